@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Benchmark single-file download throughput of the write path.
+
+Downloads one large file from a local server, first with the old
+iter_content(8192) loop (a new bytes object and a small write per 8 KiB)
+and then with download_file(), which reads into a reused buffer, preallocates
+the file and optionally writes on a background thread.
+
+Usage:
+    python benchmarks/bench_download.py
+    python benchmarks/bench_download.py --size-mb 2048 --output-dir /mnt/nvme --repeat 5
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from local_server import local_server
+from sami_cli.download import download_file
+from sami_cli.session import create_transfer_session
+
+
+def _download_iter_content(url: str, output_path: Path, session) -> None:
+    """Old behaviour: iterate 8 KiB chunks and write each one."""
+    with session.get(url, stream=True, timeout=300) as response:
+        response.raise_for_status()
+        with open(output_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=8192):
+                f.write(chunk)
+
+
+def run(label: str, fn, size: int, repeat: int) -> None:
+    rates = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        rates.append(size / (time.perf_counter() - start) / 1024**2)
+    print(f"  {label:<34} {statistics.median(rates):8.1f} MB/s  (best {max(rates):.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=512, help="File size in MiB (default: 512)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant, median reported (default: 3)")
+    parser.add_argument("--output-dir", help="Directory to download into (default: a temp dir)")
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory(dir=args.output_dir) as tmpdir, \
+            local_server() as base_url, \
+            create_transfer_session(1) as session:
+        url = f"{base_url}/files/{size}"
+        output = Path(tmpdir) / "file.bin"
+        print(f"1 file x {args.size_mb} MiB into {tmpdir}")
+
+        run("iter_content(8192) (old)", lambda: _download_iter_content(url, output, session), size, args.repeat)
+        for buffer_kib in (64, 1024, 4096):
+            run(
+                f"readinto {buffer_kib} KiB",
+                lambda: download_file(url, output, size, session=session, buffer_size=buffer_kib * 1024),
+                size, args.repeat,
+            )
+        run(
+            "readinto 1024 KiB + write-behind",
+            lambda: download_file(url, output, size, session=session, write_behind=True),
+            size, args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
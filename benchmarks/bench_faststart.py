@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Benchmark the native faststart remuxer against the ffmpeg subprocess.
+
+Each video is copied to a scratch directory first, then remuxed in place
+with apply_faststart (native) and apply_faststart_ffmpeg.
+
+Usage:
+    python benchmarks/bench_faststart.py                   # generated videos
+    python benchmarks/bench_faststart.py --videos ./videos # your own .mp4 files
+
+Without --videos, test clips are generated with ffmpeg when it is installed,
+otherwise synthetic MP4 files (valid atom layout, dummy media) are used and
+only the native path is timed.
+"""
+
+import argparse
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sami_cli.upload import apply_faststart, apply_faststart_ffmpeg, check_ffmpeg_available, needs_faststart
+
+
+def _atom(atom_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", len(payload) + 8, atom_type) + payload
+
+
+def synthetic_video(path: Path, size: int, chunks: int) -> None:
+    """Write an MP4 with moov after mdat and one stco entry per chunk."""
+    ftyp = _atom(b"ftyp", b"isom\0\0\0\0isom")
+    chunk_size = size // chunks
+    offsets = [len(ftyp) + 8 + i * chunk_size for i in range(chunks)]
+    stco = _atom(b"stco", b"\0\0\0\0" + struct.pack(">I%dI" % chunks, chunks, *offsets))
+    trak = _atom(b"trak", _atom(b"tkhd", b"\0" * 84) + _atom(b"mdia", _atom(b"minf", _atom(b"stbl", stco))))
+    moov = _atom(b"moov", _atom(b"mvhd", b"\0" * 100) + trak)
+    with open(path, "wb") as f:
+        f.write(ftyp)
+        f.write(struct.pack(">I4s", chunk_size * chunks + 8, b"mdat"))
+        block = b"\0" * chunk_size
+        for _ in range(chunks):
+            f.write(block)
+        f.write(moov)
+
+
+def ffmpeg_video(path: Path, seconds: int) -> None:
+    """Generate a real H.264 test clip with moov at the end."""
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-loglevel", "error", "-f", "lavfi",
+            "-i", f"testsrc=size=640x480:rate=30:duration={seconds}",
+            "-c:v", "libx264", "-preset", "ultrafast", str(path),
+        ],
+        check=True,
+    )
+
+
+def time_remux(fn, sources, scratch: Path) -> float:
+    copies = []
+    for i, src in enumerate(sources):
+        dst = scratch / f"bench_{i:04d}.mp4"
+        shutil.copyfile(src, dst)
+        copies.append(dst)
+    start = time.perf_counter()
+    for video in copies:
+        if not fn(video):
+            raise RuntimeError(f"Remux failed for {video}")
+    elapsed = time.perf_counter() - start
+    for video in copies:
+        assert not needs_faststart(video)
+        video.unlink()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=Path, help="Directory of .mp4 files to benchmark")
+    parser.add_argument("--count", type=int, default=20, help="Generated videos (default: 20)")
+    parser.add_argument("--size-mb", type=int, default=20, help="Synthetic video size in MB (default: 20)")
+    args = parser.parse_args()
+
+    have_ffmpeg = check_ffmpeg_available()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        if args.videos:
+            sources = [p for p in sorted(args.videos.rglob("*.mp4")) if needs_faststart(p)]
+            kind = f"{len(sources)} videos from {args.videos} needing faststart"
+        else:
+            sources = []
+            for i in range(args.count):
+                path = tmp / f"source_{i:04d}.mp4"
+                if have_ffmpeg:
+                    ffmpeg_video(path, seconds=10)
+                else:
+                    synthetic_video(path, args.size_mb * 1024 * 1024, chunks=300)
+                sources.append(path)
+            kind = f"{args.count} {'ffmpeg test clips' if have_ffmpeg else 'synthetic videos'}"
+
+        if not sources:
+            print("No videos needing faststart found.")
+            return
+
+        total_mb = sum(p.stat().st_size for p in sources) / (1024**2)
+        print(f"{kind} ({total_mb:.1f} MB total)")
+
+        scratch = tmp / "scratch"
+        scratch.mkdir()
+        native = time_remux(apply_faststart, sources, scratch)
+        print(f"  native remuxer  {native:7.3f}s  {native / len(sources) * 1000:8.2f} ms/video")
+        if have_ffmpeg:
+            ffmpeg = time_remux(apply_faststart_ffmpeg, sources, scratch)
+            print(f"  ffmpeg          {ffmpeg:7.3f}s  {ffmpeg / len(sources) * 1000:8.2f} ms/video")
+            print(f"  speedup         {ffmpeg / native:7.1f}x")
+        else:
+            print("  ffmpeg          (not installed, skipped)")
+
+
+if __name__ == "__main__":
+    main()
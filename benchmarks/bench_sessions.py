@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Benchmark per-file overhead of one-off requests vs a pooled session.
+
+Uploads many small files to a local server, first with module-level
+requests.put (new connection per file, the old behaviour) and then with a
+shared session from create_transfer_session().
+
+Usage:
+    python benchmarks/bench_sessions.py
+    python benchmarks/bench_sessions.py --files 2000 --workers 8 --tls
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import urllib3
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from local_server import local_server
+from sami_cli.session import create_transfer_session
+from sami_cli.upload import upload_file
+
+
+def run(base_url: str, paths, workers: int, pooled: bool, verify: bool) -> float:
+    session = create_transfer_session(workers) if pooled else None
+    if session is not None:
+        # REQUESTS_CA_BUNDLE would otherwise override verify=False
+        session.trust_env = verify
+        session.verify = verify
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for i, path in enumerate(paths):
+            url = f"{base_url}/upload/{i}"
+            if session is None:
+                # Old behaviour: module-level requests.put, new connection per file
+                futures.append(executor.submit(_put_one_off, path, url, verify))
+            else:
+                futures.append(executor.submit(upload_file, path, url, "application/octet-stream", session=session))
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+    if session is not None:
+        session.close()
+    return elapsed
+
+
+def _put_one_off(path: Path, url: str, verify: bool) -> None:
+    import requests
+
+    with open(path, "rb") as f:
+        response = requests.put(url, data=f, headers={"Content-Type": "application/octet-stream"}, verify=verify)
+    response.raise_for_status()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1000, help="Number of files (default: 1000)")
+    parser.add_argument("--size", type=int, default=2048, help="File size in bytes (default: 2048)")
+    parser.add_argument("--workers", type=int, default=4, help="Worker threads (default: 4)")
+    parser.add_argument("--tls", action="store_true", help="Use HTTPS with a self-signed certificate")
+    args = parser.parse_args()
+
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for i in range(args.files):
+            path = Path(tmpdir) / f"file-{i:06d}.bin"
+            path.write_bytes(b"x" * args.size)
+            paths.append(path)
+
+        with local_server(tls=args.tls) as base_url:
+            print(f"{args.files} files x {args.size} B, {args.workers} workers, {base_url.split(':')[0].upper()}")
+            for label, pooled in (("one-off requests.put", False), ("pooled session", True)):
+                elapsed = run(base_url, paths, args.workers, pooled, verify=False)
+                per_file = elapsed / args.files * 1000 * args.workers
+                print(f"  {label:<22} {elapsed:6.2f}s  {per_file:6.2f} ms/file per worker")
+
+
+if __name__ == "__main__":
+    main()
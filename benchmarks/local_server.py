@@ -0,0 +1,102 @@
+"""Local HTTP(S) server used by the transfer benchmarks.
+
+PUT requests are read and discarded. GET requests return a deterministic
+payload whose size is taken from the URL path, e.g. GET /files/1048576, and
+honour single Range headers.
+"""
+
+import re
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_PUT(self):
+        remaining = int(self.headers.get("Content-Length", 0))
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+        self.send_response(200)
+        self.send_header("ETag", '"benchmark"')
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        total = int(self.path.rstrip("/").rsplit("/", 1)[-1])
+        start, end = 0, total
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)) + 1, total) if match.group(2) else total
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{total}")
+        else:
+            self.send_response(200)
+        size = end - start
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        block = b"\0" * (1024 * 1024)
+        while size > 0:
+            n = min(size, len(block))
+            self.wfile.write(block[:n])
+            size -= n
+
+
+def _self_signed_context(workdir: Path) -> ssl.SSLContext:
+    cert, key = workdir / "cert.pem", workdir / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", str(key), "-out", str(cert), "-days", "1",
+            "-subj", "/CN=localhost",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+@contextmanager
+def local_server(tls: bool = False):
+    """Run the benchmark server in a background thread.
+
+    Args:
+        tls: Serve HTTPS with a throwaway self-signed certificate (needs openssl)
+
+    Yields:
+        Base URL of the server
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    workdir = Path(tempfile.mkdtemp())
+    scheme = "http"
+    try:
+        if tls:
+            if not shutil.which("openssl"):
+                raise RuntimeError("openssl is required for --tls")
+            context = _self_signed_context(workdir)
+            server.socket = context.wrap_socket(server.socket, server_side=True)
+            scheme = "https"
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"{scheme}://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(workdir, ignore_errors=True)
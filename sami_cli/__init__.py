@@ -55,6 +55,10 @@ from .exceptions import (
     UploadError,
     DownloadError,
     ValidationError,
+    UrlExpiredError,
+    ChecksumError,
+    TransientError,
+    CircuitOpenError,
 )
 
 __version__ = "0.2.0"
@@ -72,4 +76,8 @@ __all__ = [
     "UploadError",
     "DownloadError",
     "ValidationError",
+    "UrlExpiredError",
+    "ChecksumError",
+    "TransientError",
+    "CircuitOpenError",
 ]
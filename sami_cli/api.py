@@ -0,0 +1,140 @@
+"""API calls shared by SamiClient and AsyncSamiClient.
+
+Each call is described once, as an ApiCall: the request to send and how
+its response maps to a result or an exception. SamiClient sends calls with
+requests and AsyncSamiClient with aiohttp, so both return the same results
+and raise the same errors for the same responses.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple, Type
+
+from .exceptions import SamiError, NotFoundError, AuthenticationError
+
+
+def error_message(status: int, data: Any) -> str:
+    """Extract the error message from a decoded API error response."""
+    if isinstance(data, dict):
+        return (data.get("error") or {}).get("message", "Unknown error")
+    return f"HTTP {status}"
+
+
+@dataclass(frozen=True)
+class ApiCall:
+    """One API request and how to read its response.
+
+    Attributes:
+        method: HTTP method
+        path: Path below the API URL
+        action: What the call does, for "Failed to <action>: ..." errors
+        ok: Statuses of a successful response
+        errors: Exception type and message raised for particular statuses
+        params: Query parameters
+        json: JSON body
+    """
+
+    method: str
+    path: str
+    action: str
+    ok: Tuple[int, ...] = (200,)
+    errors: Dict[int, Tuple[Type[SamiError], str]] = field(default_factory=dict)
+    params: Optional[dict] = None
+    json: Optional[dict] = None
+
+    @property
+    def idempotent(self) -> bool:
+        """Whether the call may be retried after the server could have acted on it."""
+        return self.method != "POST"
+
+    def request_kwargs(self) -> dict:
+        """Query parameters and body, as keyword arguments for requests or aiohttp."""
+        kwargs = {}
+        if self.params is not None:
+            kwargs["params"] = self.params
+        if self.json is not None:
+            kwargs["json"] = self.json
+        return kwargs
+
+    def result(self, status: int, data: Any) -> Any:
+        """The "data" of a successful response.
+
+        Args:
+            status: HTTP status of the response
+            data: Decoded JSON body, or None if it was not JSON
+
+        Raises:
+            SamiError: The error mapped to the status, or SamiError with the
+                server's message for any other unsuccessful status
+        """
+        if status in self.errors:
+            error_type, message = self.errors[status]
+            raise error_type(message)
+        if status not in self.ok:
+            raise SamiError(f"Failed to {self.action}: {error_message(status, data)}")
+        return data.get("data") if isinstance(data, dict) else None
+
+
+def _dataset_not_found(dataset_id: str) -> Dict[int, Tuple[Type[SamiError], str]]:
+    return {404: (NotFoundError, f"Dataset not found: {dataset_id}")}
+
+
+def get_current_user() -> ApiCall:
+    return ApiCall(
+        "GET", "/auth/me", "get user info",
+        errors={401: (AuthenticationError, "Session expired. Please login again.")},
+    )
+
+
+def list_datasets(page: int = 1, limit: int = 20, status: Optional[str] = None) -> ApiCall:
+    params = {"page": page, "limit": limit}
+    if status:
+        params["status"] = status
+    return ApiCall("GET", "/datasets", "list datasets", params=params)
+
+
+def get_dataset(dataset_id: str) -> ApiCall:
+    return ApiCall("GET", f"/datasets/{dataset_id}", "get dataset", errors=_dataset_not_found(dataset_id))
+
+
+def list_formats(dataset_id: str) -> ApiCall:
+    return ApiCall(
+        "GET", f"/datasets/{dataset_id}/formats", "list formats", errors=_dataset_not_found(dataset_id)
+    )
+
+
+def request_conversion(dataset_id: str, target_format: str) -> ApiCall:
+    return ApiCall(
+        "POST", f"/datasets/{dataset_id}/convert", "request conversion",
+        ok=(200, 201, 202), errors=_dataset_not_found(dataset_id), json={"targetFormat": target_format},
+    )
+
+
+def get_conversion_status(dataset_id: str, target_format: str) -> ApiCall:
+    return ApiCall(
+        "GET", f"/datasets/{dataset_id}/convert/{target_format}", "get conversion status",
+        errors={404: (NotFoundError, "Conversion job not found")},
+    )
+
+
+def delete_dataset(dataset_id: str) -> ApiCall:
+    return ApiCall(
+        "DELETE", f"/datasets/{dataset_id}", "delete dataset",
+        ok=(200, 204), errors=_dataset_not_found(dataset_id),
+    )
+
+
+def assign_dataset(dataset_id: str, organization_id: str, permission_level: str = "download") -> ApiCall:
+    if permission_level not in ("view", "download", "admin"):
+        raise ValueError("permission_level must be 'view', 'download', or 'admin'")
+    return ApiCall(
+        "POST", f"/datasets/{dataset_id}/assignments", "assign dataset",
+        ok=(200, 201), errors={404: (NotFoundError, "Dataset or organization not found")},
+        json={"organizationId": organization_id, "permissionLevel": permission_level},
+    )
+
+
+def remove_assignment(dataset_id: str, assignment_id: str) -> ApiCall:
+    return ApiCall(
+        "DELETE", f"/datasets/{dataset_id}/assignments/{assignment_id}", "remove assignment",
+        ok=(200, 204), errors={404: (NotFoundError, "Dataset or assignment not found")},
+    )
@@ -0,0 +1,342 @@
+"""asyncio client for SAMI Datasets.
+
+AsyncSamiClient mirrors SamiClient with coroutines. API calls, described
+once in api.py for both clients, run on an aiohttp session. Uploads and downloads keep their planning, hashing and
+large-file workers on a thread, while their small-file transfers run as
+coroutines on the caller's event loop (see engine.py), so an application
+can run several of them, with hundreds of requests in flight, without
+blocking its loop.
+
+Needs aiohttp (pip install "uz-cli[async]").
+
+    async with AsyncSamiClient.from_saved_credentials() as client:
+        datasets = await client.list_datasets()
+        await client.download_dataset(datasets[0].id, "./my_dataset")
+"""
+
+import asyncio
+import functools
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+try:
+    import aiohttp
+except ImportError as e:
+    raise ImportError("AsyncSamiClient needs aiohttp: pip install 'uz-cli[async]'") from e
+
+from . import api
+from .client import SamiClient
+from .config import DEFAULT_API_URL
+from .engine import MAX_IN_FLIGHT, TransferEngine
+from .models import Dataset
+from .retry import is_retryable_status, parse_retry_after
+
+
+class AsyncSamiClient:
+    """asyncio client for the SAMI Dataset Distribution Platform.
+
+    Example usage:
+        async with AsyncSamiClient(email="user@example.com", password="...") as client:
+            datasets = await client.list_datasets()
+            await asyncio.gather(*(
+                client.download_dataset(ds.id, f"./data/{ds.id}") for ds in datasets
+            ))
+    """
+
+    def __init__(
+        self,
+        api_url: str = None,
+        email: str = None,
+        password: str = None,
+        invite_code: str = None,
+        max_in_flight: int = MAX_IN_FLIGHT,
+    ):
+        """Initialize the client.
+
+        Logging in with email/password or an invite code here blocks; in a
+        running event loop, use `await client.login()` instead.
+
+        Args:
+            api_url: Base URL of the SAMI API. Defaults to https://api.unitzero.ai/api/v1
+            email: User email for authentication
+            password: User password for authentication
+            invite_code: Invite code for anonymous join authentication
+            max_in_flight: Small-file transfers in flight at once, shared by
+                all uploads and downloads of this client
+        """
+        self._client = SamiClient(
+            api_url=api_url or DEFAULT_API_URL, email=email, password=password, invite_code=invite_code
+        )
+        self.max_in_flight = max_in_flight
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._engine: Optional[TransferEngine] = None
+
+    @property
+    def api_url(self) -> str:
+        return self._client.api_url
+
+    @property
+    def auth(self):
+        return self._client.auth
+
+    @classmethod
+    def from_saved_credentials(cls, **kwargs) -> "AsyncSamiClient":
+        """Create a client using saved credentials from ~/.uz/.
+
+        Refreshed tokens are persisted to disk, as with SamiClient.
+
+        Args:
+            **kwargs: Other AsyncSamiClient arguments (max_in_flight)
+
+        Raises:
+            AuthenticationError: If no saved credentials found
+        """
+        client = cls(**kwargs)
+        client._client = SamiClient.from_saved_credentials()
+        return client
+
+    async def login(self, email: str, password: str) -> None:
+        """Authenticate with the SAMI API.
+
+        Args:
+            email: User email
+            password: User password
+        """
+        await asyncio.to_thread(self.auth.login, email, password)
+
+    # -------------------------------------------------------------------------
+    # Plumbing
+    # -------------------------------------------------------------------------
+
+    async def _headers(self) -> dict:
+        if self.auth.refresh_token and self.auth.is_token_expired():
+            # The refresh is a blocking request
+            return await asyncio.to_thread(self.auth.get_headers)
+        return self.auth.get_headers(auto_refresh=False)
+
+    async def _call(self, call: api.ApiCall):
+        """Send an API call and return its result, like SamiClient._call().
+
+        Failed calls are retried as the client's retry_policy says; POSTs
+        only when the server cannot have acted on them.
+        """
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        policy = self._client.retry_policy
+        url = f"{self.api_url}{call.path}"
+        attempt = 0
+        while True:
+            headers = await self._headers()
+            try:
+                async with self._session.request(call.method, url, headers=headers, **call.request_kwargs()) as response:
+                    try:
+                        data = await response.json(content_type=None)
+                    except ValueError:
+                        data = None
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = policy.next_delay(attempt) if call.idempotent else None
+                if delay is None:
+                    raise
+            else:
+                if not is_retryable_status(response.status, call.idempotent):
+                    if response.status < 400:
+                        policy.succeeded()
+                    return call.result(response.status, data)
+                delay = policy.next_delay(attempt, parse_retry_after(response.headers))
+                if delay is None:
+                    return call.result(response.status, data)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _transfer_engine(self) -> TransferEngine:
+        if self._engine is None:
+            self._engine = TransferEngine(self.max_in_flight, loop=asyncio.get_running_loop())
+        return self._engine
+
+    async def aclose(self) -> None:
+        """Close the client's connections."""
+        if self._engine is not None:
+            await self._engine.aclose()
+            self._engine = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncSamiClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    # -------------------------------------------------------------------------
+    # API
+    # -------------------------------------------------------------------------
+
+    async def get_current_user(self) -> dict:
+        """Get current authenticated user info.
+
+        Returns:
+            Dictionary with user info including email, firstName, lastName,
+            role, and organization.
+        """
+        return (await self._call(api.get_current_user()))["user"]
+
+    async def list_datasets(self, page: int = 1, limit: int = 20, status: str = None) -> List[Dataset]:
+        """List datasets accessible to the authenticated user.
+
+        Args:
+            page: Page number (1-indexed)
+            limit: Number of results per page (max 100)
+            status: Filter by status (pending, uploading, processing, ready, failed)
+
+        Returns:
+            List of Dataset objects
+        """
+        return [Dataset.from_api_response(d) for d in await self._call(api.list_datasets(page, limit, status))]
+
+    async def get_dataset(self, dataset_id: str) -> Dataset:
+        """Get details of a specific dataset.
+
+        Args:
+            dataset_id: ID of the dataset
+
+        Returns:
+            Dataset object
+        """
+        return Dataset.from_api_response(await self._call(api.get_dataset(dataset_id)))
+
+    async def list_formats(self, dataset_id: str) -> List[dict]:
+        """List available formats for a dataset.
+
+        Args:
+            dataset_id: ID of the dataset
+
+        Returns:
+            List of format info dictionaries with keys: format, status, progress, size
+        """
+        return (await self._call(api.list_formats(dataset_id)))["formats"]
+
+    async def request_conversion(self, dataset_id: str, target_format: str) -> dict:
+        """Request conversion of a dataset to a target format.
+
+        Args:
+            dataset_id: ID of the dataset
+            target_format: Target format ('hdf5')
+
+        Returns:
+            Conversion job info dictionary
+        """
+        return await self._call(api.request_conversion(dataset_id, target_format))
+
+    async def get_conversion_status(self, dataset_id: str, target_format: str) -> dict:
+        """Get the status of a conversion job.
+
+        Args:
+            dataset_id: ID of the dataset
+            target_format: Target format ('hdf5')
+
+        Returns:
+            Conversion job status dictionary with keys: status, progress, errorMessage
+        """
+        return await self._call(api.get_conversion_status(dataset_id, target_format))
+
+    async def delete_dataset(self, dataset_id: str) -> None:
+        """Delete a dataset.
+
+        Only the owning organization can delete a dataset.
+
+        Args:
+            dataset_id: ID of the dataset to delete
+        """
+        await self._call(api.delete_dataset(dataset_id))
+
+    async def assign_dataset(self, dataset_id: str, organization_id: str, permission_level: str = "download") -> None:
+        """Assign a dataset to another organization.
+
+        Args:
+            dataset_id: ID of the dataset
+            organization_id: ID of the organization to grant access
+            permission_level: Permission level (view, download, admin)
+        """
+        await self._call(api.assign_dataset(dataset_id, organization_id, permission_level))
+
+    async def remove_assignment(self, dataset_id: str, assignment_id: str) -> None:
+        """Remove a dataset assignment.
+
+        Args:
+            dataset_id: ID of the dataset
+            assignment_id: ID of the assignment to remove
+        """
+        await self._call(api.remove_assignment(dataset_id, assignment_id))
+
+    # -------------------------------------------------------------------------
+    # Transfers
+    # -------------------------------------------------------------------------
+
+    async def upload_dataset(self, name: str, path: str, **kwargs) -> Dataset:
+        """Upload a LeRobot dataset.
+
+        Small files are uploaded on this event loop; the rest of the upload
+        runs on a thread.
+
+        Args:
+            name: Dataset name
+            path: Path to local LeRobot dataset directory
+            **kwargs: Other SamiClient.upload_dataset() arguments
+
+        Returns:
+            Dataset object with metadata
+        """
+        upload = functools.partial(
+            self._client.upload_dataset, name, path, engine=self._transfer_engine(), **kwargs
+        )
+        return await asyncio.to_thread(upload)
+
+    async def download_dataset(self, dataset_id: str, output_path: str, **kwargs) -> Path:
+        """Download a dataset.
+
+        Small files are downloaded on this event loop; the rest of the
+        download runs on a thread. on_episode is called from that thread.
+
+        Args:
+            dataset_id: ID of the dataset to download
+            output_path: Local path to download to
+            **kwargs: Other SamiClient.download_dataset() arguments
+
+        Returns:
+            Path to the downloaded dataset
+        """
+        download = functools.partial(
+            self._client.download_dataset, dataset_id, output_path, engine=self._transfer_engine(), **kwargs
+        )
+        return await asyncio.to_thread(download)
+
+    async def iter_episodes(self, dataset_id: str, output_path: str, **kwargs) -> AsyncIterator[int]:
+        """Download a LeRobot dataset, yielding each episode once it is on disk.
+
+            async for episode in client.iter_episodes(dataset_id, "./data"):
+                print(f"episode {episode} ready")
+
+        Args:
+            dataset_id: ID of the dataset to download
+            output_path: Local path to download to
+            **kwargs: Other SamiClient.download_dataset() arguments
+
+        Yields:
+            Episode indices, roughly in ascending order
+        """
+        loop = asyncio.get_running_loop()
+        ready: asyncio.Queue = asyncio.Queue()
+        download = asyncio.ensure_future(self.download_dataset(
+            dataset_id, output_path,
+            on_episode=lambda episode: loop.call_soon_threadsafe(ready.put_nowait, episode),
+            **kwargs,
+        ))
+        download.add_done_callback(lambda _: ready.put_nowait(None))
+        while True:
+            episode = await ready.get()
+            if episode is None:
+                break
+            yield episode
+        # Raises the download's error, after the last complete episode
+        await download
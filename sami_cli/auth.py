@@ -2,15 +2,32 @@
 
 import base64
 import json
+import threading
 import time
 import webbrowser
 import requests
+from contextlib import contextmanager
 from typing import Optional, Dict, Any, Tuple
 from .exceptions import AuthenticationError
 
 
+# Seconds before expiry a token counts as expired
+EXPIRY_MARGIN = 60
+# Seconds before expiry the background refresh renews a token
+BACKGROUND_REFRESH_MARGIN = 300
+# Seconds the background refresh waits after a failed attempt
+BACKGROUND_RETRY_INTERVAL = 30
+# (connect, read) timeout in seconds of a token refresh, which holds the
+# refresh lock every other request waits on
+REFRESH_TIMEOUT = (10, 30)
+
+
 class SamiAuth:
-    """Handles authentication with SAMI API."""
+    """Handles authentication with SAMI API.
+
+    Safe to share between threads: an expired token is refreshed once, by
+    whichever caller gets there first, while the others wait for it.
+    """
 
     def __init__(self, api_url: str):
         self.api_url = api_url.rstrip("/")
@@ -18,21 +35,28 @@ class SamiAuth:
         self.refresh_token: Optional[str] = None
         # Callback to persist tokens after refresh (set by client)
         self._on_tokens_refreshed: Optional[callable] = None
+        # Held while refreshing, so concurrent callers wait for one refresh
+        self._refresh_lock = threading.Lock()
+        # Background refresh thread, shared by nested keep_fresh() blocks
+        self._keep_fresh_lock = threading.Lock()
+        self._keep_fresh_users = 0
+        self._keep_fresh_stop: Optional[threading.Event] = None
+        self._keep_fresh_thread: Optional[threading.Thread] = None
 
-    def is_token_expired(self) -> bool:
-        """Check if the access token is expired.
+    def token_expires_at(self) -> Optional[float]:
+        """Expiry time of the access token (the JWT "exp" claim).
 
         Returns:
-            True if token is expired or invalid, False otherwise.
+            Unix timestamp, or None if there is no token or it can't be decoded.
         """
         if not self.access_token:
-            return True
+            return None
 
         try:
             # JWT format: header.payload.signature
             parts = self.access_token.split(".")
             if len(parts) != 3:
-                return True
+                return None
 
             # Decode payload (add padding if needed)
             payload = parts[1]
@@ -42,15 +66,25 @@ class SamiAuth:
 
             decoded = base64.urlsafe_b64decode(payload)
             claims = json.loads(decoded)
-
-            # Check expiration with 60 second buffer
-            exp = claims.get("exp", 0)
-            return time.time() >= (exp - 60)
+            return float(claims.get("exp", 0))
 
         except Exception:
+            return None
+
+    def is_token_expired(self) -> bool:
+        """Check if the access token is expired.
+
+        Returns:
+            True if token is expired or invalid, False otherwise.
+        """
+        expires_at = self.token_expires_at()
+        if expires_at is None:
             # If we can't decode, assume expired
             return True
 
+        # Check expiration with 60 second buffer
+        return time.time() >= (expires_at - EXPIRY_MARGIN)
+
     def login(self, email: str, password: str) -> None:
         """Authenticate with email and password."""
         response = requests.post(
@@ -115,12 +149,50 @@ class SamiAuth:
         Raises:
             AuthenticationError: If no refresh token available or refresh fails.
         """
+        with self._refresh_lock:
+            return self._refresh()
+
+    def refresh_if_stale(self, stale_token: Optional[str], margin: float = EXPIRY_MARGIN) -> bool:
+        """Refresh the access token unless another caller already has.
+
+        Callers that found `stale_token` expired call this at the same time;
+        the first one refreshes, the others wait for it and reuse its token.
+
+        Args:
+            stale_token: Access token the caller found expired
+            margin: Seconds before expiry a token counts as expired
+
+        Returns:
+            True if a usable token is in place.
+
+        Raises:
+            AuthenticationError: If no refresh token available or refresh fails.
+        """
+        with self._refresh_lock:
+            if self.access_token != stale_token:
+                # Refreshed while this caller waited for the lock
+                return True
+            expires_at = self.token_expires_at()
+            if expires_at is not None and time.time() < expires_at - margin:
+                return True
+            return self._refresh()
+
+    def _refresh(self) -> bool:
+        """refresh(); caller holds the refresh lock.
+
+        The request times out after REFRESH_TIMEOUT, so a stalled server
+        cannot keep the lock, and every request waiting on it, forever.
+
+        Raises:
+            requests.Timeout: If the auth server does not answer in time
+        """
         if not self.refresh_token:
             raise AuthenticationError("No refresh token available. Please login again.")
 
         response = requests.post(
             f"{self.api_url}/auth/refresh-token",
             json={"refreshToken": self.refresh_token},
+            timeout=REFRESH_TIMEOUT,
         )
 
         if response.status_code != 200:
@@ -143,7 +215,8 @@ class SamiAuth:
         if new_refresh_token:
             self.refresh_token = new_refresh_token
 
-        # Persist new tokens to disk via callback
+        # Persist new tokens to disk via callback (under the lock, so
+        # concurrent refreshes never interleave their writes)
         if self._on_tokens_refreshed:
             self._on_tokens_refreshed(self.access_token, self.refresh_token)
 
@@ -164,10 +237,11 @@ class SamiAuth:
         if not self.access_token:
             raise AuthenticationError("Not authenticated. Call login() first.")
 
-        # Check if token is expired and try to refresh
+        # Check if token is expired and try to refresh (once, for all threads)
+        token = self.access_token
         if auto_refresh and self.is_token_expired() and self.refresh_token:
             try:
-                self.refresh()
+                self.refresh_if_stale(token)
             except AuthenticationError:
                 # If refresh fails, continue with expired token
                 # The server will return 401 and the caller can handle it
@@ -179,6 +253,55 @@ class SamiAuth:
         """Check if currently authenticated."""
         return self.access_token is not None
 
+    # =========================================================================
+    # Background Refresh
+    # =========================================================================
+
+    @contextmanager
+    def keep_fresh(self):
+        """Refresh the access token in the background while the block runs.
+
+        The token is renewed BACKGROUND_REFRESH_MARGIN seconds before it
+        expires, so requests of a long transfer never wait for a refresh.
+        Blocks may nest or overlap across threads; one thread serves them all.
+        """
+        with self._keep_fresh_lock:
+            self._keep_fresh_users += 1
+            if self._keep_fresh_users == 1 and self.refresh_token:
+                self._keep_fresh_stop = threading.Event()
+                self._keep_fresh_thread = threading.Thread(
+                    target=self._keep_fresh_loop, args=(self._keep_fresh_stop,),
+                    name="uz-token-refresh", daemon=True,
+                )
+                self._keep_fresh_thread.start()
+        try:
+            yield self
+        finally:
+            with self._keep_fresh_lock:
+                self._keep_fresh_users -= 1
+                if self._keep_fresh_users == 0 and self._keep_fresh_thread is not None:
+                    self._keep_fresh_stop.set()
+                    self._keep_fresh_thread = None
+
+    def _keep_fresh_loop(self, stop: threading.Event) -> None:
+        """Refresh the token shortly before it expires until stop is set."""
+        min_wait = 0.0
+        while True:
+            expires_at = self.token_expires_at()
+            if expires_at is None:
+                # Not a JWT: nothing to schedule, get_headers() refreshes it
+                return
+            if stop.wait(max(expires_at - BACKGROUND_REFRESH_MARGIN - time.time(), min_wait)):
+                return
+            try:
+                self.refresh_if_stale(self.access_token, margin=BACKGROUND_REFRESH_MARGIN)
+            except (AuthenticationError, requests.RequestException):
+                # Near expiry, get_headers() refreshes inline meanwhile
+                pass
+            # At most one attempt per interval, even if it failed or the new
+            # token is as short-lived as the margin
+            min_wait = BACKGROUND_RETRY_INTERVAL
+
     def start_device_flow(self) -> Dict[str, Any]:
         """Start device code flow for CLI authentication.
 
@@ -0,0 +1,242 @@
+"""Back-pressure shared by all workers of a transfer.
+
+Without coordination, every worker finds out about throttling on its own:
+while S3 answers 503 SlowDown, each worker backs off and retries on its own
+schedule, and the pool as a whole keeps the request rate up. Backpressure
+sees the outcome of every request of a run and gates new requests per host:
+
+- throttled (429 or 503): requests to the host pause for a while (the
+  Retry-After, at least PAUSE seconds). Throttles from the same burst only
+  extend the pause; it doubles when throttling outlasts it (the probe, or
+  a request after the pause, is throttled again)
+- FAILURE_THRESHOLD failures in a row (connection errors, other 5xx): the
+  host's circuit opens and requests wait OPEN_COOLDOWN seconds, doubled
+  after every failed probe
+- after a pause or cooldown a single probe request goes out; the others
+  resume once it succeeds
+- a host failing for MAX_OUTAGE seconds fails further requests at once
+  with CircuitOpenError, so the run ends and can be resumed later
+
+Transfer sessions gate requests through BackpressureAdapter (session.py),
+asyncio transfers and API calls through request() / request_async().
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .exceptions import CircuitOpenError
+
+
+# Seconds requests to a throttled host pause, doubled while throttling outlasts the pause
+PAUSE = 1.0
+MAX_PAUSE = 30.0
+# Failures in a row that open a host's circuit
+FAILURE_THRESHOLD = 5
+# Seconds an open circuit waits before a probe, doubled after each failed probe
+OPEN_COOLDOWN = 5.0
+MAX_COOLDOWN = 60.0
+# Seconds a host may keep failing before requests to it fail at once
+MAX_OUTAGE = 300.0
+# Seconds between checks while another request probes the host
+PROBE_POLL = 0.5
+# Responses telling the client to slow down
+THROTTLE_STATUS = frozenset({429, 503})
+
+
+class _Host:
+    """Back-pressure state of one host."""
+
+    def __init__(self):
+        self.blocked_until = 0.0
+        self.probe_needed = False
+        self.probing = False
+        self.failures = 0
+        self.pause = 0.0
+        self.cooldown = 0.0
+        self.failing_since: Optional[float] = None
+
+
+class Backpressure:
+    """Per-host pause and circuit breaker shared by the workers of a run."""
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        max_outage: float = MAX_OUTAGE,
+    ):
+        """
+        Args:
+            failure_threshold: Failures in a row that open a host's circuit
+            max_outage: Seconds a host may keep failing before requests to
+                it fail at once
+        """
+        self.failure_threshold = max(failure_threshold, 1)
+        self.max_outage = max_outage
+        self.throttles = 0
+        self.circuit_opens = 0
+        self._hosts: Dict[str, _Host] = {}
+        self._cond = threading.Condition()
+
+    # =========================================================================
+    # Gate
+    # =========================================================================
+
+    def _admit(self, host: str) -> Tuple[float, bool]:
+        """Seconds to wait before a request to host, and whether it probes.
+
+        Caller holds the lock.
+        """
+        state = self._hosts.setdefault(host, _Host())
+        now = time.monotonic()
+        if state.cooldown and state.failing_since is not None and now - state.failing_since >= self.max_outage:
+            raise CircuitOpenError(f"{host} has been failing for {self.max_outage:.0f}s")
+        if now < state.blocked_until:
+            return state.blocked_until - now, False
+        if state.probe_needed:
+            if state.probing:
+                return PROBE_POLL, False
+            state.probing = True
+            return 0.0, True
+        return 0.0, False
+
+    def acquire(self, host: str) -> bool:
+        """Wait until a request to host may be sent.
+
+        Returns:
+            True if the request is the host's probe; its outcome must be
+            passed to record() (or abandon())
+
+        Raises:
+            CircuitOpenError: If the host has been failing for max_outage
+        """
+        with self._cond:
+            while True:
+                wait, probe = self._admit(host)
+                if wait <= 0:
+                    return probe
+                self._cond.wait(wait)
+
+    async def acquire_async(self, host: str) -> bool:
+        """acquire() without blocking the event loop."""
+        while True:
+            with self._cond:
+                wait, probe = self._admit(host)
+            if wait <= 0:
+                return probe
+            await asyncio.sleep(min(wait, PROBE_POLL))
+
+    # =========================================================================
+    # Outcomes
+    # =========================================================================
+
+    def record(self, host: str, status: Optional[int], retry_after: Optional[float] = None, probe: bool = False) -> None:
+        """Record the outcome of a request to host.
+
+        Args:
+            host: Host the request went to
+            status: Response status, or None for a connection error or timeout
+            retry_after: Delay the server asked for in seconds
+            probe: Whether the request was the host's probe
+        """
+        with self._cond:
+            state = self._hosts.setdefault(host, _Host())
+            now = time.monotonic()
+            if probe:
+                state.probing = False
+            if status in THROTTLE_STATUS:
+                self.throttles += 1
+                if probe or now >= state.blocked_until:
+                    # Throttled again after a pause; throttles of requests
+                    # already in flight during it only extend it
+                    state.pause = min(MAX_PAUSE, state.pause * 2 if state.pause else PAUSE)
+                delay = max(state.pause, min(retry_after or 0.0, MAX_PAUSE))
+                state.blocked_until = max(state.blocked_until, now + delay)
+                state.probe_needed = True
+            elif status is None or status >= 500:
+                state.failures += 1
+                if state.failing_since is None:
+                    state.failing_since = now
+                if state.failures >= self.failure_threshold:
+                    if not state.probe_needed or probe:
+                        # Opened, or a probe of the open circuit failed
+                        if not state.cooldown:
+                            self.circuit_opens += 1
+                        state.cooldown = min(MAX_COOLDOWN, state.cooldown * 2 if state.cooldown else OPEN_COOLDOWN)
+                        state.blocked_until = max(state.blocked_until, now + state.cooldown)
+                    state.probe_needed = True
+            else:
+                # The host answered: a 4xx is the request's problem, not the host's
+                state.failures = 0
+                state.failing_since = None
+                if probe or not state.probe_needed:
+                    state.pause = 0.0
+                    state.cooldown = 0.0
+                    state.probe_needed = False
+            self._cond.notify_all()
+
+    def abandon(self, host: str, probe: bool) -> None:
+        """Forget a request that ended without an outcome (e.g. interrupted)."""
+        if probe:
+            with self._cond:
+                self._hosts[host].probing = False
+                self._cond.notify_all()
+
+    @contextmanager
+    def request(self, url: str):
+        """Gate one request to url.
+
+            with backpressure.request(url) as report:
+                response = requests.get(url)
+                report(response.status_code, parse_retry_after(response.headers))
+
+        An exception raised before report() is recorded as a connection
+        failure (KeyboardInterrupt and the like are not recorded).
+
+        Yields:
+            report(status, retry_after=None)
+        """
+        host = urlsplit(url).netloc
+        probe = self.acquire(host)
+        with self._reporting(host, probe) as report:
+            yield report
+
+    @asynccontextmanager
+    async def request_async(self, url: str):
+        """request() for asyncio transfers."""
+        host = urlsplit(url).netloc
+        probe = await self.acquire_async(host)
+        with self._reporting(host, probe) as report:
+            yield report
+
+    @contextmanager
+    def _reporting(self, host: str, probe: bool):
+        reported = []
+
+        def report(status: Optional[int], retry_after: Optional[float] = None) -> None:
+            if not reported:
+                reported.append(status)
+                self.record(host, status, retry_after, probe)
+
+        try:
+            yield report
+        except Exception:
+            report(None)
+            raise
+        finally:
+            if not reported:
+                self.abandon(host, probe)
+
+    def summary(self) -> Optional[str]:
+        """One-line description of the throttling seen, if any."""
+        if not self.throttles and not self.circuit_opens:
+            return None
+        parts = []
+        if self.throttles:
+            parts.append(f"throttled {self.throttles} times")
+        if self.circuit_opens:
+            parts.append(f"circuit opened {self.circuit_opens} times")
+        return "Back-pressure: " + ", ".join(parts)
@@ -0,0 +1,249 @@
+"""Bandwidth limits for uploads and downloads (``--max-bandwidth``).
+
+All transfers of a run draw from one TokenBucket, so the limit holds for the
+sum of all workers and asyncio transfers, not per connection. Bodies are
+throttled as they are streamed: a download waits after each buffer it reads
+(letting TCP flow control slow the sender), an upload before each block it
+hands to the connection.
+
+The limit can follow a schedule by time of day, e.g. full speed at night and
+50 Mbit/s while the lab's teleoperation streams need the uplink:
+
+    uz config --bandwidth-schedule "08:00-20:00=50Mbit"
+"""
+
+import datetime
+import re
+import threading
+import time
+from typing import List, Optional, Tuple, Union
+
+from .exceptions import ValidationError
+
+
+# Seconds of transfer at full rate that may be sent in one burst
+BURST_SECONDS = 0.5
+# Seconds a scheduled rate is reused before the schedule is checked again
+SCHEDULE_CHECK_INTERVAL = 10.0
+
+_BANDWIDTH_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([kmgKMG]?)(bit|bps|b|B)?(?:/s)?$")
+_UNLIMITED = ("unlimited", "off", "none")
+_PREFIXES = {"": 1, "k": 10**3, "m": 10**6, "g": 10**9}
+
+
+def parse_bandwidth(value: str) -> Optional[int]:
+    """Parse a bandwidth such as "50Mbit", "6MB/s" or "unlimited".
+
+    Lowercase b, bit and bps are bits, uppercase B bytes; a bare number is
+    Mbit/s. Prefixes are decimal (k = 1000), as is usual for network rates.
+
+    Returns:
+        Bytes per second, or None for no limit
+    """
+    value = value.strip()
+    if value.lower() in _UNLIMITED:
+        return None
+    match = _BANDWIDTH_RE.match(value)
+    if not match:
+        raise ValidationError(f"Invalid bandwidth '{value}': expected e.g. 50Mbit, 6MB/s or unlimited")
+    number, prefix, unit = match.groups()
+    if unit is None:
+        prefix, unit = prefix or "m", "bit"
+    rate = float(number) * _PREFIXES[prefix.lower()]
+    if unit != "B":
+        rate /= 8
+    if rate < 1:
+        raise ValidationError(f"Invalid bandwidth '{value}': must be at least 1 byte/s")
+    return int(rate)
+
+
+def format_bandwidth(rate: Optional[int]) -> str:
+    """Describe a rate in bytes per second in Mbit/s."""
+    if rate is None:
+        return "unlimited"
+    return f"{rate * 8 / 10**6:g} Mbit/s"
+
+
+def _parse_time(value: str) -> int:
+    """Minutes after midnight of a HH:MM time."""
+    try:
+        hours, minutes = (int(v) for v in value.split(":"))
+    except ValueError:
+        raise ValidationError(f"Invalid time '{value}': expected HH:MM")
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or hours * 60 + minutes > 24 * 60:
+        raise ValidationError(f"Invalid time '{value}': expected HH:MM")
+    return hours * 60 + minutes
+
+
+class BandwidthSchedule:
+    """Bandwidth limits by time of day (local time).
+
+    A schedule is a comma-separated list of START-END=RATE windows; windows
+    may wrap past midnight, and the first matching window wins. Outside
+    every window, transfers run at full speed:
+
+        08:00-20:00=50Mbit,20:00-23:00=200Mbit
+    """
+
+    def __init__(self, windows: List[Tuple[int, int, Optional[int]]]):
+        """
+        Args:
+            windows: (start, end, rate) tuples; start and end in minutes
+                after midnight, rate in bytes per second (None: no limit)
+        """
+        self.windows = windows
+
+    @classmethod
+    def parse(cls, spec: str) -> "BandwidthSchedule":
+        """Parse a schedule such as "08:00-20:00=50Mbit"."""
+        windows = []
+        for item in spec.split(","):
+            span, sep, rate = item.strip().partition("=")
+            start, dash, end = span.partition("-")
+            if not sep or not dash:
+                raise ValidationError(f"Invalid schedule entry '{item.strip()}': expected HH:MM-HH:MM=RATE")
+            windows.append((_parse_time(start.strip()), _parse_time(end.strip()), parse_bandwidth(rate)))
+        return cls(windows)
+
+    def rate_at(self, when: datetime.datetime) -> Optional[int]:
+        """Limit in bytes per second at a given time (None: no limit)."""
+        minute = when.hour * 60 + when.minute
+        for start, end, rate in self.windows:
+            if start <= end:
+                inside = start <= minute < end
+            else:
+                inside = minute >= start or minute < end
+            if inside:
+                return rate
+        return None
+
+    def __str__(self) -> str:
+        return ",".join(
+            f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}={format_bandwidth(rate).replace(' ', '')}"
+            for start, end, rate in self.windows
+        )
+
+
+class TokenBucket:
+    """Byte budget refilled at a fixed (or scheduled) rate, shared by threads.
+
+    Callers take tokens for the bytes they are about to move; once the
+    bucket is empty they wait for it to refill. Waits are reserved in order
+    under the lock, so concurrent callers share the rate fairly.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[int] = None,
+        schedule: Optional[BandwidthSchedule] = None,
+        burst_seconds: float = BURST_SECONDS,
+    ):
+        """
+        Args:
+            rate: Limit in bytes per second
+            schedule: Limits by time of day, used when rate is None
+            burst_seconds: Seconds at full rate the bucket holds
+        """
+        self.rate = rate
+        self.schedule = schedule
+        self.burst_seconds = burst_seconds
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self._scheduled_rate: Optional[int] = None
+        self._schedule_checked: Optional[float] = None
+
+    def current_rate(self) -> Optional[int]:
+        """Limit in force now, in bytes per second (None: no limit)."""
+        if self.rate is not None or self.schedule is None:
+            return self.rate
+        now = time.monotonic()
+        if self._schedule_checked is None or now - self._schedule_checked >= SCHEDULE_CHECK_INTERVAL:
+            self._scheduled_rate = self.schedule.rate_at(datetime.datetime.now())
+            self._schedule_checked = now
+        return self._scheduled_rate
+
+    def reserve(self, num_bytes: int) -> float:
+        """Take tokens for num_bytes, going into debt if needed.
+
+        Returns:
+            Seconds to wait before moving the bytes
+        """
+        with self._lock:
+            rate = self.current_rate()
+            now = time.monotonic()
+            if rate is None:
+                self._tokens = 0.0
+                self._updated = now
+                return 0.0
+            capacity = rate * self.burst_seconds
+            self._tokens = min(capacity, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            self._tokens -= num_bytes
+            return -self._tokens / rate if self._tokens < 0 else 0.0
+
+    def consume(self, num_bytes: int) -> None:
+        """Wait until num_bytes may be moved."""
+        delay = self.reserve(num_bytes)
+        if delay > 0:
+            time.sleep(delay)
+
+    def describe(self) -> str:
+        """Human-readable limit, e.g. for a progress message."""
+        if self.rate is not None or self.schedule is None:
+            return format_bandwidth(self.rate)
+        return f"{format_bandwidth(self.current_rate())} now (schedule {self.schedule})"
+
+
+class LimitedBody:
+    """File-like wrapper reading a request body no faster than a TokenBucket allows."""
+
+    def __init__(self, body, size: int, bucket: TokenBucket):
+        """
+        Args:
+            body: Readable body (file, FileSlice, FaststartReader)
+            size: Body length in bytes, sent as Content-Length
+            bucket: Token bucket shared by the run
+        """
+        self._body = body
+        self._size = size
+        self._bucket = bucket
+
+    def __len__(self) -> int:
+        return self._size
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._body.read(size)
+        if data:
+            self._bucket.consume(len(data))
+        return data
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(1024 * 1024)
+            if not chunk:
+                return
+            yield chunk
+
+
+def limit_bandwidth(
+    max_bandwidth: Optional[Union[int, str]] = None,
+    schedule: Optional[Union[BandwidthSchedule, str]] = None,
+) -> Optional[TokenBucket]:
+    """Token bucket for a run, or None if it is not limited.
+
+    Args:
+        max_bandwidth: Limit in bytes per second, or a string such as
+            "50Mbit"; overrides the schedule
+        schedule: BandwidthSchedule, or a schedule string
+    """
+    if isinstance(max_bandwidth, str):
+        max_bandwidth = parse_bandwidth(max_bandwidth)
+        if max_bandwidth is None:
+            # Explicitly unlimited, whatever the schedule says
+            return None
+    if isinstance(schedule, str):
+        schedule = BandwidthSchedule.parse(schedule)
+    if max_bandwidth is None and schedule is None:
+        return None
+    return TokenBucket(max_bandwidth, None if max_bandwidth is not None else schedule)
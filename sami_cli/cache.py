@@ -0,0 +1,284 @@
+"""Machine-wide cache of downloaded files, shared by all output directories.
+
+Downloads through a cache land in the cache first and are then placed in the
+output directory as a reflink (copy-on-write clone, on btrfs/XFS), a
+hardlink, or a copy when the output is on another file system. Downloading a
+dataset that is already cached, into any directory, transfers nothing.
+
+Objects are keyed by content when the server reports a checksum (SHA-256 or
+S3 ETag), so identical files in different datasets are stored once, and by
+dataset, path, size and version otherwise. They are made read-only, since a
+hardlinked output shares its data with the cache.
+
+Several processes can share a cache: each object is downloaded under an
+exclusive file lock, so concurrent downloads of the same file wait for one
+another instead of fetching it twice. Once the cache grows past its size
+limit, the least recently used objects are deleted (by access time, which
+every use refreshes). Hardlinked outputs keep their data after eviction.
+
+For a cache shared between users, point every user at the same directory
+(uz config --cache-dir) and make it group-writable.
+"""
+
+import hashlib
+import os
+import shutil
+import stat
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+from .checksum import expected_checksum
+from .config import SamiConfig
+from .sync import server_version
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Default cache location
+CACHE_DIR = SamiConfig.CONFIG_DIR / "cache"
+# Default size limit of a cache
+DEFAULT_CACHE_MAX_SIZE = 100 * 1024**3
+# Suffix of the lock file of an object
+LOCK_SUFFIX = ".lock"
+# ioctl that clones a file's extents (Linux)
+_FICLONE = 0x40049409
+
+
+class FileLock:
+    """Exclusive lock on a file, held across processes and threads.
+
+    Uses flock() on POSIX and LockFile on Windows. The lock file itself is
+    never deleted, so every process always locks the same file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._f = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Take the lock, waiting for it unless blocking is False.
+
+        Returns:
+            True if the lock was taken
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                except BlockingIOError:
+                    f.close()
+                    return False
+            else:
+                while True:
+                    try:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        if not blocking:
+                            f.close()
+                            return False
+                        time.sleep(0.1)
+        except BaseException:
+            f.close()
+            raise
+        self._f = f
+        return True
+
+    def release(self) -> None:
+        """Release the lock if it is held."""
+        if self._f is None:
+            return
+        if fcntl is None:
+            self._f.seek(0)
+            msvcrt.locking(self._f.fileno(), msvcrt.LK_UNLCK, 1)
+        # Closing the file releases a flock()
+        self._f.close()
+        self._f = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def _reflink(source: Path, target: Path) -> bool:
+    """Clone a file without copying its data, where the file system can."""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        return True
+    except OSError:
+        target.unlink(missing_ok=True)
+        return False
+
+
+def _object_name(dataset_id: str, url_info: dict) -> Tuple[str, str]:
+    """(kind, name) of the cache object holding a file."""
+    size = url_info["size"]
+    checksum = expected_checksum(url_info)
+    if checksum is not None:
+        return checksum.algorithm, f"{checksum.value}-{size}"
+    identity = "\0".join([dataset_id, url_info["relativePath"], str(size), server_version(url_info) or ""])
+    return "path", hashlib.sha256(identity.encode()).hexdigest()
+
+
+class ContentCache:
+    """Directory of downloaded files shared between downloads."""
+
+    def __init__(self, root: Optional[Path] = None, max_size: Optional[int] = DEFAULT_CACHE_MAX_SIZE):
+        """
+        Args:
+            root: Cache directory (default: ~/.uz/cache)
+            max_size: Bytes kept before evicting the least recently used
+                objects (None: no limit)
+        """
+        self.root = Path(root).expanduser() if root else CACHE_DIR
+        self.objects_dir = self.root / "objects"
+        self.max_size = max_size
+
+    def object_path(self, dataset_id: str, url_info: dict) -> Path:
+        """Path of the cache object for a file of the download listing."""
+        kind, name = _object_name(dataset_id, url_info)
+        return self.objects_dir / kind / name[:2] / name
+
+    def lookup(self, object_path: Path, size: Optional[int] = None) -> bool:
+        """Check if an object is cached, marking it as recently used.
+
+        Objects only appear once complete (downloads are renamed into place).
+        """
+        try:
+            st = os.stat(object_path)
+        except FileNotFoundError:
+            return False
+        if size is not None and st.st_size != size:
+            return False
+        try:
+            # Only the access time: the mtime is shared with hardlinked
+            # outputs and recorded in their download manifests
+            os.utime(object_path, ns=(time.time_ns(), st.st_mtime_ns))
+        except OSError:
+            pass
+        return True
+
+    @contextmanager
+    def locked(self, object_path: Path) -> Iterator[None]:
+        """Hold the lock of an object, e.g. while it is downloaded."""
+        with FileLock(object_path.with_name(object_path.name + LOCK_SUFFIX)):
+            yield
+
+    def try_lock(self, object_path: Path) -> Optional[FileLock]:
+        """Take the lock of an object if no other download holds it."""
+        lock = FileLock(object_path.with_name(object_path.name + LOCK_SUFFIX))
+        return lock if lock.acquire(blocking=False) else None
+
+    def seal(self, object_path: Path) -> None:
+        """Make a new object read-only, protecting it through its hardlinks."""
+        mode = os.stat(object_path).st_mode
+        os.chmod(object_path, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+    def materialize(self, object_path: Path, output_path: Path) -> str:
+        """Place a cached object at output_path, replacing any file there.
+
+        Returns:
+            How it was placed: "reflink", "hardlink" or "copy"
+
+        Raises:
+            FileNotFoundError: If the object was evicted in the meantime
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_name(output_path.name + ".uz-link")
+        tmp_path.unlink(missing_ok=True)
+        if _reflink(object_path, tmp_path):
+            method = "reflink"
+        else:
+            try:
+                os.link(object_path, tmp_path)
+                method = "hardlink"
+            except FileNotFoundError:
+                raise
+            except OSError:
+                # Other file system, or links not supported
+                shutil.copyfile(object_path, tmp_path)
+                method = "copy"
+        os.replace(tmp_path, output_path)
+        return method
+
+    def fetch(self, object_path: Path, output_path: Path, size: int, fill: Callable[[Path], None]) -> bool:
+        """Place an object at output_path, downloading it first if needed.
+
+        Args:
+            object_path: Cache object (from object_path())
+            output_path: Where the file is wanted
+            size: Expected size of the object
+            fill: Called with object_path to download the object there
+
+        Returns:
+            True if the object was already cached
+        """
+        with self.locked(object_path):
+            hit = self.lookup(object_path, size)
+            if not hit:
+                fill(object_path)
+                self.seal(object_path)
+            self.materialize(object_path, output_path)
+        return hit
+
+    def _objects(self) -> Iterator[Tuple[int, int, Path]]:
+        """(atime_ns, size, path) of every complete object."""
+        for path in self.objects_dir.rglob("*"):
+            # Object names have no suffix; .lock, .part and .segments files do
+            if "." in path.name:
+                continue
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                yield st.st_atime_ns, st.st_size, path
+
+    def size(self) -> int:
+        """Total size of the cached objects in bytes."""
+        return sum(size for _, size, _ in self._objects())
+
+    def evict(self) -> Tuple[int, int]:
+        """Delete least recently used objects until the cache fits max_size.
+
+        Objects being downloaded or linked by another process are skipped.
+
+        Returns:
+            (number of objects, bytes) deleted
+        """
+        if self.max_size is None:
+            return 0, 0
+        with FileLock(self.root / "evict.lock"):
+            objects = sorted(self._objects())
+            total = sum(size for _, size, _ in objects)
+            removed, freed = 0, 0
+            for _, size, path in objects:
+                if total <= self.max_size:
+                    break
+                lock = self.try_lock(path)
+                if lock is None:
+                    continue
+                try:
+                    path.unlink(missing_ok=True)
+                finally:
+                    lock.release()
+                total -= size
+                removed += 1
+                freed += size
+        return removed, freed
@@ -0,0 +1,259 @@
+"""Checksums computed in the same pass as a transfer, and `uz verify`.
+
+Uploads: a PUT can carry a Content-MD5 header that S3 checks on arrival.
+The header has to be sent before the body, so its MD5 costs a read of its
+own. By default only the MD5s the dedup hashing pass (dedup.hash_files)
+already computed are sent, and uploads read every file once. With
+checksums=True (--checksum), the other MD5s are computed just before each
+file or multipart part is sent (body_md5), reading it twice.
+
+Downloads: bytes are hashed as they are written and checked against the
+checksum the server reports once the file is complete: a SHA-256 from the
+listing, or the S3 ETag. A plain ETag is the MD5 of the object. A multipart
+ETag ("<hex>-<parts>") is the MD5 of the concatenated part MD5s. It is only
+checked when the listing reports the part size the object was uploaded with
+(partSize): a matching part count alone does not prove the part size, and a
+wrong guess would fail every download of the file.
+
+S3 ETags are only MD5s for objects that are not encrypted with SSE-KMS; such
+buckets should report a sha256 in the download listing.
+"""
+
+import base64
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from tqdm import tqdm
+
+from .exceptions import ChecksumError
+from .sync import LocalManifest
+
+
+# Read size when hashing files on disk
+READ_CHUNK_SIZE = 8 * 1024 * 1024
+
+_ETAG_PATTERN = re.compile(r'^(?:w/)?"?([0-9a-f]{32})(?:-(\d+))?"?$')
+
+
+def content_md5(md5_hex: str) -> str:
+    """Value of a Content-MD5 header (base64 of the binary digest)."""
+    return base64.b64encode(bytes.fromhex(md5_hex)).decode("ascii")
+
+
+def body_md5(open_body) -> str:
+    """MD5 hex digest of an upload body, read once before it is sent.
+
+    Args:
+        open_body: Callable returning a fresh context-managed body
+    """
+    digest = hashlib.md5()
+    with open_body() as body:
+        while True:
+            chunk = body.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def multipart_etag(part_md5s: List[str]) -> str:
+    """ETag S3 assigns to a multipart upload with these part MD5s."""
+    digest = hashlib.md5(b"".join(bytes.fromhex(md5) for md5 in part_md5s))
+    return f"{digest.hexdigest()}-{len(part_md5s)}"
+
+
+class ExpectedChecksum(NamedTuple):
+    """Checksum a downloaded file must match.
+
+    algorithm is "sha256", "md5" or "multipart" (an S3 multipart ETag, whose
+    parts are part_size bytes long).
+    """
+
+    algorithm: str
+    value: str
+    part_size: Optional[int] = None
+
+
+def expected_checksum(url_info: dict) -> Optional[ExpectedChecksum]:
+    """Get the checksum the server reports for a file.
+
+    Args:
+        url_info: Download listing entry (with size and optional sha256,
+            etag and partSize, the part size of a multipart upload)
+
+    Returns:
+        The expected checksum, or None if the server reports none that can
+        be checked
+    """
+    if url_info.get("sha256"):
+        return ExpectedChecksum("sha256", url_info["sha256"].lower())
+    match = _ETAG_PATTERN.match((url_info.get("etag") or "").strip().lower())
+    if not match:
+        return None
+    digest, parts = match.groups()
+    if parts is None:
+        return ExpectedChecksum("md5", digest)
+    part_size = url_info.get("partSize")
+    if part_size and -(-url_info["size"] // part_size) == int(parts):
+        return ExpectedChecksum("multipart", f"{digest}-{parts}", part_size)
+    return None
+
+
+class StreamingChecksum:
+    """Hashes a file as it is written, in order, and checks the result.
+
+    Example:
+        checksum = StreamingChecksum(expected)
+        for chunk in chunks:
+            f.write(chunk)
+            checksum.update(chunk)
+        checksum.verify("episode_000001.mp4")
+    """
+
+    def __init__(self, expected: ExpectedChecksum):
+        self.expected = expected
+        self.reset()
+
+    def reset(self) -> None:
+        """Start over from the first byte."""
+        self.position = 0
+        self._part_md5s: List[str] = []
+        if self.expected.algorithm == "multipart":
+            self._digest = hashlib.md5()
+            self._part_remaining = self.expected.part_size
+        else:
+            self._digest = hashlib.new(self.expected.algorithm)
+
+    def update(self, data) -> None:
+        """Hash the next bytes of the file."""
+        self.position += len(data)
+        if self.expected.algorithm != "multipart":
+            self._digest.update(data)
+            return
+        data = memoryview(data)
+        while data:
+            take = min(len(data), self._part_remaining)
+            self._digest.update(data[:take])
+            self._part_remaining -= take
+            data = data[take:]
+            if not self._part_remaining:
+                self._part_md5s.append(self._digest.hexdigest())
+                self._digest = hashlib.md5()
+                self._part_remaining = self.expected.part_size
+
+    def hash_file(self, file_path: Path, length: Optional[int] = None) -> None:
+        """Hash the first `length` bytes (default: all) of a file from scratch.
+
+        Used to catch up with bytes written by an earlier, interrupted run.
+        """
+        self.reset()
+        with open(file_path, "rb") as f:
+            while length is None or self.position < length:
+                size = READ_CHUNK_SIZE if length is None else min(READ_CHUNK_SIZE, length - self.position)
+                chunk = f.read(size)
+                if not chunk:
+                    break
+                self.update(chunk)
+
+    def hexdigest(self) -> str:
+        """Checksum of the bytes hashed so far, in the expected format."""
+        if self.expected.algorithm != "multipart":
+            return self._digest.hexdigest()
+        part_md5s = list(self._part_md5s)
+        if self._part_remaining != self.expected.part_size:
+            part_md5s.append(self._digest.hexdigest())
+        return multipart_etag(part_md5s)
+
+    def verify(self, name: str) -> None:
+        """Check the bytes hashed so far against the expected checksum.
+
+        Raises:
+            ChecksumError: If they do not match
+        """
+        actual = self.hexdigest()
+        if actual != self.expected.value:
+            raise ChecksumError(
+                f"Checksum mismatch for {name}: expected {self.expected.algorithm} "
+                f"{self.expected.value}, got {actual}"
+            )
+
+
+def verify_file(file_path: Path, expected: ExpectedChecksum) -> None:
+    """Re-read a file and check it against its expected checksum.
+
+    Raises:
+        ChecksumError: If the content does not match
+    """
+    checksum = StreamingChecksum(expected)
+    checksum.hash_file(file_path)
+    checksum.verify(str(file_path))
+
+
+class VerifyResult(NamedTuple):
+    """Outcome of verify_download()."""
+
+    verified: List[str]
+    corrupt: Dict[str, str]
+    missing: List[str]
+    unchecked: List[str]
+
+
+def verify_download(
+    output_dir: Path,
+    max_workers: Optional[int] = None,
+) -> VerifyResult:
+    """Re-check a downloaded dataset against the checksums in its manifest.
+
+    Files are hashed in parallel. Corrupt and missing files are dropped from
+    the manifest, so `uz download --sync` fetches them again.
+
+    Args:
+        output_dir: Directory a dataset was downloaded to
+        max_workers: Number of parallel hashing threads (default: CPU count)
+
+    Returns:
+        VerifyResult with relative paths of verified files, corrupt files
+        (with the mismatch), missing files, and files with no checksum
+    """
+    manifest = LocalManifest(output_dir)
+    verified, corrupt, missing, unchecked = [], {}, [], []
+    to_check = {}
+    for rel_path, entry in manifest.entries.items():
+        file_path = Path(output_dir) / rel_path
+        if not file_path.is_file():
+            missing.append(rel_path)
+            continue
+        expected = expected_checksum(entry)
+        if expected is None:
+            unchecked.append(rel_path)
+            continue
+        to_check[rel_path] = (file_path, expected)
+
+    total = sum(os.path.getsize(path) for path, _ in to_check.values())
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor, \
+            tqdm(total=total, desc="  Verifying", unit="B", unit_scale=True, unit_divisor=1024) as pbar:
+        def check(file_path: Path, expected: ExpectedChecksum) -> None:
+            verify_file(file_path, expected)
+            pbar.update(file_path.stat().st_size)
+
+        futures = {
+            executor.submit(check, file_path, expected): rel_path
+            for rel_path, (file_path, expected) in to_check.items()
+        }
+        for future in as_completed(futures):
+            rel_path = futures[future]
+            try:
+                future.result()
+                verified.append(rel_path)
+            except (ChecksumError, OSError) as e:
+                corrupt[rel_path] = str(e)
+
+    for rel_path in list(corrupt) + missing:
+        manifest.forget(rel_path)
+    if corrupt or missing:
+        manifest.save()
+    return VerifyResult(sorted(verified), corrupt, sorted(missing), sorted(unchecked))
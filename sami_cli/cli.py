@@ -9,6 +9,7 @@ Usage:
     uz list               # List accessible datasets
     uz upload <path>      # Upload a dataset
     uz download <id>      # Download a dataset
+    uz verify <path>      # Re-check a downloaded dataset against its checksums
     uz info <id>          # Show dataset details
     uz delete <id>        # Delete a dataset
 """
@@ -17,10 +18,69 @@ import argparse
 import getpass
 import os
 import sys
+from dataclasses import replace
 from typing import Optional
 
 from .config import SamiConfig, DEFAULT_API_URL
-from .exceptions import AuthenticationError, SamiError, NotFoundError
+from .bandwidth import BandwidthSchedule, parse_bandwidth
+from .cache import CACHE_DIR, DEFAULT_CACHE_MAX_SIZE, ContentCache
+from .concurrency import parse_worker_limits, parse_workers
+from .exceptions import AuthenticationError, SamiError, NotFoundError, ValidationError
+from .selection import parse_episodes
+
+
+def _argument_type(parse):
+    """Wrap a parser raising ValidationError for use as an argparse type."""
+    def convert(value):
+        try:
+            return parse(value)
+        except ValidationError as e:
+            raise argparse.ArgumentTypeError(str(e))
+    convert.__name__ = parse.__name__
+    return convert
+
+
+def _positive_megabytes(value: str) -> int:
+    """Parse a size in MB given on the command line."""
+    try:
+        megabytes = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size '{value}': expected a whole number of MB")
+    if megabytes < 1:
+        raise argparse.ArgumentTypeError(f"invalid size '{value}': must be at least 1 MB")
+    return megabytes
+
+
+def _positive_count(value: str) -> int:
+    """Parse a number of items given on the command line."""
+    try:
+        count = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid count '{value}': expected a whole number")
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"invalid count '{value}': must be at least 1")
+    return count
+
+
+def _bandwidth(value: str) -> str:
+    """Check a --max-bandwidth value, keeping it as given for the client."""
+    parse_bandwidth(value)
+    return value
+
+
+def _bandwidth_schedule(value: str) -> str:
+    """Check a --bandwidth-schedule value ("off" removes the schedule)."""
+    if value.strip().lower() in ("off", "none"):
+        return ""
+    BandwidthSchedule.parse(value)
+    return value
+
+
+def _with_retries(client, retries: Optional[int]):
+    """Apply --retries to a client's retry policy."""
+    if retries is not None:
+        client.retry_policy = replace(client.retry_policy, max_attempts=retries + 1)
+    return client
 
 
 def get_client():
@@ -342,7 +402,20 @@ def cmd_config(args):
     """Handle 'uz config' command."""
     config = SamiConfig()
 
-    if args.api_url:
+    if args.bandwidth_schedule is not None:
+        config.set_bandwidth_schedule(args.bandwidth_schedule or None)
+        if args.bandwidth_schedule:
+            print(f"Bandwidth schedule set to: {args.bandwidth_schedule}")
+        else:
+            print("Bandwidth schedule removed")
+    elif args.cache_dir or args.cache_max_gb:
+        if args.cache_dir:
+            config.set_cache_dir(args.cache_dir)
+            print(f"Download cache set to: {config.get_cache_dir()}")
+        if args.cache_max_gb:
+            config.set_cache_max_size(args.cache_max_gb * 1024**3)
+            print(f"Download cache limit set to: {args.cache_max_gb} GB")
+    elif args.api_url:
         # Set API URL
         config.set_api_url(args.api_url)
         print(f"API URL set to: {args.api_url}")
@@ -356,6 +429,8 @@ def cmd_config(args):
         print(f"API URL: {cfg['api_url']}")
         print(f"Config directory: {cfg['config_dir']}")
         print(f"Logged in: {'Yes' if cfg['has_credentials'] else 'No'}")
+        print(f"Download cache: {config.get_cache_dir() or 'off (enable with --cache-dir)'}")
+        print(f"Bandwidth schedule: {config.get_bandwidth_schedule() or 'off (full speed)'}")
 
         # Show if using env var
         if os.environ.get("SAMI_API_URL"):
@@ -413,7 +488,7 @@ def cmd_upload(args):
         print(f"Error: Path does not exist or is not a directory: {args.path}", file=sys.stderr)
         sys.exit(1)
 
-    client = get_client()
+    client = _with_retries(get_client(), args.retries)
 
     try:
         print(f"Uploading dataset from {args.path}...")
@@ -425,6 +500,14 @@ def cmd_upload(args):
             task_category=args.task_category,
             max_workers=args.workers,
             strict=not args.no_strict,
+            resume=args.resume,
+            video_workers=args.video_workers,
+            worker_limits=args.worker_limits,
+            dedup=args.dedup,
+            checksums=args.checksums,
+            max_in_flight=args.max_in_flight,
+            max_bandwidth=args.max_bandwidth,
+            bandwidth_schedule=SamiConfig().get_bandwidth_schedule(),
         )
 
         print("")
@@ -458,9 +541,20 @@ def cmd_download(args):
     """Handle 'uz download' command."""
     import time
 
-    client = get_client()
+    if args.delete and not args.sync:
+        print("Error: --delete can only be used with --sync", file=sys.stderr)
+        sys.exit(1)
+
+    client = _with_retries(get_client(), args.retries)
     dataset_format = getattr(args, "format", "lerobot")
 
+    cache = None
+    if not args.no_cache:
+        config = SamiConfig()
+        cache_dir = args.cache or config.get_cache_dir()
+        if cache_dir:
+            cache = ContentCache(cache_dir, config.get_cache_max_size() or DEFAULT_CACHE_MAX_SIZE)
+
     try:
         # If HDF5 format requested, check if conversion is needed
         if dataset_format == "hdf5":
@@ -509,6 +603,25 @@ def cmd_download(args):
             output_path=args.output,
             max_workers=args.workers,
             dataset_format=dataset_format,
+            worker_limits=args.worker_limits,
+            sync=args.sync,
+            delete=args.delete,
+            write_behind=args.write_behind,
+            segment_size=args.segment_size * 1024 * 1024,
+            segment_threshold=args.segment_threshold * 1024 * 1024,
+            checksums=not args.no_checksum,
+            episodes=args.episodes,
+            sample=args.sample,
+            seed=args.seed,
+            video_keys=args.video_keys,
+            include=args.include,
+            exclude=args.exclude,
+            meta_only=args.meta_only,
+            episode_order=args.episode_order,
+            cache=cache,
+            max_in_flight=args.max_in_flight,
+            max_bandwidth=args.max_bandwidth,
+            bandwidth_schedule=SamiConfig().get_bandwidth_schedule(),
         )
 
         print("")
@@ -522,6 +635,42 @@ def cmd_download(args):
         sys.exit(1)
 
 
+# =============================================================================
+# Verify Command
+# =============================================================================
+
+
+def cmd_verify(args):
+    """Handle 'uz verify' command."""
+    from pathlib import Path
+
+    from .checksum import verify_download
+    from .sync import MANIFEST_NAME
+
+    output_dir = Path(args.path)
+    if not (output_dir / MANIFEST_NAME).is_file():
+        print(f"Error: No download manifest in {args.path}; was it downloaded with uz download?", file=sys.stderr)
+        sys.exit(1)
+
+    result = verify_download(output_dir, max_workers=args.workers)
+
+    print(f"  {len(result.verified)} files verified")
+    if result.unchecked:
+        print(f"  {len(result.unchecked)} files have no server checksum and were not checked")
+    for rel_path, error in sorted(result.corrupt.items()):
+        print(f"  CORRUPT  {rel_path}: {error}")
+    for rel_path in result.missing:
+        print(f"  MISSING  {rel_path}")
+    if result.corrupt or result.missing:
+        print(
+            f"Error: {len(result.corrupt)} corrupt and {len(result.missing)} missing files. "
+            f"Run 'uz download <id> --output {args.path} --sync' to fetch them again.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    print("All checked files match the server checksums.")
+
+
 # =============================================================================
 # Info Command
 # =============================================================================
@@ -621,6 +770,8 @@ Examples:
   uz list                               # List accessible datasets
   uz upload ./dataset --name "My Data"  # Upload a dataset
   uz download abc123 --output ./data    # Download a dataset
+  uz download abc123 --episodes 0-49 --video-keys observation.images.front
+  uz verify ./data                      # Re-check a downloaded dataset
   uz info abc123                        # Show dataset details
 
 Environment Variables:
@@ -629,6 +780,7 @@ Environment Variables:
   SAMI_INVITE_CODE    Invite code for login (skip login)
   SAMI_EMAIL          Email for login
   SAMI_PASSWORD       Password for login
+  SAMI_CACHE_DIR      Download cache shared by all output directories
 """,
     )
 
@@ -669,6 +821,23 @@ Environment Variables:
     config_parser = subparsers.add_parser("config", help="View/set configuration")
     config_parser.add_argument("--api-url", help="Set API URL")
     config_parser.add_argument("--reset", action="store_true", help="Reset API URL to default")
+    config_parser.add_argument(
+        "--cache-dir",
+        help="Download through a cache shared by all output directories (e.g. ~/.uz/cache)",
+    )
+    config_parser.add_argument(
+        "--cache-max-gb",
+        type=int,
+        metavar="GB",
+        help="Size limit of the download cache (default: 100)",
+    )
+    config_parser.add_argument(
+        "--bandwidth-schedule",
+        type=_argument_type(_bandwidth_schedule),
+        metavar="SCHEDULE",
+        help="Limit uploads and downloads by time of day, e.g. 08:00-20:00=50Mbit "
+             "(full speed outside the windows; 'off' to remove)",
+    )
     config_parser.set_defaults(func=cmd_config)
 
     # -------------------------------------------------------------------------
@@ -691,12 +860,74 @@ Environment Variables:
     upload_parser.add_argument("--name", required=True, help="Dataset name")
     upload_parser.add_argument("--description", help="Dataset description")
     upload_parser.add_argument("--task-category", help="Task category (e.g., manipulation)")
-    upload_parser.add_argument("--workers", type=int, default=4, help="Parallel upload workers (default: 4)")
+    upload_parser.add_argument(
+        "--workers",
+        type=_argument_type(parse_workers),
+        default=4,
+        help="Parallel upload workers, or 'auto' to adapt to the network (default: 4)",
+    )
+    upload_parser.add_argument(
+        "--worker-limits",
+        type=_argument_type(parse_worker_limits),
+        metavar="MIN:MAX",
+        help="Concurrency range for --workers auto (default: 1:32)",
+    )
+    upload_parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        metavar="N",
+        help="Upload files under 8 MB as asyncio transfers, N at once on one thread "
+             "(for datasets of many small files; needs uz-cli[async])",
+    )
+    upload_parser.add_argument(
+        "--retries",
+        type=int,
+        metavar="N",
+        help="Retry a failed request up to N times, with backoff (default: 4)",
+    )
+    upload_parser.add_argument(
+        "--max-bandwidth",
+        type=_argument_type(_bandwidth),
+        metavar="RATE",
+        help="Limit all transfers together, e.g. 50Mbit or 6MB/s "
+             "(default: the configured schedule; 'unlimited' to ignore it)",
+    )
+    upload_parser.add_argument(
+        "--video-workers",
+        type=int,
+        help="Parallel video web-optimization workers (default: CPU count)",
+    )
     upload_parser.add_argument(
         "--no-strict",
         action="store_true",
         help="Allow partial datasets (missing videos/data)",
     )
+    upload_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted upload of this path, skipping files already uploaded",
+    )
+    upload_parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Hash files first and copy content already stored on the platform server-side "
+             "instead of uploading it (for re-exported datasets)",
+    )
+    upload_parser.add_argument(
+        "--checksum",
+        action="store_const",
+        const=True,
+        dest="checksums",
+        help="Send a Content-MD5 with every file and part, reading each one an extra time "
+             "(by default only the MD5s --dedup computed are sent)",
+    )
+    upload_parser.add_argument(
+        "--no-checksum",
+        action="store_const",
+        const=False,
+        dest="checksums",
+        help="Do not send Content-MD5 checksums",
+    )
     upload_parser.set_defaults(func=cmd_upload)
 
     # -------------------------------------------------------------------------
@@ -705,15 +936,148 @@ Environment Variables:
     download_parser = subparsers.add_parser("download", help="Download a dataset")
     download_parser.add_argument("id", help="Dataset ID")
     download_parser.add_argument("--output", default=".", help="Output directory (default: current)")
-    download_parser.add_argument("--workers", type=int, default=4, help="Parallel download workers (default: 4)")
+    download_parser.add_argument(
+        "--workers",
+        type=_argument_type(parse_workers),
+        default=4,
+        help="Parallel download workers, or 'auto' to adapt to the network (default: 4)",
+    )
+    download_parser.add_argument(
+        "--worker-limits",
+        type=_argument_type(parse_worker_limits),
+        metavar="MIN:MAX",
+        help="Concurrency range for --workers auto (default: 1:32)",
+    )
+    download_parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        metavar="N",
+        help="Download files under 8 MB as asyncio transfers, N at once on one thread "
+             "(for datasets of many small files; needs uz-cli[async])",
+    )
+    download_parser.add_argument(
+        "--retries",
+        type=int,
+        metavar="N",
+        help="Retry a failed request up to N times, with backoff (default: 4)",
+    )
+    download_parser.add_argument(
+        "--max-bandwidth",
+        type=_argument_type(_bandwidth),
+        metavar="RATE",
+        help="Limit all transfers together, e.g. 50Mbit or 6MB/s "
+             "(default: the configured schedule; 'unlimited' to ignore it)",
+    )
     download_parser.add_argument(
         "--format",
         choices=["lerobot", "hdf5"],
         default="lerobot",
         help="Download format: lerobot (default) or hdf5",
     )
+    download_parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Only download files that are new or changed since the last download",
+    )
+    download_parser.add_argument(
+        "--delete",
+        action="store_true",
+        help="With --sync, delete downloaded files that are no longer on the server "
+             "(files not downloaded by uz are kept)",
+    )
+    download_parser.add_argument(
+        "--write-behind",
+        action="store_true",
+        help="Write to disk on a background thread (for disks slower than the network)",
+    )
+    download_parser.add_argument(
+        "--segment-size",
+        type=_positive_megabytes,
+        default=64,
+        metavar="MB",
+        help="Byte range fetched per worker when splitting large files (default: 64)",
+    )
+    download_parser.add_argument(
+        "--segment-threshold",
+        type=_positive_megabytes,
+        default=256,
+        metavar="MB",
+        help="Split files at least this large across all workers (default: 256)",
+    )
+    download_parser.add_argument(
+        "--no-checksum",
+        action="store_true",
+        help="Do not check files against the server's SHA-256 or ETag",
+    )
+    download_parser.add_argument(
+        "--episodes",
+        type=_argument_type(parse_episodes),
+        metavar="RANGES",
+        help="Only download these episodes, e.g. 0-49,100",
+    )
+    download_parser.add_argument(
+        "--sample",
+        type=_positive_count,
+        metavar="N",
+        help="Only download N episodes chosen at random (from --episodes if given)",
+    )
+    download_parser.add_argument("--seed", type=int, help="Random seed for --sample")
+    download_parser.add_argument(
+        "--video-keys",
+        type=lambda value: [key.strip() for key in value.split(",") if key.strip()],
+        metavar="KEYS",
+        help="Only download these comma-separated video features, e.g. observation.images.front",
+    )
+    download_parser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="Only download files matching this glob (repeatable; meta/ is always downloaded)",
+    )
+    download_parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="Do not download files matching this glob (repeatable)",
+    )
+    download_parser.add_argument(
+        "--meta-only",
+        action="store_true",
+        help="Only download meta/ (info.json, stats, episode and task tables)",
+    )
+    download_parser.add_argument(
+        "--episode-order",
+        action="store_true",
+        help="Download meta/ first, then episodes in ascending order, so training can start early",
+    )
+    download_parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=str(CACHE_DIR),
+        metavar="DIR",
+        help="Download through a shared cache and link files into --output "
+             "(default: the configured cache, or ~/.uz/cache)",
+    )
+    download_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not use the configured download cache",
+    )
     download_parser.set_defaults(func=cmd_download)
 
+    # -------------------------------------------------------------------------
+    # uz verify
+    # -------------------------------------------------------------------------
+    verify_parser = subparsers.add_parser("verify", help="Re-check a downloaded dataset against its checksums")
+    verify_parser.add_argument("path", help="Directory the dataset was downloaded to")
+    verify_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Parallel hashing threads (default: CPU count)",
+    )
+    verify_parser.set_defaults(func=cmd_verify)
+
     # -------------------------------------------------------------------------
     # uz info
     # -------------------------------------------------------------------------
@@ -1,16 +1,21 @@
 """Main SAMI Datasets client."""
 
-from typing import List, Optional
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 
 import requests
 
+from . import api
 from .auth import SamiAuth
 from .config import SamiConfig, DEFAULT_API_URL
 from .models import Dataset
 from .upload import upload_dataset
-from .download import download_dataset
-from .exceptions import SamiError, NotFoundError, AuthenticationError
+from .download import DOWNLOAD_BUFFER_SIZE, SEGMENT_SIZE, SEGMENT_THRESHOLD, download_dataset, iter_episodes
+from .selection import DownloadSelection, parse_episodes
+from .cache import ContentCache
+from .retry import RetryPolicy
+from .bandwidth import BandwidthSchedule, limit_bandwidth
+from .exceptions import AuthenticationError
 
 
 class SamiClient:
@@ -40,7 +45,14 @@ class SamiClient:
         )
     """
 
-    def __init__(self, api_url: str = None, email: str = None, password: str = None, invite_code: str = None):
+    def __init__(
+        self,
+        api_url: str = None,
+        email: str = None,
+        password: str = None,
+        invite_code: str = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
         """Initialize the SAMI client.
 
         Args:
@@ -48,11 +60,14 @@ class SamiClient:
             email: User email for authentication
             password: User password for authentication
             invite_code: Invite code for anonymous join authentication
+            retry_policy: Backoff for failed API calls and transfers
+                (default: RetryPolicy())
         """
         if api_url is None:
             api_url = DEFAULT_API_URL
         self.api_url = api_url.rstrip("/")
         self.auth = SamiAuth(self.api_url)
+        self.retry_policy = retry_policy or RetryPolicy()
 
         if invite_code:
             self.auth.login_with_code(invite_code)
@@ -105,6 +120,21 @@ class SamiClient:
 
         return client
 
+    def _call(self, call: api.ApiCall):
+        """Send an API call, retried as retry_policy says, and return its result."""
+        response = self.retry_policy.call(
+            getattr(requests, call.method.lower()),
+            f"{self.api_url}{call.path}",
+            headers=self.auth.get_headers(),
+            idempotent=call.idempotent,
+            **call.request_kwargs(),
+        )
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        return call.result(response.status_code, data)
+
     def get_current_user(self) -> dict:
         """Get current authenticated user info.
 
@@ -112,22 +142,7 @@ class SamiClient:
             Dictionary with user info including email, firstName, lastName,
             role, and organization.
         """
-        response = requests.get(
-            f"{self.api_url}/auth/me",
-            headers=self.auth.get_headers(),
-        )
-
-        if response.status_code == 401:
-            raise AuthenticationError("Session expired. Please login again.")
-        if response.status_code != 200:
-            try:
-                error = response.json().get("error", {}).get("message", "Unknown error")
-            except Exception:
-                error = f"HTTP {response.status_code}"
-            raise SamiError(f"Failed to get user info: {error}")
-
-        # API returns { data: { user: {...} } }
-        return response.json()["data"]["user"]
+        return self._call(api.get_current_user())["user"]
 
     def list_datasets(
         self,
@@ -145,25 +160,7 @@ class SamiClient:
         Returns:
             List of Dataset objects
         """
-        params = {"page": page, "limit": limit}
-        if status:
-            params["status"] = status
-
-        response = requests.get(
-            f"{self.api_url}/datasets",
-            params=params,
-            headers=self.auth.get_headers(),
-        )
-
-        if response.status_code != 200:
-            try:
-                error = response.json().get("error", {}).get("message", "Unknown error")
-            except Exception:
-                error = f"HTTP {response.status_code}"
-            raise SamiError(f"Failed to list datasets: {error}")
-
-        data = response.json()["data"]
-        return [Dataset.from_api_response(d) for d in data]
+        return [Dataset.from_api_response(d) for d in self._call(api.list_datasets(page, limit, status))]
 
     def get_dataset(self, dataset_id: str) -> Dataset:
         """Get details of a specific dataset.
@@ -174,21 +171,7 @@ class SamiClient:
         Returns:
             Dataset object
         """
-        response = requests.get(
-            f"{self.api_url}/datasets/{dataset_id}",
-            headers=self.auth.get_headers(),
-        )
-
-        if response.status_code == 404:
-            raise NotFoundError(f"Dataset not found: {dataset_id}")
-        if response.status_code != 200:
-            try:
-                error = response.json().get("error", {}).get("message", "Unknown error")
-            except Exception:
-                error = f"HTTP {response.status_code}"
-            raise SamiError(f"Failed to get dataset: {error}")
-
-        return Dataset.from_api_response(response.json()["data"])
+        return Dataset.from_api_response(self._call(api.get_dataset(dataset_id)))
 
     def upload_dataset(
         self,
@@ -196,8 +179,17 @@ class SamiClient:
         path: str,
         description: str = None,
         task_category: str = None,
-        max_workers: int = 4,
+        max_workers: Union[int, str] = 4,
         strict: bool = True,
+        resume: bool = False,
+        video_workers: Optional[int] = None,
+        worker_limits: Optional[Tuple[int, int]] = None,
+        dedup: bool = False,
+        checksums: Optional[bool] = None,
+        max_in_flight: Optional[int] = None,
+        engine=None,
+        max_bandwidth: Optional[Union[int, str]] = None,
+        bandwidth_schedule: Optional[Union[str, BandwidthSchedule]] = None,
     ) -> Dataset:
         """Upload a LeRobot dataset.
 
@@ -209,9 +201,34 @@ class SamiClient:
             path: Path to local LeRobot dataset directory
             description: Optional description
             task_category: Optional task category (e.g., "manipulation", "navigation")
-            max_workers: Number of parallel upload threads
+            max_workers: Number of parallel upload threads, or "auto" to
+                    adapt concurrency to measured throughput and errors
             strict: If True, fail on missing videos/data. If False, warn only
                     (useful for uploading partial datasets like videos-only).
+            resume: Continue a previously failed or interrupted upload of the
+                    same path, uploading only the files that did not finish.
+            video_workers: Number of parallel video web-optimization workers
+                    (default: CPU count)
+            worker_limits: (min, max) concurrency when max_workers is "auto"
+                    (default: (1, 32))
+            dedup: Copy content the platform already stores server-side
+                    instead of uploading it again (hashes every file before
+                    the upload starts).
+            checksums: Send a Content-MD5 with files and parts, so data
+                    corrupted in transit is rejected and uploaded again.
+                    None sends the MD5s dedup already computed, True also
+                    computes the others (reading every file once more),
+                    False sends none.
+            max_in_flight: Upload small files as asyncio transfers on one
+                    thread, up to this many at once (needs aiohttp; helps
+                    datasets of many small files).
+            engine: TransferEngine to run small-file transfers on instead
+                    (see engine.py; AsyncSamiClient passes its own).
+            max_bandwidth: Limit for all transfers together, in bytes per
+                    second or a string such as "50Mbit" or "6MB/s"
+                    ("unlimited" ignores the schedule).
+            bandwidth_schedule: Limits by time of day such as
+                    "08:00-20:00=50Mbit", used without max_bandwidth.
 
         Returns:
             Dataset object with metadata
@@ -225,28 +242,107 @@ class SamiClient:
             task_category=task_category,
             max_workers=max_workers,
             strict=strict,
+            resume=resume,
+            video_workers=video_workers,
+            worker_limits=worker_limits,
+            dedup=dedup,
+            checksums=checksums,
+            max_in_flight=max_in_flight,
+            engine=engine,
+            retry_policy=self.retry_policy,
+            bandwidth=limit_bandwidth(max_bandwidth, bandwidth_schedule),
         )
 
     def download_dataset(
         self,
         dataset_id: str,
         output_path: str,
-        max_workers: int = 4,
+        max_workers: Union[int, str] = 4,
         dataset_format: str = "lerobot",
+        worker_limits: Optional[Tuple[int, int]] = None,
+        sync: bool = False,
+        delete: bool = False,
+        buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+        write_behind: bool = False,
+        segment_size: int = SEGMENT_SIZE,
+        segment_threshold: Optional[int] = SEGMENT_THRESHOLD,
+        checksums: bool = True,
+        episodes: Optional[Union[Iterable[int], str]] = None,
+        sample: Optional[int] = None,
+        seed: Optional[int] = None,
+        video_keys: Optional[Iterable[str]] = None,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+        meta_only: bool = False,
+        episode_order: bool = False,
+        on_episode: Optional[Callable[[int], None]] = None,
+        cache: Optional[Union[str, Path, ContentCache]] = None,
+        max_in_flight: Optional[int] = None,
+        engine=None,
+        max_bandwidth: Optional[Union[int, str]] = None,
+        bandwidth_schedule: Optional[Union[str, BandwidthSchedule]] = None,
     ) -> Path:
         """Download a dataset.
 
         The downloaded dataset will be in the specified format.
 
+        Part of a LeRobot dataset can be downloaded with the episode, video
+        and glob filters. meta/ is always downloaded in full, so the subset
+        loads with LeRobotDataset(..., episodes=[...]).
+
         Args:
             dataset_id: ID of the dataset to download
             output_path: Local path to download to
-            max_workers: Number of parallel download threads
+            max_workers: Number of parallel download threads, or "auto" to
+                    adapt concurrency to measured throughput and errors
             dataset_format: Format to download ('lerobot' or 'hdf5')
+            worker_limits: (min, max) concurrency when max_workers is "auto"
+                    (default: (1, 32))
+            sync: Only download files that are new or changed since the
+                    last download into output_path.
+            delete: With sync, delete downloaded files no longer on the
+                    server (files not downloaded by uz are never deleted).
+            buffer_size: Bytes read and written per call for each file
+                    (default: 1 MiB).
+            write_behind: Write to disk on a background thread while the
+                    next data is read.
+            segment_size: Bytes fetched per worker when a large file is
+                    downloaded in parallel byte ranges (default: 64 MiB).
+            segment_threshold: Files at least this large are downloaded in
+                    segments (default: 256 MiB, None: never).
+            checksums: Check every file against the SHA-256 or ETag the
+                    server reports; corrupt files are downloaded again.
+            episodes: Episode indices to download, or a string of indices
+                    and ranges such as "0-49,100" (default: all).
+            sample: Download this many episodes chosen at random (from
+                    `episodes` if given).
+            seed: Random seed for `sample`.
+            video_keys: Video features (cameras) to download (default: all).
+            include: Only download files matching one of these globs.
+            exclude: Do not download files matching any of these globs.
+            meta_only: Only download meta/.
+            episode_order: Download meta/ first, then the files of each
+                    episode in ascending order.
+            on_episode: Called with each episode index once all of its
+                    files are on disk (implies episode_order).
+            cache: Directory (or ContentCache) of a download cache shared
+                    with other downloads; files are linked from it into
+                    output_path, and cached files are not transferred again.
+            max_in_flight: Download small files as asyncio transfers on one
+                    thread, up to this many at once (needs aiohttp; helps
+                    datasets of many small files).
+            engine: TransferEngine to run small-file transfers on instead
+                    (see engine.py; AsyncSamiClient passes its own).
+            max_bandwidth: Limit for all transfers together, in bytes per
+                    second or a string such as "50Mbit" or "6MB/s"
+                    ("unlimited" ignores the schedule).
+            bandwidth_schedule: Limits by time of day such as
+                    "08:00-20:00=50Mbit", used without max_bandwidth.
 
         Returns:
             Path to the downloaded dataset
         """
+        selection = self._selection(episodes, sample, seed, video_keys, include, exclude, meta_only)
         return download_dataset(
             auth=self.auth,
             api_url=self.api_url,
@@ -254,8 +350,101 @@ class SamiClient:
             output_path=output_path,
             max_workers=max_workers,
             dataset_format=dataset_format,
+            worker_limits=worker_limits,
+            sync=sync,
+            delete=delete,
+            buffer_size=buffer_size,
+            write_behind=write_behind,
+            segment_size=segment_size,
+            segment_threshold=segment_threshold,
+            checksums=checksums,
+            selection=selection,
+            episode_order=episode_order,
+            on_episode=on_episode,
+            cache=ContentCache(cache) if isinstance(cache, (str, Path)) else cache,
+            max_in_flight=max_in_flight,
+            engine=engine,
+            retry_policy=self.retry_policy,
+            bandwidth=limit_bandwidth(max_bandwidth, bandwidth_schedule),
+        )
+
+    @staticmethod
+    def _selection(
+        episodes: Optional[Union[Iterable[int], str]] = None,
+        sample: Optional[int] = None,
+        seed: Optional[int] = None,
+        video_keys: Optional[Iterable[str]] = None,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+        meta_only: bool = False,
+    ) -> DownloadSelection:
+        """Build the DownloadSelection for the download filter arguments."""
+        if isinstance(episodes, str):
+            episodes = parse_episodes(episodes)
+        return DownloadSelection(
+            episodes=sorted(set(episodes)) if episodes is not None else None,
+            sample=sample,
+            seed=seed,
+            video_keys=list(video_keys) if video_keys is not None else None,
+            include=list(include or []),
+            exclude=list(exclude or []),
+            meta_only=meta_only,
+        )
+
+    def iter_episodes(self, dataset_id: str, output_path: str, **kwargs) -> Iterator[int]:
+        """Download a LeRobot dataset, yielding each episode once it is on disk.
+
+        Episodes are downloaded in ascending order on a background thread,
+        so training can start on the first ones while the rest download:
+
+            for episode in client.iter_episodes(dataset_id, "./data"):
+                print(f"episode {episode} ready")
+
+        Args:
+            dataset_id: ID of the dataset to download
+            output_path: Local path to download to
+            **kwargs: Other download_dataset() arguments (filters, workers, ...)
+
+        Yields:
+            Episode indices, roughly in ascending order
+        """
+        selection_kwargs = {
+            key: kwargs.pop(key)
+            for key in ("episodes", "sample", "seed", "video_keys", "include", "exclude", "meta_only")
+            if key in kwargs
+        }
+        if isinstance(kwargs.get("cache"), (str, Path)):
+            kwargs["cache"] = ContentCache(kwargs["cache"])
+        return iter_episodes(
+            self.auth,
+            self.api_url,
+            dataset_id,
+            output_path,
+            selection=self._selection(**selection_kwargs),
+            **kwargs,
         )
 
+    def filesystem(self, **kwargs):
+        """Open datasets for reading in place, without downloading them.
+
+        Requires fsspec (pip install "uz-cli[fsspec]"). Files are read with
+        HTTP Range requests through a bounded block cache:
+
+            fs = client.filesystem()
+            with fs.open(f"{dataset_id}/meta/info.json") as f:
+                info = json.load(f)
+
+        Args:
+            **kwargs: SamiFileSystem options (block_size, max_blocks, ...)
+
+        Returns:
+            SamiFileSystem using this client's credentials
+        """
+        from .fs import SamiFileSystem
+
+        kwargs.setdefault("retry_policy", self.retry_policy)
+        return SamiFileSystem(client=self, **kwargs)
+
     def list_formats(self, dataset_id: str) -> List[dict]:
         """List available formats for a dataset.
 
@@ -265,21 +454,7 @@ class SamiClient:
         Returns:
             List of format info dictionaries with keys: format, status, progress, size
         """
-        response = requests.get(
-            f"{self.api_url}/datasets/{dataset_id}/formats",
-            headers=self.auth.get_headers(),
-        )
-
-        if response.status_code == 404:
-            raise NotFoundError(f"Dataset not found: {dataset_id}")
-        if response.status_code != 200:
-            try:
-                error = response.json().get("error", {}).get("message", "Unknown error")
-            except Exception:
-                error = f"HTTP {response.status_code}"
-            raise SamiError(f"Failed to list formats: {error}")
-
-        return response.json()["data"]["formats"]
+        return self._call(api.list_formats(dataset_id))["formats"]
 
     def request_conversion(self, dataset_id: str, target_format: str) -> dict:
         """Request conversion of a dataset to a target format.
@@ -291,22 +466,7 @@ class SamiClient:
         Returns:
             Conversion job info dictionary
         """
-        response = requests.post(
-            f"{self.api_url}/datasets/{dataset_id}/convert",
-            json={"targetFormat": target_format},
-            headers=self.auth.get_headers(),
-        )
-
-        if response.status_code == 404:
-            raise NotFoundError(f"Dataset not found: {dataset_id}")
-        if response.status_code not in (200, 201, 202):
-            try:
-                error = response.json().get("error", {}).get("message", "Unknown error")
-            except Exception:
-                error = f"HTTP {response.status_code}"
-            raise SamiError(f"Failed to request conversion: {error}")
-
-        return response.json()["data"]
+        return self._call(api.request_conversion(dataset_id, target_format))
 
     def get_conversion_status(self, dataset_id: str, target_format: str) -> dict:
         """Get the status of a conversion job.
@@ -318,21 +478,7 @@ class SamiClient:
         Returns:
             Conversion job status dictionary with keys: status, progress, errorMessage
         """
-        response = requests.get(
-            f"{self.api_url}/datasets/{dataset_id}/convert/{target_format}",
-            headers=self.auth.get_headers(),
-        )
-
-        if response.status_code == 404:
-            raise NotFoundError(f"Conversion job not found")
-        if response.status_code != 200:
-            try:
-                error = response.json().get("error", {}).get("message", "Unknown error")
-            except Exception:
-                error = f"HTTP {response.status_code}"
-            raise SamiError(f"Failed to get conversion status: {error}")
-
-        return response.json()["data"]
+        return self._call(api.get_conversion_status(dataset_id, target_format))
 
     def delete_dataset(self, dataset_id: str) -> None:
         """Delete a dataset.
@@ -342,19 +488,7 @@ class SamiClient:
         Args:
             dataset_id: ID of the dataset to delete
         """
-        response = requests.delete(
-            f"{self.api_url}/datasets/{dataset_id}",
-            headers=self.auth.get_headers(),
-        )
-
-        if response.status_code == 404:
-            raise NotFoundError(f"Dataset not found: {dataset_id}")
-        if response.status_code not in (200, 204):
-            try:
-                error = response.json().get("error", {}).get("message", "Unknown error")
-            except Exception:
-                error = f"HTTP {response.status_code}"
-            raise SamiError(f"Failed to delete dataset: {error}")
+        self._call(api.delete_dataset(dataset_id))
 
     def assign_dataset(
         self,
@@ -371,26 +505,7 @@ class SamiClient:
             organization_id: ID of the organization to grant access
             permission_level: Permission level (view, download, admin)
         """
-        if permission_level not in ("view", "download", "admin"):
-            raise ValueError("permission_level must be 'view', 'download', or 'admin'")
-
-        response = requests.post(
-            f"{self.api_url}/datasets/{dataset_id}/assignments",
-            json={
-                "organizationId": organization_id,
-                "permissionLevel": permission_level,
-            },
-            headers=self.auth.get_headers(),
-        )
-
-        if response.status_code == 404:
-            raise NotFoundError(f"Dataset or organization not found")
-        if response.status_code not in (200, 201):
-            try:
-                error = response.json().get("error", {}).get("message", "Unknown error")
-            except Exception:
-                error = f"HTTP {response.status_code}"
-            raise SamiError(f"Failed to assign dataset: {error}")
+        self._call(api.assign_dataset(dataset_id, organization_id, permission_level))
 
     def remove_assignment(self, dataset_id: str, assignment_id: str) -> None:
         """Remove a dataset assignment.
@@ -401,16 +516,4 @@ class SamiClient:
             dataset_id: ID of the dataset
             assignment_id: ID of the assignment to remove
         """
-        response = requests.delete(
-            f"{self.api_url}/datasets/{dataset_id}/assignments/{assignment_id}",
-            headers=self.auth.get_headers(),
-        )
-
-        if response.status_code == 404:
-            raise NotFoundError(f"Dataset or assignment not found")
-        if response.status_code not in (200, 204):
-            try:
-                error = response.json().get("error", {}).get("message", "Unknown error")
-            except Exception:
-                error = f"HTTP {response.status_code}"
-            raise SamiError(f"Failed to remove assignment: {error}")
+        self._call(api.remove_assignment(dataset_id, assignment_id))
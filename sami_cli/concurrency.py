@@ -0,0 +1,260 @@
+"""Adaptive transfer concurrency (``--workers auto``).
+
+The best number of parallel transfers depends on the link: a datacenter
+node keeps gaining throughput past 32 streams while a laptop on hotel Wi-Fi
+does best with two or three. AdaptiveConcurrency sizes the thread pool to an
+upper bound and gates transfers through a resizable limit, which it tunes by
+hill climbing on measured goodput:
+
+- goodput rose after the last change: keep moving in the same direction
+  (doubling while still in slow start)
+- goodput fell: step back the other way
+- error or 5xx rate above ERROR_RATE_LIMIT: halve the limit
+- latency well above the best seen with no goodput gain: step down
+
+Latency is only measured on requests without a body (download GETs, whose
+elapsed time ends at the response headers, and API calls). A PUT's elapsed
+time includes sending its body, so it grows with the file or part size and
+says nothing about queueing.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Tuple, Union
+
+from .exceptions import ValidationError
+
+
+# Value of --workers that enables adaptive concurrency
+AUTO_WORKERS = "auto"
+# Default (min, max) concurrency for --workers auto
+DEFAULT_WORKER_LIMITS = (1, 32)
+# Seconds of transfers measured before each adjustment
+ADJUST_INTERVAL = 2.0
+# Relative goodput change treated as a real improvement or regression
+GOODPUT_TOLERANCE = 0.1
+# Share of failed requests (errors and 5xx) that triggers a back-off
+ERROR_RATE_LIMIT = 0.05
+# Back off when latency exceeds the best observed by this factor
+LATENCY_FACTOR = 2.0
+# Flat windows before probing one more worker
+PROBE_AFTER = 3
+
+
+def parse_workers(value: str) -> Union[int, str]:
+    """Parse a --workers value: a positive integer or "auto"."""
+    if value == AUTO_WORKERS:
+        return AUTO_WORKERS
+    try:
+        workers = int(value)
+    except ValueError:
+        raise ValidationError(f"Invalid worker count '{value}': expected a number or 'auto'")
+    if workers < 1:
+        raise ValidationError(f"Invalid worker count '{value}': must be at least 1")
+    return workers
+
+
+def parse_worker_limits(value: str) -> Tuple[int, int]:
+    """Parse a --worker-limits value of the form MIN:MAX."""
+    try:
+        low, high = (int(v) for v in value.split(":"))
+    except ValueError:
+        raise ValidationError(f"Invalid worker limits '{value}': expected MIN:MAX, e.g. 2:64")
+    if not 1 <= low <= high:
+        raise ValidationError(f"Invalid worker limits '{value}': need 1 <= MIN <= MAX")
+    return low, high
+
+
+def resolve_workers(
+    max_workers: Union[int, str],
+    worker_limits: Optional[Tuple[int, int]] = None,
+) -> Tuple[int, Optional["AdaptiveConcurrency"]]:
+    """Turn a worker setting into a thread pool size and optional controller.
+
+    Args:
+        max_workers: Fixed number of workers, or "auto"
+        worker_limits: (min, max) concurrency for "auto"
+
+    Returns:
+        Tuple of (pool_size, AdaptiveConcurrency or None for a fixed count)
+    """
+    if max_workers == AUTO_WORKERS:
+        concurrency = AdaptiveConcurrency(*(worker_limits or DEFAULT_WORKER_LIMITS))
+        return concurrency.max_workers, concurrency
+    return parse_workers(str(max_workers)), None
+
+
+class AdaptiveConcurrency:
+    """Resizable limit on in-flight transfers, tuned from measured goodput.
+
+    Transfers run through run(), which waits for a free slot. Register
+    observe_response() as a requests response hook on the transfer session
+    so retried 5xx responses and latency are seen too.
+    """
+
+    def __init__(
+        self,
+        min_workers: int = 1,
+        max_workers: int = 32,
+        initial: Optional[int] = None,
+        interval: float = ADJUST_INTERVAL,
+    ):
+        """
+        Args:
+            min_workers: Lowest concurrency
+            max_workers: Highest concurrency (the thread pool size)
+            initial: Starting concurrency (default: min(4, max_workers))
+            interval: Seconds of measurements between adjustments
+        """
+        self.min_workers = max(min_workers, 1)
+        self.max_workers = max(max_workers, self.min_workers)
+        self.limit = min(max(initial or 4, self.min_workers), self.max_workers)
+        self.peak = self.limit
+        self.interval = interval
+
+        self._cond = threading.Condition()
+        self._active = 0
+        self._slow_start = True
+        self._direction = 1
+        self._flat_windows = 0
+        self._previous_goodput: Optional[float] = None
+        self._best_latency: Optional[float] = None
+        self._reset_window(time.monotonic())
+
+    def _reset_window(self, now: float) -> None:
+        self._window_start = now
+        self._bytes = 0
+        self._requests = 0
+        self._errors = 0
+        self._latency_total = 0.0
+        self._latency_count = 0
+
+    # =========================================================================
+    # Measurements
+    # =========================================================================
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the in-flight transfer slots."""
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify()
+
+    def run(self, size: int, fn, *args, **kwargs):
+        """Run a transfer in a slot and record its outcome.
+
+        Args:
+            size: Bytes moved by the transfer, counted as goodput on success
+            fn: Transfer function
+            *args, **kwargs: Passed to fn
+
+        Returns:
+            Result of fn
+        """
+        with self.slot():
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                self.record(0, error=True)
+                raise
+        self.record(size)
+        return result
+
+    def record(self, num_bytes: int, error: bool = False) -> None:
+        """Record a finished transfer and adjust the limit if a window elapsed."""
+        with self._cond:
+            self._bytes += num_bytes
+            if error:
+                self._errors += 1
+            self._maybe_adjust(time.monotonic())
+
+    def observe_response(self, response, *args, **kwargs) -> None:
+        """requests response hook: count 5xx responses and latency.
+
+        Latency is taken from requests without a body only (see the module
+        docstring).
+        """
+        with self._cond:
+            self._requests += 1
+            if response.status_code >= 500 or response.status_code == 429:
+                self._errors += 1
+            elapsed = getattr(response, "elapsed", None)
+            request = getattr(response, "request", None)
+            if elapsed is not None and request is not None and request.body is None:
+                self._latency_total += elapsed.total_seconds()
+                self._latency_count += 1
+
+    # =========================================================================
+    # Control
+    # =========================================================================
+
+    def _set_limit(self, limit: int) -> None:
+        limit = min(max(limit, self.min_workers), self.max_workers)
+        if limit > self.limit:
+            self._cond.notify(limit - self.limit)
+        self.limit = limit
+        self.peak = max(self.peak, limit)
+
+    def _maybe_adjust(self, now: float) -> None:
+        """Hill-climb the limit once per interval. Caller holds the lock."""
+        elapsed = now - self._window_start
+        if elapsed < self.interval:
+            return
+
+        goodput = self._bytes / elapsed
+        attempts = max(self._requests, self._errors, 1)
+        error_rate = self._errors / attempts
+        latency = self._latency_total / self._latency_count if self._latency_count else None
+        if latency is not None and (self._best_latency is None or latency < self._best_latency):
+            self._best_latency = latency
+        previous = self._previous_goodput
+
+        if error_rate > ERROR_RATE_LIMIT:
+            self._slow_start = False
+            self._direction = -1
+            self._set_limit(self.limit // 2)
+        elif (
+            latency is not None
+            and latency > self._best_latency * LATENCY_FACTOR
+            and (previous is None or goodput <= previous * (1 + GOODPUT_TOLERANCE))
+        ):
+            self._slow_start = False
+            self._direction = -1
+            self._set_limit(self.limit - 1)
+        elif previous is None or goodput > previous * (1 + GOODPUT_TOLERANCE):
+            self._flat_windows = 0
+            if self._slow_start and self._direction > 0:
+                self._set_limit(self.limit * 2)
+            else:
+                self._set_limit(self.limit + self._direction)
+        elif goodput < previous * (1 - GOODPUT_TOLERANCE):
+            self._slow_start = False
+            self._flat_windows = 0
+            self._direction = -self._direction
+            self._set_limit(self.limit + self._direction)
+        else:
+            # Plateau: hold, probing one more worker now and then
+            self._slow_start = False
+            self._flat_windows += 1
+            if self._flat_windows >= PROBE_AFTER:
+                self._flat_windows = 0
+                self._direction = 1
+                self._set_limit(self.limit + 1)
+
+        self._previous_goodput = goodput
+        self._reset_window(now)
+
+    def summary(self) -> str:
+        """One-line description of the current and peak concurrency."""
+        return (
+            f"adaptive concurrency {self.limit} "
+            f"(peak {self.peak}, range {self.min_workers}-{self.max_workers})"
+        )
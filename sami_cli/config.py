@@ -171,6 +171,71 @@ class SamiConfig:
             **config,
         }
 
+    def get_cache_dir(self) -> Optional[str]:
+        """Get the shared download cache directory, if one is configured.
+
+        Priority: SAMI_CACHE_DIR env var > saved config
+
+        Returns:
+            Cache directory, or None if downloads do not use a cache by default
+        """
+        env_dir = os.environ.get("SAMI_CACHE_DIR")
+        if env_dir:
+            return env_dir
+        return self._load_config().get("cache_dir")
+
+    def set_cache_dir(self, path: str) -> None:
+        """Save the shared download cache directory, used by every download.
+
+        Args:
+            path: Cache directory
+        """
+        config = self._load_config()
+        config["cache_dir"] = str(Path(path).expanduser())
+        self._save_config(config)
+
+    def get_cache_max_size(self) -> Optional[int]:
+        """Get the download cache size limit in bytes (None: default)."""
+        return self._load_config().get("cache_max_size")
+
+    def set_cache_max_size(self, max_size: int) -> None:
+        """Save the download cache size limit.
+
+        Args:
+            max_size: Size limit in bytes
+        """
+        config = self._load_config()
+        config["cache_max_size"] = max_size
+        self._save_config(config)
+
+    def get_bandwidth_schedule(self) -> Optional[str]:
+        """Get the bandwidth schedule uploads and downloads follow by default.
+
+        Priority: SAMI_BANDWIDTH_SCHEDULE env var > saved config
+
+        Returns:
+            Schedule such as "08:00-20:00=50Mbit" (see bandwidth.py), or
+            None if transfers are not limited by default
+        """
+        env_schedule = os.environ.get("SAMI_BANDWIDTH_SCHEDULE")
+        if env_schedule:
+            return env_schedule
+        return self._load_config().get("bandwidth_schedule")
+
+    def set_bandwidth_schedule(self, schedule: Optional[str]) -> None:
+        """Save the default bandwidth schedule.
+
+        Args:
+            schedule: Schedule such as "08:00-20:00=50Mbit", or None to
+                remove it
+        """
+        config = self._load_config()
+        if schedule:
+            config["bandwidth_schedule"] = schedule
+        else:
+            config.pop("bandwidth_schedule", None)
+        self._save_config(config)
+
     def reset_api_url(self) -> None:
         """Reset API URL to default."""
         config = self._load_config()
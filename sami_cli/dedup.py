@@ -0,0 +1,278 @@
+"""Content hashing and the local index used to deduplicate uploads.
+
+With dedup enabled, every file is hashed (SHA-256 of the bytes that would be
+uploaded) before transfer. ~/.uz/content_index.json remembers which dataset and path each
+uploaded hash was stored under, so files the platform already holds can be
+copied server-side instead of uploaded again. The index also caches the hash
+of each local file by inode, size and mtime, so unchanged files are not
+re-read on later uploads.
+
+The same read computes the MD5s sent as Content-MD5 with each upload, so
+with dedup every PUT carries one at no extra read (see checksum.py).
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from tqdm import tqdm
+
+from . import mp4
+from .config import SamiConfig
+
+
+# Default index location
+CONTENT_INDEX_FILE = SamiConfig.CONFIG_DIR / "content_index.json"
+# Maximum number of hashes (and of cached file hashes) kept in the index
+MAX_INDEX_ENTRIES = 1_000_000
+# Read size while hashing
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def _signature(stat: os.stat_result) -> List[int]:
+    """Return [inode, size, mtime_ns] used to detect changed files."""
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+class FileDigest(NamedTuple):
+    """Hashes of the bytes a file is uploaded as.
+
+    part_md5s holds the MD5 of each part_size part when the file is uploaded
+    in multipart parts, and is empty otherwise.
+    """
+
+    sha256: str
+    md5: str
+    part_size: Optional[int] = None
+    part_md5s: Tuple[str, ...] = ()
+
+
+def hash_stream(f, callback=None, part_size: Optional[int] = None) -> FileDigest:
+    """Hash a readable stream in a single pass.
+
+    Args:
+        f: Binary file-like object
+        callback: Called with the number of bytes hashed after each read
+        part_size: Also hash each part of this size (for multipart uploads)
+    """
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5()
+    part_md5s = []
+    part = hashlib.md5()
+    part_remaining = part_size
+    while True:
+        chunk = f.read(HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        sha256.update(chunk)
+        md5.update(chunk)
+        if part_size:
+            view = memoryview(chunk)
+            while view:
+                take = min(len(view), part_remaining)
+                part.update(view[:take])
+                part_remaining -= take
+                view = view[take:]
+                if not part_remaining:
+                    part_md5s.append(part.hexdigest())
+                    part = hashlib.md5()
+                    part_remaining = part_size
+        if callback is not None:
+            callback(len(chunk))
+    if part_size and part_remaining != part_size:
+        part_md5s.append(part.hexdigest())
+    return FileDigest(sha256.hexdigest(), md5.hexdigest(), part_size, tuple(part_md5s))
+
+
+class ContentIndex:
+    """Persistent {sha256: (dataset_id, relative_path, size)} index.
+
+    Safe to use from multiple threads. Changes are only written to disk by
+    save().
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = MAX_INDEX_ENTRIES):
+        """
+        Args:
+            path: Index file (default: ~/.uz/content_index.json)
+            max_entries: Entries kept per table before dropping the oldest
+        """
+        self.path = Path(path) if path else CONTENT_INDEX_FILE
+        self.max_entries = max_entries
+        self._hashes: Dict[str, list] = {}
+        self._files: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        """Load the index file, starting empty if it is missing or corrupt."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self._hashes = dict(data.get("hashes", {}))
+            self._files = dict(data.get("files", {}))
+        except (OSError, ValueError, AttributeError):
+            self._hashes, self._files = {}, {}
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _trim(self, table: dict) -> None:
+        while len(table) > self.max_entries:
+            del table[next(iter(table))]
+
+    # =========================================================================
+    # Uploaded content
+    # =========================================================================
+
+    def lookup(self, sha256: str) -> Optional[Tuple[str, str]]:
+        """Find where content was uploaded before.
+
+        Returns:
+            Tuple of (dataset_id, relative_path), or None if unknown
+        """
+        with self._lock:
+            entry = self._hashes.get(sha256)
+        return (entry[0], entry[1]) if entry else None
+
+    def add(self, sha256: str, dataset_id: str, relative_path: str, size: int) -> None:
+        """Record that content was stored in a dataset."""
+        with self._lock:
+            # Re-insert so the most recent upload is kept longest
+            self._hashes.pop(sha256, None)
+            self._hashes[sha256] = [dataset_id, relative_path, size]
+            self._trim(self._hashes)
+            self._dirty = True
+
+    def forget(self, sha256: str) -> None:
+        """Drop a hash whose stored copy is gone (e.g. dataset deleted)."""
+        with self._lock:
+            if self._hashes.pop(sha256, None) is not None:
+                self._dirty = True
+
+    # =========================================================================
+    # Local file hashes
+    # =========================================================================
+
+    def cached_digest(
+        self, file_path: Path, stat: os.stat_result, part_size: Optional[int] = None
+    ) -> Optional[FileDigest]:
+        """Get the hashes of a local file if it is unchanged since hashed.
+
+        Args:
+            file_path: Local file
+            stat: Current stat of the file
+            part_size: Multipart part size the hashes must have been taken with
+        """
+        with self._lock:
+            entry = self._files.get(str(Path(file_path).resolve()))
+        # Entries written before MD5s were recorded have only the SHA-256
+        if not entry or len(entry) != 7 or entry[:3] != _signature(stat) or entry[5] != part_size:
+            return None
+        return FileDigest(entry[3], entry[4], entry[5], tuple(entry[6]))
+
+    def remember_digest(self, file_path: Path, stat: os.stat_result, digest: FileDigest) -> None:
+        """Cache the hashes of a local file."""
+        key = str(Path(file_path).resolve())
+        with self._lock:
+            self._files.pop(key, None)
+            self._files[key] = _signature(stat) + [
+                digest.sha256, digest.md5, digest.part_size, list(digest.part_md5s)
+            ]
+            self._trim(self._files)
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the index to disk if it changed.
+
+        The index is best-effort: failures to write it are ignored.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = self.path.with_suffix(".tmp")
+            try:
+                self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+                with open(tmp_path, "w") as f:
+                    json.dump({"hashes": self._hashes, "files": self._files}, f)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError:
+                pass
+
+
+def hash_files(
+    files: List[Tuple[Path, str, str, int]],
+    index: ContentIndex,
+    faststart_plans: Optional[Dict[str, mp4.FaststartPlan]] = None,
+    max_workers: Optional[int] = None,
+    part_size_for: Optional[Callable[[int], Optional[int]]] = None,
+) -> Dict[str, FileDigest]:
+    """Hash files in parallel, reusing cached hashes of unchanged files.
+
+    Videos with a faststart plan are hashed in faststart order, i.e. as they
+    will be uploaded. Hardlinked copies of the same file are read once.
+
+    Args:
+        files: List of (absolute_path, relative_path, content_type, size) tuples
+        index: Content index holding cached file hashes
+        faststart_plans: {relative_path: FaststartPlan} of streamed videos
+        max_workers: Number of parallel hashing threads (default: CPU count)
+        part_size_for: Called with a file's upload size to get its multipart
+            part size, or None if it is uploaded in a single PUT
+
+    Returns:
+        {relative_path: FileDigest}
+    """
+    faststart_plans = faststart_plans or {}
+    hashes = {}
+    # (device, inode, faststart) -> relative paths sharing the same content
+    groups: Dict[tuple, List[str]] = {}
+    to_hash = {}
+
+    for abs_path, rel_path, _, size in files:
+        stat = os.stat(abs_path)
+        part_size = part_size_for(size) if part_size_for else None
+        cached = index.cached_digest(abs_path, stat, part_size)
+        if cached is not None:
+            hashes[rel_path] = cached
+            continue
+        key = (stat.st_dev, stat.st_ino, rel_path in faststart_plans)
+        if key not in groups:
+            groups[key] = []
+            to_hash[key] = (abs_path, stat, faststart_plans.get(rel_path), size, part_size)
+        groups[key].append(rel_path)
+
+    if not to_hash:
+        return hashes
+
+    def hash_one(abs_path: Path, stat: os.stat_result, plan, part_size, callback) -> FileDigest:
+        opener = (lambda: mp4.FaststartReader(abs_path, plan)) if plan else (lambda: open(abs_path, "rb"))
+        with opener() as f:
+            digest = hash_stream(f, callback, part_size)
+        index.remember_digest(abs_path, stat, digest)
+        return digest
+
+    total = sum(size for _, _, _, size, _ in to_hash.values())
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor, \
+            tqdm(total=total, desc="  Hashing", unit="B", unit_scale=True, unit_divisor=1024, leave=False) as pbar:
+        futures = {
+            executor.submit(hash_one, abs_path, stat, plan, part_size, pbar.update): key
+            for key, (abs_path, stat, plan, _, part_size) in to_hash.items()
+        }
+        try:
+            for future in as_completed(futures):
+                digest = future.result()
+                for rel_path in groups[futures[future]]:
+                    hashes[rel_path] = digest
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            raise
+
+    return hashes
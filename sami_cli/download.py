@@ -1,36 +1,764 @@
 """Dataset download functionality."""
 
+import ctypes
+import hashlib
+import json
 import os
+import queue
+import sys
+import threading
+import time
+from collections import defaultdict
 from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
-from tqdm import tqdm
+import urllib3
 
 from .auth import SamiAuth
 from .models import DownloadUrl
-from .exceptions import DownloadError, NotFoundError, PermissionDeniedError
+from .session import create_transfer_session, transfer_engine
+from .progress import TransferProgress
+from .concurrency import resolve_workers
+from .sync import LocalManifest, delete_files, find_extraneous, plan_sync
+from .cache import ContentCache
+from .selection import (
+    INFO_PATH,
+    META_DIR,
+    DownloadSelection,
+    episode_files,
+    restrict_video_features,
+    select_files,
+)
+from .retry import RetryPolicy, parse_retry_after
+from .bandwidth import TokenBucket
+from .checksum import ExpectedChecksum, StreamingChecksum, expected_checksum, multipart_etag, verify_file
+from .exceptions import (
+    ChecksumError,
+    DownloadError,
+    NotFoundError,
+    PermissionDeniedError,
+    TransientError,
+    ValidationError,
+)
 
 
-def download_file(url: str, output_path: Path, expected_size: int = None) -> None:
-    """Download a single file from S3 using presigned URL."""
+# Suffix of files still being downloaded
+PART_SUFFIX = ".part"
+# Bytes read from the socket and written to disk per call
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024
+# Buffers in flight between the reading and the writing thread with write_behind
+WRITE_BEHIND_DEPTH = 4
+# fallocate() mode that reserves blocks without changing the file size
+_FALLOC_FL_KEEP_SIZE = 1
+# Files at least this large are fetched as byte ranges by several workers
+SEGMENT_THRESHOLD = 256 * 1024 * 1024
+# Byte range fetched by one worker in a segmented download
+SEGMENT_SIZE = 64 * 1024 * 1024
+# Suffix (after .part) of the record of finished segments
+SEGMENTS_SUFFIX = ".segments"
+
+
+def _load_fallocate():
+    """Look up fallocate(2) in libc (Linux only)."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fallocate = getattr(libc, "fallocate64", None) or libc.fallocate
+    except (OSError, AttributeError):
+        return None
+    fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+    fallocate.restype = ctypes.c_int
+    return fallocate
+
+
+_fallocate = _load_fallocate()
+
+
+def part_path_for(output_path: Path) -> Path:
+    """Path of the partial file a download streams into."""
+    return output_path.with_name(output_path.name + PART_SUFFIX)
+
+
+def segments_path_for(output_path: Path) -> Path:
+    """Path of the finished-segments record of a segmented download."""
+    return output_path.with_name(output_path.name + PART_SUFFIX + SEGMENTS_SUFFIX)
+
+
+def discard_partial(output_path: Path) -> None:
+    """Delete a partial download of a file so it starts over."""
+    part_path_for(output_path).unlink(missing_ok=True)
+    segments_path_for(output_path).unlink(missing_ok=True)
+
+
+def preallocate(fd: int, size: int) -> bool:
+    """Reserve disk space for a file of `size` bytes.
+
+    The file size is left unchanged, so the size of a .part file still tells
+    how much of it was downloaded. Reserving the space up front keeps large
+    files contiguous on disk and makes a full disk fail before the transfer
+    rather than near its end. Best-effort: a no-op where the platform or file
+    system does not support it.
+
+    Returns:
+        True if the space was reserved
+    """
+    if _fallocate is None or size <= 0:
+        return False
+    return _fallocate(fd, _FALLOC_FL_KEEP_SIZE, 0, size) == 0
+
+
+class _WriteBehind:
+    """Writes filled buffers to a file on a background thread.
+
+    The download thread reads the next buffer from the socket while the
+    previous ones are written, so a slow disk does not stall the connection.
+    Buffers are recycled through a fixed pool of WRITE_BEHIND_DEPTH.
+    """
+
+    def __init__(self, f, buffer_size: int, depth: int = WRITE_BEHIND_DEPTH):
+        self._f = f
+        self._free: "queue.Queue[bytearray]" = queue.Queue()
+        for _ in range(depth):
+            self._free.put(bytearray(buffer_size))
+        self._pending: queue.Queue = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="download-writer", daemon=True)
+        self._thread.start()
+
+    def buffer(self) -> bytearray:
+        """Get a free buffer, waiting for a write to finish if none is."""
+        if self._error is not None:
+            raise self._error
+        return self._free.get()
+
+    def submit(self, buffer: bytearray, num_bytes: int) -> None:
+        """Queue the first num_bytes of a buffer for writing."""
+        self._pending.put((buffer, num_bytes))
+
+    def _run(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            buffer, num_bytes = item
+            if self._error is None:
+                try:
+                    self._f.write(memoryview(buffer)[:num_bytes])
+                except BaseException as e:
+                    self._error = e
+            # Failed writes still release their buffer so the reader never blocks
+            self._free.put(buffer)
+
+    def close(self) -> None:
+        """Wait for queued writes to finish.
+
+        Raises:
+            OSError: If a write failed
+        """
+        self._pending.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+
+def _read_into(raw, view: memoryview) -> int:
+    """Read from a urllib3 response into a buffer, raising requests errors.
+
+    Reads go through urllib3, so it sees the end of the body and returns the
+    connection to the session's pool.
+    """
+    try:
+        return raw.readinto(view)
+    except urllib3.exceptions.ReadTimeoutError as e:
+        raise requests.exceptions.ReadTimeout(e)
+    except urllib3.exceptions.HTTPError as e:
+        # Dropped connection, or fewer bytes than Content-Length
+        raise requests.exceptions.ConnectionError(e)
+
+
+def _stream_to_part(
+    http,
+    url: str,
+    part_path: Path,
+    offset: int,
+    timeout: int,
+    progress_callback: Optional[Callable[[int], None]],
+    expected_size: Optional[int] = None,
+    buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+    write_behind: bool = False,
+    checksum: Optional[StreamingChecksum] = None,
+    bandwidth: Optional[TokenBucket] = None,
+) -> int:
+    """Fetch a file from `offset` onwards and append it to the .part file.
+
+    The body is read into reused buffers and written out from them, so no
+    chunk list or joined copy of it is built. Written bytes are fed to
+    `checksum`, and reads wait for `bandwidth` tokens.
+
+    Returns:
+        Number of bytes written (the .part file size when it started over)
+
+    Raises:
+        _Restart: If the server ignored the Range request or rejected it
+    """
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    written = 0
+    with http.get(url, stream=True, headers=headers, timeout=timeout) as response:
+        if response.status_code == 416:
+            raise _Restart("Requested range not satisfiable")
+        if response.status_code >= 500 or response.status_code == 429:
+            raise TransientError(f"HTTP {response.status_code}", parse_retry_after(response.headers))
+        if offset and response.status_code == 200:
+            # Server ignored the Range header and is sending the whole file
+            raise _Restart("Server does not support ranged requests")
+        if response.status_code not in (200, 206):
+            raise DownloadError(f"Failed to download: HTTP {response.status_code}")
+        if response.status_code == 206:
+            content_range = response.headers.get("Content-Range", "")
+            if not content_range.startswith(f"bytes {offset}-"):
+                raise _Restart(f"Unexpected Content-Range '{content_range}'")
+
+        raw = response.raw
+        raw.decode_content = True
+        with open(part_path, "ab" if offset else "wb") as f:
+            if expected_size:
+                preallocate(f.fileno(), expected_size)
+
+            if not write_behind:
+                view = memoryview(bytearray(buffer_size))
+                while True:
+                    num_bytes = _read_into(raw, view)
+                    if not num_bytes:
+                        break
+                    if bandwidth is not None:
+                        bandwidth.consume(num_bytes)
+                    f.write(view[:num_bytes])
+                    if checksum is not None:
+                        checksum.update(view[:num_bytes])
+                    written += num_bytes
+                    if progress_callback is not None:
+                        progress_callback(num_bytes)
+                return written
+
+            writer = _WriteBehind(f, buffer_size)
+            try:
+                while True:
+                    buffer = writer.buffer()
+                    num_bytes = _read_into(raw, memoryview(buffer))
+                    if not num_bytes:
+                        break
+                    if bandwidth is not None:
+                        bandwidth.consume(num_bytes)
+                    if checksum is not None:
+                        checksum.update(memoryview(buffer)[:num_bytes])
+                    writer.submit(buffer, num_bytes)
+                    written += num_bytes
+                    if progress_callback is not None:
+                        progress_callback(num_bytes)
+            finally:
+                # Flush what was read, so a retry resumes after it
+                writer.close()
+    return written
+
+
+class _Restart(Exception):
+    """The partial download cannot be continued and must start over."""
+
+
+def download_file(
+    url: str,
+    output_path: Path,
+    expected_size: int = None,
+    session: Optional[requests.Session] = None,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    timeout: int = 300,
+    max_retries: Optional[int] = None,
+    buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+    write_behind: bool = False,
+    checksum: Optional[ExpectedChecksum] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    bandwidth: Optional[TokenBucket] = None,
+) -> None:
+    """Download a single file from S3 using presigned URL.
+
+    The file is streamed into `<name>.part` and renamed into place only once
+    it is complete, so a file at output_path is never partial. If the
+    connection drops, or a .part file was left by an earlier run, the
+    download continues from where it stopped with an HTTP Range request.
+
+    With a checksum, bytes are hashed as they are written and the file is
+    checked before it is renamed into place; a mismatch downloads it again.
+
+    Args:
+        url: Presigned S3 URL
+        output_path: Local file path to write
+        expected_size: Expected size in bytes, verified after download
+        session: Shared keep-alive session (default: one-off connection)
+        progress_callback: Called with the number of bytes written as the
+            file streams in (including bytes already in a .part file); a
+            failed download is reported back as a negative count
+        timeout: Seconds to wait for the server before retrying
+        max_retries: Number of attempts (default: the policy's
+            max_attempts)
+        buffer_size: Bytes read from the connection and written per call
+        write_behind: Write to disk on a background thread while the next
+            buffers are read (helps when the disk is slower than the link)
+        checksum: Checksum the server reports for the file
+        retry_policy: Backoff and budget for retrying connection errors,
+            timeouts, 429 and 5xx responses (default: RetryPolicy())
+        bandwidth: Token bucket limiting the rate, shared by the run
+
+    Raises:
+        ChecksumError: If every attempt produced a file not matching checksum
+    """
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = part_path_for(output_path)
+    if segments_path_for(output_path).exists():
+        # The .part file was filled out of order by a segmented download and
+        # its size says nothing about how much of it is there
+        discard_partial(output_path)
 
-    response = requests.get(url, stream=True)
-    if response.status_code != 200:
-        raise DownloadError(f"Failed to download: HTTP {response.status_code}")
-
-    with open(output_path, "wb") as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
-
-    # Verify size if provided
-    if expected_size is not None:
-        actual_size = output_path.stat().st_size
-        if actual_size != expected_size:
-            raise DownloadError(
-                f"Size mismatch for {output_path}: expected {expected_size}, got {actual_size}"
+    http = session or requests
+    policy = retry_policy or RetryPolicy()
+    attempts = max_retries or policy.max_attempts
+    streaming = StreamingChecksum(checksum) if checksum is not None else None
+    reported = 0
+
+    def report(num_bytes: int) -> None:
+        nonlocal reported
+        reported += num_bytes
+        if progress_callback is not None:
+            progress_callback(num_bytes)
+
+    report(0)
+    try:
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        if expected_size is not None and offset > expected_size:
+            offset = 0
+        report(offset)
+
+        last_error = None
+        error_type = DownloadError
+        attempt = 0
+        while True:
+            if streaming is not None and streaming.position != offset:
+                if offset:
+                    # Bytes written by an earlier run are hashed once from disk
+                    streaming.hash_file(part_path, offset)
+                else:
+                    streaming.reset()
+            try:
+                if expected_size is None or offset < expected_size:
+                    offset += _stream_to_part(
+                        http, url, part_path, offset, timeout, report,
+                        expected_size, buffer_size, write_behind, streaming, bandwidth,
+                    )
+                if streaming is not None and (expected_size is None or offset == expected_size):
+                    streaming.verify(output_path.name)
+                policy.succeeded()
+                break
+            except (_Restart, ChecksumError) as e:
+                last_error = str(e)
+                error_type = ChecksumError if isinstance(e, ChecksumError) else DownloadError
+                report(-offset)
+                offset = 0
+                part_path.unlink(missing_ok=True)
+                retry_after, backoff = None, False
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, TransientError) as e:
+                # Keep what arrived; the next attempt continues from there
+                last_error = str(e)
+                error_type = DownloadError
+                offset = part_path.stat().st_size if part_path.exists() else 0
+                retry_after, backoff = getattr(e, "retry_after", None), True
+            delay = policy.next_delay(attempt, retry_after, attempts)
+            if delay is None:
+                raise error_type(
+                    f"Failed to download {output_path.name} after {attempt + 1} attempts: {last_error}"
+                )
+            if backoff:
+                # Restarts and corrupt transfers are retried at once
+                time.sleep(delay)
+            attempt += 1
+
+        # Verify size if provided
+        if expected_size is not None:
+            actual_size = part_path.stat().st_size if part_path.exists() else 0
+            if actual_size != expected_size:
+                part_path.unlink(missing_ok=True)
+                raise DownloadError(
+                    f"Size mismatch for {output_path}: expected {expected_size}, got {actual_size}"
+                )
+
+        if not part_path.exists():
+            # Empty file: the server sent no body
+            part_path.touch()
+        os.replace(part_path, output_path)
+    except BaseException:
+        report(-reported)
+        raise
+
+
+def _fetch_range(
+    http,
+    url: str,
+    part_path: Path,
+    start: int,
+    end: int,
+    timeout: int,
+    progress_callback: Callable[[int], None],
+    buffer_size: int,
+    digest=None,
+    bandwidth: Optional[TokenBucket] = None,
+) -> None:
+    """Fetch bytes [start, end) of a file and write them in place in the .part file.
+
+    Written bytes are fed to `digest` (a hashlib object), if given, and reads
+    wait for `bandwidth` tokens.
+
+    Raises:
+        requests.exceptions.ConnectionError: If the connection dropped
+            (bytes received so far are kept)
+        TransientError: On a 429 or 5xx response
+        DownloadError: If the server does not support ranged requests
+    """
+    headers = {"Range": f"bytes={start}-{end - 1}"}
+    with http.get(url, stream=True, headers=headers, timeout=timeout) as response:
+        if response.status_code >= 500 or response.status_code == 429:
+            raise TransientError(f"HTTP {response.status_code}", parse_retry_after(response.headers))
+        if response.status_code == 200:
+            raise DownloadError("Server does not support ranged requests")
+        if response.status_code != 206:
+            raise DownloadError(f"Failed to download: HTTP {response.status_code}")
+        content_range = response.headers.get("Content-Range", "")
+        if not content_range.startswith(f"bytes {start}-"):
+            raise DownloadError(f"Unexpected Content-Range '{content_range}'")
+
+        view = memoryview(bytearray(buffer_size))
+        position = start
+        with open(part_path, "r+b") as f:
+            f.seek(start)
+            while position < end:
+                num_bytes = _read_into(response.raw, view[: end - position])
+                if not num_bytes:
+                    break
+                if bandwidth is not None:
+                    bandwidth.consume(num_bytes)
+                f.write(view[:num_bytes])
+                if digest is not None:
+                    digest.update(view[:num_bytes])
+                position += num_bytes
+                progress_callback(num_bytes)
+    if position < end:
+        raise requests.exceptions.ConnectionError(
+            f"Connection closed at byte {position} of range {start}-{end - 1}"
+        )
+
+
+class SegmentedDownload:
+    """A large file fetched as byte ranges by several workers at once.
+
+    Each segment is written in place into a sparse, preallocated .part file as
+    it arrives, in any order. Finished segments are recorded in
+    `<name>.part.segments`, so an interrupted download only fetches the
+    missing ones again. The worker finishing the last segment renames the
+    file into place.
+
+    With a multipart ETag checksum whose part size equals the segment size,
+    each segment's MD5 is computed as it streams in and the ETag is checked
+    from them. Any other checksum cannot be combined from out-of-order
+    ranges, so the file is read back once to check it.
+
+    Example:
+        segmented = SegmentedDownload(url, output_path, size)
+        for index in segmented.pending:
+            executor.submit(segmented.fetch, index, session=session)
+    """
+
+    def __init__(
+        self,
+        url: str,
+        output_path: Path,
+        size: int,
+        segment_size: int = SEGMENT_SIZE,
+        checksum: Optional[ExpectedChecksum] = None,
+    ):
+        """
+        Args:
+            url: Presigned S3 URL
+            output_path: Local file path to write
+            size: File size in bytes
+            segment_size: Bytes fetched per segment
+            checksum: Checksum the server reports for the file
+        """
+        self.url = url
+        self.output_path = output_path
+        self.size = size
+        self.segment_size = segment_size
+        self.checksum = checksum
+        # Segment MD5s add up to a multipart ETag when segments are its parts
+        self.hash_segments = (
+            checksum is not None and checksum.algorithm == "multipart" and checksum.part_size == segment_size
+        )
+        self._md5s: Dict[int, str] = {}
+        self.part_path = part_path_for(output_path)
+        self.segments_path = segments_path_for(output_path)
+        self.segments = [
+            (start, min(start + segment_size, size)) for start in range(0, size, segment_size)
+        ]
+        self._lock = threading.Lock()
+        self._done = self._load_done()
+        if not self._done:
+            self._create_part_file()
+
+    def _load_done(self) -> Set[int]:
+        """Read finished segments left by an earlier run of the same file."""
+        try:
+            with open(self.segments_path) as f:
+                state = json.load(f)
+            part_size = self.part_path.stat().st_size
+        except (OSError, ValueError):
+            return set()
+        if (
+            state.get("size") != self.size
+            or state.get("segment_size") != self.segment_size
+            or part_size != self.size
+        ):
+            return set()
+        done = set(state.get("done", [])) & set(range(len(self.segments)))
+        self._md5s = {int(i): md5 for i, md5 in state.get("md5s", {}).items() if int(i) in done}
+        return done
+
+    def _create_part_file(self) -> None:
+        """Create the .part file as a sparse file of the final size."""
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.part_path, "wb") as f:
+            preallocate(f.fileno(), self.size)
+            f.truncate(self.size)
+        self._save()
+
+    def _save(self) -> None:
+        """Record finished segments. Caller holds the lock or owns the object."""
+        tmp_path = self.segments_path.with_name(self.segments_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "size": self.size,
+                    "segment_size": self.segment_size,
+                    "done": sorted(self._done),
+                    "md5s": {str(i): md5 for i, md5 in self._md5s.items()},
+                },
+                f,
             )
+        os.replace(tmp_path, self.segments_path)
+
+    @property
+    def pending(self) -> List[int]:
+        """Indexes of the segments still to fetch."""
+        return [i for i in range(len(self.segments)) if i not in self._done]
+
+    def segment_bytes(self, index: int) -> int:
+        start, end = self.segments[index]
+        return end - start
+
+    @property
+    def done_bytes(self) -> int:
+        """Bytes of the file fetched by earlier runs."""
+        return sum(self.segment_bytes(i) for i in self._done)
+
+    def fetch(
+        self,
+        index: int,
+        session: Optional[requests.Session] = None,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        timeout: int = 300,
+        max_retries: Optional[int] = None,
+        buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+        retry_policy: Optional[RetryPolicy] = None,
+        bandwidth: Optional[TokenBucket] = None,
+    ) -> bool:
+        """Download one segment, resuming within it after connection drops.
+
+        Args:
+            index: Segment index
+            session: Shared keep-alive session (default: one-off connection)
+            progress_callback: Called with the number of bytes written; a
+                failed segment is reported back as a negative count
+            timeout: Seconds to wait for the server before retrying
+            max_retries: Number of attempts (default: the policy's
+                max_attempts)
+            buffer_size: Bytes read from the connection and written per call
+            retry_policy: Backoff and budget for retrying connection errors,
+                timeouts, 429 and 5xx responses (default: RetryPolicy())
+            bandwidth: Token bucket limiting the rate, shared by the run
+
+        Returns:
+            True if this completed the file and it was renamed into place
+        """
+        start, end = self.segments[index]
+        http = session or requests
+        policy = retry_policy or RetryPolicy()
+        attempts = max_retries or policy.max_attempts
+        digest = hashlib.md5() if self.hash_segments else None
+        received = 0
+
+        def report(num_bytes: int) -> None:
+            nonlocal received
+            received += num_bytes
+            if progress_callback is not None:
+                progress_callback(num_bytes)
+
+        report(0)
+        try:
+            attempt = 0
+            while True:
+                try:
+                    _fetch_range(
+                        http, self.url, self.part_path, start + received, end,
+                        timeout, report, buffer_size, digest, bandwidth,
+                    )
+                    policy.succeeded()
+                    break
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, TransientError) as e:
+                    # Keep what arrived; the next attempt continues from there
+                    if not policy.retry(attempt, getattr(e, "retry_after", None), attempts):
+                        raise DownloadError(
+                            f"Failed to download bytes {start}-{end - 1} of {self.output_path.name} "
+                            f"after {attempt + 1} attempts: {e}"
+                        )
+                attempt += 1
+        except BaseException:
+            report(-received)
+            raise
+        return self._segment_done(index, digest.hexdigest() if digest is not None else None)
+
+    def _segment_done(self, index: int, md5: Optional[str]) -> bool:
+        with self._lock:
+            self._done.add(index)
+            if md5 is not None:
+                self._md5s[index] = md5
+            if len(self._done) < len(self.segments):
+                self._save()
+                return False
+            try:
+                self._verify()
+            except ChecksumError:
+                # Corrupt somewhere: the next run starts the file over
+                discard_partial(self.output_path)
+                raise
+            os.replace(self.part_path, self.output_path)
+            self.segments_path.unlink(missing_ok=True)
+            return True
+
+    def _verify(self) -> None:
+        """Check the complete .part file against the expected checksum."""
+        if self.checksum is None:
+            return
+        if self.hash_segments and len(self._md5s) == len(self.segments):
+            actual = multipart_etag([self._md5s[i] for i in range(len(self.segments))])
+            if actual != self.checksum.value:
+                raise ChecksumError(
+                    f"Checksum mismatch for {self.output_path.name}: expected ETag "
+                    f"{self.checksum.value}, got {actual}"
+                )
+            return
+        verify_file(self.part_path, self.checksum)
+
+
+def get_download_urls(
+    auth: SamiAuth,
+    api_url: str,
+    dataset_id: str,
+    dataset_format: str = "lerobot",
+    retry_policy: Optional[RetryPolicy] = None,
+) -> dict:
+    """Get the presigned URLs of every file of a dataset.
+
+    Returns:
+        Response data with downloadUrls ({relativePath, size, downloadUrl,
+        ...} dicts) and totalFiles
+    """
+    response = (retry_policy or RetryPolicy()).call(
+        requests.get,
+        f"{api_url}/datasets/{dataset_id}/download",
+        params={"format": dataset_format},
+        headers=auth.get_headers(),
+    )
+
+    if response.status_code == 404:
+        raise NotFoundError(f"Dataset not found: {dataset_id}")
+    if response.status_code == 403:
+        raise PermissionDeniedError("You do not have download permission for this dataset")
+    if response.status_code != 200:
+        try:
+            error = response.json().get("error", {}).get("message", "Unknown error")
+        except Exception:
+            error = f"HTTP {response.status_code}"
+        raise DownloadError(f"Failed to get download URLs: {error}")
+
+    return response.json()["data"]
+
+
+def is_downloaded(output_path: Path, expected_size: Optional[int]) -> bool:
+    """Check if a file was fully downloaded by an earlier run."""
+    try:
+        size = output_path.stat().st_size
+    except FileNotFoundError:
+        return False
+    return expected_size is None or size == expected_size
+
+
+class _EpisodeTracker:
+    """Reports each episode once all of the files it is read from are on disk."""
+
+    def __init__(self, files_by_episode: Dict[int, Set[str]], callback: Optional[Callable[[int], None]]):
+        self._remaining = {episode: set(files) for episode, files in files_by_episode.items()}
+        self._episodes_of = defaultdict(list)
+        for episode in sorted(files_by_episode):
+            for rel_path in files_by_episode[episode]:
+                self._episodes_of[rel_path].append(episode)
+        self._callback = callback
+
+    def order_key(self, rel_path: str) -> Tuple[float, str]:
+        """Sort key fetching files of lower episodes first, then other files."""
+        episodes = self._episodes_of.get(rel_path)
+        return (episodes[0] if episodes else float("inf"), rel_path)
+
+    def file_done(self, rel_path: str) -> None:
+        """Record a finished file, reporting the episodes it completes."""
+        for episode in self._episodes_of.pop(rel_path, ()):
+            remaining = self._remaining[episode]
+            remaining.discard(rel_path)
+            if not remaining:
+                del self._remaining[episode]
+                if self._callback is not None:
+                    self._callback(episode)
+
+
+def _fetch_metadata(
+    download_urls: List[dict],
+    output_dir: Path,
+    manifest: LocalManifest,
+    sync: bool,
+    fetch: Callable[..., None],
+) -> None:
+    """Download meta/ ahead of the other files, to choose which of them to fetch."""
+    meta = [u for u in download_urls if u["relativePath"].startswith(META_DIR)]
+    with create_transfer_session(1) as session:
+        for url_info in meta:
+            output = output_dir / url_info["relativePath"]
+            if sync:
+                if manifest.is_current(url_info):
+                    continue
+                if url_info["relativePath"] in manifest.entries:
+                    discard_partial(output)
+            elif is_downloaded(output, url_info["size"]):
+                continue
+            fetch(url_info, session=session)
+            manifest.record(url_info)
+    manifest.save()
 
 
 def download_dataset(
@@ -38,77 +766,355 @@ def download_dataset(
     api_url: str,
     dataset_id: str,
     output_path: str,
-    max_workers: int = 4,
+    max_workers: Union[int, str] = 4,
     dataset_format: str = "lerobot",
+    worker_limits: Optional[Tuple[int, int]] = None,
+    sync: bool = False,
+    delete: bool = False,
+    buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+    write_behind: bool = False,
+    segment_size: int = SEGMENT_SIZE,
+    segment_threshold: Optional[int] = SEGMENT_THRESHOLD,
+    checksums: bool = True,
+    selection: Optional[DownloadSelection] = None,
+    episode_order: bool = False,
+    on_episode: Optional[Callable[[int], None]] = None,
+    cache: Optional[ContentCache] = None,
+    max_in_flight: Optional[int] = None,
+    engine=None,
+    retry_policy: Optional[RetryPolicy] = None,
+    bandwidth: Optional[TokenBucket] = None,
 ) -> Path:
     """Download a dataset from SAMI.
 
+    The size and ETag of every downloaded file are recorded in a manifest in
+    the output directory. With sync=True, files whose manifest entry matches
+    the server and that were not modified locally are skipped, so re-pulling
+    a dataset only transfers new or changed files.
+
+    Files of at least segment_threshold bytes are split into byte ranges
+    that all workers fetch concurrently, so a large file does not finish
+    alone on one connection while the other workers are idle.
+
+    With a selection, meta/ is downloaded first and used to pick the
+    episodes, cameras and files to fetch (see selection.py).
+
+    With episode_order=True, meta/ is downloaded first and the other files
+    are fetched in ascending episode order, so a data loader can start on the
+    first episodes while the rest are still downloading; on_episode is
+    called with each episode index once all of its files are on disk.
+
+    With a cache, files are downloaded into the cache and linked into the
+    output directory; files already cached are linked without a transfer.
+
+    With max_in_flight (or an engine), small files are downloaded as asyncio
+    coroutines on one thread, many more at once than there are workers
+    (see engine.py); the workers download the large files. Files downloaded
+    through a cache always use the workers.
+
     Args:
         auth: Authenticated SamiAuth instance
         api_url: SAMI API base URL
         dataset_id: ID of the dataset to download
         output_path: Local path to download to
-        max_workers: Number of parallel download threads
+        max_workers: Number of parallel download threads, or "auto" to
+            adapt concurrency to measured throughput and errors
         dataset_format: Format to download ('lerobot' or 'hdf5')
+        worker_limits: (min, max) concurrency when max_workers is "auto"
+        sync: Compare with the local manifest and download only new or
+            changed files
+        delete: With sync, delete downloaded files no longer on the server
+            (only files recorded in the download manifest)
+        buffer_size: Bytes read and written per call for each file
+        write_behind: Write to disk on a background thread while the next
+            buffers are read
+        segment_size: Bytes fetched per worker in a segmented download
+        segment_threshold: Size from which files are downloaded in
+            segments (None: never)
+        checksums: Check every file against the SHA-256 or ETag the server
+            reports, hashing bytes as they are written
+        selection: Download only some episodes, video keys or files
+        episode_order: Fetch meta/ first, then the files of each episode in
+            ascending order
+        on_episode: Called from the calling thread with each episode index
+            once the episode is complete (implies episode_order)
+        cache: Shared cache to download through (see cache.py)
+        max_in_flight: Download small files on an asyncio TransferEngine
+            with this many requests in flight (needs aiohttp)
+        engine: TransferEngine to use instead of starting one
+        retry_policy: How requests are retried (default: RetryPolicy());
+            the transfers of a run share a retry budget
+        bandwidth: Token bucket limiting the combined rate of all transfers
+            (see bandwidth.py)
 
     Returns:
         Path to the downloaded dataset
     """
+    if delete and not sync:
+        raise ValidationError("delete=True requires sync=True")
+    if segment_size < 1:
+        raise ValidationError(f"segment_size must be positive, got {segment_size}")
+    pool_size, concurrency = resolve_workers(max_workers, worker_limits)
     output_dir = Path(output_path)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Get download URLs - use format-specific endpoint
     print(f"Getting download URLs for dataset {dataset_id} ({dataset_format} format)...")
-    response = requests.get(
-        f"{api_url}/datasets/{dataset_id}/download",
-        params={"format": dataset_format},
-        headers=auth.get_headers(),
-    )
-
-    if response.status_code == 404:
-        raise NotFoundError(f"Dataset not found: {dataset_id}")
-    if response.status_code == 403:
-        raise PermissionDeniedError("You do not have download permission for this dataset")
-    if response.status_code != 200:
-        try:
-            error = response.json().get("error", {}).get("message", "Unknown error")
-        except Exception:
-            error = f"HTTP {response.status_code}"
-        raise DownloadError(f"Failed to get download URLs: {error}")
-
-    data = response.json()["data"]
+    retry_policy = retry_policy or RetryPolicy()
+    data = get_download_urls(auth, api_url, dataset_id, dataset_format, retry_policy)
     download_urls = data["downloadUrls"]
     total_files = data["totalFiles"]
     total_size = sum(d["size"] for d in download_urls)
 
     print(f"  Found {total_files} files ({total_size / (1024**3):.2f} GB)")
 
+    def checksum_for(url_info: dict) -> Optional[ExpectedChecksum]:
+        if not checksums:
+            return None
+        return expected_checksum(url_info)
+
+    def fetch(url_info: dict, progress_callback=None, **kwargs) -> None:
+        url, size = url_info["downloadUrl"], url_info["size"]
+        output = output_dir / url_info["relativePath"]
+        kwargs.update(
+            progress_callback=progress_callback, checksum=checksum_for(url_info),
+            retry_policy=retry_policy, bandwidth=bandwidth,
+        )
+        if cache is None:
+            download_file(url, output, size, **kwargs)
+            return
+        object_path = cache.object_path(dataset_id, url_info)
+        hit = cache.fetch(object_path, output, size, lambda path: download_file(url, path, size, **kwargs))
+        if hit and progress_callback is not None:
+            # Cached by another download since this one started
+            progress_callback(size)
+
+    episode_order = episode_order or on_episode is not None
+    manifest = LocalManifest(output_dir)
+    if episode_order or (selection is not None and selection.needs_metadata):
+        _fetch_metadata(download_urls, output_dir, manifest, sync, fetch)
+    episodes = None
+    # --delete compares against the whole dataset, not the selection
+    server_paths = {u["relativePath"] for u in download_urls}
+    if selection is not None and selection.active:
+        download_urls, episodes = select_files(download_urls, output_dir, selection)
+        total_size = sum(d["size"] for d in download_urls)
+        if episodes is not None:
+            print(f"  Selected {len(episodes)} episodes")
+        print(f"  Selected {len(download_urls)} of {total_files} files ({total_size / (1024**3):.2f} GB)")
+
+    if sync:
+        # Only new files, or files changed on the server or locally
+        pending, done = plan_sync(download_urls, manifest)
+        print(f"  {len(done)} files up to date, {len(pending)} new or changed")
+        for url_info in pending:
+            if url_info["relativePath"] in manifest.entries:
+                # A partial download of the previous version must not be resumed
+                discard_partial(output_dir / url_info["relativePath"])
+        if delete:
+            gone, extraneous = find_extraneous(
+                output_dir, manifest, server_paths, (PART_SUFFIX, PART_SUFFIX + SEGMENTS_SUFFIX)
+            )
+            if extraneous:
+                delete_files(output_dir, extraneous)
+                print(f"  Deleted {len(extraneous)} local files no longer on the server")
+            for rel_path in gone:
+                manifest.forget(rel_path)
+    else:
+        # Files completed by an earlier run are kept; partial ones resume
+        # from their .part file
+        done = [u for u in download_urls if is_downloaded(output_dir / u["relativePath"], u["size"])]
+        done_paths = {u["relativePath"] for u in done}
+        pending = [u for u in download_urls if u["relativePath"] not in done_paths]
+        if done:
+            print(f"  Skipping {len(done)} files already downloaded")
+
+    if cache is not None and pending:
+        cached = []
+        for url_info in pending:
+            object_path = cache.object_path(dataset_id, url_info)
+            if not cache.lookup(object_path, url_info["size"]):
+                continue
+            try:
+                cache.materialize(object_path, output_dir / url_info["relativePath"])
+            except FileNotFoundError:
+                # Evicted since the lookup; downloaded again below
+                continue
+            manifest.record(url_info)
+            cached.append(url_info)
+        if cached:
+            cached_paths = {u["relativePath"] for u in cached}
+            pending = [u for u in pending if u["relativePath"] not in cached_paths]
+            done = done + cached
+            print(f"  Linked {len(cached)} files from the cache at {cache.root}")
+
+    # Throttling pauses the whole run instead of every worker retrying
+    # every file to exhaustion
+    retry_policy = retry_policy.for_run()
+
+    tracker = None
+    if episode_order:
+        tracker = _EpisodeTracker(episode_files(download_urls, output_dir, episodes), on_episode)
+
     # Download files in parallel
-    print(f"Downloading with {max_workers} workers...")
+    if concurrency is not None:
+        print(f"Downloading with {concurrency.min_workers}-{pool_size} adaptive workers...")
+    else:
+        print(f"Downloading with {pool_size} workers...")
+    if bandwidth is not None:
+        print(f"  Bandwidth limit: {bandwidth.describe()}")
     failed = []
-    downloaded_bytes = 0
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    with create_transfer_session(pool_size, retry_policy.backpressure) as session, \
+            auth.keep_fresh(), \
+            ThreadPoolExecutor(max_workers=pool_size) as executor, \
+            TransferProgress("Downloading", total_size, len(download_urls), pool_size) as progress, \
+            transfer_engine(max_in_flight, engine) as engine:
+        if concurrency is not None:
+            session.hooks["response"].append(concurrency.observe_response)
+        progress.update(sum(u["size"] for u in done))
+        progress.file_done(len(done))
+
+        def submit(size: int, fn, *args, **kwargs):
+            if concurrency is not None:
+                # With --workers auto, downloads wait for a slot from the controller
+                return executor.submit(concurrency.run, size, fn, *args, **kwargs)
+            return executor.submit(fn, *args, **kwargs)
+
+        segmented_paths = {
+            u["relativePath"] for u in pending
+            if segment_threshold is not None
+            and u["size"] >= segment_threshold and u["size"] > segment_size
+        }
+        if tracker is not None:
+            # Workers take files in submission order, so episodes complete
+            # roughly in ascending order
+            ordered = sorted(pending, key=lambda u: tracker.order_key(u["relativePath"]))
+            for url_info in done:
+                tracker.file_done(url_info["relativePath"])
+        else:
+            # Large files first, so their segments spread over all workers
+            # instead of trailing at the end
+            ordered = sorted(pending, key=lambda u: u["relativePath"] not in segmented_paths)
         futures = {}
-        for url_info in download_urls:
-            file_output = output_dir / url_info["relativePath"]
-            future = executor.submit(
-                download_file,
-                url_info["downloadUrl"],
-                file_output,
-                url_info["size"]
-            )
-            futures[future] = (url_info["relativePath"], url_info["size"])
+        cache_locks = {}
+
+        for url_info in ordered:
+            rel_path = url_info["relativePath"]
+            target = output_dir / rel_path
+            if rel_path in segmented_paths and cache is not None:
+                # Segments are written straight into the cache object, which
+                # stays locked until the file is complete
+                target = cache.object_path(dataset_id, url_info)
+                lock = cache.try_lock(target)
+                if lock is not None and cache.lookup(target, url_info["size"]):
+                    lock.release()
+                    lock = None
+                if lock is None:
+                    # Cached meanwhile, or being downloaded by another process
+                    segmented_paths.discard(rel_path)
+                else:
+                    cache_locks[rel_path] = (lock, target)
+            if rel_path not in segmented_paths and engine is not None and cache is None \
+                    and engine.accepts(url_info["size"]):
+                future = engine.download(
+                    url_info["downloadUrl"], output_dir / rel_path, url_info["size"],
+                    progress_callback=progress.callback,
+                    checksum=checksum_for(url_info),
+                    retry_policy=retry_policy,
+                    bandwidth=bandwidth,
+                )
+                futures[future] = url_info
+                continue
+            if rel_path not in segmented_paths:
+                future = submit(
+                    url_info["size"],
+                    fetch,
+                    url_info,
+                    session=session,
+                    progress_callback=progress.callback,
+                    buffer_size=buffer_size,
+                    write_behind=write_behind,
+                )
+                futures[future] = url_info
+                continue
+            checksum = checksum_for(url_info)
+            try:
+                segmented_file = SegmentedDownload(
+                    url_info["downloadUrl"], target,
+                    url_info["size"],
+                    # Segments aligned with the upload's parts verify the ETag
+                    # without reading the file back
+                    checksum.part_size if checksum and checksum.part_size else segment_size,
+                    checksum,
+                )
+            except OSError as e:
+                failed.append((url_info["relativePath"], str(e)))
+                progress.file_done()
+                continue
+            progress.update(segmented_file.done_bytes)
+            for index in segmented_file.pending:
+                future = submit(
+                    segmented_file.segment_bytes(index),
+                    segmented_file.fetch,
+                    index,
+                    session=session,
+                    progress_callback=progress.callback,
+                    buffer_size=buffer_size,
+                    retry_policy=retry_policy,
+                    bandwidth=bandwidth,
+                )
+                futures[future] = url_info
 
-        with tqdm(total=len(futures), desc="Downloading", unit="files") as pbar:
+        failed_paths = set()
+        try:
             for future in as_completed(futures):
-                rel_path, size = futures[future]
+                url_info = futures[future]
+                rel_path = url_info["relativePath"]
                 try:
-                    future.result()
-                    downloaded_bytes += size
+                    if future.result() is False:
+                        # A segment of a file that is not complete yet
+                        continue
+                    if rel_path in cache_locks:
+                        lock, object_path = cache_locks.pop(rel_path)
+                        try:
+                            cache.seal(object_path)
+                            cache.materialize(object_path, output_dir / rel_path)
+                        finally:
+                            lock.release()
+                    manifest.record(url_info)
                 except Exception as e:
+                    if rel_path in failed_paths:
+                        continue
+                    failed_paths.add(rel_path)
                     failed.append((rel_path, str(e)))
-                pbar.update(1)
+                else:
+                    if tracker is not None:
+                        tracker.file_done(rel_path)
+                progress.file_done()
+        finally:
+            manifest.save()
+            for lock, _ in cache_locks.values():
+                lock.release()
+
+    if cache is not None:
+        removed, freed = cache.evict()
+        if removed:
+            print(f"  Evicted {removed} files ({freed / (1024**3):.2f} GB) from the cache")
+
+    if selection is not None and selection.video_keys is not None and (output_dir / INFO_PATH).exists():
+        # The edited info.json no longer matches the server's, so it is left
+        # out of the manifest and fetched again by the next download
+        restrict_video_features(output_dir, selection.video_keys)
+        manifest.forget(INFO_PATH)
+        manifest.save()
+
+    print(f"  Transferred {progress.summary()}")
+    if concurrency is not None:
+        print(f"  Finished at {concurrency.summary()}")
+    pressure = retry_policy.backpressure.summary()
+    if pressure:
+        print(f"  {pressure}")
 
     if failed:
         print(f"Warning: {len(failed)} files failed to download")
@@ -116,7 +1122,67 @@ def download_dataset(
             print(f"  - {path}: {error}")
         if len(failed) > 5:
             print(f"  ... and {len(failed) - 5} more")
-        raise DownloadError(f"Failed to download {len(failed)} files")
+        raise DownloadError(
+            f"Failed to download {len(failed)} files. "
+            f"Run the download again to continue; finished files are kept."
+        )
 
     print(f"Download complete! Dataset saved to: {output_dir}")
     return output_dir
+
+
+def iter_episodes(
+    auth: SamiAuth,
+    api_url: str,
+    dataset_id: str,
+    output_path: str,
+    **download_kwargs,
+) -> Iterator[int]:
+    """Download a dataset in episode order, yielding each episode once it is on disk.
+
+    The download runs on a background thread; meta/ is complete before the
+    first episode is yielded. If the iterator is closed early, the download
+    still runs to the end in the background.
+
+    Example:
+        for episode in iter_episodes(auth, api_url, dataset_id, "./data"):
+            loader.add_episode(episode)
+
+    Args:
+        auth: Authenticated SamiAuth instance
+        api_url: SAMI API base URL
+        dataset_id: ID of the dataset to download
+        output_path: Local path to download to
+        **download_kwargs: Other download_dataset() arguments
+
+    Yields:
+        Episode indices, roughly in ascending order
+
+    Raises:
+        DownloadError: After the last complete episode, if files failed
+    """
+    ready = queue.Queue()
+    finished = object()
+    errors = []
+
+    def run() -> None:
+        try:
+            download_dataset(
+                auth, api_url, dataset_id, output_path,
+                episode_order=True, on_episode=ready.put, **download_kwargs,
+            )
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            ready.put(finished)
+
+    thread = threading.Thread(target=run, name="uz-download", daemon=True)
+    thread.start()
+    while True:
+        episode = ready.get()
+        if episode is finished:
+            break
+        yield episode
+    thread.join()
+    if errors:
+        raise errors[0]
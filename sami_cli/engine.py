@@ -0,0 +1,381 @@
+"""asyncio transfer engine for small files.
+
+Transfers of small files (meta/, Parquet shards, short clips) are latency
+bound: each spends most of its time waiting for S3 to answer, and a worker
+thread per transfer caps practical concurrency at a few dozen. The engine
+runs these transfers as coroutines on one event loop with aiohttp, so
+hundreds of requests are in flight on a single thread. Upload bodies are
+streamed from disk in UPLOAD_CHUNK_SIZE chunks, so memory grows with the
+transfers in flight by a chunk each, not by a file each.
+
+download_dataset() and upload_dataset() hand the engine every file of up to
+ENGINE_MAX_FILE_SIZE bytes; larger files, which are bandwidth bound, stay on
+the worker threads and their segmented or multipart transfers. Files this
+small are fetched and sent whole, so a retry starts the file over.
+
+Needs aiohttp (pip install "uz-cli[async]").
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError as e:
+    raise ImportError("The asyncio transfer engine needs aiohttp: pip install 'uz-cli[async]'") from e
+
+from . import mp4
+from .bandwidth import TokenBucket
+from .checksum import ExpectedChecksum, StreamingChecksum, body_md5, content_md5
+from .download import discard_partial, part_path_for, segments_path_for
+from .models import UploadUrl
+from .retry import RetryPolicy, parse_retry_after
+from .upload import URL_EXPIRY_MARGIN
+from .exceptions import ChecksumError, DownloadError, TransientError, UploadError, UrlExpiredError
+
+
+# Largest file transferred by the engine instead of a worker thread
+ENGINE_MAX_FILE_SIZE = 8 * 1024**2
+# Default number of transfers in flight at once
+MAX_IN_FLIGHT = 256
+# Bytes of an upload body read from disk at a time
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+async def download_file_async(
+    session: "aiohttp.ClientSession",
+    url: str,
+    output_path: Path,
+    expected_size: Optional[int] = None,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    checksum: Optional[ExpectedChecksum] = None,
+    max_retries: Optional[int] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    bandwidth: Optional[TokenBucket] = None,
+) -> None:
+    """Download a small file from a presigned URL.
+
+    Like download_file(), the body is written to `<name>.part` and renamed
+    into place once it is complete and matches its size and checksum.
+
+    Args:
+        session: aiohttp session to send the request on
+        url: Presigned S3 URL
+        output_path: Local file path to write
+        expected_size: Expected size in bytes
+        progress_callback: Called with the number of bytes written; a failed
+            attempt is reported back as a negative count
+        checksum: Checksum the server reports for the file
+        max_retries: Number of attempts (default: the policy's max_attempts)
+        retry_policy: Backoff and budget for retrying connection errors,
+            timeouts, 429 and 5xx responses and checksum mismatches
+        bandwidth: Token bucket limiting the rate, shared by the run
+
+    Raises:
+        DownloadError: If every attempt failed
+        ChecksumError: If every attempt produced a file not matching checksum
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = part_path_for(output_path)
+    if segments_path_for(output_path).exists():
+        discard_partial(output_path)
+
+    def report(num_bytes: int) -> None:
+        if progress_callback is not None:
+            progress_callback(num_bytes)
+
+    policy = retry_policy or RetryPolicy()
+    attempts = max_retries or policy.max_attempts
+    report(0)
+    attempt = 0
+    while True:
+        streaming = StreamingChecksum(checksum) if checksum is not None else None
+        written = 0
+        try:
+            # Presigned URLs are signed as given and must not be re-quoted
+            async with _gated(policy, url) as record, session.get(URL(url, encoded=True)) as response:
+                record(response.status, parse_retry_after(response.headers))
+                if response.status >= 500 or response.status == 429:
+                    raise TransientError(f"HTTP {response.status}", parse_retry_after(response.headers))
+                if response.status != 200:
+                    raise DownloadError(f"Failed to download {output_path.name}: HTTP {response.status}")
+                with open(part_path, "wb") as f:
+                    async for chunk in response.content.iter_any():
+                        await _throttle(bandwidth, len(chunk))
+                        f.write(chunk)
+                        if streaming is not None:
+                            streaming.update(chunk)
+                        written += len(chunk)
+                        report(len(chunk))
+            if expected_size is not None and written != expected_size:
+                raise aiohttp.ClientPayloadError(f"Got {written} of {expected_size} bytes")
+            if streaming is not None:
+                streaming.verify(output_path.name)
+            os.replace(part_path, output_path)
+            policy.succeeded()
+            return
+        except ChecksumError as e:
+            last_error, error_type, retry_after = str(e), ChecksumError, None
+        except (aiohttp.ClientError, asyncio.TimeoutError, TransientError) as e:
+            last_error, error_type = str(e) or type(e).__name__, DownloadError
+            retry_after = getattr(e, "retry_after", None)
+        except BaseException:
+            report(-written)
+            part_path.unlink(missing_ok=True)
+            raise
+        report(-written)
+        part_path.unlink(missing_ok=True)
+        delay = policy.next_delay(attempt, retry_after, attempts)
+        if delay is None:
+            raise error_type(f"Failed to download {output_path.name} after {attempt + 1} attempts: {last_error}")
+        if error_type is DownloadError:
+            await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def _throttle(bandwidth: Optional[TokenBucket], num_bytes: int) -> None:
+    """TokenBucket.consume() without blocking the loop."""
+    if bandwidth is not None:
+        delay = bandwidth.reserve(num_bytes)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@asynccontextmanager
+async def _gated(policy: RetryPolicy, url: str):
+    """Send a request through the run's back-pressure gate, if it has one."""
+    if policy.backpressure is None:
+        yield lambda status, retry_after=None: None
+        return
+    async with policy.backpressure.request_async(url) as record:
+        yield record
+
+
+async def _stream_body(open_body, bandwidth: Optional[TokenBucket]) -> AsyncIterator[bytes]:
+    """Read a body in chunks on a thread, taking bandwidth tokens for each."""
+    source = await asyncio.to_thread(open_body)
+    try:
+        while True:
+            chunk = await asyncio.to_thread(source.read, UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                return
+            await _throttle(bandwidth, len(chunk))
+            yield chunk
+    finally:
+        source.close()
+
+
+async def _put(
+    session: "aiohttp.ClientSession",
+    upload_url: str,
+    open_body,
+    size: int,
+    headers: dict,
+    description: str,
+    policy: RetryPolicy,
+    max_retries: Optional[int],
+    bandwidth: Optional[TokenBucket] = None,
+) -> None:
+    """PUT a body to a presigned URL, retrying server and connection errors.
+
+    Every attempt streams the body again from a fresh `open_body()`, with
+    an explicit Content-Length, as presigned PUTs are not sent chunked.
+    """
+    headers = {**headers, "Content-Length": str(size)}
+    attempt = 0
+    while True:
+        retry_after = None
+        try:
+            body = _stream_body(open_body, bandwidth)
+            async with _gated(policy, upload_url) as record, \
+                    session.put(URL(upload_url, encoded=True), data=body, headers=headers) as response:
+                retry_after = parse_retry_after(response.headers)
+                record(response.status, retry_after)
+                if response.status in (200, 204):
+                    policy.succeeded()
+                    return
+                text = await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            last_error = f"Connection error: {e or type(e).__name__}"
+        else:
+            if response.status == 403 and "expired" in text.lower():
+                raise UrlExpiredError(f"Presigned URL expired for {description}")
+            last_error = f"HTTP {response.status}"
+            if response.status == 400 and "BadDigest" in text:
+                last_error = "Checksum mismatch (Content-MD5 rejected by S3)"
+            elif response.status < 500 and response.status != 429:
+                break
+        if not await _retry(policy, attempt, retry_after, max_retries):
+            break
+        attempt += 1
+
+    raise UploadError(f"Failed to upload {description} after {attempt + 1} attempts: {last_error}")
+
+
+async def _retry(policy: RetryPolicy, attempt: int, retry_after: Optional[float], max_attempts: Optional[int]) -> bool:
+    """RetryPolicy.retry() without blocking the loop."""
+    delay = policy.next_delay(attempt, retry_after, max_attempts)
+    if delay is None:
+        return False
+    await asyncio.sleep(delay)
+    return True
+
+
+async def upload_file_async(
+    session: "aiohttp.ClientSession",
+    file_path: Path,
+    upload_url: UploadUrl,
+    content_type: str,
+    refresh_url: Callable[[], UploadUrl],
+    faststart_plan: Optional[mp4.FaststartPlan] = None,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    md5: Optional[str] = None,
+    max_retries: Optional[int] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    bandwidth: Optional[TokenBucket] = None,
+    checksum: bool = False,
+) -> None:
+    """Upload a small file, re-requesting its presigned URL if it expired.
+
+    Args:
+        session: aiohttp session to send the request on
+        file_path: Local file path
+        upload_url: Presigned URL issued for the file
+        content_type: MIME type
+        refresh_url: Callable returning a fresh UploadUrl for the file (run
+            on a thread, as it calls the API synchronously)
+        faststart_plan: Send the video in faststart order using this layout
+        progress_callback: Called with the number of bytes sent
+        md5: MD5 hex digest of the uploaded bytes, sent as Content-MD5
+        max_retries: Number of attempts (default: the policy's max_attempts)
+        retry_policy: Backoff and budget for retrying connection errors,
+            429 and 5xx responses and rejected checksums
+        bandwidth: Token bucket limiting the rate, shared by the run
+        checksum: Without md5, compute the Content-MD5 from the body
+    """
+    if progress_callback is not None:
+        progress_callback(0)
+    if upload_url.expires_within(URL_EXPIRY_MARGIN):
+        upload_url = await asyncio.to_thread(refresh_url)
+    if faststart_plan is not None:
+        open_body = lambda: mp4.FaststartReader(file_path, faststart_plan)
+        size = faststart_plan.output_size
+    else:
+        open_body = lambda: open(file_path, "rb")
+        size = file_path.stat().st_size
+    headers = {"Content-Type": content_type}
+    if checksum and not md5:
+        md5 = await asyncio.to_thread(body_md5, open_body)
+    if md5:
+        headers["Content-MD5"] = content_md5(md5)
+
+    policy = retry_policy or RetryPolicy()
+    put = (open_body, size, headers, str(file_path), policy, max_retries, bandwidth)
+    try:
+        await _put(session, upload_url.upload_url, *put)
+    except UrlExpiredError:
+        upload_url = await asyncio.to_thread(refresh_url)
+        await _put(session, upload_url.upload_url, *put)
+    if progress_callback is not None:
+        progress_callback(size)
+
+
+class TransferEngine:
+    """Runs small-file transfers as coroutines on one event loop.
+
+    Transfers are submitted from any thread other than the loop's and return
+    concurrent.futures.Future objects, so the thread-based download and
+    upload loops wait on them like on their worker threads.
+
+    Without a loop, the engine starts its own on a background thread; with
+    the loop of a running application (as AsyncSamiClient does), transfers
+    run there, and the engine must be closed with `await aclose()`.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        max_file_size: int = ENGINE_MAX_FILE_SIZE,
+        timeout: int = 300,
+    ):
+        """
+        Args:
+            max_in_flight: Transfers running at once (and pooled connections)
+            loop: Event loop to run transfers on (default: a new one on a
+                background thread)
+            max_file_size: Largest file the engine accepts
+            timeout: Seconds a transfer may take before it is retried
+        """
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_file_size = max_file_size
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._thread = None
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=loop.run_forever, name="uz-transfer-engine", daemon=True)
+            self._thread.start()
+        self.loop = loop
+
+    def accepts(self, size: int) -> bool:
+        """Check if a file of this size is transferred by the engine."""
+        return size <= self.max_file_size
+
+    async def _run(self, transfer, *args, **kwargs):
+        if self._session is None:
+            # Created on the loop that uses them
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_in_flight),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        async with self._semaphore:
+            return await transfer(self._session, *args, **kwargs)
+
+    def submit(self, transfer, *args, **kwargs) -> concurrent.futures.Future:
+        """Schedule `transfer(session, *args, **kwargs)` on the engine's loop."""
+        return asyncio.run_coroutine_threadsafe(self._run(transfer, *args, **kwargs), self.loop)
+
+    def download(self, url: str, output_path: Path, expected_size: Optional[int] = None, **kwargs) -> concurrent.futures.Future:
+        """Schedule download_file_async(); kwargs are passed through."""
+        return self.submit(download_file_async, url, output_path, expected_size, **kwargs)
+
+    def upload(
+        self,
+        file_path: Path,
+        upload_url: UploadUrl,
+        content_type: str,
+        refresh_url: Callable[[], UploadUrl],
+        **kwargs,
+    ) -> concurrent.futures.Future:
+        """Schedule upload_file_async(); kwargs are passed through."""
+        return self.submit(upload_file_async, file_path, upload_url, content_type, refresh_url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the engine's connections (on its loop)."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def close(self) -> None:
+        """Close the connections and stop the engine's own loop."""
+        if self._thread is None:
+            raise RuntimeError("An engine on an external loop is closed with 'await engine.aclose()'")
+        asyncio.run_coroutine_threadsafe(self.aclose(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def __enter__(self) -> "TransferEngine":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
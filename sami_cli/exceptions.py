@@ -2,7 +2,29 @@
 
 
 class SamiError(Exception):
-    """Base exception for SAMI SDK."""
+    """Base exception for SAMI SDK.
+
+    `retryable` tells whether the failed operation may succeed if it is
+    tried again (see retry.py); errors are fatal unless marked otherwise.
+    """
+    retryable = False
+
+
+class TransientError(SamiError):
+    """Raised when a request failed in a way that may succeed if retried.
+
+    Used for throttling (429) and server errors (5xx); retry_after is the
+    delay the server asked for in seconds, if any.
+    """
+    retryable = True
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(SamiError):
+    """Raised when a host failed for so long that requests to it fail at once."""
     pass
 
 
@@ -34,3 +56,19 @@ class DownloadError(SamiError):
 class ValidationError(SamiError):
     """Raised when dataset validation fails."""
     pass
+
+
+class UrlExpiredError(SamiError):
+    """Raised when a presigned transfer URL has expired.
+
+    Retryable with a new URL.
+    """
+    retryable = True
+
+
+class ChecksumError(SamiError):
+    """Raised when transferred data does not match its checksum.
+
+    Retryable: the data is usually corrupted in transit, not at the source.
+    """
+    retryable = True
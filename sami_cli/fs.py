@@ -0,0 +1,272 @@
+"""fsspec filesystem for reading SAMI datasets in place: sami://<dataset-id>/<path>.
+
+Files are read with HTTP Range requests on the presigned URLs from
+/datasets/{id}/download, through a bounded cache of fixed-size blocks per
+open file, so readers that seek (pyarrow reading a few columns or row
+groups, video decoders reading some frames) only transfer what they touch.
+
+Needs fsspec (pip install "uz-cli[fsspec]"). The sami:// protocol is
+registered with fsspec on install, so pandas, pyarrow and other fsspec
+users accept sami:// URLs directly:
+
+    import pandas as pd
+    df = pd.read_parquet("sami://<dataset-id>/data/chunk-000/file-000.parquet", columns=["action"])
+
+Credentials come from `uz login` (or SAMI_ACCESS_TOKEN), or from a client:
+
+    fs = SamiFileSystem(client=client)
+    with fs.open("<dataset-id>/videos/observation.images.front/chunk-000/file-000.mp4") as f:
+        f.seek(1_000_000)
+        f.read(65536)
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+try:
+    from fsspec import AbstractFileSystem
+    from fsspec.spec import AbstractBufferedFile
+except ImportError as e:
+    raise ImportError("The sami:// filesystem needs fsspec: pip install 'uz-cli[fsspec]'") from e
+
+from .download import get_download_urls
+from .exceptions import DownloadError, NotFoundError
+from .backpressure import Backpressure
+from .retry import RetryPolicy, is_retryable_status, parse_retry_after
+from .session import create_transfer_session
+
+
+# Bytes fetched per Range request and cached per block
+BLOCK_SIZE = 4 * 1024 * 1024
+# Blocks cached per open file (BLOCK_SIZE * MAX_BLOCKS bytes at most)
+MAX_BLOCKS = 32
+# Seconds a dataset listing (and its presigned URLs) is reused
+LISTING_TTL = 300
+
+
+class SamiFileSystem(AbstractFileSystem):
+    """Read-only fsspec filesystem over the files of SAMI datasets.
+
+    Paths are "<dataset-id>/<relative path>"; the root lists the datasets
+    you can access. Dataset listings are fetched once and reused for
+    LISTING_TTL seconds, or until a presigned URL is rejected as expired.
+    """
+
+    protocol = "sami"
+    root_marker = ""
+
+    def __init__(
+        self,
+        client=None,
+        dataset_format: str = "lerobot",
+        block_size: int = BLOCK_SIZE,
+        max_blocks: int = MAX_BLOCKS,
+        max_connections: int = 8,
+        retry_policy: Optional[RetryPolicy] = None,
+        **kwargs,
+    ):
+        """
+        Args:
+            client: Authenticated SamiClient (default: saved `uz login`
+                credentials, or SAMI_ACCESS_TOKEN)
+            dataset_format: Format of the files to read ('lerobot' or 'hdf5')
+            block_size: Bytes fetched per Range request
+            max_blocks: Blocks cached per open file
+            max_connections: Size of the shared HTTP connection pool
+            retry_policy: Backoff for failed listings and Range requests
+        """
+        super().__init__(**kwargs)
+        self.client = client or _default_client()
+        self.dataset_format = dataset_format
+        self.blocksize = block_size
+        self.max_blocks = max_blocks
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Readers share one gate, so throttling pauses all of them
+        self.backpressure = self.retry_policy.backpressure or Backpressure()
+        self.session = create_transfer_session(max_connections, self.backpressure)
+        self._listings: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # Listings
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def _strip_protocol(cls, path):
+        path = super()._strip_protocol(path)
+        return path.strip("/")
+
+    def _files(self, dataset_id: str, refresh: bool = False) -> Dict[str, dict]:
+        """{relative path: url_info} of a dataset, fetched at most every LISTING_TTL seconds."""
+        with self._lock:
+            cached = self._listings.get(dataset_id)
+            if cached is not None and not refresh and time.monotonic() - cached[0] < LISTING_TTL:
+                return cached[1]
+        try:
+            data = get_download_urls(
+                self.client.auth, self.client.api_url, dataset_id, self.dataset_format, retry_policy=self.retry_policy
+            )
+        except NotFoundError as e:
+            raise FileNotFoundError(dataset_id) from e
+        files = {u["relativePath"]: u for u in data["downloadUrls"]}
+        with self._lock:
+            self._listings[dataset_id] = (time.monotonic(), files)
+        return files
+
+    def _entry(self, name: str, size: int, kind: str) -> dict:
+        return {"name": name, "size": size, "type": kind}
+
+    def ls(self, path: str, detail: bool = True, **kwargs) -> List:
+        path = self._strip_protocol(path)
+        if not path:
+            entries = [
+                self._entry(ds.id, ds.file_size_bytes or 0, "directory")
+                for ds in self.client.list_datasets(limit=1000)
+            ]
+        else:
+            dataset_id, _, prefix = path.partition("/")
+            files = self._files(dataset_id)
+            if prefix in files:
+                entries = [self._file_entry(dataset_id, files[prefix])]
+            else:
+                entries = {}
+                base = prefix + "/" if prefix else ""
+                for rel_path, url_info in files.items():
+                    if not rel_path.startswith(base):
+                        continue
+                    child, sep, _ = rel_path[len(base):].partition("/")
+                    name = f"{dataset_id}/{base}{child}"
+                    if sep:
+                        entry = entries.setdefault(name, self._entry(name, 0, "directory"))
+                        entry["size"] += url_info["size"]
+                    else:
+                        entries[name] = self._file_entry(dataset_id, url_info)
+                if not entries:
+                    raise FileNotFoundError(path)
+                entries = sorted(entries.values(), key=lambda e: e["name"])
+        return entries if detail else [e["name"] for e in entries]
+
+    def _file_entry(self, dataset_id: str, url_info: dict) -> dict:
+        entry = self._entry(f"{dataset_id}/{url_info['relativePath']}", url_info["size"], "file")
+        for key in ("etag", "sha256"):
+            if url_info.get(key):
+                entry[key] = url_info[key]
+        return entry
+
+    def info(self, path: str, **kwargs) -> dict:
+        path = self._strip_protocol(path)
+        dataset_id, _, rel_path = path.partition("/")
+        if rel_path and rel_path in self._files(dataset_id):
+            return self._file_entry(dataset_id, self._files(dataset_id)[rel_path])
+        return super().info(path, **kwargs)
+
+    def invalidate_cache(self, path: Optional[str] = None) -> None:
+        with self._lock:
+            if path is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(self._strip_protocol(path).partition("/")[0], None)
+        super().invalidate_cache(path)
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+
+    def fetch_range(self, path: str, start: int, end: int, max_retries: Optional[int] = None) -> bytes:
+        """Read bytes [start, end) of a file with a Range request.
+
+        Connection errors, throttling and 5xx responses are retried as the
+        filesystem's retry_policy says; an expired presigned URL is replaced
+        by refreshing the dataset listing.
+        """
+        dataset_id, _, rel_path = self._strip_protocol(path).partition("/")
+        if end <= start:
+            return b""
+        refreshed = False
+        attempt = 0
+        while True:
+            retry_after = None
+            files = self._files(dataset_id)
+            if rel_path not in files:
+                raise FileNotFoundError(path)
+            try:
+                response = self.session.get(
+                    files[rel_path]["downloadUrl"],
+                    headers={"Range": f"bytes={start}-{end - 1}"},
+                    timeout=60,
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = e
+            else:
+                if response.status_code in (200, 206, 416):
+                    self.retry_policy.succeeded()
+                if response.status_code == 206:
+                    return response.content
+                if response.status_code == 200:
+                    # Range ignored: the whole file was sent
+                    return response.content[start:end]
+                if response.status_code == 416:
+                    return b""
+                if response.status_code == 403 and not refreshed:
+                    # Presigned URL expired: get new ones and retry at once
+                    self._files(dataset_id, refresh=True)
+                    refreshed = True
+                    continue
+                if not is_retryable_status(response.status_code):
+                    raise DownloadError(f"Failed to read {path}: HTTP {response.status_code}")
+                last_error = DownloadError(f"HTTP {response.status_code}")
+                retry_after = parse_retry_after(response.headers)
+            if not self.retry_policy.retry(attempt, retry_after, max_retries):
+                raise DownloadError(f"Failed to read {path} after {attempt + 1} attempts: {last_error}")
+            attempt += 1
+
+    def cat_file(self, path: str, start: Optional[int] = None, end: Optional[int] = None, **kwargs) -> bytes:
+        size = self.info(path)["size"]
+        start = 0 if start is None else (start if start >= 0 else max(size + start, 0))
+        end = size if end is None else (end if end >= 0 else max(size + end, 0))
+        return self.fetch_range(path, start, min(end, size))
+
+    def _open(
+        self,
+        path: str,
+        mode: str = "rb",
+        block_size: Optional[int] = None,
+        autocommit: bool = True,
+        cache_options: Optional[dict] = None,
+        **kwargs,
+    ) -> "SamiFile":
+        if mode != "rb":
+            raise NotImplementedError("sami:// is read-only")
+        cache_options = {"maxblocks": self.max_blocks, **(cache_options or {})}
+        return SamiFile(
+            self, path, mode,
+            block_size=block_size or self.blocksize,
+            cache_type=kwargs.pop("cache_type", "blockcache"),
+            cache_options=cache_options,
+            size=self.info(path)["size"],
+            **kwargs,
+        )
+
+
+class SamiFile(AbstractBufferedFile):
+    """Read-only file whose blocks are fetched with Range requests on demand."""
+
+    def _fetch_range(self, start: int, end: int) -> bytes:
+        return self.fs.fetch_range(self.path, start, end)
+
+
+def _default_client():
+    """Client from SAMI_ACCESS_TOKEN or the credentials saved by `uz login`."""
+    from .client import SamiClient
+    from .config import SamiConfig
+
+    token = os.environ.get("SAMI_ACCESS_TOKEN")
+    if token:
+        client = SamiClient(api_url=SamiConfig().get_api_url())
+        client.auth.access_token = token
+        return client
+    return SamiClient.from_saved_credentials()
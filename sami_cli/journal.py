@@ -0,0 +1,180 @@
+"""On-disk journal of upload progress, used to resume interrupted uploads.
+
+Journals are stored in ~/.uz/uploads/ as append-only JSON lines files, one
+per local dataset directory. The first line describes the session (dataset
+id and file manifest); every following line records a finished file, a
+started multipart upload or a finished multipart part.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from .config import SamiConfig
+
+
+# Directory holding one journal per local dataset path
+JOURNAL_DIR = SamiConfig.CONFIG_DIR / "uploads"
+
+
+def file_signature(file_path: Path) -> Tuple[int, int]:
+    """Return (size, mtime_ns) used to detect files changed between runs."""
+    stat = file_path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+class UploadJournal:
+    """Append-only record of an upload session.
+
+    Attributes:
+        dataset_id: ID of the dataset record created for this upload
+        name: Dataset name used when the session started
+        manifest: {relative_path: (size, mtime_ns)} at session start
+        completed_files: Relative paths of files fully uploaded
+        multipart: {relative_path: {"upload_id": str, "etags": {part: etag}}}
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.dataset_id: Optional[str] = None
+        self.name: Optional[str] = None
+        self.manifest: Dict[str, Tuple[int, int]] = {}
+        self.completed_files: Set[str] = set()
+        self.multipart: Dict[str, dict] = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_dataset(cls, dataset_path: Path, journal_dir: Optional[Path] = None) -> "UploadJournal":
+        """Get the journal for a local dataset directory."""
+        journal_dir = Path(journal_dir) if journal_dir else JOURNAL_DIR
+        key = hashlib.sha256(str(Path(dataset_path).resolve()).encode()).hexdigest()[:16]
+        return cls(journal_dir / f"{key}.jsonl")
+
+    def exists(self) -> bool:
+        """Check if a journal was saved by a previous run."""
+        return self.path.exists()
+
+    def load(self) -> bool:
+        """Load the journal from disk.
+
+        A truncated last line (e.g. from a killed process) is ignored.
+
+        Returns:
+            True if a valid session was loaded, False otherwise.
+        """
+        if not self.path.exists():
+            return False
+
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._apply(entry)
+
+        return self.dataset_id is not None
+
+    def _apply(self, entry: dict) -> None:
+        """Apply one journal entry to the in-memory state."""
+        kind = entry.get("type")
+        if kind == "session":
+            self.dataset_id = entry["datasetId"]
+            self.name = entry.get("name")
+            self.manifest = {k: tuple(v) for k, v in entry["manifest"].items()}
+            self.completed_files = set()
+            self.multipart = {}
+        elif kind == "file":
+            self.completed_files.add(entry["path"])
+        elif kind == "multipart":
+            self.multipart[entry["path"]] = {"upload_id": entry["uploadId"], "etags": {}}
+        elif kind == "part":
+            upload = self.multipart.get(entry["path"])
+            if upload is not None:
+                upload["etags"][entry["partNumber"]] = entry["etag"]
+
+    def is_unchanged(self, relative_path: str, signature: Tuple[int, int]) -> bool:
+        """Check if a file has the same size and mtime as when journaled."""
+        return self.manifest.get(relative_path) == tuple(signature)
+
+    def start(
+        self,
+        dataset_id: str,
+        name: str,
+        manifest: Dict[str, Tuple[int, int]],
+        completed_files: Iterable[str] = (),
+        multipart: Optional[Dict[str, dict]] = None,
+    ) -> None:
+        """Write a fresh journal, carrying over progress that is still valid.
+
+        Args:
+            dataset_id: ID of the dataset record
+            name: Dataset name
+            manifest: {relative_path: (size, mtime_ns)} of files to upload
+            completed_files: Files already uploaded in a previous run
+            multipart: Open multipart uploads from a previous run
+        """
+        self.close()
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+        self.dataset_id = dataset_id
+        self.name = name
+        self.manifest = dict(manifest)
+        self.completed_files = set()
+        self.multipart = {}
+
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            self._file = f
+            self._write({
+                "type": "session",
+                "datasetId": dataset_id,
+                "name": name,
+                "manifest": {k: list(v) for k, v in self.manifest.items()},
+            })
+            for rel_path in completed_files:
+                self.record_file(rel_path)
+            for rel_path, upload in (multipart or {}).items():
+                self.record_multipart(rel_path, upload["upload_id"])
+                for part_number, etag in upload["etags"].items():
+                    self.record_part(rel_path, part_number, etag)
+        os.replace(tmp_path, self.path)
+
+        self._file = open(self.path, "a")
+
+    def _write(self, entry: dict) -> None:
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+
+    def record_file(self, relative_path: str) -> None:
+        """Record that a file finished uploading."""
+        self.completed_files.add(relative_path)
+        self.multipart.pop(relative_path, None)
+        self._write({"type": "file", "path": relative_path})
+
+    def record_multipart(self, relative_path: str, upload_id: str) -> None:
+        """Record that a multipart upload was started for a file."""
+        self.multipart[relative_path] = {"upload_id": upload_id, "etags": {}}
+        self._write({"type": "multipart", "path": relative_path, "uploadId": upload_id})
+
+    def record_part(self, relative_path: str, part_number: int, etag: str) -> None:
+        """Record that a multipart part finished uploading."""
+        self.multipart[relative_path]["etags"][part_number] = etag
+        self._write({"type": "part", "path": relative_path, "partNumber": part_number, "etag": etag})
+
+    def close(self) -> None:
+        """Close the journal file, keeping it on disk."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self) -> None:
+        """Delete the journal (after a successful upload)."""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
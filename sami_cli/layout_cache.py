@@ -0,0 +1,179 @@
+"""On-disk cache of MP4 atom layouts, used to skip re-inspecting videos.
+
+Checking whether a video needs faststart walks its top-level atoms, which
+costs several seeks per file (slow on network storage). The layout of every
+inspected video is stored in ~/.uz/mp4_layouts.json, keyed by path and
+validated against the file's inode, size and mtime, so unchanged videos are
+not read again on later runs. For videos uploaded in faststart order the
+rewritten moov is cached too, so their moov is not read and parsed again.
+The least recently used entries are evicted once the cache grows past its
+size limit.
+"""
+
+import base64
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .config import SamiConfig
+from .mp4 import Atom, FaststartPlan, plan_faststart, read_top_level_atoms
+
+
+# Default cache location
+LAYOUT_CACHE_FILE = SamiConfig.CONFIG_DIR / "mp4_layouts.json"
+# Maximum number of videos kept in the cache
+MAX_LAYOUT_ENTRIES = 100_000
+# Largest rewritten moov kept in the cache (larger ones are rebuilt per run)
+MAX_CACHED_MOOV = 1024**2
+
+
+def _signature(stat: os.stat_result) -> Tuple[int, int, int]:
+    """Return (inode, size, mtime_ns) used to detect changed files."""
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class Mp4LayoutCache:
+    """Persistent {path: top-level atoms} cache for MP4 files.
+
+    Safe to use from multiple threads. Changes are only written to disk by
+    save(); cache hits alone do not rewrite the file (their LRU order is
+    saved along with the next change).
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = MAX_LAYOUT_ENTRIES):
+        """
+        Args:
+            path: Cache file (default: ~/.uz/mp4_layouts.json)
+            max_entries: Number of videos kept before evicting the least
+                recently used
+        """
+        self.path = Path(path) if path else LAYOUT_CACHE_FILE
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        """Load the cache file, starting empty if it is missing or corrupt."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self._entries = OrderedDict(data.get("entries", {}))
+        except (OSError, ValueError, AttributeError):
+            self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _entry(self, file_path: Path) -> Optional[dict]:
+        """Cache entry of a file, if it has not changed since; marks it recently used."""
+        key = str(Path(file_path).resolve())
+        signature = list(_signature(os.stat(file_path)))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["signature"] != signature:
+                return None
+            self._entries.move_to_end(key)
+        return entry
+
+    def get(self, file_path: Path) -> Optional[List[Atom]]:
+        """Get the cached atoms of a file, if it has not changed since.
+
+        Args:
+            file_path: Video path
+
+        Returns:
+            List of top-level atoms, or None on a cache miss
+        """
+        entry = self._entry(file_path)
+        if entry is None:
+            return None
+        return [Atom(*atom) for atom in entry["atoms"]]
+
+    def put(self, file_path: Path, atoms: List[Atom], stat: Optional[os.stat_result] = None) -> None:
+        """Store the atoms of a file.
+
+        Args:
+            file_path: Video path
+            atoms: Top-level atoms read from the file
+            stat: File stat taken before reading the atoms (default: stat now)
+        """
+        key = str(Path(file_path).resolve())
+        stat = stat or os.stat(file_path)
+        with self._lock:
+            self._entries[key] = {
+                "signature": list(_signature(stat)),
+                "atoms": [[a.type, a.offset, a.size] for a in atoms],
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def read_atoms(self, file_path: Path) -> List[Atom]:
+        """Get the top-level atoms of a file, reading it only on a cache miss.
+
+        Raises:
+            Mp4Error: If the file cannot be parsed (not cached)
+        """
+        atoms = self.get(file_path)
+        if atoms is not None:
+            return atoms
+
+        stat = os.stat(file_path)
+        with open(file_path, "rb") as f:
+            atoms = read_top_level_atoms(f)
+        self.put(file_path, atoms, stat)
+        return atoms
+
+    def plan_faststart(self, file_path: Path) -> Optional[FaststartPlan]:
+        """Get the faststart plan of a file, reading its moov only on a cache miss.
+
+        Returns:
+            FaststartPlan, or None if moov already precedes mdat
+
+        Raises:
+            Mp4Error: If the file has an unsupported layout (not cached)
+        """
+        entry = self._entry(file_path)
+        if entry is not None and "new_moov" in entry:
+            atoms = [Atom(*atom) for atom in entry["atoms"]]
+            moov = next(a for a in atoms if a.type == "moov")
+            insert_at = next(a.offset for a in atoms if a.type == "mdat")
+            return FaststartPlan(moov, insert_at, base64.b64decode(entry["new_moov"]), atoms[-1].end)
+
+        key = str(Path(file_path).resolve())
+        stat = os.stat(file_path)
+        atoms = self.read_atoms(file_path)
+        with open(file_path, "rb") as f:
+            plan = plan_faststart(f, atoms)
+        if plan is not None and len(plan.new_moov) <= MAX_CACHED_MOOV:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry["signature"] == list(_signature(stat)):
+                    entry["new_moov"] = base64.b64encode(plan.new_moov).decode("ascii")
+                    self._dirty = True
+        return plan
+
+    def save(self) -> None:
+        """Write the cache to disk if it changed.
+
+        The cache is best-effort: failures to write it are ignored.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"entries": self._entries}
+            tmp_path = self.path.with_suffix(".tmp")
+            try:
+                self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError:
+                pass
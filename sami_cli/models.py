@@ -3,6 +3,7 @@
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+import time
 
 
 @dataclass
@@ -74,6 +75,13 @@ class UploadUrl:
     relative_path: str
     upload_url: str
     key: str
+    expires_at: Optional[float] = None
+
+    def expires_within(self, seconds: float) -> bool:
+        """Check if the URL expires within the given number of seconds."""
+        if self.expires_at is None:
+            return False
+        return time.time() + seconds >= self.expires_at
 
 
 @dataclass
@@ -0,0 +1,370 @@
+"""Minimal MP4 (ISO BMFF) atom handling for web streaming optimization.
+
+Implements "faststart" natively: moving the moov atom ahead of mdat and
+rewriting the stco/co64 chunk offset tables to match. Media data is
+copied in bulk and never decoded, so no ffmpeg is needed. The result can
+be written to a new file (faststart) or streamed directly from the
+original (FaststartReader).
+"""
+
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+from .exceptions import SamiError
+
+
+# Containers on the path from moov to the chunk offset tables
+_CONTAINER_ATOMS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+# Largest offset a 32-bit stco entry can hold
+_STCO_MAX = 0xFFFFFFFF
+# Buffer size for bulk copies when copy_file_range is unavailable
+_COPY_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+class Mp4Error(SamiError):
+    """Raised when an MP4 file cannot be parsed or remuxed."""
+    pass
+
+
+@dataclass
+class Atom:
+    """A top-level atom: type, file offset and total size (including header)."""
+    type: str
+    offset: int
+    size: int
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.size
+
+
+def read_top_level_atoms(f: BinaryIO) -> List[Atom]:
+    """Walk the top-level atoms of an MP4 file.
+
+    Args:
+        f: File opened in binary mode
+
+    Returns:
+        List of atoms in file order
+    """
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    atoms = []
+    offset = 0
+
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        header = f.read(8)
+        size, atom_type = struct.unpack(">I4s", header)
+        if size == 1:
+            extended = f.read(8)
+            if len(extended) < 8:
+                break
+            size = struct.unpack(">Q", extended)[0]
+        elif size == 0:
+            # Atom extends to end of file
+            size = file_size - offset
+        if size < 8:
+            raise Mp4Error(f"Invalid atom size {size} at offset {offset}")
+
+        atoms.append(Atom(atom_type.decode("latin-1"), offset, size))
+        offset += size
+
+    return atoms
+
+
+# =============================================================================
+# moov parsing and rewriting
+# =============================================================================
+
+
+def _parse_children(data: bytes) -> List[list]:
+    """Parse atoms in a buffer into [type, payload] or [type, children] nodes."""
+    nodes = []
+    pos = 0
+    while pos + 8 <= len(data):
+        size, atom_type = struct.unpack(">I4s", data[pos:pos + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[pos + 8:pos + 16])[0]
+            header = 16
+        elif size == 0:
+            size = len(data) - pos
+        if size < header or pos + size > len(data):
+            raise Mp4Error(f"Corrupt atom '{atom_type.decode('latin-1')}' in moov")
+
+        payload = data[pos + header:pos + size]
+        if atom_type in _CONTAINER_ATOMS:
+            nodes.append([atom_type, _parse_children(payload)])
+        else:
+            nodes.append([atom_type, payload])
+        pos += size
+    return nodes
+
+
+def _chunk_offset_tables(nodes: List[list]) -> List[list]:
+    """Find all stco/co64 nodes in a parsed tree."""
+    tables = []
+    for node in nodes:
+        if node[0] in _CONTAINER_ATOMS:
+            tables.extend(_chunk_offset_tables(node[1]))
+        elif node[0] in (b"stco", b"co64"):
+            tables.append(node)
+    return tables
+
+
+def _decode_offsets(node: list) -> List[int]:
+    payload = node[1]
+    count = struct.unpack(">I", payload[4:8])[0]
+    fmt = ">%dI" if node[0] == b"stco" else ">%dQ"
+    width = 4 if node[0] == b"stco" else 8
+    if len(payload) < 8 + count * width:
+        raise Mp4Error("Truncated chunk offset table")
+    return list(struct.unpack(fmt % count, payload[8:8 + count * width]))
+
+
+def _encode_offsets(atom_type: bytes, version_flags: bytes, offsets: List[int]) -> bytes:
+    fmt = ">%dI" if atom_type == b"stco" else ">%dQ"
+    return version_flags + struct.pack(">I", len(offsets)) + struct.pack(fmt % len(offsets), *offsets)
+
+
+def _serialize(nodes: List[list]) -> bytes:
+    """Serialize a parsed tree back to bytes, recomputing container sizes."""
+    out = []
+    for atom_type, content in nodes:
+        payload = _serialize(content) if isinstance(content, list) else content
+        size = len(payload) + 8
+        if size > 0xFFFFFFFF:
+            out.append(struct.pack(">I4sQ", 1, atom_type, size + 8))
+        else:
+            out.append(struct.pack(">I4s", size, atom_type))
+        out.append(payload)
+    return b"".join(out)
+
+
+@dataclass
+class FaststartPlan:
+    """How to lay out a file with moov first.
+
+    The output is: source[0:insert_at] + moov + source[insert_at:moov.offset]
+    + source[moov.end:].
+    """
+    moov: Atom
+    insert_at: int
+    new_moov: bytes
+    source_size: int
+
+    @property
+    def output_size(self) -> int:
+        return self.source_size - self.moov.size + len(self.new_moov)
+
+    def segments(self) -> List[Tuple[Optional[int], int]]:
+        """Output as (source_offset, length) ranges; offset None means new_moov."""
+        segments = [
+            (0, self.insert_at),
+            (None, len(self.new_moov)),
+            (self.insert_at, self.moov.offset - self.insert_at),
+            (self.moov.end, self.source_size - self.moov.end),
+        ]
+        return [(offset, length) for offset, length in segments if length > 0]
+
+
+def plan_faststart(f: BinaryIO, atoms: Optional[List[Atom]] = None) -> Optional[FaststartPlan]:
+    """Work out the faststart layout of an MP4 file.
+
+    Args:
+        f: File opened in binary mode
+        atoms: Top-level atoms of the file, if already known (e.g. cached)
+
+    Returns:
+        FaststartPlan, or None if moov already precedes mdat
+
+    Raises:
+        Mp4Error: If the file has no moov/mdat or an unsupported layout
+            (fragmented or compressed moov)
+    """
+    if atoms is None:
+        atoms = read_top_level_atoms(f)
+    types = [a.type for a in atoms]
+    if "moov" not in types or "mdat" not in types:
+        raise Mp4Error("File has no moov or mdat atom")
+    if "moof" in types:
+        raise Mp4Error("Fragmented MP4 files are not supported")
+
+    moov = next(a for a in atoms if a.type == "moov")
+    first_mdat = next(a for a in atoms if a.type == "mdat")
+    if moov.offset < first_mdat.offset:
+        return None
+
+    f.seek(moov.offset)
+    moov_data = f.read(moov.size)
+    tree = _parse_children(moov_data)
+    if not tree or tree[0][0] != b"moov":
+        raise Mp4Error("Could not parse moov atom")
+    if any(node[0] == b"cmov" for node in tree[0][1]):
+        raise Mp4Error("Compressed moov atoms are not supported")
+
+    tables = _chunk_offset_tables(tree)
+    original = [(node, node[1][:4], _decode_offsets(node)) for node in tables]
+    insert_at = first_mdat.offset
+    source_size = atoms[-1].end
+
+    # Moving moov in front of the media shifts every chunk offset by the new
+    # moov size. Promoting stco to co64 grows moov, so repeat until stable.
+    while True:
+        new_moov = _serialize(tree)
+        delta_before = len(new_moov)
+        delta_after = len(new_moov) - moov.size
+        promoted = False
+        for node, version_flags, offsets in original:
+            shifted = [
+                o if o < insert_at else o + (delta_before if o < moov.offset else delta_after)
+                for o in offsets
+            ]
+            if node[0] == b"stco" and shifted and max(shifted) > _STCO_MAX:
+                node[0] = b"co64"
+                promoted = True
+            node[1] = _encode_offsets(node[0], version_flags, shifted)
+        if not promoted and len(_serialize(tree)) == len(new_moov):
+            return FaststartPlan(moov, insert_at, _serialize(tree), source_size)
+
+
+# =============================================================================
+# Remuxing
+# =============================================================================
+
+
+def _copy_range(src: BinaryIO, dst: BinaryIO, offset: int, length: int) -> None:
+    """Copy a byte range between files, in-kernel where supported."""
+    if hasattr(os, "copy_file_range"):
+        dst.flush()
+        dst_pos = dst.tell()
+        try:
+            src_fd, dst_fd = src.fileno(), dst.fileno()
+            while length > 0:
+                copied = os.copy_file_range(src_fd, dst_fd, length, offset, dst_pos)
+                if copied == 0:
+                    break
+                offset += copied
+                dst_pos += copied
+                length -= copied
+            dst.seek(dst_pos)
+            if length == 0:
+                return
+        except OSError:
+            # Cross-filesystem or unsupported; fall back to buffered copy
+            dst.seek(dst_pos)
+
+    src.seek(offset)
+    while length > 0:
+        chunk = src.read(min(length, _COPY_BUFFER_SIZE))
+        if not chunk:
+            raise Mp4Error("Unexpected end of file while copying media data")
+        dst.write(chunk)
+        length -= len(chunk)
+
+
+def faststart(src_path: Path, dst_path: Path) -> bool:
+    """Write a faststart copy of an MP4 file.
+
+    Args:
+        src_path: Source video
+        dst_path: Output path (must differ from src_path)
+
+    Returns:
+        True if a remuxed copy was written, False if the file is already
+        faststart (nothing is written)
+
+    Raises:
+        Mp4Error: If the file cannot be remuxed
+    """
+    with open(src_path, "rb") as src:
+        plan = plan_faststart(src)
+        if plan is None:
+            return False
+
+        with open(dst_path, "wb") as dst:
+            for offset, length in plan.segments():
+                if offset is None:
+                    dst.write(plan.new_moov)
+                else:
+                    _copy_range(src, dst, offset, length)
+
+    return True
+
+
+class FaststartReader:
+    """Read-only file-like view of a video in faststart order.
+
+    Serves the rewritten moov from memory and every other byte range straight
+    from the source file, so a faststart copy can be uploaded without writing
+    a temp file or touching the original. A sub-range of the output can be
+    selected for multipart parts; each reader opens its own handle.
+    """
+
+    def __init__(self, src_path: Path, plan: FaststartPlan, offset: int = 0, length: Optional[int] = None):
+        """
+        Args:
+            src_path: Source video
+            plan: Layout from plan_faststart()
+            offset: Start of the range in the faststart output
+            length: Length of the range (default: to the end of the output)
+        """
+        self._file = open(src_path, "rb")
+        self._plan = plan
+        if length is None:
+            length = plan.output_size - offset
+        self._pos = offset
+        self._end = offset + length
+        self._length = length
+
+        # (output_start, output_end, source_offset or None for new moov)
+        self._segments = []
+        out = 0
+        for source_offset, seg_length in plan.segments():
+            self._segments.append((out, out + seg_length, source_offset))
+            out += seg_length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if self._pos >= self._end:
+            return b""
+        if size is None or size < 0 or size > self._end - self._pos:
+            size = self._end - self._pos
+
+        out = []
+        while size > 0 and self._pos < self._end:
+            start, end, source_offset = next(s for s in self._segments if s[0] <= self._pos < s[1])
+            n = min(size, end - self._pos)
+            if source_offset is None:
+                data = self._plan.new_moov[self._pos - start:self._pos - start + n]
+            else:
+                self._file.seek(source_offset + self._pos - start)
+                data = self._file.read(n)
+                if not data:
+                    raise Mp4Error("Unexpected end of file while streaming video")
+            out.append(data)
+            self._pos += len(data)
+            size -= len(data)
+        return b"".join(out)
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(1024 * 1024)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "FaststartReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
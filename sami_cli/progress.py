@@ -0,0 +1,250 @@
+"""Byte-level transfer progress shared by upload and download workers.
+
+Workers report bytes from inside each transfer through a callback. Counts
+are kept per worker thread, so reporting a chunk never takes a lock; a
+background thread sums them and redraws the progress bar at a fixed rate,
+however many files or chunks are in flight.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from tqdm import tqdm
+
+
+# Seconds between progress bar refreshes
+REFRESH_INTERVAL = 0.5
+# Window used for the rolling transfer rate
+RATE_WINDOW = 5.0
+# A worker that has not reported bytes for this long counts as idle
+IDLE_GAP = 1.0
+
+
+class _WorkerStats:
+    """Counters owned and written by a single worker thread."""
+
+    __slots__ = ("bytes", "busy", "last")
+
+    def __init__(self):
+        self.bytes = 0
+        self.busy = 0.0
+        self.last = None
+
+
+class ProgressBody:
+    """File-like wrapper reporting bytes as a request body is read.
+
+    Used as the data of a PUT so progress follows what is actually sent.
+    """
+
+    def __init__(self, body, size: int, callback):
+        """
+        Args:
+            body: Readable body (file, FileSlice, FaststartReader)
+            size: Body length in bytes, sent as Content-Length
+            callback: Called with the number of bytes read
+        """
+        self._body = body
+        self._size = size
+        self._callback = callback
+        self.bytes_read = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._body.read(size)
+        if data:
+            self.bytes_read += len(data)
+            self._callback(len(data))
+        return data
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(1024 * 1024)
+            if not chunk:
+                return
+            yield chunk
+
+
+class TransferProgress:
+    """Byte-accurate progress bar with rolling throughput and worker stats.
+
+    Example:
+        with TransferProgress("Uploading", total_bytes, total_files, workers=8) as progress:
+            upload_file(path, url, content_type, progress_callback=progress.callback)
+            progress.file_done()
+    """
+
+    def __init__(
+        self,
+        desc: str,
+        total_bytes: int,
+        total_files: int,
+        workers: int,
+        refresh_interval: float = REFRESH_INTERVAL,
+        disable: bool = False,
+    ):
+        """
+        Args:
+            desc: Progress bar label
+            total_bytes: Bytes expected to be transferred
+            total_files: Files expected to be transferred
+            workers: Number of transfer threads, used for utilisation
+            refresh_interval: Seconds between progress bar refreshes
+            disable: Hide the progress bar (stats are still collected)
+        """
+        self.total_files = total_files
+        self.workers = max(workers, 1)
+        self.files_done = 0
+        self.refresh_interval = refresh_interval
+
+        self._stats: List[_WorkerStats] = []
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        # Bytes reported from the main thread (e.g. parts finished in a previous run)
+        self._base_bytes = 0
+        self._shown_bytes = 0
+        self._samples = deque()
+        self._started = time.monotonic()
+        self._finished: Optional[float] = None
+
+        self._bar = tqdm(
+            total=total_bytes, desc=desc, unit="B", unit_scale=True,
+            unit_divisor=1024, disable=disable,
+        )
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="transfer-progress", daemon=True)
+        self._thread.start()
+
+    # =========================================================================
+    # Reporting (called from worker threads)
+    # =========================================================================
+
+    def _worker(self) -> _WorkerStats:
+        stats = getattr(self._local, "stats", None)
+        if stats is None:
+            stats = self._local.stats = _WorkerStats()
+            with self._stats_lock:
+                self._stats.append(stats)
+        return stats
+
+    def callback(self, num_bytes: int) -> None:
+        """Report bytes transferred by the calling worker.
+
+        Negative values undo bytes of a failed attempt before it is retried.
+        """
+        stats = self._worker()
+        now = time.monotonic()
+        if stats.last is not None and now - stats.last < IDLE_GAP:
+            stats.busy += now - stats.last
+        stats.last = now
+        stats.bytes += num_bytes
+
+    # =========================================================================
+    # Bookkeeping (called from the thread that owns the progress bar)
+    # =========================================================================
+
+    def update(self, num_bytes: int) -> None:
+        """Count bytes that were not transferred by a worker (e.g. resumed)."""
+        self._base_bytes += num_bytes
+
+    def file_done(self, count: int = 1) -> None:
+        """Count finished (or failed) files."""
+        self.files_done += count
+
+    def write(self, message: str) -> None:
+        """Print a message without breaking the progress bar."""
+        self._bar.write(message)
+
+    @property
+    def transferred_bytes(self) -> int:
+        with self._stats_lock:
+            stats = list(self._stats)
+        return self._base_bytes + sum(s.bytes for s in stats)
+
+    def rate(self) -> float:
+        """Rolling transfer rate in bytes/second over the last few seconds."""
+        if len(self._samples) < 2:
+            return 0.0
+        (t0, b0), (t1, b1) = self._samples[0], self._samples[-1]
+        return (b1 - b0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def worker_stats(self) -> Dict[str, float]:
+        """Summary of per-worker throughput and utilisation.
+
+        Returns:
+            Dict with elapsed seconds, total bytes, average rate (bytes/s),
+            and mean/min/max worker utilisation (0-1, share of wall time
+            each worker spent moving bytes)
+        """
+        elapsed = max((self._finished or time.monotonic()) - self._started, 1e-9)
+        with self._stats_lock:
+            busy = [s.busy for s in self._stats]
+        # Workers that never reported bytes were idle the whole time
+        busy += [0.0] * max(self.workers - len(busy), 0)
+        utilisation = [min(b / elapsed, 1.0) for b in busy]
+        total = self.transferred_bytes
+        return {
+            "elapsed": elapsed,
+            "bytes": total,
+            "rate": total / elapsed,
+            "utilisation": sum(utilisation) / len(utilisation),
+            "utilisation_min": min(utilisation),
+            "utilisation_max": max(utilisation),
+        }
+
+    def _active_workers(self, now: float) -> int:
+        with self._stats_lock:
+            stats = list(self._stats)
+        return sum(1 for s in stats if s.last is not None and now - s.last < IDLE_GAP)
+
+    def refresh(self) -> None:
+        """Redraw the progress bar from the worker counters."""
+        now = time.monotonic()
+        total = self.transferred_bytes
+        self._samples.append((now, total))
+        while len(self._samples) > 2 and now - self._samples[0][0] > RATE_WINDOW:
+            self._samples.popleft()
+
+        self._bar.update(total - self._shown_bytes)
+        self._shown_bytes = total
+        self._bar.set_postfix_str(
+            f"{self.rate() / 1024**2:.1f} MB/s, "
+            f"files {self.files_done}/{self.total_files}, "
+            f"workers {self._active_workers(now)}/{self.workers}",
+            refresh=False,
+        )
+        self._bar.refresh()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def close(self) -> None:
+        """Stop refreshing, draw the final state and close the bar."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self._finished = time.monotonic()
+        self.refresh()
+        self._bar.close()
+
+    def summary(self) -> str:
+        """One-line throughput and utilisation summary."""
+        stats = self.worker_stats()
+        return (
+            f"{stats['bytes'] / 1024**3:.2f} GB in {stats['elapsed']:.1f}s "
+            f"({stats['rate'] / 1024**2:.1f} MB/s), worker utilisation "
+            f"{stats['utilisation']:.0%} (min {stats['utilisation_min']:.0%}, "
+            f"max {stats['utilisation_max']:.0%})"
+        )
+
+    def __enter__(self) -> "TransferProgress":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
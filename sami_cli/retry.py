@@ -0,0 +1,248 @@
+"""Retry policy shared by transfers and API calls.
+
+Failed requests are retried after an exponential backoff with full jitter
+(a random delay between zero and the backoff), so workers throttled at the
+same moment do not all come back at the same moment. A Retry-After header
+(sent by S3 and the API with 429 and 503 responses) sets the shortest
+delay.
+
+A run (one upload or download) also shares a RetryBudget: every successful
+request earns it a fraction of a retry, on top of a fixed reserve, and once
+it is spent further failures are final. When S3 throttles a whole run, the
+run then stops adding load and reports the failed files, which the next
+run resumes, instead of every worker retrying every file to exhaustion.
+The run's Backpressure (see backpressure.py) pauses all of its workers
+while a host throttles.
+
+Errors are classified with is_retryable(): connection errors, timeouts,
+throttling and 5xx responses are retried, and so are SamiErrors marked
+retryable (see exceptions.py); everything else fails at once. Requests
+that are not idempotent (API POSTs) are only retried when the server
+cannot have acted on them.
+"""
+
+import email.utils
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Mapping, Optional
+
+import requests
+
+from .backpressure import Backpressure
+from .exceptions import SamiError
+
+
+# Initial backoff in seconds, doubled after every failed attempt
+BASE_DELAY = 1.0
+# Responses worth retrying
+RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+# Responses sent before the server acted on the request, safe to retry for
+# any method
+UNPROCESSED_STATUS = frozenset({429, 503})
+# Retries a successful request earns the run's budget...
+BUDGET_RATIO = 0.2
+# ...on top of this many it starts with
+BUDGET_MIN_RETRIES = 50
+
+
+def parse_retry_after(headers: Optional[Mapping]) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header, if there is one."""
+    try:
+        value = headers.get("Retry-After") if headers is not None else None
+        if value is None:
+            return None
+        value = str(value).strip()
+        if value.isdigit():
+            return float(value)
+        when = email.utils.parsedate_to_datetime(value)
+        return max(when.timestamp() - time.time(), 0.0)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def is_retryable_status(status: int, idempotent: bool = True) -> bool:
+    """Check if a response status is worth retrying."""
+    if not idempotent:
+        return status in UNPROCESSED_STATUS
+    return status in RETRYABLE_STATUS
+
+
+def is_retryable(error: BaseException, idempotent: bool = True) -> bool:
+    """Check if a request that raised `error` may succeed if retried.
+
+    Args:
+        error: The exception raised by the request
+        idempotent: Whether repeating a request the server may already have
+            acted on is harmless
+    """
+    if isinstance(error, SamiError):
+        return error.retryable
+    if isinstance(error, requests.exceptions.SSLError):
+        # Certificate problems do not go away by themselves
+        return False
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        # Never reached the server
+        return True
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return idempotent
+    return False
+
+
+class RetryBudget:
+    """Retries left for a run, shared by all of its workers.
+
+    The budget starts with `reserve` retries and every successful request
+    deposits `ratio` of one, so retries stay a bounded fraction of the
+    requests that got through however long the run is.
+    """
+
+    def __init__(self, reserve: int = BUDGET_MIN_RETRIES, ratio: float = BUDGET_RATIO):
+        self.remaining = float(reserve)
+        self.ratio = ratio
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        """Earn a fraction of a retry for a successful request."""
+        with self._lock:
+            self.remaining += self.ratio
+
+    def withdraw(self) -> bool:
+        """Take one retry from the budget.
+
+        Returns:
+            False if the budget is spent
+        """
+        with self._lock:
+            if self.remaining < 1:
+                return False
+            self.remaining -= 1
+            return True
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how long to wait before retrying a failed request.
+
+    Attributes:
+        max_attempts: Attempts per request, including the first
+        base_delay: Backoff before the first retry in seconds, doubled for
+            every further one (default: BASE_DELAY)
+        max_delay: Longest backoff in seconds
+        max_retry_after: Longest Retry-After honoured, in seconds
+        budget: Retries shared by a run (None: only max_attempts applies)
+        backpressure: Pauses and circuit breakers shared by a run, applied
+            to the API calls sent with call()
+    """
+
+    max_attempts: int = 5
+    base_delay: Optional[float] = None
+    max_delay: float = 30.0
+    max_retry_after: float = 300.0
+    budget: Optional[RetryBudget] = None
+    backpressure: Optional[Backpressure] = None
+
+    def for_run(self) -> "RetryPolicy":
+        """This policy with a retry budget and back-pressure for a run, unless it has them."""
+        if self.budget is not None and self.backpressure is not None:
+            return self
+        return replace(
+            self,
+            budget=self.budget or RetryBudget(),
+            backpressure=self.backpressure or Backpressure(),
+        )
+
+    def backoff(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """Delay before the retry-th retry (1 for the first), with full jitter."""
+        base = BASE_DELAY if self.base_delay is None else self.base_delay
+        delay = random.uniform(0, min(self.max_delay, base * 2 ** (retry - 1)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_retry_after))
+        return delay
+
+    def next_delay(
+        self,
+        attempt: int,
+        retry_after: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+    ) -> Optional[float]:
+        """Delay before retrying after attempt `attempt` (0-based) failed.
+
+        Args:
+            attempt: Index of the attempt that failed
+            retry_after: Delay the server asked for
+            max_attempts: Attempts allowed for this request (default:
+                the policy's)
+
+        Returns:
+            Seconds to wait, or None if the attempts or the budget are spent
+        """
+        if attempt + 1 >= (max_attempts or self.max_attempts):
+            return None
+        if self.budget is not None and not self.budget.withdraw():
+            return None
+        return self.backoff(attempt + 1, retry_after)
+
+    def succeeded(self) -> None:
+        """Record a successful request, earning the budget part of a retry."""
+        if self.budget is not None:
+            self.budget.deposit()
+
+    def retry(self, attempt: int, retry_after: Optional[float] = None, max_attempts: Optional[int] = None) -> bool:
+        """Wait before retrying after attempt `attempt` (0-based) failed.
+
+        Returns:
+            False, without waiting, if the attempts or the budget are spent
+        """
+        delay = self.next_delay(attempt, retry_after, max_attempts)
+        if delay is None:
+            return False
+        time.sleep(delay)
+        return True
+
+    def call(self, send: Callable[..., requests.Response], *args, idempotent: bool = True, **kwargs) -> requests.Response:
+        """Send an API request, retrying connection errors and retryable responses.
+
+        Example:
+            response = policy.call(requests.get, url, headers=headers)
+
+        Args:
+            send: requests function (or session method) sending the request
+            idempotent: False for requests (POSTs) that must not be repeated
+                if the server may have acted on them
+
+        Returns:
+            The last response; callers check its status as usual
+
+        Raises:
+            requests.exceptions.RequestException: If the last attempt raised
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self._send(send, *args, **kwargs)
+            except requests.exceptions.RequestException as e:
+                if not is_retryable(e, idempotent):
+                    raise
+                delay = self.next_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                if not is_retryable_status(response.status_code, idempotent):
+                    if response.status_code < 400:
+                        self.succeeded()
+                    return response
+                delay = self.next_delay(attempt, parse_retry_after(response.headers))
+                if delay is None:
+                    return response
+            time.sleep(delay)
+            attempt += 1
+
+    def _send(self, send: Callable[..., requests.Response], url: str, *args, **kwargs) -> requests.Response:
+        if self.backpressure is None:
+            return send(url, *args, **kwargs)
+        with self.backpressure.request(url) as report:
+            response = send(url, *args, **kwargs)
+            report(response.status_code, parse_retry_after(response.headers))
+        return response
@@ -0,0 +1,322 @@
+"""Choosing part of a LeRobot dataset to download.
+
+Files of a LeRobot dataset are named after the `data_path` and `video_path`
+templates in meta/info.json, e.g.
+
+    v2.x: data/chunk-{episode_chunk:03d}/episode_{episode_index:06d}.parquet
+    v3.0: videos/{video_key}/chunk-{chunk_index:03d}/file-{file_index:03d}.mp4
+
+so the episode and camera of a file can be read from its path. In v3.0 a
+file holds many episodes; which files hold an episode is listed in
+meta/episodes/*.parquet, and reading it needs pyarrow.
+
+The whole meta/ directory is always downloaded, so a subset loads like the
+full dataset with LeRobotDataset(..., episodes=[...]). When only some
+cameras are selected, the other video features are removed from the local
+meta/info.json.
+
+The same mapping from files to episodes lets download_dataset() fetch a
+dataset in episode order and report each episode once it is on disk.
+"""
+
+import fnmatch
+import json
+import os
+import random
+import re
+import string
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .exceptions import ValidationError
+
+
+# Directory of a LeRobot dataset that is always downloaded in full
+META_DIR = "meta/"
+INFO_PATH = "meta/info.json"
+
+
+@dataclass
+class DownloadSelection:
+    """Which files of a dataset to download.
+
+    Attributes:
+        episodes: Episode indices to download (default: all)
+        sample: Download this many episodes chosen at random (from
+            `episodes` if given)
+        seed: Random seed for `sample`, for a reproducible choice
+        video_keys: Video features to download (default: all)
+        include: Only download files matching one of these globs
+        exclude: Do not download files matching any of these globs
+        meta_only: Only download meta/
+    """
+
+    episodes: Optional[List[int]] = None
+    sample: Optional[int] = None
+    seed: Optional[int] = None
+    video_keys: Optional[List[str]] = None
+    include: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)
+    meta_only: bool = False
+
+    @property
+    def needs_metadata(self) -> bool:
+        """Whether meta/ must be read to tell which files are selected."""
+        return self.episodes is not None or self.sample is not None or self.video_keys is not None
+
+    @property
+    def active(self) -> bool:
+        """Whether any file can be left out."""
+        return self.needs_metadata or self.meta_only or bool(self.include or self.exclude)
+
+
+def parse_episodes(value: str) -> List[int]:
+    """Parse an --episodes value: indices and ranges like "0-49,100,200-209"."""
+    episodes = set()
+    try:
+        for item in value.split(","):
+            low, _, high = item.strip().partition("-")
+            low = int(low)
+            high = int(high) if high else low
+            if not 0 <= low <= high:
+                raise ValueError
+            episodes.update(range(low, high + 1))
+    except ValueError:
+        raise ValidationError(f"Invalid episodes '{value}': expected indices and ranges, e.g. 0-49,100")
+    return sorted(episodes)
+
+
+def compile_template(template: str) -> "re.Pattern":
+    """Turn a LeRobot path template into a regex with a group per field.
+
+    `video_key` matches any name; every other field is an integer.
+    """
+    pattern, seen = "", set()
+    for literal, name, _, _ in string.Formatter().parse(template):
+        pattern += re.escape(literal)
+        if name is None:
+            continue
+        if name in seen:
+            pattern += f"(?P={name})"
+        else:
+            seen.add(name)
+            pattern += f"(?P<{name}>.+?)" if name == "video_key" else f"(?P<{name}>\\d+)"
+    return re.compile(pattern)
+
+
+def load_info(output_dir: Path) -> dict:
+    """Read meta/info.json of a (partly) downloaded dataset."""
+    try:
+        with open(Path(output_dir) / INFO_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise ValidationError(
+            f"Selecting or ordering episodes needs {INFO_PATH}, which this dataset does not have"
+        )
+
+
+def video_keys_of(info: dict) -> List[str]:
+    """Video features of a dataset, from its info.json."""
+    return [key for key, feat in info.get("features", {}).items() if feat.get("dtype") == "video"]
+
+
+def choose_episodes(info: dict, selection: DownloadSelection) -> Optional[List[int]]:
+    """Episode indices to download, or None for all of them.
+
+    Raises:
+        ValidationError: If the sample size is less than 1
+    """
+    if selection.episodes is None and selection.sample is None:
+        return None
+    if selection.sample is not None and selection.sample < 1:
+        raise ValidationError(f"Sample size must be at least 1, got {selection.sample}")
+    total = info.get("total_episodes", 0)
+    pool = [e for e in selection.episodes if e < total] if selection.episodes is not None else range(total)
+    if selection.sample is not None:
+        pool = random.Random(selection.seed).sample(list(pool), min(selection.sample, len(pool)))
+    return sorted(pool)
+
+
+def _read_parquet_rows(path: Path) -> List[dict]:
+    """Rows of the episode index and chunk/file columns of an episodes file."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValidationError(
+            "Finding the episodes of a LeRobot v3.0 dataset reads meta/episodes/*.parquet, "
+            "which needs pyarrow: pip install 'uz-cli[lerobot]'"
+        )
+    table = pq.read_table(path)
+    columns = [
+        name for name in table.column_names
+        if name == "episode_index" or name.endswith(("/chunk_index", "/file_index"))
+    ]
+    return table.select(columns).to_pylist()
+
+
+def read_episode_table(output_dir: Path) -> Dict[int, Set[Tuple[str, int, int]]]:
+    """Files holding each episode of a LeRobot v3.0 dataset.
+
+    Returns:
+        {episode_index: {("data" or "videos/<video_key>", chunk_index, file_index)}}
+    """
+    episodes_files = sorted((Path(output_dir) / META_DIR / "episodes").rglob("*.parquet"))
+    if not episodes_files:
+        raise ValidationError("meta/episodes/ has no parquet files to find the episodes in")
+    table = defaultdict(set)
+    for path in episodes_files:
+        for row in _read_parquet_rows(path):
+            for name, chunk_index in row.items():
+                if name.endswith("/chunk_index"):
+                    prefix = name[: -len("/chunk_index")]
+                    table[row["episode_index"]].add((prefix, chunk_index, row[f"{prefix}/file_index"]))
+    return table
+
+
+def path_templates(info: dict) -> List[Tuple[str, "re.Pattern"]]:
+    """Compiled (key, template) pairs for data_path and video_path."""
+    return [(key, compile_template(info[key])) for key in ("data_path", "video_path") if info.get(key)]
+
+
+def _match(templates: List[Tuple[str, "re.Pattern"]], rel_path: str) -> Optional[Tuple[str, dict]]:
+    """(template key, fields) of the first template a path matches."""
+    for key, template in templates:
+        match = template.fullmatch(rel_path)
+        if match is not None:
+            return key, match.groupdict()
+    return None
+
+
+def _location(key: str, fields: dict) -> Tuple[str, int, int]:
+    """Entry of a v3.0 file in the episode table."""
+    prefix = "data" if key == "data_path" else f"videos/{fields.get('video_key')}"
+    return prefix, int(fields["chunk_index"]), int(fields["file_index"])
+
+
+def _packed(templates: List[Tuple[str, "re.Pattern"]]) -> bool:
+    """Whether files hold several episodes (v3.0) rather than one (v2.x)."""
+    return any("file_index" in t.groupindex for _, t in templates)
+
+
+def episode_files(
+    download_urls: List[dict],
+    output_dir: Path,
+    episodes: Optional[List[int]] = None,
+) -> Dict[int, Set[str]]:
+    """Relative paths of the files each episode is read from.
+
+    meta/ must already be downloaded to output_dir.
+
+    Args:
+        download_urls: Server listing ({relativePath, ...} dicts)
+        output_dir: Directory the dataset is downloaded to
+        episodes: Only map these episodes (default: all)
+
+    Returns:
+        {episode_index: {relative_path}}
+    """
+    templates = path_templates(load_info(output_dir))
+    wanted = set(episodes) if episodes is not None else None
+    episodes_at = defaultdict(set)
+    if _packed(templates):
+        for episode, locations in read_episode_table(output_dir).items():
+            for location in locations:
+                episodes_at[location].add(episode)
+    files = defaultdict(set)
+    for url_info in download_urls:
+        matched = _match(templates, url_info["relativePath"])
+        if matched is None:
+            continue
+        key, fields = matched
+        if "episode_index" in fields:
+            found = {int(fields["episode_index"])}
+        elif "file_index" in fields:
+            found = episodes_at.get(_location(key, fields), set())
+        else:
+            continue
+        for episode in found:
+            if wanted is None or episode in wanted:
+                files[episode].add(url_info["relativePath"])
+    return dict(files)
+
+
+def select_files(
+    download_urls: List[dict],
+    output_dir: Path,
+    selection: DownloadSelection,
+) -> Tuple[List[dict], Optional[List[int]]]:
+    """Filter a download listing.
+
+    meta/ must already be downloaded to output_dir if
+    selection.needs_metadata. Files under meta/ are always kept; files that
+    match neither path template are kept unless a glob excludes them.
+
+    Args:
+        download_urls: Server listing ({relativePath, size, ...} dicts)
+        output_dir: Directory the dataset is downloaded to
+        selection: What to download
+
+    Returns:
+        Tuple of (selected url_infos, selected episodes or None for all)
+    """
+    episodes = None
+    templates = []
+    locations = None
+    if selection.needs_metadata:
+        info = load_info(output_dir)
+        available = video_keys_of(info)
+        unknown = sorted(set(selection.video_keys or []) - set(available))
+        if unknown:
+            raise ValidationError(f"Unknown video keys {unknown}; the dataset has {available}")
+        episodes = choose_episodes(info, selection)
+        templates = path_templates(info)
+        if episodes is not None and _packed(templates):
+            table = read_episode_table(output_dir)
+            locations = set().union(*(table.get(e, set()) for e in episodes))
+    wanted_episodes = set(episodes) if episodes is not None else None
+
+    def selected(rel_path: str) -> bool:
+        if rel_path.startswith(META_DIR):
+            return True
+        if selection.meta_only:
+            return False
+        matched = _match(templates, rel_path)
+        if matched is not None:
+            key, fields = matched
+            if (
+                selection.video_keys is not None and key == "video_path"
+                and fields.get("video_key") not in selection.video_keys
+            ):
+                return False
+            if wanted_episodes is not None:
+                if "episode_index" in fields:
+                    if int(fields["episode_index"]) not in wanted_episodes:
+                        return False
+                elif locations is not None and "file_index" in fields:
+                    if _location(key, fields) not in locations:
+                        return False
+        if selection.include and not any(fnmatch.fnmatch(rel_path, p) for p in selection.include):
+            return False
+        return not any(fnmatch.fnmatch(rel_path, p) for p in selection.exclude)
+
+    return [u for u in download_urls if selected(u["relativePath"])], episodes
+
+
+def restrict_video_features(output_dir: Path, video_keys: List[str]) -> None:
+    """Remove the video features that were not downloaded from meta/info.json.
+
+    The file is replaced rather than rewritten, since with --cache it may be
+    a hardlink to the shared cache object, which must stay untouched.
+    """
+    info_path = Path(output_dir) / INFO_PATH
+    info = load_info(output_dir)
+    info["features"] = {
+        key: feat for key, feat in info.get("features", {}).items()
+        if feat.get("dtype") != "video" or key in video_keys
+    }
+    tmp_path = info_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(info, f, indent=4)
+    os.replace(tmp_path, info_path)
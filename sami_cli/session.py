@@ -0,0 +1,74 @@
+"""Shared HTTP sessions for file transfers."""
+
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .backpressure import Backpressure
+from .retry import parse_retry_after
+from .exceptions import ValidationError
+
+
+class BackpressureAdapter(HTTPAdapter):
+    """HTTPAdapter sending every request through a Backpressure gate."""
+
+    def __init__(self, backpressure: Backpressure, **kwargs):
+        self.backpressure = backpressure
+        super().__init__(**kwargs)
+
+    def send(self, request, *args, **kwargs):
+        with self.backpressure.request(request.url) as report:
+            response = super().send(request, *args, **kwargs)
+            report(response.status_code, parse_retry_after(response.headers))
+        return response
+
+
+def create_transfer_session(max_workers: int, backpressure: Optional[Backpressure] = None) -> requests.Session:
+    """Create a keep-alive session shared by all transfer workers.
+
+    The connection pool is sized to the worker count so every worker can
+    reuse an open TCP/TLS connection to S3 instead of opening one per file.
+
+    Args:
+        max_workers: Number of threads that will use the session concurrently
+        backpressure: Gate every request of the session through this
+            (pauses for throttling, circuit breaker per host)
+
+    Returns:
+        requests.Session with pooled HTTP and HTTPS adapters
+    """
+    session = requests.Session()
+    pool_maxsize = max(max_workers, 1)
+    if backpressure is not None:
+        adapter = BackpressureAdapter(backpressure, pool_connections=4, pool_maxsize=pool_maxsize)
+    else:
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@contextmanager
+def transfer_engine(max_in_flight: Optional[int] = None, engine=None) -> Iterator:
+    """Engine to run small-file transfers on, if any.
+
+    Args:
+        max_in_flight: Start a TransferEngine with this many transfers in
+            flight (needs aiohttp), closed on exit
+        engine: Existing TransferEngine to use instead
+
+    Yields:
+        The engine, or None to transfer every file on worker threads
+    """
+    if engine is not None or not max_in_flight:
+        yield engine
+        return
+    try:
+        from .engine import TransferEngine
+    except ImportError as e:
+        raise ValidationError(f"max_in_flight: {e}") from e
+
+    with TransferEngine(max_in_flight) as new_engine:
+        yield new_engine
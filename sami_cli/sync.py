@@ -0,0 +1,132 @@
+"""Local manifest of downloaded files, used by `uz download --sync`.
+
+Every download records the server's size and ETag (or checksum) of each
+file, together with the local size and mtime, in `.uz-manifest.json` at the
+root of the output directory. A sync compares the server listing with the
+manifest and a stat() of each file, so unchanged files are confirmed without
+reading them.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# Manifest file name, stored at the root of the download directory
+MANIFEST_NAME = ".uz-manifest.json"
+
+
+def server_version(url_info: dict) -> Optional[str]:
+    """ETag or checksum the server reports for a file, if any."""
+    return url_info.get("etag") or url_info.get("sha256") or url_info.get("checksum")
+
+
+class LocalManifest:
+    """{relative_path: server size/version and local size/mtime} of a download."""
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_NAME
+        self.entries: Dict[str, dict] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Load the manifest, starting empty if it is missing or corrupt."""
+        try:
+            with open(self.path) as f:
+                self.entries = dict(json.load(f).get("files", {}))
+        except (OSError, ValueError, AttributeError):
+            self.entries = {}
+
+    def is_current(self, url_info: dict) -> bool:
+        """Check if the local copy of a file matches the server listing.
+
+        True when the file was downloaded with the same server size and
+        version, and has not been modified locally since.
+        """
+        entry = self.entries.get(url_info["relativePath"])
+        if entry is None:
+            return False
+        if entry["size"] != url_info["size"] or entry.get("version") != server_version(url_info):
+            return False
+        try:
+            stat = os.stat(self.output_dir / url_info["relativePath"])
+        except FileNotFoundError:
+            return False
+        return stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]
+
+    def record(self, url_info: dict) -> None:
+        """Record a file that was just downloaded."""
+        stat = os.stat(self.output_dir / url_info["relativePath"])
+        entry = {
+            "size": url_info["size"],
+            "version": server_version(url_info),
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        # Kept for `uz verify`
+        for key in ("etag", "sha256", "partSize"):
+            if url_info.get(key):
+                entry[key] = url_info[key]
+        self.entries[url_info["relativePath"]] = entry
+
+    def forget(self, relative_path: str) -> None:
+        self.entries.pop(relative_path, None)
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"files": self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+
+def plan_sync(download_urls: List[dict], manifest: LocalManifest) -> Tuple[List[dict], List[dict]]:
+    """Split the server listing into files to download and files up to date.
+
+    Returns:
+        Tuple of (changed_or_new, unchanged) url_info lists
+    """
+    changed, unchanged = [], []
+    for url_info in download_urls:
+        (unchanged if manifest.is_current(url_info) else changed).append(url_info)
+    return changed, unchanged
+
+
+def find_extraneous(
+    output_dir: Path,
+    manifest: LocalManifest,
+    server_paths: set,
+    part_suffixes: Tuple[str, ...] = (".part",),
+) -> Tuple[List[str], List[Path]]:
+    """Find downloaded files that are no longer on the server.
+
+    Only files recorded in the manifest are considered: files the user put
+    in the output directory are never listed, nor are files left out of a
+    selective download, as long as server_paths is the full listing.
+
+    Returns:
+        Tuple of (relative paths to forget from the manifest, local files
+        to delete: those still present and their partial downloads, named
+        <path><suffix> for any of part_suffixes)
+    """
+    output_dir = Path(output_dir)
+    gone = sorted(rel_path for rel_path in manifest.entries if rel_path not in server_paths)
+    extraneous = []
+    for rel_path in gone:
+        for suffix in ("",) + tuple(part_suffixes):
+            file_path = output_dir / (rel_path + suffix)
+            if file_path.is_file():
+                extraneous.append(file_path)
+    return gone, extraneous
+
+
+def delete_files(output_dir: Path, paths: List[Path]) -> None:
+    """Delete files and prune directories left empty."""
+    output_dir = Path(output_dir)
+    for file_path in paths:
+        file_path.unlink(missing_ok=True)
+        parent = file_path.parent
+        while parent != output_dir and parent.is_dir() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
@@ -2,21 +2,53 @@
 
 import os
 import json
-import struct
 import shutil
 import mimetypes
 import subprocess
 import tempfile
+import functools
+import queue
+import threading
+import time
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional, Union
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 from tqdm import tqdm
 
+from . import mp4
 from .auth import SamiAuth
-from .models import Dataset
-from .exceptions import UploadError, ValidationError
+from .mp4 import read_top_level_atoms
+from .layout_cache import Mp4LayoutCache
+from .models import Dataset, UploadUrl
+from .journal import UploadJournal, file_signature
+from .session import create_transfer_session, transfer_engine
+from .progress import ProgressBody, TransferProgress
+from .concurrency import resolve_workers
+from .dedup import ContentIndex, FileDigest, hash_files
+from .checksum import body_md5, content_md5
+from .retry import RetryPolicy, parse_retry_after
+from .bandwidth import LimitedBody, TokenBucket
+from .sync import MANIFEST_NAME
+from .exceptions import UploadError, UrlExpiredError, ValidationError
+
+
+# Files larger than this are uploaded in parts (S3 single PUT limit is 5 GB)
+MULTIPART_THRESHOLD = 1024**3
+# Default size of each multipart part
+MULTIPART_PART_SIZE = 64 * 1024**2
+# S3 allows at most 10,000 parts per upload
+MAX_MULTIPART_PARTS = 10000
+
+# Files per upload-urls request (avoids request size limits)
+URL_BATCH_SIZE = 500
+# Concurrent upload-urls / multipart-initiate requests
+URL_REQUEST_WORKERS = 4
+# Presigned URL lifetime assumed when the API does not return expiresIn
+DEFAULT_URL_TTL = 3600
+# Re-request a presigned URL if it expires within this many seconds
+URL_EXPIRY_MARGIN = 300
 
 
 def check_ffmpeg_available() -> bool:
@@ -24,54 +56,62 @@ def check_ffmpeg_available() -> bool:
     return shutil.which("ffmpeg") is not None
 
 
-def needs_faststart(video_path: Path) -> bool:
+def needs_faststart(video_path: Path, layout_cache: Optional[Mp4LayoutCache] = None) -> bool:
     """Check if video needs faststart (moov atom at end).
 
     Returns True if moov atom comes after mdat atom, meaning
-    the video is not optimized for web streaming.
+    the video is not optimized for web streaming. With a layout cache,
+    unchanged videos are not read again.
     """
     try:
-        with open(video_path, 'rb') as f:
-            moov_offset = None
-            mdat_offset = None
-
-            while True:
-                header = f.read(8)
-                if len(header) < 8:
-                    break
-
-                size = struct.unpack('>I', header[:4])[0]
-                atom_type = header[4:8].decode('latin-1', errors='ignore')
-                current_offset = f.tell() - 8
-
-                if atom_type == 'moov':
-                    moov_offset = current_offset
-                elif atom_type == 'mdat':
-                    mdat_offset = current_offset
-
-                if size == 0:
-                    break
-                if size == 1:
-                    # 64-bit size
-                    extended = f.read(8)
-                    if len(extended) < 8:
-                        break
-                    size = struct.unpack('>Q', extended)[0]
-                    f.seek(current_offset + size)
-                else:
-                    f.seek(current_offset + size)
+        if layout_cache is not None:
+            atoms = layout_cache.read_atoms(video_path)
+        else:
+            with open(video_path, 'rb') as f:
+                atoms = read_top_level_atoms(f)
+
+        moov_offset = next((a.offset for a in atoms if a.type == 'moov'), None)
+        mdat_offset = next((a.offset for a in atoms if a.type == 'mdat'), None)
 
-            # If moov comes after mdat, needs faststart
-            if moov_offset is not None and mdat_offset is not None:
-                return moov_offset > mdat_offset
+        # If moov comes after mdat, needs faststart
+        if moov_offset is not None and mdat_offset is not None:
+            return moov_offset > mdat_offset
 
-            return False
+        return False
     except Exception:
         # If we can't parse, assume it needs processing
         return True
 
 
 def apply_faststart(video_path: Path) -> bool:
+    """Apply faststart to a video, moving the moov atom to the beginning.
+
+    Uses the built-in remuxer, which copies media data in bulk without
+    re-encoding. Layouts it does not support (fragmented or compressed
+    moov) fall back to ffmpeg when it is installed.
+
+    Returns True if successful, False otherwise.
+    """
+    temp_path = video_path.with_suffix('.tmp.mp4')
+
+    try:
+        if mp4.faststart(video_path, temp_path):
+            # Replace original with processed file
+            temp_path.replace(video_path)
+        return True
+    except mp4.Mp4Error:
+        if check_ffmpeg_available():
+            return apply_faststart_ffmpeg(video_path)
+        return False
+    except Exception:
+        return False
+    finally:
+        # Clean up failed or interrupted attempts
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def apply_faststart_ffmpeg(video_path: Path) -> bool:
     """Apply faststart to video by remuxing with ffmpeg.
 
     This moves the moov atom to the beginning of the file
@@ -100,29 +140,36 @@ def apply_faststart(video_path: Path) -> bool:
             # Replace original with processed file
             temp_path.replace(video_path)
             return True
-        else:
-            # Clean up failed attempt
-            if temp_path.exists():
-                temp_path.unlink()
-            return False
-
-    except subprocess.TimeoutExpired:
-        if temp_path.exists():
-            temp_path.unlink()
         return False
+
     except Exception:
+        return False
+    finally:
+        # Clean up failed or interrupted attempts
         if temp_path.exists():
             temp_path.unlink()
-        return False
 
 
-def process_videos_for_web(video_files: List[Tuple[Path, str, str, int]]) -> Tuple[int, int]:
+def default_video_workers() -> int:
+    """Default number of parallel video checks/remuxes (one per CPU)."""
+    return os.cpu_count() or 4
+
+
+def process_videos_for_web(
+    video_files: List[Tuple[Path, str, str, int]],
+    max_workers: Optional[int] = None,
+    layout_cache: Optional[Mp4LayoutCache] = None,
+) -> Tuple[int, int]:
     """Process video files to ensure web compatibility.
 
     Checks each video for faststart optimization and applies it if needed.
+    Both passes run on a thread pool; the work is mostly file I/O (and
+    ffmpeg subprocesses for fallback remuxes), so threads scale across CPUs.
 
     Args:
         video_files: List of (absolute_path, relative_path, content_type, size) tuples
+        max_workers: Number of parallel checks/remuxes (default: CPU count)
+        layout_cache: Atom layout cache (default: ~/.uz/mp4_layouts.json)
 
     Returns:
         Tuple of (processed_count, failed_count)
@@ -130,36 +177,58 @@ def process_videos_for_web(video_files: List[Tuple[Path, str, str, int]]) -> Tup
     if not video_files:
         return 0, 0
 
-    if not check_ffmpeg_available():
-        print("  ⚠ ffmpeg not found - skipping video optimization")
-        print("    Videos may not play in browser if not properly encoded")
-        return 0, 0
-
+    if layout_cache is None:
+        layout_cache = Mp4LayoutCache()
+    max_workers = max_workers or default_video_workers()
     videos_needing_fix = []
 
-    # First pass: check which videos need fixing
-    print("  Checking video web compatibility...")
-    for abs_path, rel_path, _, _ in video_files:
-        if needs_faststart(abs_path):
-            videos_needing_fix.append((abs_path, rel_path))
-
-    if not videos_needing_fix:
-        print("  ✓ All videos are web-optimized")
-        return 0, 0
-
-    print(f"  Processing {len(videos_needing_fix)} videos for web streaming...")
-
-    processed = 0
-    failed = 0
-
-    with tqdm(total=len(videos_needing_fix), desc="  Optimizing", unit="videos") as pbar:
-        for abs_path, rel_path in videos_needing_fix:
-            if apply_faststart(abs_path):
-                processed += 1
-            else:
-                failed += 1
-                tqdm.write(f"    ⚠ Failed to process: {rel_path}")
-            pbar.update(1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # First pass: check which videos need fixing
+        print("  Checking video web compatibility...")
+        futures = {
+            executor.submit(needs_faststart, abs_path, layout_cache): (abs_path, rel_path)
+            for abs_path, rel_path, _, _ in video_files
+        }
+        try:
+            with tqdm(total=len(futures), desc="  Checking", unit="videos", leave=False) as pbar:
+                for future in as_completed(futures):
+                    if future.result():
+                        videos_needing_fix.append(futures[future])
+                    pbar.update(1)
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            layout_cache.save()
+
+        if not videos_needing_fix:
+            print("  ✓ All videos are web-optimized")
+            return 0, 0
+
+        print(f"  Processing {len(videos_needing_fix)} videos for web streaming...")
+
+        processed = 0
+        failed = 0
+
+        futures = {
+            executor.submit(apply_faststart, abs_path): rel_path
+            for abs_path, rel_path in videos_needing_fix
+        }
+        try:
+            with tqdm(total=len(futures), desc="  Optimizing", unit="videos") as pbar:
+                for future in as_completed(futures):
+                    if future.result():
+                        processed += 1
+                    else:
+                        failed += 1
+                        tqdm.write(f"    ⚠ Failed to process: {futures[future]}")
+                    pbar.update(1)
+        except KeyboardInterrupt:
+            # Queued remuxes never start; running ones remove their temp files
+            for future in futures:
+                future.cancel()
+            raise
 
     if processed > 0:
         print(f"  ✓ Optimized {processed} videos for web streaming")
@@ -169,6 +238,84 @@ def process_videos_for_web(video_files: List[Tuple[Path, str, str, int]]) -> Tup
     return processed, failed
 
 
+def plan_videos_for_web(
+    video_files: List[Tuple[Path, str, str, int]],
+    max_workers: Optional[int] = None,
+    layout_cache: Optional[Mp4LayoutCache] = None,
+) -> Tuple[Dict[str, mp4.FaststartPlan], int]:
+    """Plan faststart streaming for videos without modifying them.
+
+    Videos whose moov atom follows mdat get a FaststartPlan so they can be
+    uploaded in faststart order straight from the original file. Videos
+    the native remuxer cannot handle fall back to an in-place ffmpeg remux
+    when ffmpeg is installed.
+
+    Args:
+        video_files: List of (absolute_path, relative_path, content_type, size) tuples
+        max_workers: Number of parallel checks (default: CPU count)
+        layout_cache: Atom layout cache (default: ~/.uz/mp4_layouts.json)
+
+    Returns:
+        Tuple of ({relative_path: FaststartPlan}, number of videos remuxed in place)
+    """
+    if not video_files:
+        return {}, 0
+
+    if layout_cache is None:
+        layout_cache = Mp4LayoutCache()
+
+    max_workers = max_workers or default_video_workers()
+    plans = {}
+    unsupported = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        print("  Checking video web compatibility...")
+        futures = {
+            executor.submit(layout_cache.plan_faststart, abs_path): (abs_path, rel_path)
+            for abs_path, rel_path, _, _ in video_files
+        }
+        try:
+            with tqdm(total=len(futures), desc="  Checking", unit="videos", leave=False) as pbar:
+                for future in as_completed(futures):
+                    abs_path, rel_path = futures[future]
+                    try:
+                        result = future.result()
+                        if result is not None:
+                            plans[rel_path] = result
+                    except Exception:
+                        if needs_faststart(abs_path, layout_cache):
+                            unsupported.append((abs_path, rel_path))
+                    pbar.update(1)
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            layout_cache.save()
+
+    if plans:
+        print(f"  ✓ {len(plans)} videos will be streamed in web-optimized order")
+    if not unsupported:
+        if not plans:
+            print("  ✓ All videos are web-optimized")
+        return plans, 0
+
+    if not check_ffmpeg_available():
+        print(f"  ⚠ {len(unsupported)} videos use a layout that needs ffmpeg, which was not found")
+        print("    These videos may not play in browser")
+        return plans, 0
+
+    remuxed = 0
+    for abs_path, rel_path in unsupported:
+        if apply_faststart_ffmpeg(abs_path):
+            remuxed += 1
+        else:
+            print(f"    ⚠ Failed to process: {rel_path}")
+    if remuxed:
+        print(f"  ✓ Optimized {remuxed} videos in place with ffmpeg")
+    return plans, remuxed
+
+
 def validate_lerobot_structure(path: Path, strict: bool = True) -> dict:
     """Validate that the path contains a valid LeRobot dataset.
 
@@ -343,7 +490,7 @@ def list_dataset_files(path: Path) -> List[Tuple[Path, str, str, int]]:
     """
     files = []
     for file_path in path.rglob("*"):
-        if file_path.is_file():
+        if file_path.is_file() and file_path.name != MANIFEST_NAME:
             relative = file_path.relative_to(path)
             content_type, _ = mimetypes.guess_type(str(file_path))
             content_type = content_type or "application/octet-stream"
@@ -353,57 +500,737 @@ def list_dataset_files(path: Path) -> List[Tuple[Path, str, str, int]]:
     return files
 
 
-def upload_file(
-    file_path: Path,
+def _put_with_retries(
     upload_url: str,
-    content_type: str,
-    timeout: int = 3600,
-    max_retries: int = 3,
-) -> None:
-    """Upload a single file to S3 using presigned URL.
+    open_body,
+    headers: dict,
+    description: str,
+    size: int,
+    timeout: int,
+    max_retries: Optional[int] = None,
+    session: Optional[requests.Session] = None,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    bandwidth: Optional[TokenBucket] = None,
+) -> requests.Response:
+    """PUT a body to a presigned URL, retrying server and connection errors.
 
     Args:
-        file_path: Local file path
         upload_url: Presigned S3 URL
-        content_type: MIME type
-        timeout: Request timeout in seconds (default 1 hour for large files)
-        max_retries: Number of retry attempts for failed uploads
-    """
-    file_size = file_path.stat().st_size
-    last_error = None
+        open_body: Callable returning a fresh context-managed body per attempt
+        headers: Request headers
+        description: What is being uploaded, used in error messages
+        size: Body size in bytes, used in error messages
+        timeout: Request timeout in seconds
+        max_retries: Number of attempts (default: the policy's max_attempts)
+        session: Shared keep-alive session (default: one-off connection)
+        progress_callback: Called with the number of bytes sent as the body
+            is streamed; failed attempts are reported back as negative counts
+        retry_policy: Backoff and budget for retrying connection errors,
+            timeouts, 429 and 5xx responses and rejected checksums
+        bandwidth: Token bucket limiting the rate the body is sent at
 
-    for attempt in range(max_retries):
+    Returns:
+        The successful response
+    """
+    http = session or requests
+    policy = retry_policy or RetryPolicy()
+    attempt = 0
+
+    while True:
+        body = None
+        succeeded = False
+        retry_after = None
         try:
-            with open(file_path, "rb") as f:
-                response = requests.put(
+            with open_body() as source:
+                if bandwidth is not None:
+                    source = LimitedBody(source, size, bandwidth)
+                if progress_callback is not None:
+                    progress_callback(0)
+                    body = ProgressBody(source, size, progress_callback)
+                response = http.put(
                     upload_url,
-                    data=f,
-                    headers={"Content-Type": content_type},
+                    data=body if body is not None else source,
+                    headers=headers,
                     timeout=timeout,
                 )
 
             if response.status_code in (200, 204):
-                return  # Success
+                succeeded = True
+                policy.succeeded()
+                if body is not None:
+                    progress_callback(0)
+                return response
+
+            if response.status_code == 403 and "expired" in response.text.lower():
+                # Presigned URL expired while the file was queued
+                raise UrlExpiredError(f"Presigned URL expired for {description}")
 
             last_error = f"HTTP {response.status_code}"
-            if response.status_code >= 500:
-                # Server error, retry
-                continue
-            else:
+            retry_after = parse_retry_after(response.headers)
+            if response.status_code == 400 and "BadDigest" in response.text:
+                # Body corrupted in transit: S3 rejected it against Content-MD5
+                last_error = "Checksum mismatch (Content-MD5 rejected by S3)"
+            elif response.status_code < 500 and response.status_code != 429:
                 # Client error, don't retry
                 break
 
         except requests.exceptions.Timeout:
-            last_error = f"Timeout after {timeout}s (file size: {file_size / (1024**2):.1f} MB)"
-            continue
+            last_error = f"Timeout after {timeout}s (size: {size / (1024**2):.1f} MB)"
         except requests.exceptions.ConnectionError as e:
             last_error = f"Connection error: {e}"
-            continue
+        except UrlExpiredError:
+            raise
         except Exception as e:
             last_error = str(e)
             break
+        finally:
+            if body is not None and not succeeded:
+                # Bytes of a failed attempt are sent again (or never count)
+                progress_callback(-body.bytes_read)
+
+        if not policy.retry(attempt, retry_after, max_retries):
+            break
+        attempt += 1
+
+    raise UploadError(f"Failed to upload {description} after {attempt + 1} attempts: {last_error}")
+
+
+def upload_file(
+    file_path: Path,
+    upload_url: str,
+    content_type: str,
+    timeout: int = 3600,
+    max_retries: Optional[int] = None,
+    session: Optional[requests.Session] = None,
+    faststart_plan: Optional[mp4.FaststartPlan] = None,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    md5: Optional[str] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    bandwidth: Optional[TokenBucket] = None,
+    checksum: bool = False,
+) -> None:
+    """Upload a single file to S3 using presigned URL.
+
+    Args:
+        file_path: Local file path
+        upload_url: Presigned S3 URL
+        content_type: MIME type
+        timeout: Request timeout in seconds (default 1 hour for large files)
+        max_retries: Number of attempts (default: the policy's max_attempts)
+        session: Shared keep-alive session (default: one-off connection)
+        faststart_plan: Stream the video in faststart order using this layout
+        progress_callback: Called with the number of bytes sent as the file
+            is streamed
+        md5: MD5 hex digest of the uploaded bytes, sent as Content-MD5 so S3
+            rejects a body corrupted in transit (the upload is retried)
+        retry_policy: Backoff and budget for retrying failed attempts
+        bandwidth: Token bucket limiting the rate, shared by the run
+        checksum: Without md5, compute it from the file just before the
+            upload and send it as Content-MD5
+    """
+    if faststart_plan is not None:
+        open_body = lambda: mp4.FaststartReader(file_path, faststart_plan)
+        size = faststart_plan.output_size
+    else:
+        open_body = lambda: open(file_path, "rb")
+        size = file_path.stat().st_size
+
+    if checksum and not md5:
+        md5 = body_md5(open_body)
+    headers = {"Content-Type": content_type}
+    if md5:
+        headers["Content-MD5"] = content_md5(md5)
+
+    _put_with_retries(
+        upload_url,
+        open_body,
+        headers=headers,
+        description=str(file_path),
+        size=size,
+        timeout=timeout,
+        max_retries=max_retries,
+        session=session,
+        progress_callback=progress_callback,
+        retry_policy=retry_policy,
+        bandwidth=bandwidth,
+    )
+
+
+def _api_error(response: requests.Response) -> str:
+    """Extract the error message from an API error response."""
+    try:
+        return response.json().get("error", {}).get("message", "Unknown error")
+    except Exception:
+        return f"HTTP {response.status_code}"
+
+
+def request_upload_urls(
+    auth: SamiAuth,
+    api_url: str,
+    dataset_id: str,
+    files: List[Tuple[Path, str, str, int]],
+    retry_policy: Optional[RetryPolicy] = None,
+) -> List[UploadUrl]:
+    """Request presigned upload URLs for a batch of files.
+
+    Args:
+        auth: Authenticated SamiAuth instance
+        api_url: SAMI API base URL
+        dataset_id: ID of the dataset being uploaded
+        files: List of (absolute_path, relative_path, content_type, size) tuples
+        retry_policy: Backoff for failed requests
+
+    Returns:
+        List of UploadUrl objects with their expiry time
+    """
+    file_specs = [
+        {"relativePath": rel_path, "contentType": ct, "size": size}
+        for _, rel_path, ct, size in files
+    ]
+
+    # Signing URLs changes nothing on the server, so it is safe to repeat
+    response = (retry_policy or RetryPolicy()).call(
+        requests.post,
+        f"{api_url}/datasets/{dataset_id}/upload-urls",
+        json={"files": file_specs},
+        headers=auth.get_headers(),
+    )
+
+    if response.status_code != 200:
+        raise UploadError(f"Failed to get upload URLs: {_api_error(response)}")
+
+    data = response.json()["data"]
+    expires_at = time.time() + data.get("expiresIn", DEFAULT_URL_TTL)
+    return [
+        UploadUrl(
+            relative_path=u["relativePath"],
+            upload_url=u["uploadUrl"],
+            key=u.get("key", ""),
+            expires_at=expires_at,
+        )
+        for u in data["uploadUrls"]
+    ]
+
+
+# =============================================================================
+# Deduplication
+# =============================================================================
+
+
+def copy_files(
+    auth: SamiAuth,
+    api_url: str,
+    dataset_id: str,
+    copies: List[dict],
+    retry_policy: Optional[RetryPolicy] = None,
+) -> Optional[set]:
+    """Ask the platform to copy already-stored content into a dataset.
+
+    Args:
+        auth: Authenticated SamiAuth instance
+        api_url: SAMI API base URL
+        dataset_id: ID of the dataset being uploaded
+        copies: List of {"relativePath", "sha256", "size", "sourceDatasetId",
+            "sourceRelativePath"} dicts
+        retry_policy: Backoff for failed requests
+
+    Returns:
+        Set of relative paths that were copied, or None if the API does not
+        support server-side copies
+    """
+    copied = set()
+    for i in range(0, max(len(copies), 1), URL_BATCH_SIZE):
+        # Copying the same content again leaves the same files
+        response = (retry_policy or RetryPolicy()).call(
+            requests.post,
+            f"{api_url}/datasets/{dataset_id}/copy-files",
+            json={"files": copies[i : i + URL_BATCH_SIZE]},
+            headers=auth.get_headers(),
+        )
+        if response.status_code in (404, 405, 501):
+            return None
+        if response.status_code != 200:
+            raise UploadError(f"Failed to copy files: {_api_error(response)}")
+        copied.update(response.json()["data"].get("copied", []))
+    return copied
+
+
+def deduplicate_files(
+    auth: SamiAuth,
+    api_url: str,
+    dataset_id: str,
+    files: List[Tuple[Path, str, str, int]],
+    hashes: Dict[str, str],
+    index: ContentIndex,
+    retry_policy: Optional[RetryPolicy] = None,
+) -> Tuple[List[Tuple[Path, str, str, int]], Dict[str, str], set]:
+    """Copy files the platform already stores instead of uploading them.
+
+    Files whose hash is in the content index are copied server-side from
+    where they were uploaded before. Files with the same content as another
+    file in this upload are only uploaded once; the duplicates are copied
+    from it afterwards (see copy_duplicates).
+
+    Args:
+        auth: Authenticated SamiAuth instance
+        api_url: SAMI API base URL
+        dataset_id: ID of the dataset being uploaded
+        files: Files still to upload
+        hashes: {relative_path: sha256}
+        index: Content index of earlier uploads
+        retry_policy: Backoff for failed requests
+
+    Returns:
+        Tuple of (files still to upload, {duplicate_path: source_path},
+        relative paths copied server-side)
+    """
+    first_with_hash = {}
+    duplicates = {}
+    copies = []
+    for _, rel_path, _, size in files:
+        sha256 = hashes[rel_path]
+        if sha256 in first_with_hash:
+            duplicates[rel_path] = first_with_hash[sha256]
+            continue
+        first_with_hash[sha256] = rel_path
+        source = index.lookup(sha256)
+        if source is not None and source != (dataset_id, rel_path):
+            copies.append({
+                "relativePath": rel_path,
+                "sha256": sha256,
+                "size": size,
+                "sourceDatasetId": source[0],
+                "sourceRelativePath": source[1],
+            })
+
+    if not copies and not duplicates:
+        return files, {}, set()
+
+    copied = copy_files(auth, api_url, dataset_id, copies, retry_policy)
+    if copied is None:
+        print("  Server-side copies are not supported by this server; uploading all files")
+        return files, {}, set()
+
+    for copy in copies:
+        if copy["relativePath"] not in copied:
+            # The stored copy is gone (e.g. its dataset was deleted)
+            index.forget(copy["sha256"])
+
+    remaining = [f for f in files if f[1] not in copied and f[1] not in duplicates]
+    copied_size = sum(f[3] for f in files if f[1] in copied)
+    if copied:
+        print(f"  ✓ {len(copied)} files ({copied_size / (1024**3):.2f} GB) already stored, copied server-side")
+    if duplicates:
+        print(f"  ✓ {len(duplicates)} duplicate files will be copied after upload")
+    return remaining, duplicates, copied
+
+
+def copy_duplicates(
+    auth: SamiAuth,
+    api_url: str,
+    dataset_id: str,
+    duplicates: Dict[str, str],
+    hashes: Dict[str, str],
+    sizes: Dict[str, int],
+    retry_policy: Optional[RetryPolicy] = None,
+) -> set:
+    """Copy duplicate files from their uploaded twin in the same dataset.
+
+    Returns:
+        Set of relative paths that were copied
+    """
+    copies = [
+        {
+            "relativePath": rel_path,
+            "sha256": hashes[rel_path],
+            "size": sizes[rel_path],
+            "sourceDatasetId": dataset_id,
+            "sourceRelativePath": source,
+        }
+        for rel_path, source in duplicates.items()
+    ]
+    return copy_files(auth, api_url, dataset_id, copies, retry_policy) or set()
+
+
+def upload_file_with_url_refresh(
+    file_path: Path,
+    upload_url: UploadUrl,
+    content_type: str,
+    refresh_url,
+    session: Optional[requests.Session] = None,
+    faststart_plan: Optional[mp4.FaststartPlan] = None,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    md5: Optional[str] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    bandwidth: Optional[TokenBucket] = None,
+    checksum: bool = False,
+) -> None:
+    """Upload a file, re-requesting its presigned URL if it expired while queued.
+
+    Args:
+        file_path: Local file path
+        upload_url: Presigned URL issued for the file
+        content_type: MIME type
+        refresh_url: Callable returning a fresh UploadUrl for the file
+        session: Shared keep-alive session
+        faststart_plan: Stream the video in faststart order using this layout
+        progress_callback: Called with the number of bytes sent
+        md5: MD5 hex digest of the uploaded bytes, sent as Content-MD5
+        retry_policy: Backoff and budget for retrying failed attempts
+        bandwidth: Token bucket limiting the rate, shared by the run
+        checksum: Without md5, compute the Content-MD5 before the upload
+    """
+    if upload_url.expires_within(URL_EXPIRY_MARGIN):
+        upload_url = refresh_url()
+    try:
+        upload_file(
+            file_path, upload_url.upload_url, content_type, session=session,
+            faststart_plan=faststart_plan, progress_callback=progress_callback, md5=md5,
+            retry_policy=retry_policy, bandwidth=bandwidth, checksum=checksum,
+        )
+    except UrlExpiredError:
+        upload_file(
+            file_path, refresh_url().upload_url, content_type, session=session,
+            faststart_plan=faststart_plan, progress_callback=progress_callback, md5=md5,
+            retry_policy=retry_policy, bandwidth=bandwidth, checksum=checksum,
+        )
+
+
+# =============================================================================
+# Multipart Upload
+# =============================================================================
+
+
+class FileSlice:
+    """Read-only file-like view of a byte range, used as a multipart part body.
+
+    Each slice opens its own handle so parts of the same file can be
+    uploaded from different worker threads.
+    """
+
+    def __init__(self, file_path: Path, offset: int, length: int):
+        self._file = open(file_path, "rb")
+        self._file.seek(offset)
+        self._remaining = length
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(1024 * 1024)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "FileSlice":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def multipart_part_size(size: int, part_size: Optional[int] = None) -> int:
+    """Part size used to upload a file of `size` bytes in multipart parts.
+
+    The preferred part size is grown if needed so the file fits in S3's part
+    limit.
+
+    Args:
+        size: File size in bytes
+        part_size: Preferred part size (default: MULTIPART_PART_SIZE)
+    """
+    return max(part_size or MULTIPART_PART_SIZE, -(-size // MAX_MULTIPART_PARTS))
+
+
+def plan_multipart_parts(size: int, part_size: Optional[int] = None) -> List[Tuple[int, int, int]]:
+    """Split a file size into multipart parts.
+
+    Args:
+        size: File size in bytes
+        part_size: Preferred part size (default: MULTIPART_PART_SIZE)
+
+    Returns:
+        List of (part_number, offset, length) tuples, part numbers starting at 1
+    """
+    part_size = multipart_part_size(size, part_size)
+    parts = []
+    offset = 0
+    part_number = 1
+    while offset < size:
+        length = min(part_size, size - offset)
+        parts.append((part_number, offset, length))
+        offset += length
+        part_number += 1
+    return parts
+
+
+def upload_part(
+    file_path: Path,
+    upload_url: str,
+    part_number: int,
+    offset: int,
+    length: int,
+    timeout: int = 3600,
+    max_retries: Optional[int] = None,
+    session: Optional[requests.Session] = None,
+    faststart_plan: Optional[mp4.FaststartPlan] = None,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    md5: Optional[str] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    bandwidth: Optional[TokenBucket] = None,
+    checksum: bool = False,
+) -> str:
+    """Upload one part of a multipart upload using its presigned URL.
+
+    Args:
+        file_path: Local file path
+        upload_url: Presigned S3 URL for this part
+        part_number: 1-based part number
+        offset: Byte offset of the part in the file (in faststart order
+            when faststart_plan is given)
+        length: Part length in bytes
+        timeout: Request timeout in seconds
+        max_retries: Number of attempts (default: the policy's max_attempts)
+        session: Shared keep-alive session (default: one-off connection)
+        faststart_plan: Stream the video in faststart order using this layout
+        progress_callback: Called with the number of bytes sent
+        md5: MD5 hex digest of the part, sent as Content-MD5
+        retry_policy: Backoff and budget for retrying failed attempts
+        bandwidth: Token bucket limiting the rate, shared by the run
+        checksum: Without md5, compute it from the part just before the
+            upload and send it as Content-MD5
+
+    Returns:
+        ETag returned by S3, needed to complete the upload
+    """
+    if faststart_plan is not None:
+        open_body = lambda: mp4.FaststartReader(file_path, faststart_plan, offset, length)
+    else:
+        open_body = lambda: FileSlice(file_path, offset, length)
+    if checksum and not md5:
+        md5 = body_md5(open_body)
+
+    response = _put_with_retries(
+        upload_url,
+        open_body,
+        headers={"Content-MD5": content_md5(md5)} if md5 else {},
+        description=f"{file_path} (part {part_number})",
+        size=length,
+        timeout=timeout,
+        max_retries=max_retries,
+        session=session,
+        progress_callback=progress_callback,
+        retry_policy=retry_policy,
+        bandwidth=bandwidth,
+    )
+    etag = response.headers.get("ETag")
+    if not etag:
+        raise UploadError(
+            f"No ETag returned for {file_path} (part {part_number}); "
+            f"the bucket CORS policy must expose the ETag header"
+        )
+    return etag
+
+
+def initiate_multipart_upload(
+    auth: SamiAuth,
+    api_url: str,
+    dataset_id: str,
+    relative_path: str,
+    content_type: str,
+    size: int,
+    part_size: Optional[int] = None,
+    upload_id: Optional[str] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+) -> dict:
+    """Start a multipart upload and get presigned URLs for every part.
+
+    Args:
+        auth: Authenticated SamiAuth instance
+        api_url: SAMI API base URL
+        dataset_id: ID of the dataset being uploaded
+        relative_path: Path of the file within the dataset
+        content_type: MIME type
+        size: File size in bytes
+        part_size: Preferred part size (default: MULTIPART_PART_SIZE)
+        upload_id: Existing upload to get fresh part URLs for (when resuming)
+        retry_policy: Backoff for failed requests
+
+    Returns:
+        Dictionary with uploadId, key, expiresAt and parts (list of
+        {partNumber, offset, length, uploadUrl})
+    """
+    parts = plan_multipart_parts(size, part_size)
+    payload = {
+        "relativePath": relative_path,
+        "contentType": content_type,
+        "size": size,
+        "partSize": parts[0][2] if parts else 0,
+        "partCount": len(parts),
+    }
+    if upload_id:
+        payload["uploadId"] = upload_id
+
+    # A repeated start would leave an orphaned upload behind; re-signing an
+    # existing one is safe
+    response = (retry_policy or RetryPolicy()).call(
+        requests.post,
+        f"{api_url}/datasets/{dataset_id}/multipart-uploads",
+        json=payload,
+        headers=auth.get_headers(),
+        idempotent=bool(upload_id),
+    )
+
+    if response.status_code not in (200, 201):
+        raise UploadError(f"Failed to start multipart upload for {relative_path}: {_api_error(response)}")
+
+    data = response.json()["data"]
+    data["expiresAt"] = time.time() + data.get("expiresIn", DEFAULT_URL_TTL)
+    url_map = {p["partNumber"]: p["uploadUrl"] for p in data["parts"]}
+    data["parts"] = [
+        {"partNumber": n, "offset": offset, "length": length, "uploadUrl": url_map[n]}
+        for n, offset, length in parts
+    ]
+    return data
+
+
+class MultipartPartUrls:
+    """Presigned part URLs of one multipart upload, re-signed when they expire.
+
+    Shared by all workers uploading parts of the same file; the first worker
+    to find the URLs stale re-signs them for everyone.
+    """
+
+    def __init__(self, parts: List[dict], expires_at: Optional[float], resign):
+        """
+        Args:
+            parts: Parts as returned by initiate_multipart_upload
+            expires_at: Expiry time of the part URLs (epoch seconds)
+            resign: Callable returning fresh initiate_multipart_upload data
+        """
+        self._urls = {p["partNumber"]: p["uploadUrl"] for p in parts}
+        self._expires_at = expires_at
+        self._resign = resign
+        self._lock = threading.Lock()
+
+    def get(self, part_number: int) -> str:
+        """Get a part URL, re-signing first if it is about to expire."""
+        with self._lock:
+            if self._expires_at is not None and time.time() + URL_EXPIRY_MARGIN >= self._expires_at:
+                self._refresh()
+            return self._urls[part_number]
+
+    def refresh(self, stale_url: str, part_number: int) -> str:
+        """Re-sign after a URL was rejected as expired, unless another worker already did."""
+        with self._lock:
+            if self._urls[part_number] == stale_url:
+                self._refresh()
+            return self._urls[part_number]
+
+    def _refresh(self) -> None:
+        data = self._resign()
+        self._urls = {p["partNumber"]: p["uploadUrl"] for p in data["parts"]}
+        self._expires_at = data.get("expiresAt")
+
+
+def upload_part_with_url_refresh(
+    file_path: Path,
+    part_urls: MultipartPartUrls,
+    part_number: int,
+    offset: int,
+    length: int,
+    session: Optional[requests.Session] = None,
+    faststart_plan: Optional[mp4.FaststartPlan] = None,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    md5: Optional[str] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    bandwidth: Optional[TokenBucket] = None,
+    checksum: bool = False,
+) -> str:
+    """Upload one multipart part, re-signing its URL if it expired while queued.
+
+    Returns:
+        ETag returned by S3
+    """
+    upload_url = part_urls.get(part_number)
+    try:
+        return upload_part(
+            file_path, upload_url, part_number, offset, length,
+            session=session, faststart_plan=faststart_plan,
+            progress_callback=progress_callback, md5=md5, retry_policy=retry_policy,
+            bandwidth=bandwidth, checksum=checksum,
+        )
+    except UrlExpiredError:
+        upload_url = part_urls.refresh(upload_url, part_number)
+        return upload_part(
+            file_path, upload_url, part_number, offset, length,
+            session=session, faststart_plan=faststart_plan,
+            progress_callback=progress_callback, md5=md5, retry_policy=retry_policy,
+            bandwidth=bandwidth, checksum=checksum,
+        )
 
-    raise UploadError(f"Failed to upload {file_path} after {attempt + 1} attempts: {last_error}")
+
+def complete_multipart_upload(
+    auth: SamiAuth,
+    api_url: str,
+    dataset_id: str,
+    relative_path: str,
+    upload_id: str,
+    etags: Dict[int, str],
+    retry_policy: Optional[RetryPolicy] = None,
+) -> None:
+    """Assemble uploaded parts into the final S3 object."""
+    response = (retry_policy or RetryPolicy()).call(
+        requests.post,
+        f"{api_url}/datasets/{dataset_id}/multipart-uploads/complete",
+        json={
+            "relativePath": relative_path,
+            "uploadId": upload_id,
+            "parts": [
+                {"partNumber": n, "etag": etags[n]} for n in sorted(etags)
+            ],
+        },
+        headers=auth.get_headers(),
+        idempotent=False,
+    )
+
+    if response.status_code not in (200, 201):
+        raise UploadError(f"Failed to complete multipart upload for {relative_path}: {_api_error(response)}")
+
+
+def abort_multipart_upload(
+    auth: SamiAuth,
+    api_url: str,
+    dataset_id: str,
+    relative_path: str,
+    upload_id: str,
+    retry_policy: Optional[RetryPolicy] = None,
+) -> None:
+    """Abort a multipart upload so S3 discards its parts (best effort)."""
+    try:
+        (retry_policy or RetryPolicy()).call(
+            requests.post,
+            f"{api_url}/datasets/{dataset_id}/multipart-uploads/abort",
+            json={"relativePath": relative_path, "uploadId": upload_id},
+            headers=auth.get_headers(),
+        )
+    except Exception:
+        pass
 
 
 def upload_dataset(
@@ -413,11 +1240,30 @@ def upload_dataset(
     path: str,
     description: str = None,
     task_category: str = None,
-    max_workers: int = 4,
+    max_workers: Union[int, str] = 4,
     strict: bool = True,
+    resume: bool = False,
+    journal_dir: Optional[Path] = None,
+    video_workers: Optional[int] = None,
+    worker_limits: Optional[Tuple[int, int]] = None,
+    dedup: bool = False,
+    content_index: Optional[ContentIndex] = None,
+    checksums: Optional[bool] = None,
+    max_in_flight: Optional[int] = None,
+    engine=None,
+    retry_policy: Optional[RetryPolicy] = None,
+    bandwidth: Optional[TokenBucket] = None,
 ) -> Dataset:
     """Upload a LeRobot dataset to SAMI.
 
+    Progress is journaled on disk while uploading. If the upload fails or is
+    interrupted, calling again with resume=True reuses the dataset record and
+    uploads only the files and multipart parts that did not finish.
+
+    With max_in_flight (or an engine), small files are uploaded as asyncio
+    coroutines on one thread, many more at once than there are workers
+    (see engine.py); the workers upload the large files.
+
     Args:
         auth: Authenticated SamiAuth instance
         api_url: SAMI API base URL
@@ -425,15 +1271,40 @@ def upload_dataset(
         path: Path to local LeRobot dataset
         description: Optional description
         task_category: Optional task category
-        max_workers: Number of parallel upload threads
+        max_workers: Number of parallel upload threads, or "auto" to adapt
+            concurrency to measured throughput and errors
         strict: If True, fail on missing videos/data. If False, warn only.
+        resume: Continue the previous interrupted upload of this path
+        journal_dir: Directory for upload journals (default: ~/.uz/uploads)
+        video_workers: Parallel video checks/remuxes (default: CPU count)
+        worker_limits: (min, max) concurrency when max_workers is "auto"
+        dedup: Hash files and copy content the platform already stores
+            (from earlier uploads or duplicates within this one) server-side
+            instead of uploading it. Every pending file is read once before
+            the first upload starts, so this pays off for re-exported
+            datasets rather than new ones.
+        content_index: Index of uploaded content (default: ~/.uz/content_index.json)
+        checksums: Send the MD5 of files and multipart parts as
+            Content-MD5, so S3 rejects data corrupted in transit. None (the
+            default) sends the MD5s the dedup hashing already computed and
+            no others; True also computes the missing ones, reading each
+            file or part once more just before its upload; False sends none.
+        max_in_flight: Upload small files on an asyncio TransferEngine with
+            this many requests in flight (needs aiohttp)
+        engine: TransferEngine to use instead of starting one
+        retry_policy: Backoff for failed requests; the transfers of one run
+            share a retry budget (see retry.py)
+        bandwidth: Token bucket limiting the combined rate of all transfers
+            (see bandwidth.py)
 
     Returns:
         Dataset object with metadata
     """
     dataset_path = Path(path)
+    retry_policy = retry_policy or RetryPolicy()
     if not dataset_path.exists():
         raise UploadError(f"Dataset path does not exist: {path}")
+    pool_size, concurrency = resolve_workers(max_workers, worker_limits)
 
     # Validate structure
     print("Validating LeRobot dataset structure...")
@@ -479,116 +1350,400 @@ def upload_dataset(
     if other_files:
         print(f"      - {len(other_files)} other files")
 
-    # Process videos for web compatibility (faststart)
+    # Plan web compatibility (faststart) for videos; they are streamed in
+    # faststart order during upload and the source files stay untouched
+    faststart_plans = {}
     if video_files:
         print("Optimizing videos for web streaming...")
-        processed, failed = process_videos_for_web(video_files)
-        if processed > 0:
-            # Re-scan to get updated file sizes after processing
+        faststart_plans, remuxed = plan_videos_for_web(video_files, max_workers=video_workers)
+        if remuxed > 0:
+            # Re-scan to get updated file sizes after in-place fallback remuxes
             files = list_dataset_files(dataset_path)
             video_files = [(p, r, c, s) for p, r, c, s in files if r.startswith("videos/") and r.endswith(".mp4")]
-            total_size = sum(f[3] for f in files)
-
-    # Warn about large video files (>1GB may have issues with presigned URLs)
-    large_files = [(r, s) for _, r, _, s in files if s > 1024**3]
-    if large_files:
-        print(f"\n  ⚠ Warning: {len(large_files)} files exceed 1GB:")
-        for rel_path, size in large_files[:5]:
-            print(f"      - {rel_path}: {size / (1024**3):.2f} GB")
-        if len(large_files) > 5:
-            print(f"      ... and {len(large_files) - 5} more")
-        print("    Large files may take longer to upload and could timeout.")
-        print("")
+        # Uploaded size is the size of the faststart stream
+        files = [
+            (p, r, c, faststart_plans[r].output_size if r in faststart_plans else s)
+            for p, r, c, s in files
+        ]
+        total_size = sum(f[3] for f in files)
 
-    # Warn about very large files (>5GB requires multipart upload)
-    very_large_files = [(r, s) for _, r, _, s in files if s > 5 * 1024**3]
-    if very_large_files:
-        print(f"\n  ⚠ ERROR: {len(very_large_files)} files exceed 5GB S3 single-PUT limit:")
-        for rel_path, size in very_large_files:
+    # Files over the multipart threshold are split into parts and uploaded in parallel
+    multipart_files = [f for f in files if f[3] > MULTIPART_THRESHOLD]
+    if multipart_files:
+        print(f"  {len(multipart_files)} files exceed {MULTIPART_THRESHOLD / (1024**3):.0f} GB and will use multipart upload:")
+        for _, rel_path, _, size in multipart_files[:5]:
             print(f"      - {rel_path}: {size / (1024**3):.2f} GB")
-        raise UploadError(
-            f"Files exceeding 5GB require multipart upload which is not yet supported. "
-            f"Found {len(very_large_files)} files over 5GB."
+        if len(multipart_files) > 5:
+            print(f"      ... and {len(multipart_files) - 5} more")
+
+    # Resume a previous session from its journal, or start a new one
+    journal = UploadJournal.for_dataset(dataset_path, journal_dir)
+    manifest = {rel_path: file_signature(file_path) for file_path, rel_path, _, _ in files}
+    dataset_id = None
+    completed = set()
+    open_multipart = {}
+
+    if resume and journal.load():
+        print(f"Resuming upload of dataset {journal.dataset_id}...")
+        response = retry_policy.call(
+            requests.get,
+            f"{api_url}/datasets/{journal.dataset_id}",
+            headers=auth.get_headers(),
         )
-
-    # Create dataset record
-    print("Creating dataset record...")
-    create_payload = {"name": name}
-    if description:
-        create_payload["description"] = description
-    if task_category:
-        create_payload["taskCategory"] = task_category
-
-    response = requests.post(
-        f"{api_url}/datasets",
-        json=create_payload,
-        headers=auth.get_headers(),
-    )
-
-    if response.status_code != 201:
-        try:
-            error = response.json().get("error", {}).get("message", "Unknown error")
-        except Exception:
-            error = f"HTTP {response.status_code}"
-        raise UploadError(f"Failed to create dataset: {error}")
-
-    dataset_data = response.json()["data"]
-    dataset_id = dataset_data["id"]
-    print(f"  Created dataset: {dataset_id}")
-
-    # Get upload URLs (batch by 500 to avoid request size limits)
-    print("Getting upload URLs...")
-    all_upload_urls = []
-    batch_size = 500
-
-    for i in range(0, len(files), batch_size):
-        batch = files[i : i + batch_size]
-        file_specs = [
-            {"relativePath": rel_path, "contentType": ct, "size": size}
-            for _, rel_path, ct, size in batch
-        ]
-
-        response = requests.post(
-            f"{api_url}/datasets/{dataset_id}/upload-urls",
-            json={"files": file_specs},
+        if response.status_code == 200:
+            dataset_id = journal.dataset_id
+            completed = {
+                rel_path for rel_path in journal.completed_files
+                if rel_path in manifest and journal.is_unchanged(rel_path, manifest[rel_path])
+            }
+            for rel_path, upload in journal.multipart.items():
+                if rel_path in manifest and journal.is_unchanged(rel_path, manifest[rel_path]):
+                    open_multipart[rel_path] = upload
+                else:
+                    # File changed since its parts were uploaded
+                    abort_multipart_upload(
+                        auth, api_url, dataset_id, rel_path, upload["upload_id"], retry_policy
+                    )
+            print(f"  {len(completed)}/{len(files)} files already uploaded")
+        else:
+            print(f"  Previous dataset record is no longer available (HTTP {response.status_code}), starting over")
+    elif resume:
+        print("No interrupted upload found for this path, starting a new upload")
+
+    if dataset_id is None:
+        # Create dataset record
+        print("Creating dataset record...")
+        create_payload = {"name": name}
+        if description:
+            create_payload["description"] = description
+        if task_category:
+            create_payload["taskCategory"] = task_category
+
+        response = retry_policy.call(
+            requests.post,
+            f"{api_url}/datasets",
+            json=create_payload,
             headers=auth.get_headers(),
+            idempotent=False,
         )
 
-        if response.status_code != 200:
-            try:
-                error = response.json().get("error", {}).get("message", "Unknown error")
-            except Exception:
-                error = f"HTTP {response.status_code}"
-            raise UploadError(f"Failed to get upload URLs: {error}")
+        if response.status_code != 201:
+            raise UploadError(f"Failed to create dataset: {_api_error(response)}")
 
-        all_upload_urls.extend(response.json()["data"]["uploadUrls"])
-        print(f"  Got URLs for {len(all_upload_urls)}/{len(files)} files")
+        dataset_data = response.json()["data"]
+        dataset_id = dataset_data["id"]
+        print(f"  Created dataset: {dataset_id}")
 
-    # Create mapping of relative path to upload URL
-    url_map = {u["relativePath"]: u["uploadUrl"] for u in all_upload_urls}
+    journal.start(dataset_id, name, manifest, completed, open_multipart)
+    try:
+        pending = [f for f in files if f[1] not in completed]
+
+        # With dedup, hash files once (also giving the Content-MD5 of every
+        # PUT), then skip content the platform already stores
+        hashes = {}
+        digests: Dict[str, FileDigest] = {}
+        duplicates = {}
+        if dedup and pending:
+            print("Checking for content already uploaded...")
+            if content_index is None:
+                content_index = ContentIndex()
+            try:
+                digests = hash_files(
+                    pending, content_index, faststart_plans, max_workers=video_workers,
+                    part_size_for=lambda size: multipart_part_size(size) if size > MULTIPART_THRESHOLD else None,
+                )
+                hashes = {rel_path: digest.sha256 for rel_path, digest in digests.items()}
+                pending, duplicates, copied = deduplicate_files(
+                    auth, api_url, dataset_id, pending, hashes, content_index, retry_policy
+                )
+                for rel_path in copied:
+                    journal.record_file(rel_path)
+            finally:
+                content_index.save()
+            if checksums is False:
+                digests = {}
+
+        def file_md5(rel_path: str) -> Optional[str]:
+            digest = digests.get(rel_path)
+            return digest.md5 if digest else None
+
+        def part_md5(rel_path: str, part: dict, part_count: int) -> Optional[str]:
+            digest = digests.get(rel_path)
+            if digest is None or len(digest.part_md5s) != part_count:
+                return None
+            return digest.part_md5s[part["partNumber"] - 1]
+
+        # Upload URLs are requested in concurrent batches and multipart uploads are
+        # started in the background; each batch is handed to the upload workers as
+        # soon as it arrives, so uploads start while later URLs are being issued.
+        single_files = [f for f in pending if f[3] <= MULTIPART_THRESHOLD]
+        multipart_files = [f for f in pending if f[3] > MULTIPART_THRESHOLD]
+        files_by_path = {f[1]: f for f in pending}
+        # Throttling pauses the whole run instead of every worker retrying
+        # every file to exhaustion
+        retry_policy = retry_policy.for_run()
+
+        if concurrency is not None:
+            print(f"Uploading {len(pending)} files with {concurrency.min_workers}-{pool_size} adaptive workers...")
+        else:
+            print(f"Uploading {len(pending)} files with {pool_size} workers...")
+        if bandwidth is not None:
+            print(f"  Bandwidth limit: {bandwidth.describe()}")
+        failed = []
+        interrupted = False
+        # rel_path -> {"upload_id", "parts", "part_urls", "etags", "failed"}
+        multipart = {}
+        # future -> (kind, payload); kind is "urls", "initiate", "file" or "part"
+        tasks = {}
+        done_queue = queue.Queue()
+
+        def refresh_url(file_info: Tuple[Path, str, str, int]) -> UploadUrl:
+            return request_upload_urls(auth, api_url, dataset_id, [file_info], retry_policy)[0]
+
+        def resign_parts(file_info: Tuple[Path, str, str, int]) -> dict:
+            _, rel_path, content_type, size = file_info
+            return initiate_multipart_upload(
+                auth, api_url, dataset_id, rel_path, content_type, size,
+                upload_id=multipart[rel_path]["upload_id"], retry_policy=retry_policy,
+            )
 
-    # Upload files in parallel
-    print(f"Uploading {len(files)} files with {max_workers} workers...")
-    failed = []
-    uploaded_bytes = 0
+        def start_multipart(file_info: Tuple[Path, str, str, int]) -> dict:
+            _, rel_path, content_type, size = file_info
+            previous = journal.multipart.get(rel_path)
+            return initiate_multipart_upload(
+                auth, api_url, dataset_id, rel_path, content_type, size,
+                upload_id=previous["upload_id"] if previous else None, retry_policy=retry_policy,
+            )
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {}
-        for file_path, rel_path, content_type, size in files:
-            upload_url = url_map.get(rel_path)
-            if upload_url:
-                future = executor.submit(upload_file, file_path, upload_url, content_type)
-                futures[future] = (rel_path, size)
-
-        with tqdm(total=len(futures), desc="Uploading", unit="files") as pbar:
-            for future in as_completed(futures):
-                rel_path, size = futures[future]
+        with create_transfer_session(pool_size, retry_policy.backpressure) as session, \
+                auth.keep_fresh(), \
+                ThreadPoolExecutor(max_workers=URL_REQUEST_WORKERS) as url_executor, \
+                ThreadPoolExecutor(max_workers=pool_size) as executor, \
+                transfer_engine(max_in_flight, engine) as engine:
+            if concurrency is not None:
+                session.hooks["response"].append(concurrency.observe_response)
+
+            def track(task: tuple, future) -> None:
+                tasks[future] = task
+                future.add_done_callback(done_queue.put)
+
+            def submit(pool: ThreadPoolExecutor, task: tuple, fn, *args, **kwargs) -> None:
+                if interrupted:
+                    return
+                track(task, pool.submit(fn, *args, **kwargs))
+
+            def gated(size: int, fn):
+                # With --workers auto, transfers wait for a slot from the controller
+                return functools.partial(concurrency.run, size, fn) if concurrency else fn
+
+            def finish_multipart(rel_path: str) -> None:
+                upload = multipart[rel_path]
+                try:
+                    complete_multipart_upload(
+                        auth, api_url, dataset_id, rel_path, upload["upload_id"], upload["etags"], retry_policy
+                    )
+                    journal.record_file(rel_path)
+                except Exception as e:
+                    failed.append((rel_path, str(e)))
+                progress.file_done()
+
+            def handle_urls(future, batch) -> None:
+                try:
+                    upload_urls = future.result()
+                except Exception as e:
+                    for _, rel_path, _, _ in batch:
+                        failed.append((rel_path, str(e)))
+                    progress.file_done(len(batch))
+                    return
+                # A file the server issued no URL for is never uploaded
+                issued = {upload_url.relative_path for upload_url in upload_urls}
+                missing = [rel_path for _, rel_path, _, _ in batch if rel_path not in issued]
+                for rel_path in missing:
+                    failed.append((rel_path, "No upload URL returned by the server"))
+                if missing:
+                    progress.file_done(len(missing))
+                for upload_url in upload_urls:
+                    file_info = files_by_path.get(upload_url.relative_path)
+                    if file_info is None:
+                        continue
+                    file_path, rel_path, content_type, size = file_info
+                    if engine is not None and engine.accepts(size):
+                        if not interrupted:
+                            track(("file", file_info), engine.upload(
+                                file_path, upload_url, content_type,
+                                functools.partial(refresh_url, file_info),
+                                faststart_plan=faststart_plans.get(rel_path),
+                                progress_callback=progress.callback,
+                                md5=file_md5(rel_path),
+                                retry_policy=retry_policy,
+                                bandwidth=bandwidth,
+                                checksum=bool(checksums),
+                            ))
+                        continue
+                    submit(
+                        executor, ("file", file_info), gated(size, upload_file_with_url_refresh),
+                        file_path, upload_url, content_type,
+                        functools.partial(refresh_url, file_info), session=session,
+                        faststart_plan=faststart_plans.get(rel_path),
+                        progress_callback=progress.callback,
+                        md5=file_md5(rel_path),
+                        retry_policy=retry_policy,
+                        bandwidth=bandwidth,
+                        checksum=bool(checksums),
+                    )
+
+            def handle_initiate(future, file_info) -> None:
+                file_path, rel_path, _, _ = file_info
+                try:
+                    data = future.result()
+                except Exception as e:
+                    failed.append((rel_path, str(e)))
+                    progress.file_done()
+                    return
+                previous = journal.multipart.get(rel_path)
+                if not previous:
+                    journal.record_multipart(rel_path, data["uploadId"])
+                upload = multipart[rel_path] = {
+                    "upload_id": data["uploadId"],
+                    "parts": data["parts"],
+                    "part_urls": MultipartPartUrls(
+                        data["parts"], data["expiresAt"], functools.partial(resign_parts, file_info)
+                    ),
+                    "etags": dict(previous["etags"]) if previous else {},
+                    "failed": False,
+                }
+                # Parts finished in a previous run count as already transferred
+                progress.update(sum(p["length"] for p in upload["parts"] if p["partNumber"] in upload["etags"]))
+                if len(upload["etags"]) == len(upload["parts"]):
+                    # All parts finished in a previous run
+                    finish_multipart(rel_path)
+                    return
+                for part in upload["parts"]:
+                    if part["partNumber"] in upload["etags"]:
+                        continue
+                    submit(
+                        executor, ("part", (rel_path, part)), gated(part["length"], upload_part_with_url_refresh),
+                        file_path, upload["part_urls"], part["partNumber"],
+                        part["offset"], part["length"], session=session,
+                        faststart_plan=faststart_plans.get(rel_path),
+                        progress_callback=progress.callback,
+                        md5=part_md5(rel_path, part, len(upload["parts"])),
+                        retry_policy=retry_policy,
+                        bandwidth=bandwidth,
+                        checksum=bool(checksums),
+                    )
+
+            def handle_file(future, file_info) -> None:
+                _, rel_path, _, _ = file_info
                 try:
                     future.result()
-                    uploaded_bytes += size
+                    journal.record_file(rel_path)
+                except Exception as e:
+                    failed.append((rel_path, str(e)))
+                progress.file_done()
+
+            def handle_part(future, rel_path, part) -> None:
+                upload = multipart[rel_path]
+                if upload["failed"]:
+                    return
+                try:
+                    etag = future.result()
+                    upload["etags"][part["partNumber"]] = etag
+                    journal.record_part(rel_path, part["partNumber"], etag)
                 except Exception as e:
+                    # Stop this file and skip its queued parts; finished parts
+                    # stay in the journal so --resume can reuse them
+                    upload["failed"] = True
+                    for other, (kind, payload) in tasks.items():
+                        if kind == "part" and payload[0] == rel_path:
+                            other.cancel()
                     failed.append((rel_path, str(e)))
-                pbar.update(1)
+                    progress.file_done()
+                    return
+
+                if len(upload["etags"]) == len(upload["parts"]):
+                    finish_multipart(rel_path)
+
+            def handle_result(future) -> None:
+                kind, payload = tasks[future]
+                if kind == "urls":
+                    handle_urls(future, payload)
+                elif kind == "initiate":
+                    handle_initiate(future, payload)
+                elif kind == "file":
+                    handle_file(future, payload)
+                else:
+                    handle_part(future, *payload)
+
+            pending_bytes = sum(f[3] for f in pending)
+            with TransferProgress("Uploading", pending_bytes, len(pending), pool_size) as progress:
+                for file_info in multipart_files:
+                    submit(url_executor, ("initiate", file_info), start_multipart, file_info)
+                for i in range(0, len(single_files), URL_BATCH_SIZE):
+                    batch = single_files[i : i + URL_BATCH_SIZE]
+                    submit(
+                        url_executor, ("urls", batch), request_upload_urls,
+                        auth, api_url, dataset_id, batch, retry_policy,
+                    )
+
+                handled = set()
+                try:
+                    while len(handled) < len(tasks):
+                        future = done_queue.get()
+                        handled.add(future)
+                        handle_result(future)
+                except KeyboardInterrupt:
+                    # Drain in-flight transfers so their progress is journaled
+                    interrupted = True
+                    progress.write("Interrupted - finishing in-flight transfers and saving checkpoint...")
+                    for future in tasks:
+                        future.cancel()
+                    for future in list(tasks):
+                        if future not in handled and not future.cancelled():
+                            handled.add(future)
+                            handle_result(future)
+
+        print(f"  Transferred {progress.summary()}")
+        if concurrency is not None:
+            print(f"  Finished at {concurrency.summary()}")
+        pressure = retry_policy.backpressure.summary()
+        if pressure:
+            print(f"  {pressure}")
+
+        if duplicates and not interrupted:
+            failed_paths = {path for path, _ in failed}
+            ready = {d: src for d, src in duplicates.items() if src not in failed_paths}
+            sizes = {f[1]: f[3] for f in files}
+            try:
+                copied = (
+                    copy_duplicates(auth, api_url, dataset_id, ready, hashes, sizes, retry_policy) if ready else set()
+                )
+            except UploadError as e:
+                copied = set()
+                print(f"  Warning: {e}")
+            for rel_path in duplicates:
+                if rel_path in copied:
+                    journal.record_file(rel_path)
+                else:
+                    failed.append((rel_path, f"Copy from {duplicates[rel_path]} failed"))
+            print(f"  Copied {len(copied)} duplicate files server-side")
+    finally:
+        # Flush and close the journal however the transfer ended
+        journal.close()
+
+    if hashes:
+        sizes = {f[1]: f[3] for f in files}
+        for rel_path in journal.completed_files:
+            if rel_path in hashes:
+                content_index.add(hashes[rel_path], dataset_id, rel_path, sizes[rel_path])
+        content_index.save()
+
+    if interrupted:
+        remaining = len(files) - len(journal.completed_files)
+        raise UploadError(
+            f"Upload interrupted with {remaining} files remaining. "
+            f"Run the upload again with --resume to continue."
+        )
 
     if failed:
         print(f"Warning: {len(failed)} files failed to upload")
@@ -596,13 +1751,18 @@ def upload_dataset(
             print(f"  - {path}: {error}")
         if len(failed) > 5:
             print(f"  ... and {len(failed) - 5} more")
-        raise UploadError(f"Failed to upload {len(failed)} files")
+        raise UploadError(
+            f"Failed to upload {len(failed)} files. "
+            f"Run the upload again with --resume to retry only the missing files."
+        )
 
     # Complete upload
     print("Completing upload and parsing metadata...")
-    response = requests.post(
+    response = retry_policy.call(
+        requests.post,
         f"{api_url}/datasets/{dataset_id}/complete",
         headers=auth.get_headers(),
+        idempotent=False,
     )
 
     if response.status_code != 200:
@@ -612,6 +1772,7 @@ def upload_dataset(
             error = f"HTTP {response.status_code}"
         raise UploadError(f"Failed to complete upload: {error}")
 
+    journal.remove()
     dataset = Dataset.from_api_response(response.json()["data"])
     print(f"Upload complete! Dataset '{dataset.name}' is ready.")
     return dataset
@@ -0,0 +1,62 @@
+"""Unit tests for the API calls shared by both clients."""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from sami_cli import api
+from sami_cli.client import SamiClient
+from sami_cli.exceptions import AuthenticationError, NotFoundError, SamiError
+
+
+class TestApiCall:
+    """Tests for mapping responses to results and errors."""
+
+    @pytest.mark.unit
+    def test_result_and_errors(self):
+        """Test a success returns "data", mapped statuses raise their error and others SamiError."""
+        call = api.get_dataset("ds1")
+
+        assert call.result(200, {"data": {"id": "ds1"}}) == {"id": "ds1"}
+        with pytest.raises(NotFoundError, match="Dataset not found: ds1"):
+            call.result(404, None)
+        with pytest.raises(SamiError, match="Failed to get dataset: Boom"):
+            call.result(500, {"error": {"message": "Boom"}})
+        with pytest.raises(SamiError, match="Failed to get dataset: HTTP 502"):
+            call.result(502, None)
+        with pytest.raises(AuthenticationError):
+            api.get_current_user().result(401, None)
+
+    @pytest.mark.unit
+    def test_request(self):
+        """Test calls carry their parameters and body, and POSTs are not idempotent."""
+        listing = api.list_datasets(2, 50, "ready")
+        conversion = api.request_conversion("ds1", "hdf5")
+
+        assert listing.request_kwargs() == {"params": {"page": 2, "limit": 50, "status": "ready"}}
+        assert listing.idempotent
+        assert conversion.request_kwargs() == {"json": {"targetFormat": "hdf5"}}
+        assert not conversion.idempotent
+        assert api.delete_dataset("ds1").result(204, None) is None
+        with pytest.raises(ValueError):
+            api.assign_dataset("ds1", "org1", "owner")
+
+
+class TestSamiClientCalls:
+    """Tests for SamiClient sending API calls."""
+
+    @pytest.mark.unit
+    def test_sends_call(self):
+        """Test the client sends the call's request and maps its response."""
+        client = SamiClient(api_url="http://api")
+        client.auth.access_token = "token"
+        response = Mock(status_code=201)
+        response.json.return_value = {"data": {"status": "pending"}}
+
+        with patch("sami_cli.client.requests.post", return_value=response) as post:
+            assert client.request_conversion("ds1", "hdf5") == {"status": "pending"}
+
+        post.assert_called_once_with(
+            "http://api/datasets/ds1/convert",
+            headers={"Authorization": "Bearer token"},
+            json={"targetFormat": "hdf5"},
+        )
@@ -1,12 +1,36 @@
 """Tests for sami_cli.auth module."""
 
+import base64
+import json
+import threading
+import time
+
 import pytest
+import requests
 from unittest.mock import Mock, patch
 
+from sami_cli import auth as auth_module
 from sami_cli.auth import SamiAuth
 from sami_cli.exceptions import AuthenticationError
 
 
+def make_token(expires_in: float, name: str = "token") -> str:
+    """Build an unsigned JWT expiring expires_in seconds from now."""
+    payload = base64.urlsafe_b64encode(
+        json.dumps({"exp": time.time() + expires_in, "sub": name}).encode()
+    ).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+def refresh_response(access_token: str, refresh_token: str = "refresh-2") -> Mock:
+    """Build a successful /auth/refresh-token response."""
+    response = Mock(status_code=200)
+    response.json.return_value = {
+        "data": {"access": {"token": access_token}, "refresh": {"token": refresh_token}}
+    }
+    return response
+
+
 class TestSamiAuthUnit:
     """Unit tests for SamiAuth (mocked)."""
 
@@ -119,6 +143,101 @@ class TestSamiAuthUnit:
         assert "No access token" in str(exc_info.value)
 
 
+class TestTokenRefresh:
+    """Unit tests for refreshing tokens shared by many threads."""
+
+    @pytest.mark.unit
+    def test_expiry_decoded_from_token(self):
+        """Test the exp claim decides whether the token counts as expired."""
+        auth = SamiAuth("http://localhost:5001/api/v1")
+
+        auth.access_token = make_token(3600)
+        assert auth.is_token_expired() is False
+        auth.access_token = make_token(30)
+        assert auth.is_token_expired() is True
+        auth.access_token = "not-a-jwt"
+        assert auth.token_expires_at() is None
+        assert auth.is_token_expired() is True
+
+    @pytest.mark.unit
+    def test_concurrent_callers_share_one_refresh(self):
+        """Test threads finding the token expired wait for a single refresh."""
+        auth = SamiAuth("http://localhost:5001/api/v1")
+        auth.access_token = make_token(-10, "old")
+        auth.refresh_token = "refresh-1"
+        new_token = make_token(3600, "new")
+        saved = []
+        auth._on_tokens_refreshed = lambda access, refresh: saved.append((access, refresh))
+
+        def slow_refresh(*args, **kwargs):
+            time.sleep(0.05)
+            return refresh_response(new_token)
+
+        headers = []
+        with patch("sami_cli.auth.requests.post", side_effect=slow_refresh) as mock_post:
+            threads = [threading.Thread(target=lambda: headers.append(auth.get_headers())) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert mock_post.call_count == 1
+        assert saved == [(new_token, "refresh-2")]
+        assert headers == [{"Authorization": f"Bearer {new_token}"}] * 8
+
+    @pytest.mark.unit
+    def test_refresh_if_stale_skips_replaced_token(self):
+        """Test a caller holding a token someone else replaced does not refresh again."""
+        auth = SamiAuth("http://localhost:5001/api/v1")
+        auth.access_token = make_token(-10, "new")
+        auth.refresh_token = "refresh-1"
+
+        with patch("sami_cli.auth.requests.post") as mock_post:
+            assert auth.refresh_if_stale(make_token(-10, "old")) is True
+
+        mock_post.assert_not_called()
+
+    @pytest.mark.unit
+    def test_timed_out_refresh_releases_lock(self):
+        """Test the refresh request has a timeout and a timed-out refresh lets the next caller retry."""
+        auth = SamiAuth("http://localhost:5001/api/v1")
+        auth.access_token = make_token(-10, "old")
+        auth.refresh_token = "refresh-1"
+        new_token = make_token(3600, "new")
+
+        with patch(
+            "sami_cli.auth.requests.post",
+            side_effect=[requests.Timeout("read timed out"), refresh_response(new_token)],
+        ) as mock_post:
+            with pytest.raises(requests.Timeout):
+                auth.refresh()
+            assert auth.refresh() is True
+
+        assert all(c.kwargs["timeout"] == auth_module.REFRESH_TIMEOUT for c in mock_post.call_args_list)
+        assert auth.access_token == new_token
+
+    @pytest.mark.unit
+    def test_keep_fresh_refreshes_before_expiry(self, monkeypatch):
+        """Test the background refresh renews a token nearing expiry."""
+        monkeypatch.setattr(auth_module, "BACKGROUND_RETRY_INTERVAL", 10)
+        auth = SamiAuth("http://localhost:5001/api/v1")
+        auth.access_token = make_token(120, "old")
+        auth.refresh_token = "refresh-1"
+        new_token = make_token(3600, "new")
+        refreshed = threading.Event()
+        auth._on_tokens_refreshed = lambda access, refresh: refreshed.set()
+
+        with patch("sami_cli.auth.requests.post", return_value=refresh_response(new_token)) as mock_post:
+            with auth.keep_fresh():
+                assert refreshed.wait(5)
+                thread = auth._keep_fresh_thread
+            thread.join(5)
+
+        assert not thread.is_alive()
+        assert mock_post.call_count == 1
+        assert auth.access_token == new_token
+
+
 class TestSamiAuthIntegration:
     """Integration tests for SamiAuth (requires running backend)."""
 
@@ -0,0 +1,115 @@
+"""Unit tests for back-pressure shared by transfer workers."""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from sami_cli.backpressure import OPEN_COOLDOWN, PAUSE, PROBE_POLL, Backpressure
+from sami_cli.exceptions import CircuitOpenError
+from sami_cli.session import create_transfer_session
+
+
+@pytest.fixture
+def clock():
+    """Controllable time.monotonic() for the back-pressure module."""
+    with patch("sami_cli.backpressure.time.monotonic", return_value=100.0) as monotonic:
+        yield monotonic
+
+
+class TestBackpressure:
+    """Tests for pausing, probing and opening circuits per host."""
+
+    @pytest.mark.unit
+    def test_throttle_pauses_host_until_probe_succeeds(self, clock):
+        """Test a 503 pauses the host, then one probe goes out before the rest."""
+        backpressure = Backpressure()
+        backpressure.record("s3", 503, retry_after=2.0)
+
+        assert backpressure._admit("s3") == (2.0, False)
+        assert backpressure._admit("api") == (0.0, False)
+
+        clock.return_value = 102.0
+        assert backpressure.acquire("s3") is True
+        assert backpressure._admit("s3") == (PROBE_POLL, False)
+
+        backpressure.record("s3", 200, probe=True)
+        assert backpressure._admit("s3") == (0.0, False)
+        assert backpressure.throttles == 1
+
+    @pytest.mark.unit
+    def test_burst_of_throttles_pauses_once(self, clock):
+        """Test concurrent throttles keep the pause at PAUSE; a throttled probe doubles it."""
+        backpressure = Backpressure()
+        for offset in (0.0, 0.1, 0.2, 0.3):
+            clock.return_value = 100.0 + offset
+            backpressure.record("s3", 503)
+
+        assert backpressure._hosts["s3"].pause == PAUSE
+        assert backpressure._admit("s3") == (pytest.approx(PAUSE), False)
+        assert backpressure.throttles == 4
+
+        clock.return_value = 102.0
+        assert backpressure.acquire("s3") is True
+        backpressure.record("s3", 503, probe=True)
+        assert backpressure._hosts["s3"].pause == 2 * PAUSE
+
+    @pytest.mark.unit
+    def test_in_flight_success_does_not_end_pause(self, clock):
+        """Test a request sent before the pause cannot lift it; only the probe can."""
+        backpressure = Backpressure()
+        backpressure.record("s3", 429)
+        backpressure.record("s3", 200)
+
+        clock.return_value = 200.0
+        assert backpressure.acquire("s3") is True
+
+    @pytest.mark.unit
+    def test_circuit_opens_after_repeated_failures(self, clock):
+        """Test failures in a row open the circuit and a failed probe extends it."""
+        backpressure = Backpressure(failure_threshold=3)
+        for _ in range(3):
+            backpressure.record("s3", None)
+
+        assert backpressure._admit("s3") == (OPEN_COOLDOWN, False)
+
+        clock.return_value += OPEN_COOLDOWN
+        assert backpressure.acquire("s3") is True
+        backpressure.record("s3", 500, probe=True)
+
+        assert backpressure._admit("s3") == (2 * OPEN_COOLDOWN, False)
+        assert backpressure.circuit_opens == 1
+        assert "circuit opened 1 times" in backpressure.summary()
+
+    @pytest.mark.unit
+    def test_long_outage_fails_at_once(self, clock):
+        """Test requests fail immediately once the host failed for max_outage."""
+        backpressure = Backpressure(failure_threshold=1, max_outage=30.0)
+        backpressure.record("s3", None)
+
+        clock.return_value += 31.0
+        with pytest.raises(CircuitOpenError):
+            backpressure.acquire("s3")
+
+    @pytest.mark.unit
+    def test_request_records_errors(self, clock):
+        """Test an exception inside request() counts as a failure of the host."""
+        backpressure = Backpressure(failure_threshold=1)
+
+        with pytest.raises(ConnectionError):
+            with backpressure.request("https://s3.example.com/bucket/key"):
+                raise ConnectionError("reset")
+
+        assert backpressure._admit("s3.example.com")[0] > 0
+
+    @pytest.mark.unit
+    def test_transfer_session_is_gated(self, clock):
+        """Test responses of a transfer session are seen by its back-pressure."""
+        backpressure = Backpressure()
+        session = create_transfer_session(2, backpressure)
+        response = Mock(status_code=503, headers={"Retry-After": "5"})
+
+        adapter = session.get_adapter("https://s3.example.com/key")
+        with patch("requests.adapters.HTTPAdapter.send", return_value=response):
+            assert adapter.send(Mock(url="https://s3.example.com/key")) is response
+
+        assert backpressure.throttles == 1
+        assert backpressure._admit("s3.example.com") == (5.0, False)
@@ -0,0 +1,144 @@
+"""Unit tests for bandwidth limits."""
+
+import datetime
+import io
+
+import pytest
+from unittest.mock import patch
+
+from sami_cli.bandwidth import (
+    BandwidthSchedule,
+    LimitedBody,
+    TokenBucket,
+    limit_bandwidth,
+    parse_bandwidth,
+)
+from sami_cli.exceptions import ValidationError
+
+
+@pytest.fixture
+def clock():
+    """Controllable time.monotonic() for the bandwidth module."""
+    with patch("sami_cli.bandwidth.time.monotonic", return_value=100.0) as monotonic:
+        yield monotonic
+
+
+class TestParseBandwidth:
+    """Tests for parsing --max-bandwidth values."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ("50Mbit", 6_250_000),
+            ("50mbps", 6_250_000),
+            ("6MB/s", 6_000_000),
+            ("800kbit", 100_000),
+            ("1G", 125_000_000),
+            ("100", 12_500_000),
+            ("unlimited", None),
+            ("off", None),
+        ],
+    )
+    def test_units(self, value, expected):
+        """Test bits, bytes, prefixes and the Mbit default."""
+        assert parse_bandwidth(value) == expected
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("value", ["fast", "50 furlongs", "-5Mbit", "0"])
+    def test_invalid(self, value):
+        """Test unparsable or zero rates are rejected."""
+        with pytest.raises(ValidationError):
+            parse_bandwidth(value)
+
+
+class TestBandwidthSchedule:
+    """Tests for limits by time of day."""
+
+    @pytest.mark.unit
+    def test_windows(self):
+        """Test the first matching window wins, full speed outside all of them."""
+        schedule = BandwidthSchedule.parse("08:00-20:00=50Mbit, 20:00-23:00=200Mbit")
+        day = datetime.datetime(2024, 1, 1, 12, 30)
+
+        assert schedule.rate_at(day) == 6_250_000
+        assert schedule.rate_at(day.replace(hour=20)) == 25_000_000
+        assert schedule.rate_at(day.replace(hour=3)) is None
+
+    @pytest.mark.unit
+    def test_window_past_midnight(self):
+        """Test a window ending after midnight covers both sides of it."""
+        schedule = BandwidthSchedule.parse("22:00-06:00=10Mbit")
+        night = datetime.datetime(2024, 1, 1, 23, 0)
+
+        assert schedule.rate_at(night) == 1_250_000
+        assert schedule.rate_at(night.replace(hour=5, minute=59)) == 1_250_000
+        assert schedule.rate_at(night.replace(hour=6)) is None
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("spec", ["08:00=50Mbit", "8-20=50Mbit", "08:00-25:00=1Mbit", "08:00-20:00"])
+    def test_invalid(self, spec):
+        """Test malformed schedules are rejected."""
+        with pytest.raises(ValidationError):
+            BandwidthSchedule.parse(spec)
+
+
+class TestTokenBucket:
+    """Tests for the shared token bucket."""
+
+    @pytest.mark.unit
+    def test_burst_then_wait(self, clock):
+        """Test a full bucket lets a burst through, then callers wait in turn."""
+        bucket = TokenBucket(rate=1000, burst_seconds=1.0)
+        clock.return_value = 110.0
+
+        assert bucket.reserve(1000) == 0.0
+        assert bucket.reserve(500) == pytest.approx(0.5)
+        assert bucket.reserve(500) == pytest.approx(1.0)
+
+        clock.return_value = 111.0
+        assert bucket.reserve(0) == 0.0
+
+    @pytest.mark.unit
+    def test_schedule(self, clock):
+        """Test a scheduled bucket follows the rate of the current window."""
+        schedule = BandwidthSchedule([(0, 24 * 60, 1000)])
+        bucket = TokenBucket(schedule=schedule, burst_seconds=0.0)
+
+        assert bucket.current_rate() == 1000
+        assert bucket.reserve(2000) == pytest.approx(2.0)
+        assert "schedule" in bucket.describe()
+
+    @pytest.mark.unit
+    def test_unlimited(self, clock):
+        """Test a bucket without a limit never waits."""
+        schedule = BandwidthSchedule([])
+        assert TokenBucket(schedule=schedule).reserve(10**9) == 0.0
+
+    @pytest.mark.unit
+    def test_limited_body(self, clock):
+        """Test a limited body takes tokens for every block it reads."""
+        bucket = TokenBucket(rate=1000, burst_seconds=0.0)
+        body = LimitedBody(io.BytesIO(b"x" * 3000), 3000, bucket)
+
+        with patch("sami_cli.bandwidth.time.sleep") as sleep:
+            assert len(body) == 3000
+            assert b"".join(body) == b"x" * 3000
+
+        sleep.assert_called_once_with(pytest.approx(3.0))
+
+
+class TestLimitBandwidth:
+    """Tests for building a run's bucket from the options."""
+
+    @pytest.mark.unit
+    def test_options(self):
+        """Test a rate overrides the schedule and "unlimited" disables both."""
+        assert limit_bandwidth() is None
+        assert limit_bandwidth("unlimited", "08:00-20:00=50Mbit") is None
+
+        bucket = limit_bandwidth("10Mbit", "08:00-20:00=50Mbit")
+        assert bucket.rate == 1_250_000
+        assert bucket.schedule is None
+
+        assert limit_bandwidth(schedule="08:00-20:00=50Mbit").schedule is not None
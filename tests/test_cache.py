@@ -0,0 +1,169 @@
+"""Unit tests for the shared download cache."""
+
+import hashlib
+import io
+import os
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+from sami_cli.cache import ContentCache, FileLock
+from sami_cli.download import download_dataset
+
+
+def url_info(path: str, body: bytes, etag: bool = True) -> dict:
+    info = {"relativePath": path, "size": len(body), "downloadUrl": f"https://s3/{path}"}
+    if etag:
+        info["etag"] = f'"{hashlib.md5(body).hexdigest()}"'
+    return info
+
+
+def set_atime(path: Path, atime_ns: int) -> None:
+    os.utime(path, ns=(atime_ns, path.stat().st_mtime_ns))
+
+
+class TestContentCache:
+    """Tests for cache keys, linking and eviction."""
+
+    @pytest.mark.unit
+    def test_same_content_shares_an_object(self, tmp_path: Path):
+        """Test files with the same checksum map to one object across datasets."""
+        cache = ContentCache(tmp_path)
+
+        a = cache.object_path("ds1", url_info("a.bin", b"hello"))
+        b = cache.object_path("ds2", url_info("other/b.bin", b"hello"))
+        c = cache.object_path("ds1", url_info("a.bin", b"hello", etag=False))
+
+        assert a == b
+        assert a.parent.parent.name == "md5"
+        assert c.parent.parent.name == "path" and c != a
+
+    @pytest.mark.unit
+    def test_fetch_fills_once_and_links(self, tmp_path: Path):
+        """Test a missing object is downloaded once, sealed, and placed at every output."""
+        cache = ContentCache(tmp_path / "cache")
+        object_path = cache.object_path("ds1", url_info("a.bin", b"hello"))
+        fill = Mock(side_effect=lambda path: path.write_bytes(b"hello"))
+
+        first = cache.fetch(object_path, tmp_path / "out1/a.bin", 5, fill)
+        second = cache.fetch(object_path, tmp_path / "out2/a.bin", 5, fill)
+
+        assert (first, second) == (False, True)
+        fill.assert_called_once_with(object_path)
+        assert (tmp_path / "out2/a.bin").read_bytes() == b"hello"
+        assert not object_path.stat().st_mode & 0o222
+
+    @pytest.mark.unit
+    def test_copy_when_links_fail(self, tmp_path: Path):
+        """Test outputs are copied where neither reflinks nor hardlinks work."""
+        cache = ContentCache(tmp_path / "cache")
+        object_path = cache.root / "objects/md5/ab/abc-5"
+        object_path.parent.mkdir(parents=True)
+        object_path.write_bytes(b"hello")
+
+        with patch("sami_cli.cache._reflink", return_value=False), \
+                patch("sami_cli.cache.os.link", side_effect=OSError(18, "Invalid cross-device link")):
+            method = cache.materialize(object_path, tmp_path / "out/a.bin")
+
+        assert method == "copy"
+        assert (tmp_path / "out/a.bin").read_bytes() == b"hello"
+
+    @pytest.mark.unit
+    def test_evicts_least_recently_used(self, tmp_path: Path):
+        """Test the objects used longest ago are deleted until the cache fits."""
+        cache = ContentCache(tmp_path, max_size=10)
+        paths = []
+        for i, name in enumerate(["old", "mid", "new"]):
+            path = cache.objects_dir / "md5" / name[:2] / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"x" * 5)
+            set_atime(path, (i + 1) * 10**18)
+            paths.append(path)
+        (cache.objects_dir / "md5/ne/new.lock").write_bytes(b"")
+
+        assert cache.evict() == (1, 5)
+        assert [p.exists() for p in paths] == [False, True, True]
+        assert cache.size() == 10
+
+    @pytest.mark.unit
+    def test_locked_objects_not_evicted(self, tmp_path: Path):
+        """Test an object another download holds is skipped by eviction."""
+        cache = ContentCache(tmp_path, max_size=0)
+        path = cache.objects_dir / "md5/ab/abc"
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"x")
+
+        with cache.locked(path):
+            assert cache.evict() == (0, 0)
+        assert cache.evict() == (1, 1)
+
+    @pytest.mark.unit
+    def test_file_lock_is_exclusive(self, tmp_path: Path):
+        """Test a held lock cannot be taken again until it is released."""
+        held = FileLock(tmp_path / "x.lock")
+        other = FileLock(tmp_path / "x.lock")
+
+        assert held.acquire()
+        assert not other.acquire(blocking=False)
+        held.release()
+        assert other.acquire(blocking=False)
+        other.release()
+
+
+class TestCachedDownload:
+    """Tests for download_dataset through a cache."""
+
+    BODIES = {"meta/info.json": b"{}", "data/a.parquet": b"parquet", "videos/a.mp4": b"video" * 100}
+
+    def download(self, output_dir: Path, cache: ContentCache, **kwargs):
+        """Download the test dataset, returning the URLs fetched from S3."""
+        listing = [url_info(path, body) for path, body in self.BODIES.items()]
+        api_response = Mock(status_code=200)
+        api_response.json.return_value = {"data": {"downloadUrls": listing, "totalFiles": len(listing)}}
+        bodies = {u["downloadUrl"]: self.BODIES[u["relativePath"]] for u in listing}
+        fetched = []
+
+        def get(url, headers=None, **_):
+            fetched.append(url)
+            body = bodies[url]
+            start = int(headers["Range"][len("bytes="):].split("-")[0]) if headers else 0
+            end = int(headers["Range"].split("-")[1]) + 1 if headers else len(body)
+            response = MagicMock()
+            response.__enter__.return_value = response
+            response.status_code = 206 if headers else 200
+            response.headers = {"Content-Range": f"bytes {start}-{end - 1}/{len(body)}"} if headers else {}
+            response.raw.readinto.side_effect = io.BytesIO(body[start:end]).readinto
+            return response
+
+        auth = MagicMock()
+        auth.get_headers.return_value = {}
+        with patch("sami_cli.download.requests.get", return_value=api_response), \
+                patch("sami_cli.download.requests.Session.get", side_effect=get):
+            download_dataset(auth, "http://api", "ds1", str(output_dir), cache=cache, **kwargs)
+        return fetched
+
+    @pytest.mark.unit
+    def test_second_download_transfers_nothing(self, tmp_path: Path):
+        """Test a dataset downloaded once is linked into a new directory without requests."""
+        cache = ContentCache(tmp_path / "cache")
+
+        first = self.download(tmp_path / "out1", cache)
+        second = self.download(tmp_path / "out2", cache)
+
+        assert len(first) == 3
+        assert second == []
+        for path, body in self.BODIES.items():
+            assert (tmp_path / "out2" / path).read_bytes() == body
+
+    @pytest.mark.unit
+    def test_segmented_file_downloaded_into_cache(self, tmp_path: Path):
+        """Test a file fetched in segments is assembled in the cache and then linked."""
+        cache = ContentCache(tmp_path / "cache")
+
+        fetched = self.download(tmp_path / "out1", cache, segment_size=128, segment_threshold=256)
+        second = self.download(tmp_path / "out2", cache, segment_size=128, segment_threshold=256)
+
+        assert fetched.count("https://s3/videos/a.mp4") == 4
+        assert second == []
+        assert (tmp_path / "out2/videos/a.mp4").read_bytes() == self.BODIES["videos/a.mp4"]
+        assert not list(cache.objects_dir.rglob("*.part"))
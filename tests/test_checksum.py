@@ -0,0 +1,128 @@
+"""Unit tests for transfer checksums and download verification."""
+
+import base64
+import hashlib
+import pytest
+from pathlib import Path
+
+from sami_cli.checksum import (
+    ExpectedChecksum,
+    StreamingChecksum,
+    content_md5,
+    expected_checksum,
+    multipart_etag,
+    verify_download,
+)
+from sami_cli.exceptions import ChecksumError
+from sami_cli.sync import LocalManifest
+
+
+def md5(data: bytes) -> str:
+    return hashlib.md5(data).hexdigest()
+
+
+class TestExpectedChecksum:
+    """Tests for reading checksums from the download listing."""
+
+    @pytest.mark.unit
+    def test_content_md5_is_base64(self):
+        """Test the Content-MD5 header carries the binary digest in base64."""
+        assert base64.b64decode(content_md5(md5(b"hello"))) == hashlib.md5(b"hello").digest()
+
+    @pytest.mark.unit
+    def test_plain_etag(self):
+        """Test a quoted single-part ETag is an MD5."""
+        url_info = {"size": 5, "etag": f'"{md5(b"hello").upper()}"'}
+
+        assert expected_checksum(url_info) == ExpectedChecksum("md5", md5(b"hello"))
+
+    @pytest.mark.unit
+    def test_sha256_preferred(self):
+        """Test a SHA-256 from the listing wins over the ETag."""
+        url_info = {"size": 5, "etag": md5(b"hello"), "sha256": "AB" * 32}
+
+        assert expected_checksum(url_info) == ExpectedChecksum("sha256", "ab" * 32)
+
+    @pytest.mark.unit
+    def test_multipart_etag_needs_reported_part_size(self):
+        """Test a multipart ETag is only checked when the listing reports a fitting part size."""
+        url_info = {"size": 2500, "etag": '"0123456789abcdef0123456789abcdef-3"'}
+
+        assert expected_checksum({**url_info, "partSize": 1000}) == ExpectedChecksum(
+            "multipart", "0123456789abcdef0123456789abcdef-3", 1000
+        )
+        assert expected_checksum({**url_info, "partSize": 2000}) is None
+        # Never guessed: 3 parts of 1000 bytes fit, but so would other sizes
+        assert expected_checksum(url_info) is None
+
+    @pytest.mark.unit
+    def test_unknown_etag_ignored(self):
+        """Test ETags that are not MD5 based are not checked."""
+        assert expected_checksum({"size": 1, "etag": '"not-an-md5"'}) is None
+        assert expected_checksum({"size": 1}) is None
+
+
+class TestStreamingChecksum:
+    """Tests for hashing files as they are written."""
+
+    @pytest.mark.unit
+    def test_multipart_across_chunk_boundaries(self):
+        """Test part MD5s are split at part boundaries whatever the chunk sizes."""
+        data = bytes(range(250))
+        etag = multipart_etag([md5(data[:100]), md5(data[100:200]), md5(data[200:])])
+        checksum = StreamingChecksum(ExpectedChecksum("multipart", etag, 100))
+
+        for start in range(0, len(data), 30):
+            checksum.update(data[start:start + 30])
+
+        checksum.verify("file.bin")
+
+    @pytest.mark.unit
+    def test_mismatch_raises(self):
+        """Test different content fails verification."""
+        checksum = StreamingChecksum(ExpectedChecksum("md5", md5(b"hello")))
+        checksum.update(b"jello")
+
+        with pytest.raises(ChecksumError, match="file.bin"):
+            checksum.verify("file.bin")
+
+    @pytest.mark.unit
+    def test_hash_file_prefix(self, tmp_path: Path):
+        """Test catching up on the bytes of a partial file."""
+        path = tmp_path / "file.bin.part"
+        path.write_bytes(b"hello world")
+        checksum = StreamingChecksum(ExpectedChecksum("sha256", hashlib.sha256(b"hello world").hexdigest()))
+
+        checksum.hash_file(path, 6)
+        checksum.update(b"world")
+
+        assert checksum.position == 11
+        checksum.verify("file.bin")
+
+
+class TestVerifyDownload:
+    """Tests for re-checking a downloaded tree."""
+
+    @pytest.mark.unit
+    def test_reports_and_forgets_bad_files(self, tmp_path: Path):
+        """Test corrupt and missing files are reported and dropped from the manifest."""
+        listing = {
+            "good.bin": (b"good", md5(b"good")),
+            "bad.bin": (b"b4d!", md5(b"bad!")),
+            "gone.bin": (b"gone", md5(b"gone")),
+            "plain.bin": (b"none", None),
+        }
+        manifest = LocalManifest(tmp_path)
+        for rel_path, (data, etag) in listing.items():
+            (tmp_path / rel_path).write_bytes(data)
+            manifest.record({"relativePath": rel_path, "size": len(data), "etag": etag})
+        manifest.save()
+        (tmp_path / "gone.bin").unlink()
+
+        result = verify_download(tmp_path, max_workers=2)
+
+        assert result.verified == ["good.bin"]
+        assert list(result.corrupt) == ["bad.bin"]
+        assert result.missing == ["gone.bin"]
+        assert result.unchecked == ["plain.bin"]
+        assert sorted(LocalManifest(tmp_path).entries) == ["good.bin", "plain.bin"]
@@ -0,0 +1,138 @@
+"""Unit tests for adaptive transfer concurrency."""
+
+import threading
+import time
+import pytest
+from datetime import timedelta
+from unittest.mock import Mock
+
+from sami_cli.concurrency import (
+    AdaptiveConcurrency,
+    parse_worker_limits,
+    parse_workers,
+    resolve_workers,
+)
+from sami_cli.exceptions import ValidationError
+
+
+def window(concurrency: AdaptiveConcurrency, num_bytes: int, requests: int = 10, errors: int = 0) -> int:
+    """Feed one measurement window and return the resulting limit."""
+    start = concurrency._window_start
+    concurrency._bytes = num_bytes
+    concurrency._requests = requests
+    concurrency._errors = errors
+    with concurrency._cond:
+        concurrency._maybe_adjust(start + concurrency.interval)
+    return concurrency.limit
+
+
+class TestWorkerSettings:
+    """Tests for parsing --workers and --worker-limits."""
+
+    @pytest.mark.unit
+    def test_parse_workers(self):
+        """Test numbers and 'auto' are accepted."""
+        assert parse_workers("8") == 8
+        assert parse_workers("auto") == "auto"
+        with pytest.raises(ValidationError):
+            parse_workers("0")
+        with pytest.raises(ValidationError):
+            parse_workers("many")
+
+    @pytest.mark.unit
+    def test_parse_worker_limits(self):
+        """Test MIN:MAX ranges are validated."""
+        assert parse_worker_limits("2:64") == (2, 64)
+        with pytest.raises(ValidationError):
+            parse_worker_limits("8:2")
+
+    @pytest.mark.unit
+    def test_resolve_workers(self):
+        """Test fixed counts have no controller and auto sizes the pool to the max."""
+        assert resolve_workers(6) == (6, None)
+        pool_size, concurrency = resolve_workers("auto", (2, 16))
+        assert pool_size == 16
+        assert concurrency.min_workers == 2
+
+
+class TestAdaptiveConcurrency:
+    """Tests for the goodput hill climber."""
+
+    @pytest.mark.unit
+    def test_grows_while_goodput_improves(self):
+        """Test slow start doubles the limit and stops at the upper bound."""
+        concurrency = AdaptiveConcurrency(1, 20, initial=2)
+
+        assert window(concurrency, 100) == 4
+        assert window(concurrency, 200) == 8
+        assert window(concurrency, 400) == 16
+        assert window(concurrency, 800) == 20
+
+    @pytest.mark.unit
+    def test_steps_back_when_goodput_drops(self):
+        """Test a regression after growing reverses direction."""
+        concurrency = AdaptiveConcurrency(1, 32, initial=4)
+        window(concurrency, 100)
+
+        assert window(concurrency, 50) == 7
+
+    @pytest.mark.unit
+    def test_halves_on_server_errors(self):
+        """Test a high 5xx rate cuts the limit in half, not below the minimum."""
+        concurrency = AdaptiveConcurrency(3, 32, initial=16)
+
+        assert window(concurrency, 100, requests=10, errors=3) == 8
+        assert window(concurrency, 100, requests=10, errors=3) == 4
+        assert window(concurrency, 100, requests=10, errors=3) == 3
+
+    @pytest.mark.unit
+    def test_response_hook_counts_5xx(self):
+        """Test the session hook records server errors and latency."""
+        concurrency = AdaptiveConcurrency(1, 8)
+        elapsed = Mock(total_seconds=Mock(return_value=0.2))
+        get = Mock(body=None)
+
+        concurrency.observe_response(Mock(status_code=503, elapsed=elapsed, request=get))
+        concurrency.observe_response(Mock(status_code=200, elapsed=elapsed, request=get))
+
+        assert (concurrency._requests, concurrency._errors) == (2, 1)
+        assert concurrency._latency_count == 2
+
+    @pytest.mark.unit
+    def test_upload_time_not_counted_as_latency(self):
+        """Test a PUT's time, which grows with its body, never steps the limit down."""
+        concurrency = AdaptiveConcurrency(1, 8, initial=4)
+        concurrency.observe_response(Mock(status_code=200, elapsed=timedelta(seconds=0.1), request=Mock(body=None)))
+        limit = window(concurrency, 100)
+
+        # Large parts take far longer to send than the small files before
+        # them, with nothing congested
+        for _ in range(4):
+            concurrency.observe_response(
+                Mock(status_code=200, elapsed=timedelta(seconds=5.0), request=Mock(body=b"part"))
+            )
+
+        assert window(concurrency, 100) == limit
+
+    @pytest.mark.unit
+    def test_limit_caps_in_flight_transfers(self):
+        """Test run() never lets more than `limit` transfers run at once."""
+        concurrency = AdaptiveConcurrency(1, 8, initial=2, interval=3600)
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def transfer():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+
+        threads = [threading.Thread(target=concurrency.run, args=(1, transfer)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak[0] == 2
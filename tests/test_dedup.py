@@ -0,0 +1,108 @@
+"""Unit tests for content hashing and the dedup index."""
+
+import hashlib
+import io
+import os
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from sami_cli import dedup
+from sami_cli.dedup import ContentIndex, FileDigest, hash_files, hash_stream
+
+
+def dataset_files(*paths: Path):
+    return [(p, p.name, "application/octet-stream", p.stat().st_size) for p in paths]
+
+
+class TestContentIndex:
+    """Tests for persisting uploaded content and file hashes."""
+
+    @pytest.mark.unit
+    def test_round_trip(self, tmp_path: Path):
+        """Test saved entries are found by a new index."""
+        index = ContentIndex(tmp_path / "index.json")
+        index.add("abc", "ds1", "a.bin", 3)
+        index.save()
+
+        assert ContentIndex(tmp_path / "index.json").lookup("abc") == ("ds1", "a.bin")
+
+    @pytest.mark.unit
+    def test_oldest_entries_dropped(self, tmp_path: Path):
+        """Test the index stays within max_entries."""
+        index = ContentIndex(tmp_path / "index.json", max_entries=2)
+        for sha in ("a", "b", "c"):
+            index.add(sha, "ds1", sha, 1)
+
+        assert index.lookup("a") is None
+        assert len(index) == 2
+
+
+class TestHashFiles:
+    """Tests for parallel content hashing."""
+
+    @pytest.mark.unit
+    def test_hashes_and_caches(self, tmp_path: Path):
+        """Test files are hashed once and unchanged files reuse the cached hash."""
+        path = tmp_path / "a.bin"
+        path.write_bytes(b"hello")
+        index = ContentIndex(tmp_path / "index.json")
+
+        assert hash_files(dataset_files(path), index) == {
+            "a.bin": FileDigest(hashlib.sha256(b"hello").hexdigest(), hashlib.md5(b"hello").hexdigest())
+        }
+        with patch("sami_cli.dedup.hash_stream") as mock_hash:
+            hash_files(dataset_files(path), index)
+        mock_hash.assert_not_called()
+
+    @pytest.mark.unit
+    def test_hardlinks_read_once(self, tmp_path: Path):
+        """Test hardlinked copies share one read."""
+        original = tmp_path / "a.bin"
+        original.write_bytes(b"same")
+        link = tmp_path / "b.bin"
+        os.link(original, link)
+        index = ContentIndex(tmp_path / "index.json")
+
+        digest = FileDigest("h", "m")
+        with patch("sami_cli.dedup.hash_stream", return_value=digest) as mock_hash:
+            hashes = hash_files(dataset_files(original, link), index)
+
+        assert hashes == {"a.bin": digest, "b.bin": digest}
+        assert mock_hash.call_count == 1
+
+    @pytest.mark.unit
+    def test_part_md5s_for_multipart_files(self, tmp_path: Path):
+        """Test multipart files get one MD5 per part from the same read."""
+        path = tmp_path / "big.bin"
+        path.write_bytes(b"abcdefghij")
+        index = ContentIndex(tmp_path / "index.json")
+
+        digest = hash_files(dataset_files(path), index, part_size_for=lambda size: 4)["big.bin"]
+
+        assert digest.md5 == hashlib.md5(b"abcdefghij").hexdigest()
+        assert digest.part_md5s == tuple(hashlib.md5(p).hexdigest() for p in (b"abcd", b"efgh", b"ij"))
+
+    @pytest.mark.unit
+    def test_cache_keyed_by_part_size(self, tmp_path: Path):
+        """Test a cached digest taken with another part size is not reused."""
+        path = tmp_path / "big.bin"
+        path.write_bytes(b"abcdefghij")
+        index = ContentIndex(tmp_path / "index.json")
+        hash_files(dataset_files(path), index)
+
+        digest = hash_files(dataset_files(path), index, part_size_for=lambda size: 5)["big.bin"]
+
+        assert len(digest.part_md5s) == 2
+
+
+class TestHashStream:
+    """Tests for single-pass hashing."""
+
+    @pytest.mark.unit
+    def test_part_boundary_inside_chunk(self, monkeypatch):
+        """Test parts are split correctly when they do not align with reads."""
+        monkeypatch.setattr(dedup, "HASH_CHUNK_SIZE", 3)
+        digest = hash_stream(io.BytesIO(b"abcdefgh"), part_size=5)
+
+        assert digest.part_md5s == (hashlib.md5(b"abcde").hexdigest(), hashlib.md5(b"fgh").hexdigest())
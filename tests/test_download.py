@@ -0,0 +1,458 @@
+"""Unit tests for download transfer functionality."""
+
+import hashlib
+import io
+
+import pytest
+import urllib3
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+from benchmarks.local_server import local_server
+from sami_cli import download, retry
+from sami_cli.checksum import ExpectedChecksum, multipart_etag
+from sami_cli.download import SegmentedDownload, download_dataset, download_file
+from sami_cli.exceptions import ChecksumError, DownloadError
+from sami_cli.session import create_transfer_session
+
+
+def fake_response(status_code=200, body=b"", headers=None, error=None):
+    """Build a streamed response mock whose raw stream yields `body`.
+
+    If `error` is given, it is raised once the body has been read.
+    """
+    stream = io.BytesIO(body)
+
+    def readinto(buffer):
+        num_bytes = stream.readinto(buffer)
+        if not num_bytes and error is not None:
+            raise error
+        return num_bytes
+
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.raw.readinto.side_effect = readinto
+    return response
+
+
+def dropped_response(body: bytes):
+    """Build a streamed response whose connection drops after `body`."""
+    return fake_response(body=body, error=urllib3.exceptions.ProtocolError("Connection reset by peer"))
+
+
+def ranged_get(body: bytes, drop_first: bool = False):
+    """Build a session.get side effect serving Range requests for `body`.
+
+    With drop_first, the first request drops the connection halfway.
+    """
+    calls = []
+
+    def get(url, stream=True, headers=None, timeout=None):
+        start, end = headers["Range"][len("bytes="):].split("-")
+        start, end = int(start), int(end) + 1
+        calls.append((start, end))
+        content_range = {"Content-Range": f"bytes {start}-{end - 1}/{len(body)}"}
+        if drop_first and len(calls) == 1:
+            return fake_response(
+                206, body[start:(start + end) // 2], content_range,
+                error=urllib3.exceptions.ProtocolError("Connection reset by peer"),
+            )
+        return fake_response(206, body[start:end], content_range)
+
+    return get, calls
+
+
+class TestTransferSession:
+    """Tests for the shared keep-alive session."""
+
+    @pytest.mark.unit
+    def test_pool_sized_to_workers(self):
+        """Test the connection pool holds one connection per worker."""
+        session = create_transfer_session(16)
+
+        assert session.get_adapter("https://s3.amazonaws.com")._pool_maxsize == 16
+
+
+class TestDownloadFile:
+    """Tests for downloading a single file."""
+
+    @pytest.mark.unit
+    def test_uses_shared_session(self, tmp_path: Path):
+        """Test the file is fetched through the given session."""
+        session = MagicMock()
+        session.get.return_value = fake_response(body=b"hello")
+        output = tmp_path / "sub" / "file.bin"
+
+        download_file("https://s3/file", output, expected_size=5, session=session)
+
+        assert output.read_bytes() == b"hello"
+        session.get.assert_called_once()
+
+    @pytest.mark.unit
+    def test_size_mismatch(self, tmp_path: Path):
+        """Test a short download is reported."""
+        session = MagicMock()
+        session.get.return_value = fake_response(body=b"hel")
+
+        with pytest.raises(DownloadError, match="Size mismatch"):
+            download_file("https://s3/file", tmp_path / "file.bin", expected_size=5, session=session)
+
+    @pytest.mark.unit
+    def test_progress_reported_and_undone_on_failure(self, tmp_path: Path):
+        """Test streamed bytes are reported and a failed download takes them back."""
+        session = MagicMock()
+        session.get.return_value = fake_response(body=b"hel")
+        reported = []
+
+        with pytest.raises(DownloadError):
+            download_file(
+                "https://s3/file", tmp_path / "file.bin", expected_size=5,
+                session=session, progress_callback=reported.append,
+            )
+
+        assert 3 in reported
+        assert sum(reported) == 0
+
+
+class TestResumableDownload:
+    """Tests for .part files and Range resumption."""
+
+    @pytest.mark.unit
+    def test_resumes_from_part_file(self, tmp_path: Path):
+        """Test a .part file left by an earlier run is continued with a Range request."""
+        output = tmp_path / "video.mp4"
+        (tmp_path / "video.mp4.part").write_bytes(b"hello ")
+        session = MagicMock()
+        session.get.return_value = fake_response(206, b"world", {"Content-Range": "bytes 6-10/11"})
+
+        download_file("https://s3/video", output, expected_size=11, session=session)
+
+        assert output.read_bytes() == b"hello world"
+        assert session.get.call_args.kwargs["headers"] == {"Range": "bytes=6-"}
+        assert not (tmp_path / "video.mp4.part").exists()
+
+    @pytest.mark.unit
+    def test_dropped_connection_retried_from_offset(self, tmp_path: Path, monkeypatch):
+        """Test a connection drop keeps received bytes and resumes after them."""
+        monkeypatch.setattr(retry, "BASE_DELAY", 0)
+        output = tmp_path / "video.mp4"
+        session = MagicMock()
+        session.get.side_effect = [
+            dropped_response(b"hello "),
+            fake_response(206, b"world", {"Content-Range": "bytes 6-10/11"}),
+        ]
+        reported = []
+
+        download_file("https://s3/video", output, expected_size=11, session=session,
+                      progress_callback=reported.append)
+
+        assert output.read_bytes() == b"hello world"
+        assert session.get.call_args.kwargs["headers"] == {"Range": "bytes=6-"}
+        assert sum(reported) == 11
+
+    @pytest.mark.unit
+    def test_range_ignored_restarts(self, tmp_path: Path):
+        """Test a server answering 200 to a Range request restarts the file."""
+        output = tmp_path / "video.mp4"
+        (tmp_path / "video.mp4.part").write_bytes(b"stale")
+        session = MagicMock()
+        session.get.side_effect = [fake_response(200, b"hello world"), fake_response(200, b"hello world")]
+
+        download_file("https://s3/video", output, expected_size=11, session=session)
+
+        assert output.read_bytes() == b"hello world"
+        assert session.get.call_args.kwargs["headers"] == {}
+
+    @pytest.mark.unit
+    def test_partial_file_never_at_final_path(self, tmp_path: Path, monkeypatch):
+        """Test a download that keeps failing leaves only the .part file."""
+        monkeypatch.setattr(retry, "BASE_DELAY", 0)
+        output = tmp_path / "video.mp4"
+        session = MagicMock()
+        session.get.side_effect = lambda *args, **kwargs: dropped_response(b"x")
+
+        with pytest.raises(DownloadError, match="after 3 attempts"):
+            download_file("https://s3/video", output, expected_size=11, session=session, max_retries=3)
+
+        assert not output.exists()
+        assert (tmp_path / "video.mp4.part").exists()
+
+
+class TestWritePath:
+    """Tests for the buffered download write path."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("write_behind", [False, True])
+    def test_small_buffer_reused(self, tmp_path: Path, write_behind):
+        """Test a body larger than the buffer arrives intact over several reads."""
+        body = bytes(range(256)) * 40
+        session = MagicMock()
+        session.get.return_value = fake_response(body=body)
+        output = tmp_path / "file.bin"
+
+        download_file("https://s3/file", output, expected_size=len(body), session=session,
+                      buffer_size=1000, write_behind=write_behind)
+
+        assert output.read_bytes() == body
+        raw = session.get.return_value.raw
+        assert raw.readinto.call_count == 12
+        assert raw.decode_content is True
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("write_behind", [False, True])
+    def test_bandwidth_consumed_per_read(self, tmp_path: Path, write_behind):
+        """Test every buffer read takes its bytes from the bandwidth bucket."""
+        body = b"x" * 2500
+        session = MagicMock()
+        session.get.return_value = fake_response(body=body)
+        bandwidth = Mock()
+
+        download_file("https://s3/file", tmp_path / "file.bin", expected_size=len(body), session=session,
+                      buffer_size=1000, write_behind=write_behind, bandwidth=bandwidth)
+
+        assert [c.args[0] for c in bandwidth.consume.call_args_list] == [1000, 1000, 500]
+
+    @pytest.mark.unit
+    def test_read_timeout_retried(self, tmp_path: Path, monkeypatch):
+        """Test a urllib3 read timeout is retried from the received bytes."""
+        monkeypatch.setattr(retry, "BASE_DELAY", 0)
+        session = MagicMock()
+        session.get.side_effect = [
+            fake_response(body=b"hello ", error=urllib3.exceptions.ReadTimeoutError(None, "/", "timed out")),
+            fake_response(206, b"world", {"Content-Range": "bytes 6-10/11"}),
+        ]
+        output = tmp_path / "file.bin"
+
+        download_file("https://s3/file", output, expected_size=11, session=session)
+
+        assert output.read_bytes() == b"hello world"
+
+    @pytest.mark.unit
+    def test_connection_reused_across_downloads(self, tmp_path: Path):
+        """Test reading bodies returns the connection to the pool, so one serves every download."""
+        session = create_transfer_session(1)
+        connect = urllib3.connection.HTTPConnection.connect
+
+        with local_server() as url, \
+                patch.object(urllib3.connection.HTTPConnection, "connect", autospec=True, side_effect=connect) as opened:
+            for index in range(5):
+                download_file(f"{url}/files/{100_000 + index}", tmp_path / f"{index}.bin",
+                              expected_size=100_000 + index, session=session)
+
+        assert opened.call_count == 1
+        assert (tmp_path / "4.bin").stat().st_size == 100_004
+
+    @pytest.mark.unit
+    def test_write_behind_error_raised(self, tmp_path: Path):
+        """Test a failed background write fails the download."""
+        session = MagicMock()
+        session.get.return_value = fake_response(body=b"x" * 5000)
+
+        with patch.object(download._WriteBehind, "_run", autospec=True) as run:
+            def failing_run(self):
+                self._error = OSError(28, "No space left on device")
+                while self._pending.get() is not None:
+                    pass
+
+            run.side_effect = failing_run
+            with pytest.raises(OSError, match="No space left"):
+                download_file("https://s3/file", tmp_path / "file.bin", expected_size=5000,
+                              session=session, buffer_size=1000, write_behind=True)
+
+    @pytest.mark.unit
+    def test_preallocates_expected_size(self, tmp_path: Path):
+        """Test disk space is reserved from the expected size."""
+        session = MagicMock()
+        session.get.return_value = fake_response(body=b"hello")
+
+        with patch("sami_cli.download.preallocate") as mock_preallocate:
+            download_file("https://s3/file", tmp_path / "file.bin", expected_size=5, session=session)
+
+        assert mock_preallocate.call_args.args[1] == 5
+
+    @pytest.mark.unit
+    def test_preallocate_keeps_file_size(self, tmp_path: Path):
+        """Test preallocation does not change the size a resume relies on."""
+        part = tmp_path / "file.bin.part"
+        part.write_bytes(b"hello")
+
+        with open(part, "ab") as f:
+            download.preallocate(f.fileno(), 1024 * 1024)
+
+        assert part.stat().st_size == 5
+
+
+class TestSegmentedDownload:
+    """Tests for fetching large files in byte-range segments."""
+
+    BODY = bytes(range(256)) * 4
+
+    @pytest.mark.unit
+    def test_segments_written_out_of_order(self, tmp_path: Path):
+        """Test segments fetched in any order assemble the file and only the last completes it."""
+        session = MagicMock()
+        session.get.side_effect, calls = ranged_get(self.BODY)
+        output = tmp_path / "episode.hdf5"
+        segmented = SegmentedDownload("https://s3/big", output, len(self.BODY), segment_size=300)
+
+        results = [segmented.fetch(i, session=session) for i in (3, 1, 0, 2)]
+
+        assert results == [False, False, False, True]
+        assert output.read_bytes() == self.BODY
+        assert sorted(calls) == [(0, 300), (300, 600), (600, 900), (900, 1024)]
+        assert not (tmp_path / "episode.hdf5.part").exists()
+        assert not (tmp_path / "episode.hdf5.part.segments").exists()
+
+    @pytest.mark.unit
+    def test_segment_retried_from_where_it_dropped(self, tmp_path: Path, monkeypatch):
+        """Test a dropped segment resumes within its range and progress adds up."""
+        monkeypatch.setattr(retry, "BASE_DELAY", 0)
+        session = MagicMock()
+        session.get.side_effect, calls = ranged_get(self.BODY, drop_first=True)
+        output = tmp_path / "episode.hdf5"
+        segmented = SegmentedDownload("https://s3/big", output, len(self.BODY), segment_size=512)
+        reported = []
+
+        segmented.fetch(1, session=session, progress_callback=reported.append)
+
+        assert calls[:2] == [(512, 1024), (768, 1024)]
+        assert sum(reported) == 512
+
+    @pytest.mark.unit
+    def test_resumes_missing_segments(self, tmp_path: Path):
+        """Test a new run only fetches the segments an interrupted one did not finish."""
+        session = MagicMock()
+        session.get.side_effect, calls = ranged_get(self.BODY)
+        output = tmp_path / "episode.hdf5"
+        SegmentedDownload("https://s3/big", output, len(self.BODY), segment_size=300).fetch(1, session=session)
+
+        segmented = SegmentedDownload("https://s3/big", output, len(self.BODY), segment_size=300)
+        assert segmented.pending == [0, 2, 3]
+        assert segmented.done_bytes == 300
+        for index in segmented.pending:
+            segmented.fetch(index, session=session)
+
+        assert output.read_bytes() == self.BODY
+
+    @pytest.mark.unit
+    def test_sequential_download_discards_segmented_part(self, tmp_path: Path):
+        """Test a full-size sparse .part file is not mistaken for a finished download."""
+        output = tmp_path / "episode.hdf5"
+        SegmentedDownload("https://s3/big", output, len(self.BODY), segment_size=300)
+        session = MagicMock()
+        session.get.return_value = fake_response(body=self.BODY)
+
+        download_file("https://s3/big", output, expected_size=len(self.BODY), session=session)
+
+        assert session.get.call_args.kwargs["headers"] == {}
+        assert output.read_bytes() == self.BODY
+
+    @pytest.mark.unit
+    def test_dataset_splits_large_files(self, tmp_path: Path):
+        """Test download_dataset fetches large files in segments and small ones whole."""
+        listing = [
+            {"relativePath": "data/big.hdf5", "size": len(self.BODY), "downloadUrl": "https://s3/big"},
+            {"relativePath": "meta/info.json", "size": 2, "downloadUrl": "https://s3/info"},
+        ]
+        api_response = Mock(status_code=200)
+        api_response.json.return_value = {"data": {"downloadUrls": listing, "totalFiles": 2}}
+        session = MagicMock()
+        ranged, calls = ranged_get(self.BODY)
+        session.get.side_effect = lambda url, **kwargs: (
+            ranged(url, **kwargs) if url == "https://s3/big" else fake_response(body=b"{}")
+        )
+        session.__enter__.return_value = session
+        auth = MagicMock()
+        auth.get_headers.return_value = {}
+
+        with patch("sami_cli.download.requests.get", return_value=api_response), \
+                patch("sami_cli.download.create_transfer_session", return_value=session):
+            download_dataset(auth, "http://api", "ds1", str(tmp_path),
+                             segment_size=256, segment_threshold=512)
+
+        assert (tmp_path / "data/big.hdf5").read_bytes() == self.BODY
+        assert (tmp_path / "meta/info.json").read_bytes() == b"{}"
+        assert len(calls) == 4
+
+
+class TestChecksumVerification:
+    """Tests for checking downloads against server checksums."""
+
+    BODY = bytes(range(256)) * 4
+
+    @pytest.mark.unit
+    def test_corrupt_download_fetched_again(self, tmp_path: Path):
+        """Test a file not matching its ETag is discarded and downloaded again."""
+        corrupt = b"hellO world"
+        session = MagicMock()
+        session.get.side_effect = [fake_response(body=corrupt), fake_response(body=b"hello world")]
+        checksum = ExpectedChecksum("md5", hashlib.md5(b"hello world").hexdigest())
+        output = tmp_path / "file.bin"
+
+        download_file("https://s3/file", output, 11, session=session, checksum=checksum)
+
+        assert output.read_bytes() == b"hello world"
+        assert session.get.call_count == 2
+
+    @pytest.mark.unit
+    def test_persistent_mismatch_raises(self, tmp_path: Path):
+        """Test a file that never matches fails with ChecksumError and is not kept."""
+        session = MagicMock()
+        session.get.side_effect = lambda *args, **kwargs: fake_response(body=b"hellO world")
+        checksum = ExpectedChecksum("md5", hashlib.md5(b"hello world").hexdigest())
+        output = tmp_path / "file.bin"
+
+        with pytest.raises(ChecksumError, match="after 2 attempts"):
+            download_file("https://s3/file", output, 11, session=session, checksum=checksum, max_retries=2)
+
+        assert not output.exists()
+        assert not (tmp_path / "file.bin.part").exists()
+
+    @pytest.mark.unit
+    def test_resumed_download_verified(self, tmp_path: Path):
+        """Test bytes left by an earlier run are part of the checked content."""
+        output = tmp_path / "file.bin"
+        (tmp_path / "file.bin.part").write_bytes(b"hello ")
+        session = MagicMock()
+        session.get.return_value = fake_response(206, b"world", {"Content-Range": "bytes 6-10/11"})
+        checksum = ExpectedChecksum("sha256", hashlib.sha256(b"hello world").hexdigest())
+
+        download_file("https://s3/file", output, 11, session=session, checksum=checksum)
+
+        assert output.read_bytes() == b"hello world"
+
+    @pytest.mark.unit
+    def test_segments_checked_against_multipart_etag(self, tmp_path: Path):
+        """Test segments aligned with upload parts verify a multipart ETag in-stream."""
+        parts = [self.BODY[i:i + 256] for i in range(0, len(self.BODY), 256)]
+        checksum = ExpectedChecksum("multipart", multipart_etag([hashlib.md5(p).hexdigest() for p in parts]), 256)
+        session = MagicMock()
+        session.get.side_effect, _ = ranged_get(self.BODY)
+        output = tmp_path / "big.bin"
+        segmented = SegmentedDownload("https://s3/big", output, len(self.BODY), 256, checksum)
+
+        with patch("sami_cli.download.verify_file") as read_back:
+            for index in reversed(segmented.pending):
+                segmented.fetch(index, session=session)
+
+        read_back.assert_not_called()
+        assert output.read_bytes() == self.BODY
+
+    @pytest.mark.unit
+    def test_corrupt_segmented_file_discarded(self, tmp_path: Path):
+        """Test a segmented file failing its checksum is removed so it starts over."""
+        checksum = ExpectedChecksum("md5", hashlib.md5(b"something else").hexdigest())
+        session = MagicMock()
+        session.get.side_effect, _ = ranged_get(self.BODY)
+        output = tmp_path / "big.bin"
+        segmented = SegmentedDownload("https://s3/big", output, len(self.BODY), 512, checksum)
+
+        segmented.fetch(0, session=session)
+        with pytest.raises(ChecksumError):
+            segmented.fetch(1, session=session)
+
+        assert not output.exists()
+        assert not (tmp_path / "big.bin.part").exists()
+        assert not (tmp_path / "big.bin.part.segments").exists()
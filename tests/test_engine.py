@@ -0,0 +1,229 @@
+"""Unit tests for the asyncio transfer engine and AsyncSamiClient."""
+
+import asyncio
+import base64
+import hashlib
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+pytest.importorskip("aiohttp")
+
+from sami_cli import engine as engine_module
+from sami_cli.async_client import AsyncSamiClient
+from sami_cli.checksum import ExpectedChecksum
+from sami_cli.download import download_dataset
+from sami_cli.engine import TransferEngine
+from sami_cli.exceptions import ChecksumError, NotFoundError
+from sami_cli.models import UploadUrl
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, body: bytes = b"") -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(("GET", self.path))
+        if server.failures.get(self.path):
+            server.failures[self.path] -= 1
+            return self._reply(503)
+        if self.path in server.json:
+            status, data = server.json[self.path]
+            return self._reply(status, json.dumps(data).encode())
+        if self.path not in server.files:
+            return self._reply(404)
+        self._reply(200, server.files[self.path])
+
+    def do_PUT(self):
+        server = self.server
+        server.requests.append(("PUT", self.path))
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path.startswith("/expired"):
+            return self._reply(403, b"<Error>Request has expired</Error>")
+        server.uploads[self.path] = (body, dict(self.headers))
+        self._reply(200)
+
+
+@pytest.fixture
+def server():
+    """Local HTTP server standing in for S3 and the API."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.files, httpd.json, httpd.failures, httpd.uploads, httpd.requests = {}, {}, {}, {}, []
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestTransferEngine:
+    """Tests for small-file transfers on the event loop."""
+
+    @pytest.mark.unit
+    def test_downloads_many_files_at_once(self, server, tmp_path: Path):
+        """Test every file lands complete, with progress reported once per byte."""
+        bodies = {f"/f{i}": f"file {i}".encode() * 100 for i in range(50)}
+        server.files.update(bodies)
+        progress = []
+
+        with TransferEngine(max_in_flight=16) as engine:
+            futures = [
+                engine.download(server.url + path, tmp_path / path[1:], len(body), progress_callback=progress.append)
+                for path, body in bodies.items()
+            ]
+            for future in futures:
+                future.result()
+
+        assert all((tmp_path / path[1:]).read_bytes() == body for path, body in bodies.items())
+        assert sum(progress) == sum(len(body) for body in bodies.values())
+        assert not list(tmp_path.glob("*.part"))
+
+    @pytest.mark.unit
+    def test_server_errors_retried(self, server, tmp_path: Path):
+        """Test a 5xx response is retried after a backoff."""
+        server.files["/a"] = b"hello"
+        server.failures["/a"] = 1
+
+        with patch("sami_cli.retry.BASE_DELAY", 0), TransferEngine() as engine:
+            engine.download(server.url + "/a", tmp_path / "a", 5).result()
+
+        assert (tmp_path / "a").read_bytes() == b"hello"
+        assert server.requests.count(("GET", "/a")) == 2
+
+    @pytest.mark.unit
+    def test_checksum_mismatch_fails(self, server, tmp_path: Path):
+        """Test a file never matching its checksum is not put in place."""
+        server.files["/a"] = b"hello"
+
+        with TransferEngine() as engine:
+            checksum = ExpectedChecksum("md5", hashlib.md5(b"other").hexdigest())
+            future = engine.download(server.url + "/a", tmp_path / "a", 5, checksum=checksum, max_retries=2)
+            with pytest.raises(ChecksumError):
+                future.result()
+
+        assert not (tmp_path / "a").exists()
+        assert not (tmp_path / "a.part").exists()
+
+    @pytest.mark.unit
+    def test_upload_sends_md5_and_refreshes_expired_url(self, server, tmp_path: Path):
+        """Test an expired URL is replaced and the retry carries the Content-MD5."""
+        file_path = tmp_path / "info.json"
+        file_path.write_bytes(b"{}")
+        refresh = Mock(return_value=UploadUrl("meta/info.json", server.url + "/fresh", "key"))
+
+        with TransferEngine() as engine:
+            engine.upload(
+                file_path, UploadUrl("meta/info.json", server.url + "/expired", "key"),
+                "application/json", refresh, md5=hashlib.md5(b"{}").hexdigest(),
+            ).result()
+
+        body, headers = server.uploads["/fresh"]
+        assert body == b"{}"
+        assert headers["Content-MD5"] == "mZFLkyvTelC5g8XnyQrpOw=="
+        refresh.assert_called_once_with()
+
+
+    @pytest.mark.unit
+    def test_upload_streamed_in_chunks(self, server, tmp_path: Path, monkeypatch):
+        """Test a body larger than a chunk is streamed with its length and a computed Content-MD5."""
+        monkeypatch.setattr(engine_module, "UPLOAD_CHUNK_SIZE", 1000)
+        data = bytes(range(256)) * 20
+        file_path = tmp_path / "episode.parquet"
+        file_path.write_bytes(data)
+
+        with TransferEngine() as engine, \
+                patch.object(engine_module, "_throttle", wraps=engine_module._throttle) as throttle:
+            engine.upload(
+                file_path, UploadUrl("data/episode.parquet", server.url + "/put", "key"),
+                "application/octet-stream", Mock(), checksum=True,
+            ).result()
+
+        assert [c.args[1] for c in throttle.call_args_list] == [1000] * 5 + [120]
+        body, headers = server.uploads["/put"]
+        assert body == data
+        assert headers["Content-Length"] == str(len(data))
+        assert headers["Content-MD5"] == base64.b64encode(hashlib.md5(data).digest()).decode()
+
+
+class TestEngineDownload:
+    """Tests for download_dataset with an engine."""
+
+    @pytest.mark.unit
+    def test_small_files_on_engine_large_on_workers(self, server, tmp_path: Path):
+        """Test files up to the engine's limit go to the engine and the rest to workers."""
+        server.files.update({"/small": b"s" * 10, "/large": b"L" * 100})
+        listing = [
+            {"relativePath": "small.bin", "size": 10, "downloadUrl": server.url + "/small"},
+            {"relativePath": "large.bin", "size": 100, "downloadUrl": server.url + "/large"},
+        ]
+        api_response = Mock(status_code=200)
+        api_response.json.return_value = {"data": {"downloadUrls": listing, "totalFiles": 2}}
+        auth = MagicMock()
+        auth.get_headers.return_value = {}
+
+        with TransferEngine(max_file_size=50) as engine, \
+                patch("sami_cli.download.requests.get", return_value=api_response), \
+                patch.object(engine, "download", wraps=engine.download) as engine_download:
+            download_dataset(auth, "http://api", "ds1", str(tmp_path), engine=engine)
+
+        assert [c.args[1].name for c in engine_download.call_args_list] == ["small.bin"]
+        assert (tmp_path / "small.bin").read_bytes() == b"s" * 10
+        assert (tmp_path / "large.bin").read_bytes() == b"L" * 100
+
+
+class TestAsyncSamiClient:
+    """Tests for the asyncio client."""
+
+    def client(self, server) -> AsyncSamiClient:
+        client = AsyncSamiClient(api_url=server.url)
+        client.auth.access_token = "token"
+        return client
+
+    @pytest.mark.unit
+    def test_list_and_get(self, server):
+        """Test API calls decode responses and map errors like SamiClient."""
+        server.json["/datasets?page=1&limit=20"] = (200, {"data": [{"id": "ds1", "name": "one"}]})
+        server.json["/datasets/missing"] = (404, {"error": {"message": "Not found"}})
+
+        async def run():
+            async with self.client(server) as client:
+                datasets = await client.list_datasets()
+                with pytest.raises(NotFoundError):
+                    await client.get_dataset("missing")
+            return datasets
+
+        datasets = asyncio.run(run())
+        assert [d.id for d in datasets] == ["ds1"]
+
+    @pytest.mark.unit
+    def test_download_runs_small_files_on_callers_loop(self, server, tmp_path: Path):
+        """Test a download from a coroutine transfers its files on that loop."""
+        server.files["/a"] = b"hello"
+        server.json["/datasets/ds1/download?format=lerobot"] = (200, {"data": {
+            "downloadUrls": [{"relativePath": "a.bin", "size": 5, "downloadUrl": server.url + "/a"}],
+            "totalFiles": 1,
+        }})
+        same_loop = []
+
+        async def run():
+            async with self.client(server) as client:
+                engine = client._transfer_engine()
+                with patch.object(engine, "submit", wraps=engine.submit) as submit:
+                    await client.download_dataset("ds1", str(tmp_path))
+                same_loop.append(engine.loop is asyncio.get_running_loop())
+                return submit.call_count
+
+        assert asyncio.run(run()) == 1
+        assert same_loop == [True]
+        assert (tmp_path / "a.bin").read_bytes() == b"hello"
@@ -10,6 +10,9 @@ from sami_cli.exceptions import (
     UploadError,
     DownloadError,
     ValidationError,
+    UrlExpiredError,
+    ChecksumError,
+    TransientError,
 )
 
 
@@ -25,6 +28,9 @@ class TestExceptionHierarchy:
         assert issubclass(UploadError, SamiError)
         assert issubclass(DownloadError, SamiError)
         assert issubclass(ValidationError, SamiError)
+        assert issubclass(UrlExpiredError, SamiError)
+        assert issubclass(ChecksumError, SamiError)
+        assert issubclass(TransientError, SamiError)
 
     @pytest.mark.unit
     def test_exceptions_inherit_from_exception(self):
@@ -37,6 +43,8 @@ class TestExceptionHierarchy:
             UploadError,
             DownloadError,
             ValidationError,
+            UrlExpiredError,
+            ChecksumError,
         ]
         for exc_class in exceptions:
             assert issubclass(exc_class, Exception)
@@ -81,3 +89,12 @@ class TestExceptionHierarchy:
             assert "Invalid credentials" in str(e)
         except SamiError:
             assert False, "Should have been caught by AuthenticationError"
+
+    @pytest.mark.unit
+    def test_retryable_flag(self):
+        """Test only transient failures are marked retryable."""
+        assert TransientError("HTTP 503", retry_after=2.0).retryable
+        assert TransientError("HTTP 503", retry_after=2.0).retry_after == 2.0
+        assert UrlExpiredError("expired").retryable
+        assert not NotFoundError("missing").retryable
+        assert not SamiError("failed").retryable
@@ -0,0 +1,82 @@
+"""Unit tests for the sami:// fsspec filesystem."""
+
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+
+pytest.importorskip("fsspec")
+
+from sami_cli.fs import SamiFileSystem
+
+
+BODY = bytes(range(256)) * 64
+
+LISTING = {
+    "downloadUrls": [
+        {"relativePath": "meta/info.json", "size": 2, "downloadUrl": "https://s3/info", "etag": '"abc"'},
+        {"relativePath": "data/chunk-000/file-000.parquet", "size": len(BODY), "downloadUrl": "https://s3/data"},
+    ],
+    "totalFiles": 2,
+}
+
+
+def ranged_response(body: bytes, range_header: str, status_code: int = 206):
+    start, end = range_header[len("bytes="):].split("-")
+    response = Mock(status_code=status_code)
+    response.content = body[int(start):int(end) + 1]
+    return response
+
+
+@pytest.fixture
+def fs():
+    """Filesystem over a mocked listing, with session.get serving BODY."""
+    with patch("sami_cli.fs.get_download_urls", return_value=LISTING) as listing:
+        filesystem = SamiFileSystem(client=Mock(), block_size=1024, max_blocks=2, skip_instance_cache=True)
+        filesystem.session = MagicMock()
+        filesystem.session.get.side_effect = lambda url, headers, timeout: ranged_response(BODY, headers["Range"])
+        filesystem.listing = listing
+        yield filesystem
+
+
+class TestSamiFileSystem:
+    """Tests for listing and reading datasets in place."""
+
+    @pytest.mark.unit
+    def test_ls_builds_directories(self, fs):
+        """Test a dataset's files are listed as a directory tree."""
+        assert fs.ls("sami://ds1", detail=False) == ["ds1/data", "ds1/meta"]
+        assert fs.ls("ds1/data", detail=True)[0] == {"name": "ds1/data/chunk-000", "size": len(BODY), "type": "directory"}
+        assert fs.info("ds1/meta/info.json")["etag"] == '"abc"'
+        with pytest.raises(FileNotFoundError):
+            fs.ls("ds1/videos")
+
+    @pytest.mark.unit
+    def test_seek_and_read_only_fetches_touched_blocks(self, fs):
+        """Test a read after a seek fetches only the blocks it covers."""
+        with fs.open("sami://ds1/data/chunk-000/file-000.parquet") as f:
+            f.seek(5000)
+            data = f.read(100)
+
+        assert data == BODY[5000:5100]
+        ranges = [call.kwargs["headers"]["Range"] for call in fs.session.get.call_args_list]
+        assert ranges == ["bytes=4096-5119"]
+
+    @pytest.mark.unit
+    def test_cat_file_range(self, fs):
+        """Test a byte range (including a negative start) is read in one request."""
+        assert fs.cat_file("ds1/data/chunk-000/file-000.parquet", start=-10) == BODY[-10:]
+        assert fs.session.get.call_count == 1
+
+    @pytest.mark.unit
+    def test_expired_url_refreshes_listing(self, fs):
+        """Test a 403 from S3 fetches new presigned URLs and retries."""
+        responses = [Mock(status_code=403), ranged_response(BODY, "bytes=0-9")]
+        fs.session.get.side_effect = lambda *args, **kwargs: responses.pop(0)
+
+        assert fs.fetch_range("ds1/data/chunk-000/file-000.parquet", 0, 10) == BODY[:10]
+        assert fs.listing.call_count == 2
+
+    @pytest.mark.unit
+    def test_read_only(self, fs):
+        """Test files cannot be opened for writing."""
+        with pytest.raises(NotImplementedError):
+            fs.open("ds1/meta/info.json", "wb")
@@ -0,0 +1,69 @@
+"""Unit tests for the upload journal."""
+
+import pytest
+from pathlib import Path
+
+from sami_cli.journal import UploadJournal
+
+
+class TestUploadJournal:
+    """Tests for recording and reloading upload progress."""
+
+    @pytest.mark.unit
+    def test_round_trip(self, tmp_path: Path):
+        """Test recorded progress is restored by load()."""
+        journal = UploadJournal.for_dataset(tmp_path / "ds", journal_dir=tmp_path)
+        journal.start("ds1", "test", {"a.json": (10, 1), "big.mp4": (500, 2)})
+        journal.record_file("a.json")
+        journal.record_multipart("big.mp4", "up1")
+        journal.record_part("big.mp4", 1, '"etag1"')
+        journal.close()
+
+        loaded = UploadJournal.for_dataset(tmp_path / "ds", journal_dir=tmp_path)
+
+        assert loaded.load()
+        assert loaded.dataset_id == "ds1"
+        assert loaded.completed_files == {"a.json"}
+        assert loaded.multipart["big.mp4"] == {"upload_id": "up1", "etags": {1: '"etag1"'}}
+        assert loaded.is_unchanged("a.json", (10, 1))
+        assert not loaded.is_unchanged("a.json", (11, 1))
+
+    @pytest.mark.unit
+    def test_truncated_line_ignored(self, tmp_path: Path):
+        """Test a partially written last entry does not break loading."""
+        journal = UploadJournal.for_dataset(tmp_path / "ds", journal_dir=tmp_path)
+        journal.start("ds1", "test", {"a.json": (10, 1)})
+        journal.record_file("a.json")
+        journal.close()
+        with open(journal.path, "a") as f:
+            f.write('{"type": "file", "pa')
+
+        loaded = UploadJournal.for_dataset(tmp_path / "ds", journal_dir=tmp_path)
+
+        assert loaded.load()
+        assert loaded.completed_files == {"a.json"}
+
+    @pytest.mark.unit
+    def test_start_carries_over_progress(self, tmp_path: Path):
+        """Test restarting a session keeps still-valid progress."""
+        journal = UploadJournal.for_dataset(tmp_path / "ds", journal_dir=tmp_path)
+        journal.start(
+            "ds1", "test", {"a.json": (10, 1)},
+            completed_files=["a.json"],
+            multipart={"big.mp4": {"upload_id": "up1", "etags": {2: '"e2"'}}},
+        )
+        journal.close()
+
+        loaded = UploadJournal.for_dataset(tmp_path / "ds", journal_dir=tmp_path)
+        loaded.load()
+
+        assert loaded.completed_files == {"a.json"}
+        assert loaded.multipart["big.mp4"]["etags"] == {2: '"e2"'}
+
+    @pytest.mark.unit
+    def test_missing_journal(self, tmp_path: Path):
+        """Test load() returns False when there is nothing to resume."""
+        journal = UploadJournal.for_dataset(tmp_path / "ds", journal_dir=tmp_path)
+
+        assert not journal.exists()
+        assert not journal.load()
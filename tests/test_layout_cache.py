@@ -0,0 +1,98 @@
+"""Unit tests for the MP4 atom layout cache."""
+
+import os
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from sami_cli.layout_cache import Mp4LayoutCache
+from sami_cli.mp4 import Atom
+
+from tests.test_mp4 import build_mp4
+
+
+ATOMS = [Atom("ftyp", 0, 24), Atom("mdat", 24, 100), Atom("moov", 124, 50)]
+
+
+def write_video(path: Path) -> Path:
+    path.write_bytes(b"\0" * 174)
+    return path
+
+
+class TestMp4LayoutCache:
+    """Tests for caching and invalidating atom layouts."""
+
+    @pytest.mark.unit
+    def test_unchanged_video_not_read_again(self, tmp_path: Path):
+        """Test a saved layout is reused by a new cache without reading the file."""
+        video = write_video(tmp_path / "a.mp4")
+        cache = Mp4LayoutCache(tmp_path / "layouts.json")
+        with patch("sami_cli.layout_cache.read_top_level_atoms", return_value=ATOMS):
+            assert cache.read_atoms(video) == ATOMS
+        cache.save()
+
+        reloaded = Mp4LayoutCache(tmp_path / "layouts.json")
+        with patch("sami_cli.layout_cache.read_top_level_atoms") as mock_read:
+            assert reloaded.read_atoms(video) == ATOMS
+        mock_read.assert_not_called()
+
+    @pytest.mark.unit
+    def test_modified_video_is_a_miss(self, tmp_path: Path):
+        """Test a changed mtime invalidates the cached layout."""
+        video = write_video(tmp_path / "a.mp4")
+        cache = Mp4LayoutCache(tmp_path / "layouts.json")
+        cache.put(video, ATOMS)
+
+        stat = video.stat()
+        os.utime(video, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert cache.get(video) is None
+
+    @pytest.mark.unit
+    def test_least_recently_used_evicted(self, tmp_path: Path):
+        """Test the cache stays within max_entries, keeping recently used videos."""
+        videos = [write_video(tmp_path / f"{i}.mp4") for i in range(3)]
+        cache = Mp4LayoutCache(tmp_path / "layouts.json", max_entries=2)
+        cache.put(videos[0], ATOMS)
+        cache.put(videos[1], ATOMS)
+        cache.get(videos[0])
+        cache.put(videos[2], ATOMS)
+
+        assert len(cache) == 2
+        assert cache.get(videos[1]) is None
+        assert cache.get(videos[0]) == ATOMS
+
+    @pytest.mark.unit
+    def test_corrupt_cache_file_ignored(self, tmp_path: Path):
+        """Test an unreadable cache file starts an empty cache."""
+        (tmp_path / "layouts.json").write_text("{not json")
+
+        assert len(Mp4LayoutCache(tmp_path / "layouts.json")) == 0
+
+    @pytest.mark.unit
+    def test_hit_does_not_rewrite_cache(self, tmp_path: Path):
+        """Test a run with only cache hits leaves the cache file alone."""
+        video = write_video(tmp_path / "a.mp4")
+        cache = Mp4LayoutCache(tmp_path / "layouts.json")
+        cache.put(video, ATOMS)
+        cache.save()
+
+        reloaded = Mp4LayoutCache(tmp_path / "layouts.json")
+        assert reloaded.get(video) == ATOMS
+        with patch("sami_cli.layout_cache.os.replace") as mock_replace:
+            reloaded.save()
+        mock_replace.assert_not_called()
+
+    @pytest.mark.unit
+    def test_faststart_plan_cached(self, tmp_path: Path):
+        """Test the rewritten moov of a moov-last video is reused on later runs."""
+        video = tmp_path / "slow.mp4"
+        video.write_bytes(build_mp4([b"a" * 100, b"b" * 50]))
+        cache = Mp4LayoutCache(tmp_path / "layouts.json")
+        plan = cache.plan_faststart(video)
+        cache.save()
+
+        reloaded = Mp4LayoutCache(tmp_path / "layouts.json")
+        with patch("sami_cli.layout_cache.plan_faststart") as mock_plan:
+            assert reloaded.plan_faststart(video) == plan
+        mock_plan.assert_not_called()
@@ -0,0 +1,171 @@
+"""Unit tests for the native MP4 faststart remuxer."""
+
+import struct
+import pytest
+from pathlib import Path
+
+from sami_cli import mp4
+from sami_cli.layout_cache import Mp4LayoutCache
+from sami_cli.upload import apply_faststart, needs_faststart, plan_videos_for_web
+
+
+def atom(atom_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", len(payload) + 8, atom_type) + payload
+
+
+def build_mp4(chunks, moov_first: bool = False) -> bytes:
+    """Build a minimal MP4 with one track whose stco points at each chunk."""
+    ftyp = atom(b"ftyp", b"isom\0\0\0\0isom")
+    mdat_payload = b"".join(chunks)
+
+    def moov_for(mdat_start):
+        offsets, pos = [], mdat_start
+        for chunk in chunks:
+            offsets.append(pos)
+            pos += len(chunk)
+        stco = atom(b"stco", b"\0\0\0\0" + struct.pack(">I%dI" % len(offsets), len(offsets), *offsets))
+        trak = atom(b"trak", atom(b"tkhd", b"\0" * 84) + atom(b"mdia", atom(b"minf", atom(b"stbl", stco))))
+        return atom(b"moov", atom(b"mvhd", b"\0" * 100) + trak)
+
+    if moov_first:
+        moov_size = len(moov_for(0))
+        return ftyp + moov_for(len(ftyp) + moov_size + 8) + atom(b"mdat", mdat_payload)
+    return ftyp + atom(b"mdat", mdat_payload) + moov_for(len(ftyp) + 8)
+
+
+def read_chunks(path: Path):
+    """Read back every chunk through the file's own chunk offset table."""
+    data = path.read_bytes()
+    with open(path, "rb") as f:
+        atoms = mp4.read_top_level_atoms(f)
+    moov = next(a for a in atoms if a.type == "moov")
+    tree = mp4._parse_children(data[moov.offset:moov.end])
+    table = mp4._chunk_offset_tables(tree)[0]
+    return [a.type for a in atoms], table[0], mp4._decode_offsets(table), data
+
+
+CHUNKS = [b"A" * 30, b"B" * 50, b"C" * 20]
+
+
+class TestFaststart:
+    """Tests for moving moov ahead of mdat."""
+
+    @pytest.mark.unit
+    def test_moov_moved_and_offsets_rewritten(self, tmp_path: Path):
+        """Test moov comes first and chunk offsets still point at the media."""
+        src, dst = tmp_path / "in.mp4", tmp_path / "out.mp4"
+        src.write_bytes(build_mp4(CHUNKS))
+
+        assert mp4.faststart(src, dst) is True
+
+        types, table_type, offsets, data = read_chunks(dst)
+        assert types == ["ftyp", "moov", "mdat"]
+        assert table_type == b"stco"
+        assert [data[o:o + len(c)] for o, c in zip(offsets, CHUNKS)] == CHUNKS
+        assert dst.stat().st_size == src.stat().st_size
+
+    @pytest.mark.unit
+    def test_already_faststart_is_untouched(self, tmp_path: Path):
+        """Test nothing is written when moov already precedes mdat."""
+        src, dst = tmp_path / "in.mp4", tmp_path / "out.mp4"
+        src.write_bytes(build_mp4(CHUNKS, moov_first=True))
+
+        assert mp4.faststart(src, dst) is False
+        assert not dst.exists()
+
+    @pytest.mark.unit
+    def test_stco_promoted_to_co64_on_overflow(self, tmp_path: Path, monkeypatch):
+        """Test offsets that no longer fit in 32 bits switch the table to co64."""
+        monkeypatch.setattr(mp4, "_STCO_MAX", 200)
+        src, dst = tmp_path / "in.mp4", tmp_path / "out.mp4"
+        src.write_bytes(build_mp4(CHUNKS))
+
+        mp4.faststart(src, dst)
+
+        types, table_type, offsets, data = read_chunks(dst)
+        assert table_type == b"co64"
+        assert [data[o:o + len(c)] for o, c in zip(offsets, CHUNKS)] == CHUNKS
+
+    @pytest.mark.unit
+    def test_fragmented_mp4_rejected(self, tmp_path: Path):
+        """Test unsupported layouts raise Mp4Error."""
+        src = tmp_path / "in.mp4"
+        src.write_bytes(build_mp4(CHUNKS) + atom(b"moof", b"\0" * 8))
+
+        with pytest.raises(mp4.Mp4Error):
+            mp4.faststart(src, tmp_path / "out.mp4")
+
+
+class TestFaststartReader:
+    """Tests for streaming a video in faststart order."""
+
+    @pytest.mark.unit
+    def test_stream_matches_remuxed_file(self, tmp_path: Path):
+        """Test the streamed bytes equal a remuxed copy and the source is untouched."""
+        src, dst = tmp_path / "in.mp4", tmp_path / "out.mp4"
+        original = build_mp4(CHUNKS)
+        src.write_bytes(original)
+        mp4.faststart(src, dst)
+
+        with open(src, "rb") as f:
+            plan = mp4.plan_faststart(f)
+        with mp4.FaststartReader(src, plan) as reader:
+            assert len(reader) == plan.output_size
+            streamed = b"".join(reader)
+
+        assert streamed == dst.read_bytes()
+        assert src.read_bytes() == original
+
+    @pytest.mark.unit
+    def test_sub_ranges_cover_output(self, tmp_path: Path):
+        """Test multipart-style ranges that straddle moov reassemble the output."""
+        src = tmp_path / "in.mp4"
+        src.write_bytes(build_mp4(CHUNKS))
+        with open(src, "rb") as f:
+            plan = mp4.plan_faststart(f)
+        with mp4.FaststartReader(src, plan) as reader:
+            expected = reader.read()
+
+        parts = []
+        for offset in range(0, plan.output_size, 37):
+            with mp4.FaststartReader(src, plan, offset, min(37, plan.output_size - offset)) as part:
+                parts.append(part.read(7) + part.read())
+
+        assert b"".join(parts) == expected
+
+
+class TestApplyFaststart:
+    """Tests for in-place faststart without ffmpeg."""
+
+    @pytest.mark.unit
+    def test_in_place_without_ffmpeg(self, tmp_path: Path):
+        """Test the native remuxer fixes a video in place."""
+        video = tmp_path / "episode_000000.mp4"
+        video.write_bytes(build_mp4(CHUNKS))
+        assert needs_faststart(video)
+
+        assert apply_faststart(video) is True
+
+        assert not needs_faststart(video)
+        assert not (tmp_path / "episode_000000.tmp.mp4").exists()
+
+
+class TestPlanVideosForWeb:
+    """Tests for planning streamed faststart uploads."""
+
+    @pytest.mark.unit
+    def test_plans_only_videos_needing_faststart(self, tmp_path: Path):
+        """Test plans are returned for moov-last videos and no file is modified."""
+        slow, fast = tmp_path / "slow.mp4", tmp_path / "fast.mp4"
+        slow.write_bytes(build_mp4(CHUNKS))
+        fast.write_bytes(build_mp4(CHUNKS, moov_first=True))
+        before = slow.read_bytes()
+        videos = [(p, p.name, "video/mp4", p.stat().st_size) for p in (slow, fast)]
+
+        plans, remuxed = plan_videos_for_web(
+            videos, max_workers=2, layout_cache=Mp4LayoutCache(tmp_path / "layouts.json"),
+        )
+
+        assert set(plans) == {"slow.mp4"}
+        assert remuxed == 0
+        assert slow.read_bytes() == before
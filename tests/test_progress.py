@@ -0,0 +1,79 @@
+"""Unit tests for byte-level transfer progress."""
+
+import threading
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+from sami_cli.progress import ProgressBody, TransferProgress
+from sami_cli.upload import upload_file
+
+
+class TestTransferProgress:
+    """Tests for aggregating progress across workers."""
+
+    @pytest.mark.unit
+    def test_bytes_summed_across_workers(self):
+        """Test per-worker counters add up and every worker is tracked."""
+        progress = TransferProgress("Test", 4000, 4, workers=4, disable=True)
+
+        def worker():
+            for _ in range(10):
+                progress.callback(100)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        progress.close()
+
+        assert progress.transferred_bytes == 4000
+        assert progress.worker_stats()["bytes"] == 4000
+        assert len(progress._stats) == 4
+
+    @pytest.mark.unit
+    def test_rolling_rate(self):
+        """Test the rate is computed from refresh samples."""
+        progress = TransferProgress("Test", 0, 0, workers=1, refresh_interval=60, disable=True)
+        progress._samples.extend([(0.0, 0), (2.0, 4 * 1024**2)])
+
+        assert progress.rate() == 2 * 1024**2
+        progress.close()
+
+    @pytest.mark.unit
+    def test_body_reports_reads(self):
+        """Test the body wrapper reports each read and keeps the length."""
+        reported = []
+        body = ProgressBody(Mock(read=Mock(side_effect=[b"abc", b"de", b""])), 5, reported.append)
+
+        assert len(body) == 5
+        assert b"".join(body) == b"abcde"
+        assert reported == [3, 2]
+
+
+class TestUploadProgress:
+    """Tests for progress reporting from uploads."""
+
+    @pytest.mark.unit
+    @patch("sami_cli.retry.BASE_DELAY", 0)
+    def test_retried_attempt_not_double_counted(self, tmp_path: Path):
+        """Test bytes of a failed attempt are taken back before the retry."""
+        path = tmp_path / "a.bin"
+        path.write_bytes(b"x" * 1000)
+        responses = iter([Mock(status_code=500), Mock(status_code=200)])
+
+        def put(url, data=None, **kwargs):
+            while data.read(256):
+                pass
+            return next(responses)
+
+        session = MagicMock()
+        session.put.side_effect = put
+        reported = []
+
+        upload_file(path, "https://s3/a", "application/octet-stream",
+                    session=session, progress_callback=reported.append)
+
+        assert sum(reported) == 1000
+        assert min(reported) == -1000
@@ -0,0 +1,145 @@
+"""Unit tests for the retry policy."""
+
+import pytest
+import requests
+from unittest.mock import Mock, patch
+
+from sami_cli.exceptions import ChecksumError, NotFoundError, TransientError
+from sami_cli.retry import RetryBudget, RetryPolicy, is_retryable, is_retryable_status, parse_retry_after
+
+
+class TestRetryPolicy:
+    """Tests for backoff and attempt limits."""
+
+    @pytest.mark.unit
+    def test_backoff_is_jittered_and_capped(self):
+        """Test delays stay between zero and the capped exponential backoff."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+        delays = [policy.backoff(retry) for retry in range(1, 8) for _ in range(50)]
+
+        assert all(0 <= d <= 4.0 for d in delays)
+        assert len(set(delays)) > 1
+        assert all(policy.backoff(1) <= 1.0 for _ in range(50))
+
+    @pytest.mark.unit
+    def test_retry_after_sets_shortest_delay(self):
+        """Test Retry-After is honoured, up to max_retry_after."""
+        policy = RetryPolicy(base_delay=0.01, max_retry_after=10.0)
+
+        assert policy.backoff(1, retry_after=5.0) == 5.0
+        assert policy.backoff(1, retry_after=600.0) == 10.0
+
+    @pytest.mark.unit
+    def test_next_delay_stops_after_max_attempts(self):
+        """Test no delay is given once the attempts are spent."""
+        policy = RetryPolicy(max_attempts=3, base_delay=0)
+
+        assert policy.next_delay(0) == 0
+        assert policy.next_delay(1) == 0
+        assert policy.next_delay(2) is None
+        assert policy.next_delay(0, max_attempts=1) is None
+
+    @pytest.mark.unit
+    def test_budget_shared_by_run(self):
+        """Test a run stops retrying once its budget is spent."""
+        policy = RetryPolicy(base_delay=0).for_run()
+        policy.budget.remaining = 2
+
+        assert policy.for_run() is policy
+        assert [policy.next_delay(0) for _ in range(3)] == [0, 0, None]
+
+    @pytest.mark.unit
+    def test_budget_refilled_by_successes(self):
+        """Test successful requests earn a fraction of a retry on top of the reserve."""
+        policy = RetryPolicy(base_delay=0, budget=RetryBudget(reserve=1, ratio=0.25))
+
+        assert policy.next_delay(0) == 0
+        assert policy.next_delay(0) is None
+        for _ in range(4):
+            policy.succeeded()
+        assert policy.next_delay(0) == 0
+        assert policy.next_delay(0) is None
+
+    @pytest.mark.unit
+    def test_successful_call_deposits(self):
+        """Test call() credits the budget for a successful response only."""
+        policy = RetryPolicy(budget=RetryBudget(reserve=0, ratio=0.5))
+
+        policy.call(Mock(return_value=Mock(status_code=200, headers={})), "http://api/ok")
+        policy.call(Mock(return_value=Mock(status_code=404, headers={})), "http://api/missing")
+
+        assert policy.budget.remaining == 0.5
+
+
+class TestCall:
+    """Tests for retrying API calls."""
+
+    @pytest.mark.unit
+    @patch("sami_cli.retry.time.sleep")
+    def test_retries_unavailable_with_retry_after(self, mock_sleep):
+        """Test a 503 is retried after the delay the server asked for."""
+        send = Mock(side_effect=[
+            Mock(status_code=503, headers={"Retry-After": "7"}),
+            Mock(status_code=200, headers={}),
+        ])
+
+        response = RetryPolicy(base_delay=0).call(send, "https://api/datasets", headers={})
+
+        assert response.status_code == 200
+        assert send.call_count == 2
+        mock_sleep.assert_called_once_with(7.0)
+
+    @pytest.mark.unit
+    @patch("sami_cli.retry.time.sleep")
+    def test_post_not_repeated_after_server_error(self, mock_sleep):
+        """Test a POST the server may have acted on is not sent again."""
+        send = Mock(return_value=Mock(status_code=500, headers={}))
+
+        response = RetryPolicy().call(send, "https://api/datasets", idempotent=False)
+
+        assert response.status_code == 500
+        assert send.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @pytest.mark.unit
+    @patch("sami_cli.retry.time.sleep")
+    def test_connection_errors_raised_after_last_attempt(self, mock_sleep):
+        """Test the last connection error is raised once the attempts are spent."""
+        send = Mock(side_effect=requests.exceptions.ConnectionError("reset"))
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            RetryPolicy(max_attempts=3).call(send, "https://api/datasets")
+
+        assert send.call_count == 3
+
+
+class TestClassification:
+    """Tests for telling transient errors from permanent ones."""
+
+    @pytest.mark.unit
+    def test_statuses(self):
+        """Test throttling and server errors are retried, client errors are not."""
+        assert is_retryable_status(429)
+        assert is_retryable_status(502)
+        assert not is_retryable_status(404)
+        assert is_retryable_status(503, idempotent=False)
+        assert not is_retryable_status(500, idempotent=False)
+
+    @pytest.mark.unit
+    def test_errors(self):
+        """Test exceptions are classified by type and idempotency."""
+        assert is_retryable(TransientError("HTTP 503"))
+        assert is_retryable(ChecksumError("mismatch"))
+        assert not is_retryable(NotFoundError("gone"))
+        assert is_retryable(requests.exceptions.ReadTimeout())
+        assert not is_retryable(requests.exceptions.ReadTimeout(), idempotent=False)
+        assert is_retryable(requests.exceptions.ConnectTimeout(), idempotent=False)
+        assert not is_retryable(requests.exceptions.SSLError())
+
+    @pytest.mark.unit
+    def test_parse_retry_after(self):
+        """Test Retry-After is read as seconds or an HTTP date."""
+        assert parse_retry_after({"Retry-After": "120"}) == 120.0
+        assert parse_retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+        assert parse_retry_after({"Retry-After": "soon"}) is None
+        assert parse_retry_after({}) is None
@@ -0,0 +1,294 @@
+"""Unit tests for selective (partial) dataset downloads."""
+
+import io
+import json
+import os
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+from sami_cli import selection
+from sami_cli.download import download_dataset, iter_episodes
+from sami_cli.exceptions import ValidationError
+from sami_cli.selection import DownloadSelection, compile_template, episode_files, parse_episodes, select_files
+from sami_cli.sync import LocalManifest
+
+
+V21_INFO = {
+    "codebase_version": "v2.1",
+    "total_episodes": 4,
+    "data_path": "data/chunk-{episode_chunk:03d}/episode_{episode_index:06d}.parquet",
+    "video_path": "videos/chunk-{episode_chunk:03d}/{video_key}/episode_{episode_index:06d}.mp4",
+    "features": {
+        "observation.images.front": {"dtype": "video"},
+        "observation.images.wrist": {"dtype": "video"},
+        "action": {"dtype": "float32"},
+    },
+}
+
+V30_INFO = {
+    "codebase_version": "v3.0",
+    "total_episodes": 4,
+    "data_path": "data/chunk-{chunk_index:03d}/file-{file_index:03d}.parquet",
+    "video_path": "videos/{video_key}/chunk-{chunk_index:03d}/file-{file_index:03d}.mp4",
+    "features": {"observation.images.front": {"dtype": "video"}},
+}
+
+
+def listing(paths):
+    return [{"relativePath": p, "size": 1, "downloadUrl": f"https://s3/{p}"} for p in paths]
+
+
+def write_info(output_dir: Path, info: dict) -> None:
+    (output_dir / "meta").mkdir(parents=True, exist_ok=True)
+    (output_dir / "meta" / "info.json").write_text(json.dumps(info))
+
+
+def v21_files():
+    paths = ["meta/info.json", "meta/episodes.jsonl", "README.md"]
+    for episode in range(4):
+        paths.append(f"data/chunk-000/episode_{episode:06d}.parquet")
+        for key in ("observation.images.front", "observation.images.wrist"):
+            paths.append(f"videos/chunk-000/{key}/episode_{episode:06d}.mp4")
+    return listing(paths)
+
+
+def selected_paths(output_dir: Path, files, **kwargs):
+    chosen, _ = select_files(files, output_dir, DownloadSelection(**kwargs))
+    return sorted(u["relativePath"] for u in chosen)
+
+
+class TestParsing:
+    """Tests for episode ranges and path templates."""
+
+    @pytest.mark.unit
+    def test_parse_episodes(self):
+        """Test indices and ranges are merged and sorted."""
+        assert parse_episodes("5,0-2, 2") == [0, 1, 2, 5]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("value", ["", "a", "3-1", "-1"])
+    def test_parse_episodes_invalid(self, value):
+        """Test malformed ranges are rejected."""
+        with pytest.raises(ValidationError):
+            parse_episodes(value)
+
+    @pytest.mark.unit
+    def test_compile_template(self):
+        """Test template fields become groups and literals are escaped."""
+        match = compile_template(V21_INFO["video_path"]).fullmatch(
+            "videos/chunk-001/observation.images.front/episode_001234.mp4"
+        )
+
+        assert match.groupdict() == {
+            "episode_chunk": "001",
+            "video_key": "observation.images.front",
+            "episode_index": "001234",
+        }
+        assert compile_template("episode_{episode_index:06d}.mp4").fullmatch("episode_1x3.mp4") is None
+
+
+class TestSelectFiles:
+    """Tests for filtering a listing with the info.json templates."""
+
+    @pytest.mark.unit
+    def test_episodes_and_video_keys(self, tmp_path: Path):
+        """Test only the chosen episodes and cameras are kept, along with meta/ and other files."""
+        write_info(tmp_path, V21_INFO)
+
+        paths = selected_paths(tmp_path, v21_files(), episodes=[1, 3], video_keys=["observation.images.front"])
+
+        assert paths == [
+            "README.md",
+            "data/chunk-000/episode_000001.parquet",
+            "data/chunk-000/episode_000003.parquet",
+            "meta/episodes.jsonl",
+            "meta/info.json",
+            "videos/chunk-000/observation.images.front/episode_000001.mp4",
+            "videos/chunk-000/observation.images.front/episode_000003.mp4",
+        ]
+
+    @pytest.mark.unit
+    def test_sample_is_reproducible(self, tmp_path: Path):
+        """Test a seeded sample picks the same episodes every time."""
+        write_info(tmp_path, V21_INFO)
+        choose = lambda: select_files(v21_files(), tmp_path, DownloadSelection(sample=2, seed=7))[1]
+
+        episodes = choose()
+
+        assert len(episodes) == 2 and set(episodes) <= {0, 1, 2, 3}
+        assert choose() == episodes
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("sample", [0, -1])
+    def test_sample_must_be_positive(self, tmp_path: Path, sample):
+        """Test a sample of no episodes is rejected instead of crashing random.sample."""
+        write_info(tmp_path, V21_INFO)
+
+        with pytest.raises(ValidationError, match="at least 1"):
+            select_files(v21_files(), tmp_path, DownloadSelection(sample=sample))
+
+    @pytest.mark.unit
+    def test_meta_only_and_globs(self, tmp_path: Path):
+        """Test --meta-only keeps meta/ and globs never drop it."""
+        files = v21_files()
+
+        assert selected_paths(tmp_path, files, meta_only=True) == ["meta/episodes.jsonl", "meta/info.json"]
+        assert selected_paths(tmp_path, files, include=["data/*"], exclude=["*000003*"]) == [
+            "data/chunk-000/episode_000000.parquet",
+            "data/chunk-000/episode_000001.parquet",
+            "data/chunk-000/episode_000002.parquet",
+            "meta/episodes.jsonl",
+            "meta/info.json",
+        ]
+
+    @pytest.mark.unit
+    def test_unknown_video_key(self, tmp_path: Path):
+        """Test a camera the dataset does not have is reported."""
+        write_info(tmp_path, V21_INFO)
+
+        with pytest.raises(ValidationError, match="observation.images.top"):
+            select_files(v21_files(), tmp_path, DownloadSelection(video_keys=["observation.images.top"]))
+
+    @pytest.mark.unit
+    def test_v30_files_from_episode_table(self, tmp_path: Path, monkeypatch):
+        """Test v3.0 files are chosen by the chunk/file columns of meta/episodes."""
+        write_info(tmp_path, V30_INFO)
+        (tmp_path / "meta/episodes/chunk-000").mkdir(parents=True)
+        (tmp_path / "meta/episodes/chunk-000/file-000.parquet").write_bytes(b"")
+        rows = [
+            {
+                "episode_index": episode,
+                "data/chunk_index": 0, "data/file_index": episode // 2,
+                "videos/observation.images.front/chunk_index": 0,
+                "videos/observation.images.front/file_index": episode // 3,
+            }
+            for episode in range(4)
+        ]
+        monkeypatch.setattr(selection, "_read_parquet_rows", lambda path: rows)
+        files = listing([
+            "meta/info.json",
+            "data/chunk-000/file-000.parquet",
+            "data/chunk-000/file-001.parquet",
+            "videos/observation.images.front/chunk-000/file-000.mp4",
+            "videos/observation.images.front/chunk-000/file-001.mp4",
+        ])
+
+        assert selected_paths(tmp_path, files, episodes=[3]) == [
+            "data/chunk-000/file-001.parquet",
+            "meta/info.json",
+            "videos/observation.images.front/chunk-000/file-001.mp4",
+        ]
+
+
+def run_download(output_dir: Path, download=download_dataset, **kwargs):
+    """Run a download of the v2.1 test dataset against mocked S3.
+
+    Returns:
+        (the download's return value, URLs fetched in order)
+    """
+    files = v21_files()
+    bodies = {u["downloadUrl"]: b"x" for u in files}
+    bodies["https://s3/meta/info.json"] = json.dumps(V21_INFO).encode()
+    for u in files:
+        u["size"] = len(bodies[u["downloadUrl"]])
+    api_response = Mock(status_code=200)
+    api_response.json.return_value = {"data": {"downloadUrls": files, "totalFiles": len(files)}}
+    fetched = []
+
+    def get(url, **kwargs):
+        fetched.append(url)
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.status_code = 200
+        response.headers = {}
+        response.raw.readinto.side_effect = io.BytesIO(bodies[url]).readinto
+        return response
+
+    auth = MagicMock()
+    auth.get_headers.return_value = {}
+    with patch("sami_cli.download.requests.get", return_value=api_response), \
+            patch("sami_cli.download.requests.Session.get", side_effect=get):
+        result = download(auth, "http://api", "ds1", str(output_dir), **kwargs)
+        if not isinstance(result, Path):
+            result = list(result)
+    return result, fetched
+
+
+class TestSelectiveDownload:
+    """Tests for download_dataset with a selection."""
+
+    @pytest.mark.unit
+    def test_downloads_subset_and_trims_info(self, tmp_path: Path):
+        """Test meta/ is fetched first, then only the selection, and info.json lists the kept cameras."""
+        _, fetched = run_download(
+            tmp_path, selection=DownloadSelection(episodes=[2], video_keys=["observation.images.wrist"]),
+        )
+
+        assert fetched[:2] == ["https://s3/meta/info.json", "https://s3/meta/episodes.jsonl"]
+        assert sorted(fetched[2:]) == [
+            "https://s3/README.md",
+            "https://s3/data/chunk-000/episode_000002.parquet",
+            "https://s3/videos/chunk-000/observation.images.wrist/episode_000002.mp4",
+        ]
+        info = json.loads((tmp_path / "meta/info.json").read_text())
+        assert sorted(info["features"]) == ["action", "observation.images.wrist"]
+        assert "meta/info.json" not in LocalManifest(tmp_path).entries
+
+    @pytest.mark.unit
+    def test_trimming_info_keeps_hardlinked_original(self, tmp_path: Path):
+        """Test info.json is replaced, not edited in place, so a cache hardlink keeps the original."""
+        output_dir = tmp_path / "out"
+        write_info(output_dir, V21_INFO)
+        cached = tmp_path / "cache-object"
+        os.link(output_dir / "meta" / "info.json", cached)
+
+        selection.restrict_video_features(output_dir, ["observation.images.wrist"])
+
+        assert json.loads(cached.read_text()) == V21_INFO
+        info = json.loads((output_dir / "meta" / "info.json").read_text())
+        assert sorted(info["features"]) == ["action", "observation.images.wrist"]
+
+
+class TestEpisodeOrder:
+    """Tests for downloading and reporting episodes in order."""
+
+    @pytest.mark.unit
+    def test_episode_files(self, tmp_path: Path):
+        """Test each episode maps to its parquet file and one video per camera."""
+        write_info(tmp_path, V21_INFO)
+
+        files = episode_files(v21_files(), tmp_path, episodes=[0, 1])
+
+        assert sorted(files) == [0, 1]
+        assert sorted(files[1]) == [
+            "data/chunk-000/episode_000001.parquet",
+            "videos/chunk-000/observation.images.front/episode_000001.mp4",
+            "videos/chunk-000/observation.images.wrist/episode_000001.mp4",
+        ]
+
+    @pytest.mark.unit
+    def test_episodes_fetched_and_reported_in_order(self, tmp_path: Path):
+        """Test files are fetched episode by episode and each episode is reported when complete."""
+        ready = []
+
+        _, fetched = run_download(tmp_path, max_workers=1, on_episode=ready.append)
+
+        assert ready == [0, 1, 2, 3]
+        assert fetched[:2] == ["https://s3/meta/info.json", "https://s3/meta/episodes.jsonl"]
+        assert fetched[2:5] == [
+            "https://s3/data/chunk-000/episode_000000.parquet",
+            "https://s3/videos/chunk-000/observation.images.front/episode_000000.mp4",
+            "https://s3/videos/chunk-000/observation.images.wrist/episode_000000.mp4",
+        ]
+        assert fetched[-1] == "https://s3/README.md"
+
+    @pytest.mark.unit
+    def test_downloaded_episodes_reported_first(self, tmp_path: Path):
+        """Test episodes finished by an earlier run are reported before new ones download."""
+        run_download(tmp_path, selection=DownloadSelection(episodes=[0, 1]))
+
+        ready, fetched = run_download(tmp_path, download=iter_episodes, max_workers=1)
+
+        assert ready == [0, 1, 2, 3]
+        assert "https://s3/data/chunk-000/episode_000000.parquet" not in fetched
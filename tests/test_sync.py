@@ -0,0 +1,138 @@
+"""Unit tests for incremental download sync."""
+
+import os
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+from sami_cli.download import download_dataset
+from sami_cli.selection import DownloadSelection
+from sami_cli.sync import MANIFEST_NAME, LocalManifest, find_extraneous, plan_sync
+
+
+def url_info(path: str, size: int, etag: str = "e1") -> dict:
+    return {"relativePath": path, "size": size, "etag": etag, "downloadUrl": f"https://s3/{path}"}
+
+
+class TestLocalManifest:
+    """Tests for detecting up-to-date files."""
+
+    @pytest.mark.unit
+    def test_unchanged_file_is_current(self, tmp_path: Path):
+        """Test a recorded file matches until the server or local copy changes."""
+        (tmp_path / "a.bin").write_bytes(b"abc")
+        manifest = LocalManifest(tmp_path)
+        manifest.record(url_info("a.bin", 3))
+        manifest.save()
+
+        reloaded = LocalManifest(tmp_path)
+        assert reloaded.is_current(url_info("a.bin", 3))
+        assert not reloaded.is_current(url_info("a.bin", 3, etag="e2"))
+
+        stat = (tmp_path / "a.bin").stat()
+        os.utime(tmp_path / "a.bin", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        assert not reloaded.is_current(url_info("a.bin", 3))
+
+    @pytest.mark.unit
+    def test_plan_sync_splits_listing(self, tmp_path: Path):
+        """Test new files are planned and recorded ones skipped."""
+        (tmp_path / "a.bin").write_bytes(b"abc")
+        manifest = LocalManifest(tmp_path)
+        manifest.record(url_info("a.bin", 3))
+
+        changed, unchanged = plan_sync([url_info("a.bin", 3), url_info("b.bin", 5)], manifest)
+
+        assert [u["relativePath"] for u in changed] == ["b.bin"]
+        assert [u["relativePath"] for u in unchanged] == ["a.bin"]
+
+    @pytest.mark.unit
+    def test_find_extraneous(self, tmp_path: Path):
+        """Test only downloaded files gone from the server are listed, never untracked ones."""
+        (tmp_path / "sub").mkdir()
+        for name in ("a.bin", "old.bin", "sub/gone.bin", "notes.txt", "untracked.bin"):
+            (tmp_path / name).write_bytes(b"x")
+        manifest = LocalManifest(tmp_path)
+        for name in ("a.bin", "old.bin", "sub/gone.bin", "vanished.bin"):
+            manifest.entries[name] = {"size": 1}
+
+        gone, extraneous = find_extraneous(tmp_path, manifest, {"a.bin", "b.bin"})
+
+        assert gone == ["old.bin", "sub/gone.bin", "vanished.bin"]
+        assert sorted(p.relative_to(tmp_path).as_posix() for p in extraneous) == ["old.bin", "sub/gone.bin"]
+
+    @pytest.mark.unit
+    def test_find_extraneous_removes_partial_downloads(self, tmp_path: Path):
+        """Test partial downloads of a removed file go with it; others are kept."""
+        for name in ("b.bin.part", "b.bin.part.segments", "old.bin.part.segments", "stray.bin.part"):
+            (tmp_path / name).write_bytes(b"x")
+        manifest = LocalManifest(tmp_path)
+        manifest.entries["old.bin"] = {"size": 1}
+
+        _, extraneous = find_extraneous(tmp_path, manifest, {"b.bin"}, (".part", ".part.segments"))
+
+        assert [p.name for p in extraneous] == ["old.bin.part.segments"]
+
+
+class TestDownloadSync:
+    """Tests for download_dataset(sync=True)."""
+
+    @pytest.mark.unit
+    def test_only_changed_files_downloaded(self, tmp_path: Path):
+        """Test a second sync fetches only the changed file and deletes removed ones."""
+        listing = [url_info("a.bin", 3), url_info("b.bin", 3)]
+
+        def api_response(files):
+            response = Mock(status_code=200)
+            response.json.return_value = {"data": {"downloadUrls": files, "totalFiles": len(files)}}
+            return response
+
+        def fake_download(url, output_path, expected_size=None, **kwargs):
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_bytes(b"x" * expected_size)
+
+        auth = MagicMock()
+        auth.get_headers.return_value = {}
+        with patch("sami_cli.download.requests.get", return_value=api_response(listing)), \
+                patch("sami_cli.download.download_file", side_effect=fake_download), \
+                patch("sami_cli.download.create_transfer_session", return_value=MagicMock()):
+            download_dataset(auth, "http://api", "ds1", str(tmp_path), sync=True)
+
+        listing = [url_info("a.bin", 3), url_info("c.bin", 4, etag="e9")]
+        with patch("sami_cli.download.requests.get", return_value=api_response(listing)), \
+                patch("sami_cli.download.download_file", side_effect=fake_download) as mock_download, \
+                patch("sami_cli.download.create_transfer_session", return_value=MagicMock()):
+            download_dataset(auth, "http://api", "ds1", str(tmp_path), sync=True, delete=True)
+
+        assert [c.args[1].name for c in mock_download.call_args_list] == ["c.bin"]
+        assert not (tmp_path / "b.bin").exists()
+        assert (tmp_path / "a.bin").exists()
+
+    @pytest.mark.unit
+    def test_delete_keeps_user_files_and_unselected_episodes(self, tmp_path: Path):
+        """Test --delete with a selection never removes files outside it or not downloaded by us."""
+        listing = [url_info("a.bin", 3), url_info("videos/b.mp4", 3)]
+        response = Mock(status_code=200)
+        response.json.return_value = {"data": {"downloadUrls": listing, "totalFiles": len(listing)}}
+        (tmp_path / "videos").mkdir()
+        (tmp_path / "videos" / "b.mp4").write_bytes(b"xxx")
+        manifest = LocalManifest(tmp_path)
+        manifest.record(url_info("videos/b.mp4", 3))
+        manifest.save()
+        (tmp_path / "my_notes.txt").write_text("mine")
+
+        def fake_download(url, output_path, expected_size=None, **kwargs):
+            output_path.write_bytes(b"x" * expected_size)
+
+        auth = MagicMock()
+        auth.get_headers.return_value = {}
+        with patch("sami_cli.download.requests.get", return_value=response), \
+                patch("sami_cli.download.download_file", side_effect=fake_download), \
+                patch("sami_cli.download.create_transfer_session", return_value=MagicMock()):
+            download_dataset(
+                auth, "http://api", "ds1", str(tmp_path), sync=True, delete=True,
+                selection=DownloadSelection(exclude=["videos/*"]),
+            )
+
+        assert (tmp_path / "a.bin").exists()
+        assert (tmp_path / "videos" / "b.mp4").exists()
+        assert (tmp_path / "my_notes.txt").read_text() == "mine"
@@ -0,0 +1,436 @@
+"""Unit tests for upload transfer functionality."""
+
+import base64
+import hashlib
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+from sami_cli import upload
+from sami_cli.upload import FileSlice, plan_multipart_parts, upload_part
+from sami_cli.exceptions import UploadError
+from sami_cli.dedup import ContentIndex
+from sami_cli.journal import UploadJournal
+from sami_cli.layout_cache import Mp4LayoutCache
+from sami_cli.models import UploadUrl
+
+
+def fake_session(put):
+    """Build a transfer session mock whose put() calls the given function."""
+    session = MagicMock()
+    session.__enter__.return_value = session
+    session.put.side_effect = put
+    return session
+
+
+class TestPlanMultipartParts:
+    """Tests for splitting files into multipart parts."""
+
+    @pytest.mark.unit
+    def test_parts_cover_file(self):
+        """Test parts are contiguous and cover the whole file."""
+        parts = plan_multipart_parts(250, part_size=100)
+
+        assert parts == [(1, 0, 100), (2, 100, 100), (3, 200, 50)]
+
+    @pytest.mark.unit
+    def test_part_size_grows_to_fit_part_limit(self):
+        """Test part size is raised so the file fits in 10,000 parts."""
+        size = 20_000 * 1024
+        parts = plan_multipart_parts(size, part_size=1024)
+
+        assert len(parts) <= upload.MAX_MULTIPART_PARTS
+        assert sum(length for _, _, length in parts) == size
+
+
+class TestFileSlice:
+    """Tests for the byte-range part body."""
+
+    @pytest.mark.unit
+    def test_reads_only_its_range(self, tmp_path: Path):
+        """Test a slice reads exactly its byte range."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"0123456789")
+
+        with FileSlice(path, 3, 4) as body:
+            assert len(body) == 4
+            assert b"".join(body) == b"3456"
+            assert body.read() == b""
+
+
+class TestUploadPart:
+    """Tests for uploading a single multipart part."""
+
+    @pytest.mark.unit
+    @patch("sami_cli.upload.requests.put")
+    def test_returns_etag(self, mock_put, tmp_path: Path):
+        """Test the part ETag is returned."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"x" * 10)
+        mock_put.return_value = Mock(status_code=200, headers={"ETag": '"abc"'})
+
+        etag = upload_part(path, "https://s3/part1", 1, 0, 10)
+
+        assert etag == '"abc"'
+
+    @pytest.mark.unit
+    @patch("sami_cli.retry.BASE_DELAY", 0)
+    @patch("sami_cli.upload.requests.put")
+    def test_retries_server_errors(self, mock_put, tmp_path: Path):
+        """Test a part is retried on its own after a 5xx."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"x" * 10)
+        mock_put.side_effect = [
+            Mock(status_code=503, headers={}),
+            Mock(status_code=200, headers={"ETag": '"abc"'}),
+        ]
+
+        assert upload_part(path, "https://s3/part1", 1, 0, 10) == '"abc"'
+        assert mock_put.call_count == 2
+
+    @pytest.mark.unit
+    @patch("sami_cli.retry.BASE_DELAY", 0)
+    @patch("sami_cli.upload.requests.put")
+    def test_content_md5_sent_and_bad_digest_retried(self, mock_put, tmp_path: Path):
+        """Test the part MD5 is sent and a body S3 rejects as corrupt is sent again."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"x" * 10)
+        md5 = hashlib.md5(b"x" * 10)
+        mock_put.side_effect = [
+            Mock(status_code=400, headers={}, text="<Code>BadDigest</Code>"),
+            Mock(status_code=200, headers={"ETag": '"abc"'}),
+        ]
+
+        assert upload_part(path, "https://s3/part1", 1, 0, 10, md5=md5.hexdigest()) == '"abc"'
+        assert mock_put.call_count == 2
+        sent = mock_put.call_args.kwargs["headers"]["Content-MD5"]
+        assert base64.b64decode(sent) == md5.digest()
+
+    @pytest.mark.unit
+    @patch("sami_cli.upload.requests.put")
+    def test_missing_etag_fails(self, mock_put, tmp_path: Path):
+        """Test a part without ETag cannot be completed."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"x" * 10)
+        mock_put.return_value = Mock(status_code=200, headers={})
+
+        with pytest.raises(UploadError, match="ETag"):
+            upload_part(path, "https://s3/part1", 1, 0, 10)
+
+
+class TestMultipartUploadDataset:
+    """Tests for the multipart path of upload_dataset."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("checksums", [None, True])
+    def test_large_file_uploaded_in_parts(self, temp_dataset_dir: Path, tmp_path: Path, monkeypatch, checksums):
+        """Test files over the threshold are split, uploaded and completed, read twice only with checksums."""
+        monkeypatch.setattr(upload, "MULTIPART_THRESHOLD", 1000)
+        monkeypatch.setattr(upload, "MULTIPART_PART_SIZE", 1000)
+        data_dir = temp_dataset_dir / "data" / "chunk-000"
+        data_dir.mkdir(parents=True)
+        (data_dir / "file-000.parquet").write_bytes(b"x" * 2500)
+
+        posted = {}
+
+        def fake_post(url, json=None, headers=None):
+            posted[url[len("http://api/"):]] = json
+            response = Mock(status_code=200)
+            if url.endswith("/datasets"):
+                response.status_code = 201
+                response.json.return_value = {"data": {"id": "ds1"}}
+            elif url.endswith("/upload-urls"):
+                response.json.return_value = {"data": {"uploadUrls": [
+                    {"relativePath": f["relativePath"], "uploadUrl": "https://s3/single"}
+                    for f in json["files"]
+                ]}}
+            elif url.endswith("/multipart-uploads"):
+                response.json.return_value = {"data": {"uploadId": "up1", "key": "k", "parts": [
+                    {"partNumber": n, "uploadUrl": f"https://s3/part{n}"}
+                    for n in range(1, json["partCount"] + 1)
+                ]}}
+            elif url.endswith("/complete"):
+                response.json.return_value = {"data": {
+                    "id": "ds1", "name": "test", "uploadStatus": "ready",
+                }}
+            return response
+
+        sent_md5 = {}
+
+        def fake_put(url, data=None, headers=None, timeout=None):
+            body = b"".join(data)
+            sent_md5[url] = (headers.get("Content-MD5"), base64.b64encode(hashlib.md5(body).digest()).decode())
+            return Mock(status_code=200, headers={"ETag": url.rsplit("/", 1)[1]})
+
+        auth = MagicMock()
+        auth.get_headers.return_value = {}
+        with patch("sami_cli.upload.requests.post", side_effect=fake_post), \
+                patch("sami_cli.upload.create_transfer_session", return_value=fake_session(fake_put)), \
+                patch("sami_cli.upload.hash_files") as hash_files, \
+                patch("sami_cli.upload.body_md5", wraps=upload.body_md5) as pre_hash:
+            dataset = upload.upload_dataset(
+                auth, "http://api", "test", str(temp_dataset_dir), journal_dir=tmp_path,
+                content_index=ContentIndex(tmp_path / "index.json"), checksums=checksums,
+            )
+
+        assert dataset.id == "ds1"
+        # No hashing pass before the transfer; only with checksums=True does
+        # every PUT carry an MD5 computed (by a second read) just before it
+        hash_files.assert_not_called()
+        for part in ("https://s3/part1", "https://s3/part2", "https://s3/part3"):
+            expected = sent_md5[part][1] if checksums else None
+            assert sent_md5[part][0] == expected
+        assert pre_hash.called == bool(checksums)
+        assert posted["datasets/ds1/multipart-uploads"]["partCount"] == 3
+        assert posted["datasets/ds1/multipart-uploads/complete"]["parts"] == [
+            {"partNumber": 1, "etag": "part1"},
+            {"partNumber": 2, "etag": "part2"},
+            {"partNumber": 3, "etag": "part3"},
+        ]
+        single_paths = [f["relativePath"] for f in posted["datasets/ds1/upload-urls"]["files"]]
+        assert "data/chunk-000/file-000.parquet" not in single_paths
+
+
+class TestResumeUploadDataset:
+    """Tests for resuming an upload from its journal."""
+
+    @staticmethod
+    def fake_post(created):
+        def post(url, json=None, headers=None):
+            response = Mock(status_code=200)
+            if url.endswith("/datasets"):
+                created.append(url)
+                response.status_code = 201
+                response.json.return_value = {"data": {"id": "ds1"}}
+            elif url.endswith("/upload-urls"):
+                response.json.return_value = {"data": {"uploadUrls": [
+                    {"relativePath": f["relativePath"], "uploadUrl": f"https://s3/{f['relativePath']}"}
+                    for f in json["files"]
+                ]}}
+            elif url.endswith("/complete"):
+                response.json.return_value = {"data": {
+                    "id": "ds1", "name": "test", "uploadStatus": "ready",
+                }}
+            return response
+        return post
+
+    @pytest.mark.unit
+    def test_resume_uploads_only_missing_files(self, temp_dataset_dir: Path, tmp_path: Path):
+        """Test a rerun with resume reuses the dataset and skips finished files."""
+        data_dir = temp_dataset_dir / "data" / "chunk-000"
+        data_dir.mkdir(parents=True)
+        (data_dir / "file-000.parquet").write_bytes(b"x" * 100)
+
+        created = []
+
+        def failing_put(url, data=None, headers=None, timeout=None):
+            status = 403 if url.endswith(".parquet") else 200
+            return Mock(status_code=status, headers={})
+
+        auth = MagicMock()
+        auth.get_headers.return_value = {}
+        with patch("sami_cli.upload.requests.post", side_effect=self.fake_post(created)), \
+                patch("sami_cli.upload.create_transfer_session", return_value=fake_session(failing_put)):
+            with pytest.raises(UploadError, match="--resume"):
+                upload.upload_dataset(
+                    auth, "http://api", "test", str(temp_dataset_dir), journal_dir=tmp_path,
+                    content_index=ContentIndex(tmp_path / "index.json"),
+                )
+
+        session = fake_session(lambda url, **kwargs: Mock(status_code=200, headers={}))
+        with patch("sami_cli.upload.requests.post", side_effect=self.fake_post(created)), \
+                patch("sami_cli.upload.requests.get", return_value=Mock(status_code=200)), \
+                patch("sami_cli.upload.create_transfer_session", return_value=session):
+            dataset = upload.upload_dataset(
+                auth, "http://api", "test", str(temp_dataset_dir), resume=True, journal_dir=tmp_path,
+                content_index=ContentIndex(tmp_path / "index.json"),
+            )
+
+        assert dataset.id == "ds1"
+        assert len(created) == 1
+        assert [c.args[0] for c in session.put.call_args_list] == ["https://s3/data/chunk-000/file-000.parquet"]
+        assert not list(tmp_path.glob("*.jsonl"))
+
+
+    @pytest.mark.unit
+    def test_journal_closed_when_transfer_raises(self, temp_dataset_dir: Path, tmp_path: Path):
+        """Test the journal is flushed and closed even if the transfer loop raises."""
+        created = []
+        journals = []
+        for_dataset = UploadJournal.for_dataset
+
+        def track_journal(*args):
+            journals.append(for_dataset(*args))
+            return journals[-1]
+
+        auth = MagicMock()
+        auth.get_headers.return_value = {}
+        with patch("sami_cli.upload.requests.post", side_effect=self.fake_post(created)), \
+                patch("sami_cli.upload.create_transfer_session", side_effect=RuntimeError("boom")), \
+                patch("sami_cli.upload.UploadJournal.for_dataset", side_effect=track_journal):
+            with pytest.raises(RuntimeError, match="boom"):
+                upload.upload_dataset(
+                    auth, "http://api", "test", str(temp_dataset_dir), journal_dir=tmp_path,
+                    content_index=ContentIndex(tmp_path / "index.json"),
+                )
+
+        assert journals[0]._file is None
+        assert journals[0].exists()
+
+
+    @pytest.mark.unit
+    def test_file_without_url_fails_upload(self, temp_dataset_dir: Path, tmp_path: Path):
+        """Test a file the server returns no upload URL for is reported as failed."""
+        data_dir = temp_dataset_dir / "data" / "chunk-000"
+        data_dir.mkdir(parents=True)
+        (data_dir / "file-000.parquet").write_bytes(b"x" * 100)
+        post = self.fake_post([])
+
+        def dropping_post(url, json=None, headers=None):
+            if url.endswith("/upload-urls"):
+                json = {"files": [f for f in json["files"] if not f["relativePath"].endswith(".parquet")]}
+            return post(url, json=json, headers=headers)
+
+        session = fake_session(lambda url, **kwargs: Mock(status_code=200, headers={}))
+        auth = MagicMock()
+        auth.get_headers.return_value = {}
+        with patch("sami_cli.upload.requests.post", side_effect=dropping_post), \
+                patch("sami_cli.upload.create_transfer_session", return_value=session):
+            with pytest.raises(UploadError, match="Failed to upload 1 files"):
+                upload.upload_dataset(
+                    auth, "http://api", "test", str(temp_dataset_dir), journal_dir=tmp_path,
+                    content_index=ContentIndex(tmp_path / "index.json"),
+                )
+
+
+class TestDeduplicateUploadDataset:
+    """Tests for skipping content the platform already stores."""
+
+    @pytest.mark.unit
+    def test_known_and_duplicate_files_copied(self, temp_dataset_dir: Path, tmp_path: Path):
+        """Test indexed content and in-dataset duplicates are copied, not uploaded."""
+        data_dir = temp_dataset_dir / "data" / "chunk-000"
+        data_dir.mkdir(parents=True)
+        (data_dir / "file-000.parquet").write_bytes(b"x" * 100)
+        (data_dir / "file-001.parquet").write_bytes(b"x" * 100)
+        info = temp_dataset_dir / "meta" / "info.json"
+        index = ContentIndex(tmp_path / "index.json")
+        index.add(hashlib.sha256(info.read_bytes()).hexdigest(), "old", "meta/info.json", 10)
+
+        created = []
+        copy_requests = []
+        post = TestResumeUploadDataset.fake_post(created)
+
+        def fake_post(url, json=None, headers=None):
+            if url.endswith("/copy-files"):
+                copy_requests.append(json["files"])
+                response = Mock(status_code=200)
+                response.json.return_value = {"data": {"copied": [f["relativePath"] for f in json["files"]]}}
+                return response
+            return post(url, json=json, headers=headers)
+
+        session = fake_session(lambda url, **kwargs: Mock(status_code=200, headers={}))
+        auth = MagicMock()
+        auth.get_headers.return_value = {}
+        with patch("sami_cli.upload.requests.post", side_effect=fake_post), \
+                patch("sami_cli.upload.create_transfer_session", return_value=session):
+            upload.upload_dataset(
+                auth, "http://api", "test", str(temp_dataset_dir), journal_dir=tmp_path,
+                content_index=index, dedup=True,
+            )
+
+        assert len(session.put.call_args_list) == 1
+        assert [(f["relativePath"], f["sourceDatasetId"]) for f in copy_requests[0]] == [
+            ("meta/info.json", "old"),
+        ]
+        assert [f["sourceDatasetId"] for f in copy_requests[1]] == ["ds1"]
+        assert index.lookup(hashlib.sha256(b"x" * 100).hexdigest())[0] == "ds1"
+
+
+class TestUrlRefresh:
+    """Tests for re-requesting presigned URLs that expired while queued."""
+
+    @pytest.mark.unit
+    def test_expiring_url_refreshed_before_upload(self, tmp_path: Path):
+        """Test a URL close to expiry is replaced before the PUT."""
+        path = tmp_path / "a.json"
+        path.write_text("{}")
+        stale = UploadUrl("a.json", "https://s3/stale", "", expires_at=time.time() + 10)
+        fresh = UploadUrl("a.json", "https://s3/fresh", "", expires_at=time.time() + 3600)
+        session = fake_session(lambda url, **kwargs: Mock(status_code=200, headers={}))
+
+        upload.upload_file_with_url_refresh(path, stale, "application/json", lambda: fresh, session=session)
+
+        assert [c.args[0] for c in session.put.call_args_list] == ["https://s3/fresh"]
+
+    @pytest.mark.unit
+    def test_expired_response_triggers_refresh(self, tmp_path: Path):
+        """Test an S3 'Request has expired' rejection re-requests the URL once."""
+        path = tmp_path / "a.json"
+        path.write_text("{}")
+        url = UploadUrl("a.json", "https://s3/old", "", expires_at=time.time() + 3600)
+        fresh = UploadUrl("a.json", "https://s3/new", "", expires_at=time.time() + 3600)
+        session = fake_session(lambda url, **kwargs: (
+            Mock(status_code=403, text="<Message>Request has expired</Message>", headers={})
+            if url.endswith("old") else Mock(status_code=200, headers={})
+        ))
+
+        upload.upload_file_with_url_refresh(path, url, "application/json", lambda: fresh, session=session)
+
+        assert [c.args[0] for c in session.put.call_args_list] == ["https://s3/old", "https://s3/new"]
+
+    @pytest.mark.unit
+    def test_part_urls_resigned_once(self):
+        """Test concurrent workers share one re-sign of stale part URLs."""
+        resign = Mock(return_value={
+            "parts": [{"partNumber": 1, "uploadUrl": "new1"}, {"partNumber": 2, "uploadUrl": "new2"}],
+            "expiresAt": time.time() + 3600,
+        })
+        parts = [{"partNumber": 1, "uploadUrl": "old1"}, {"partNumber": 2, "uploadUrl": "old2"}]
+        part_urls = upload.MultipartPartUrls(parts, time.time() + 10, resign)
+
+        assert part_urls.get(1) == "new1"
+        assert part_urls.get(2) == "new2"
+        assert part_urls.refresh("old2", 2) == "new2"
+        assert resign.call_count == 1
+
+
+class TestProcessVideosForWeb:
+    """Tests for parallel faststart checking and remuxing."""
+
+    @pytest.mark.unit
+    def test_only_videos_needing_faststart_are_remuxed(self, tmp_path: Path):
+        """Test both passes run and only flagged videos are processed."""
+        videos = []
+        for i in range(6):
+            path = tmp_path / f"episode_{i:06d}.mp4"
+            path.write_bytes(b"")
+            videos.append((path, path.name, "video/mp4", 0))
+        needs = {videos[1][0], videos[4][0]}
+
+        with patch("sami_cli.upload.check_ffmpeg_available", return_value=True), \
+                patch("sami_cli.upload.needs_faststart", side_effect=lambda p, cache=None: p in needs), \
+                patch("sami_cli.upload.apply_faststart", return_value=True) as mock_apply:
+            processed, failed = upload.process_videos_for_web(
+                videos, max_workers=3, layout_cache=Mp4LayoutCache(tmp_path / "layouts.json"),
+            )
+
+        assert (processed, failed) == (2, 0)
+        assert {c.args[0] for c in mock_apply.call_args_list} == needs
+
+    @pytest.mark.unit
+    def test_failed_remux_removes_temp_file(self, tmp_path: Path):
+        """Test a failed ffmpeg run leaves no .tmp.mp4 behind."""
+        video = tmp_path / "episode_000000.mp4"
+        video.write_bytes(b"original")
+
+        def fake_ffmpeg(cmd, **kwargs):
+            Path(cmd[-1]).write_bytes(b"partial")
+            return Mock(returncode=1)
+
+        with patch("sami_cli.upload.subprocess.run", side_effect=fake_ffmpeg):
+            assert upload.apply_faststart_ffmpeg(video) is False
+
+        assert video.read_bytes() == b"original"
+        assert not (tmp_path / "episode_000000.tmp.mp4").exists()